@@ -0,0 +1,153 @@
+"""
+Device Farm v5 - Task Dispatch Benchmark
+Measures DeviceScheduler matching throughput against the legacy linear scan
+
+Usage (from device_farm_v5/):
+    python -m benchmarks.bench_task_dispatch --devices 1000 --tasks 100000
+"""
+
+import argparse
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from src.core.device_scheduler import DeviceCapabilities, DeviceScheduler, TaskRequirements
+
+ANDROID_VERSIONS = ["9", "10", "11", "12", "13", "14"]
+RESOLUTIONS = ["1080x2400", "1080x1920", "720x1600"]
+REGIONS = ["es", "mx", "us", "co", "ar"]
+PACKAGES = ["com.zhiliaoapp.musically", "com.instagram.android", "com.twitter.android"]
+
+
+@dataclass
+class BenchTask:
+    task_id: int
+    priority: int
+    device_requirements: Dict[str, Any] = field(default_factory=dict)
+
+
+def build_devices(count: int, rng: random.Random) -> Dict[str, DeviceCapabilities]:
+    devices = {}
+    for i in range(count):
+        devices[f"device-{i:05d}"] = DeviceCapabilities(
+            android_version=(int(rng.choice(ANDROID_VERSIONS)),),
+            screen_resolution=rng.choice(RESOLUTIONS),
+            region=rng.choice(REGIONS),
+            packages=frozenset(rng.sample(PACKAGES, rng.randint(1, len(PACKAGES)))),
+        )
+    return devices
+
+
+def build_tasks(count: int, rng: random.Random) -> List[BenchTask]:
+    tasks = []
+    for i in range(count):
+        requirements: Dict[str, Any] = {}
+        if rng.random() < 0.5:
+            requirements["min_android_version"] = rng.choice(ANDROID_VERSIONS[:4])
+        if rng.random() < 0.5:
+            requirements["region"] = rng.choice(REGIONS)
+        if rng.random() < 0.3:
+            requirements["packages"] = [rng.choice(PACKAGES)]
+        tasks.append(BenchTask(task_id=i, priority=rng.randint(1, 4), device_requirements=requirements))
+    return tasks
+
+
+def bench_scheduler(devices: Dict[str, DeviceCapabilities], tasks: List[BenchTask]) -> Dict[str, float]:
+    """Submit all tasks, then repeatedly dispatch and free devices until drained"""
+    scheduler = DeviceScheduler()
+    for serial, capabilities in devices.items():
+        scheduler.set_device(serial, capabilities, available=True)
+
+    start = time.perf_counter()
+    for task in tasks:
+        scheduler.submit(task)
+    submit_elapsed = time.perf_counter() - start
+
+    dispatched = 0
+    start = time.perf_counter()
+    while scheduler.pending_count:
+        busy = []
+        while True:
+            assignment = scheduler.next_assignment()
+            if assignment is None:
+                break
+            busy.append(assignment[1])
+            dispatched += 1
+        if not busy:
+            break  # Remaining tasks have no compatible device
+        for serial in busy:
+            scheduler.mark_idle(serial)
+    dispatch_elapsed = time.perf_counter() - start
+
+    return {
+        "submitted": len(tasks),
+        "dispatched": dispatched,
+        "unmatched": scheduler.pending_count,
+        "submit_seconds": submit_elapsed,
+        "dispatch_seconds": dispatch_elapsed,
+        "dispatch_per_second": dispatched / dispatch_elapsed if dispatch_elapsed else 0.0,
+    }
+
+
+def bench_linear_scan(
+    devices: Dict[str, DeviceCapabilities], tasks: List[BenchTask], limit: int
+) -> Dict[str, float]:
+    """Legacy behaviour: rebuild the available list and scan it per task"""
+    availability = {serial: True for serial in devices}
+    tasks = tasks[:limit]
+
+    dispatched = 0
+    start = time.perf_counter()
+    for task in tasks:
+        requirements = TaskRequirements.from_dict(task.device_requirements)
+        available_devices = [serial for serial, free in availability.items() if free]
+        if not available_devices:
+            availability = {serial: True for serial in devices}
+            available_devices = list(devices)
+        for serial in available_devices:
+            if requirements.is_satisfied_by(devices[serial]):
+                availability[serial] = False
+                dispatched += 1
+                break
+    elapsed = time.perf_counter() - start
+
+    return {
+        "submitted": len(tasks),
+        "dispatched": dispatched,
+        "dispatch_seconds": elapsed,
+        "dispatch_per_second": dispatched / elapsed if elapsed else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Task dispatch benchmark")
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--linear-limit", type=int, default=10000, help="Tasks for the baseline")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    devices = build_devices(args.devices, rng)
+    tasks = build_tasks(args.tasks, rng)
+
+    print(f"Devices: {args.devices}  Tasks: {args.tasks}")
+
+    indexed = bench_scheduler(devices, tasks)
+    print(
+        f"DeviceScheduler: {indexed['dispatched']} dispatched "
+        f"({indexed['unmatched']} unmatched) in {indexed['dispatch_seconds']:.3f}s "
+        f"-> {indexed['dispatch_per_second']:,.0f} tasks/s "
+        f"(submit {indexed['submit_seconds']:.3f}s)"
+    )
+
+    linear = bench_linear_scan(devices, tasks, args.linear_limit)
+    print(
+        f"Linear scan:     {linear['dispatched']} dispatched in {linear['dispatch_seconds']:.3f}s "
+        f"-> {linear['dispatch_per_second']:,.0f} tasks/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,16 +7,41 @@ import asyncio
 import json
 import re
 import subprocess
+import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import psutil
 from loguru import logger
 
 from ..config_manager import get_config
+from ..core.adb_shell_pool import (
+    ADBShellPool,
+    ADBShellSessionError,
+    ADBShellTimeoutError,
+    ADBShellUnsupportedError,
+)
 from ..core.models import Device, get_db_session
+from ..core.screen_capture import ScreenCaptureError, ScreenFrame, decode_screencap
+from ..utils.performance import performance_monitor
+
+# Marker separating sections of a combined `adb shell` invocation
+_SECTION_MARKER = "__DF5_SECTION__"
+
+# Properties that never change while a device stays connected
+_STATIC_PROPERTY_COMMANDS = [
+    "getprop ro.product.model",
+    "getprop ro.build.version.release",
+    "wm size",
+]
+
+# Properties re-queried on every scan
+_DYNAMIC_PROPERTY_COMMANDS = [
+    "dumpsys battery | grep level",
+    "ip route | grep wlan0",
+]
 
 
 @dataclass
@@ -86,6 +111,23 @@ class ADBDeviceManager:
         self._device_proxies: Dict[str, ProxySettings] = {}
         self._last_scan: Optional[datetime] = None
 
+        # Persistent per-device shells for `shell` commands
+        self.persistent_shell = self.config.raw_config.get("adb", {}).get("persistent_shell", True)
+        self._shell_pool = ADBShellPool(self.adb_path)
+        # Devices without shell_v2 use one `adb shell` process per command
+        self._legacy_shell_serials: Set[str] = set()
+
+        # Discovery settings
+        detection = self.config.raw_config.get("adb", {}).get("detection", {})
+        self.scan_concurrency = int(detection.get("scan_concurrency", 16))
+        self._scan_metrics: Dict[str, Any] = {
+            "scans": 0,
+            "last_scan_seconds": 0.0,
+            "last_scan_devices": 0,
+            "full_queries": 0,
+            "incremental_queries": 0,
+        }
+
         logger.info("ADB Device Manager initialized")
 
     async def initialize(self) -> bool:
@@ -112,7 +154,26 @@ class ADBDeviceManager:
     async def _run_adb_command(
         self, args: List[str], device_serial: Optional[str] = None
     ) -> Tuple[str, str]:
-        """Run ADB command with timeout and error handling"""
+        """Run ADB command with timeout and error handling.
+
+        `shell` commands for a device go over that device's persistent shell
+        session; everything else spawns an `adb` process.
+        """
+        if (
+            self.persistent_shell
+            and device_serial
+            and device_serial not in self._legacy_shell_serials
+            and len(args) > 1
+            and args[0] == "shell"
+        ):
+            return await self._run_shell_command(args[1:], device_serial)
+
+        return await self._spawn_adb_command(args, device_serial)
+
+    async def _spawn_adb_command(
+        self, args: List[str], device_serial: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """Run ADB command in its own `adb` process"""
         cmd = [self.adb_path]
 
         if device_serial:
@@ -149,8 +210,75 @@ class ADBDeviceManager:
             logger.error(f"Error running ADB command {' '.join(cmd)}: {e}")
             raise ADBError(f"Failed to run ADB command: {e}")
 
+    async def _run_shell_command(self, shell_args: List[str], device_serial: str) -> Tuple[str, str]:
+        """Run a shell command over the device's persistent session"""
+        # adb joins shell arguments with spaces before handing them to sh
+        command = " ".join(shell_args)
+        try:
+            stdout, stderr, status = await self._shell_pool.run(
+                device_serial, command, self.command_timeout
+            )
+        except ADBShellTimeoutError as e:
+            # The command may have run; spawning it again could repeat its side effects
+            logger.error(f"Error running shell command on {device_serial} ({command}): {e}")
+            raise ADBError(f"Failed to run ADB command: {e}")
+        except ADBShellUnsupportedError as e:
+            logger.info(f"Using one adb process per shell command for {device_serial}: {e}")
+            self._legacy_shell_serials.add(device_serial)
+            return await self._spawn_adb_command(["shell", *shell_args], device_serial)
+        except ADBShellSessionError as e:
+            logger.warning(f"Persistent shell failed on {device_serial} ({command}): {e}")
+            return await self._spawn_adb_command(["shell", *shell_args], device_serial)
+
+        stdout_str = stdout.strip()
+        stderr_str = stderr.strip()
+
+        if status != 0 and stderr_str:
+            logger.debug(f"ADB shell command returned {status}: {stderr_str}")
+
+        return stdout_str, stderr_str
+
+    async def _run_adb_binary(self, args: List[str], device_serial: str) -> bytes:
+        """Run an ADB command and return its raw stdout (e.g. `exec-out screencap`)"""
+        cmd = [self.adb_path, "-s", device_serial, *args]
+
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(), timeout=self.command_timeout
+                )
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                raise ADBError(f"ADB command timed out after {self.command_timeout}s")
+
+            if process.returncode != 0:
+                raise ADBError(stderr.decode("utf-8", errors="ignore").strip())
+
+            return stdout
+
+        except ADBError:
+            raise
+        except Exception as e:
+            raise ADBError(f"Failed to run ADB command: {e}")
+
+    async def cleanup(self):
+        """Close persistent shell sessions"""
+        await self._shell_pool.close_all()
+
+    @performance_monitor("adb_scan_devices")
     async def scan_devices(self) -> List[DeviceInfo]:
-        """Scan for connected Android devices"""
+        """Scan for connected Android devices.
+
+        Devices are queried concurrently (bounded by ``scan_concurrency``)
+        with one combined shell invocation each. Devices already known from
+        a previous scan only re-query battery and WiFi IP.
+        """
+        scan_start = time.perf_counter()
         try:
             logger.info("Scanning for Android devices...")
 
@@ -161,7 +289,7 @@ class ADBDeviceManager:
                 logger.warning("No devices found")
                 return []
 
-            devices = []
+            serials = []
             lines = stdout.split("\n")[1:]  # Skip header line
 
             for line in lines:
@@ -177,19 +305,44 @@ class ADBDeviceManager:
                 status = parts[1]
 
                 if status == "device":
-                    # Get detailed device info
-                    device_info = await self._get_device_info(serial)
-                    if device_info:
-                        devices.append(device_info)
-                        self._devices[serial] = device_info
+                    serials.append(serial)
+
+            # Forget devices that disappeared so a reconnect gets a full query
+            for serial in list(self._devices):
+                if serial not in serials:
+                    del self._devices[serial]
+                    await self._shell_pool.close_session(serial)
+
+            semaphore = asyncio.Semaphore(self.scan_concurrency)
+
+            async def _discover(serial: str) -> Optional[DeviceInfo]:
+                async with semaphore:
+                    known = self._devices.get(serial)
+                    if known:
+                        return await self._refresh_device_info(serial, known)
+                    return await self._get_device_info(serial)
+
+            results = await asyncio.gather(*(_discover(serial) for serial in serials))
+
+            devices = []
+            for serial, device_info in zip(serials, results):
+                if device_info:
+                    devices.append(device_info)
+                    if serial not in self._devices:
                         logger.info(f"Found device: {serial} ({device_info.model})")
+                    self._devices[serial] = device_info
 
             self._last_scan = datetime.now(timezone.utc)
 
             # Update database
             await self._sync_devices_to_db(devices)
 
-            logger.info(f"Scan completed: {len(devices)} devices found")
+            elapsed = time.perf_counter() - scan_start
+            self._scan_metrics["scans"] += 1
+            self._scan_metrics["last_scan_seconds"] = round(elapsed, 4)
+            self._scan_metrics["last_scan_devices"] = len(devices)
+
+            logger.info(f"Scan completed: {len(devices)} devices found in {elapsed:.2f}s")
             return devices
 
         except Exception as e:
@@ -197,35 +350,60 @@ class ADBDeviceManager:
             return []
 
     async def _get_device_info(self, serial: str) -> Optional[DeviceInfo]:
-        """Get detailed information about a device"""
+        """Get detailed information about a device with a single shell invocation"""
         try:
-            # Get device properties
-            model = await self._get_device_property(serial, "ro.product.model")
-            android_version = await self._get_device_property(serial, "ro.build.version.release")
+            sections = await self._run_combined_shell(
+                serial, _STATIC_PROPERTY_COMMANDS + _DYNAMIC_PROPERTY_COMMANDS
+            )
+            model, android_version, wm_size, battery, route = sections
+            self._scan_metrics["full_queries"] += 1
 
-            # Get screen resolution
-            resolution = await self._get_screen_resolution(serial)
+            return DeviceInfo(
+                serial=serial,
+                model=model.strip() or "Unknown",
+                android_version=android_version.strip() or "Unknown",
+                screen_resolution=self._parse_screen_resolution(wm_size) or "Unknown",
+                status="online",
+                battery_level=self._parse_battery_level(battery),
+                wifi_ip=self._parse_wifi_ip(route),
+            )
 
-            # Get battery level
-            battery_level = await self._get_battery_level(serial)
+        except Exception as e:
+            logger.error(f"Failed to get info for device {serial}: {e}")
+            return None
 
-            # Get WiFi IP
-            wifi_ip = await self._get_wifi_ip(serial)
+    async def _refresh_device_info(self, serial: str, known: DeviceInfo) -> Optional[DeviceInfo]:
+        """Re-query only the properties that change while a device is connected"""
+        try:
+            battery, route = await self._run_combined_shell(serial, _DYNAMIC_PROPERTY_COMMANDS)
+            self._scan_metrics["incremental_queries"] += 1
 
             return DeviceInfo(
                 serial=serial,
-                model=model or "Unknown",
-                android_version=android_version or "Unknown",
-                screen_resolution=resolution or "Unknown",
+                model=known.model,
+                android_version=known.android_version,
+                screen_resolution=known.screen_resolution,
                 status="online",
-                battery_level=battery_level,
-                wifi_ip=wifi_ip,
+                battery_level=self._parse_battery_level(battery),
+                wifi_ip=self._parse_wifi_ip(route),
             )
 
         except Exception as e:
-            logger.error(f"Failed to get info for device {serial}: {e}")
+            logger.error(f"Failed to refresh info for device {serial}: {e}")
             return None
 
+    async def _run_combined_shell(self, serial: str, commands: List[str]) -> List[str]:
+        """Run several shell commands in one `adb shell` and split their outputs"""
+        script = f"; echo {_SECTION_MARKER}; ".join(commands)
+        stdout, _ = await self._run_adb_command(["shell", script], serial)
+
+        sections = stdout.split(_SECTION_MARKER)
+        if len(sections) != len(commands):
+            raise ADBError(
+                f"Expected {len(commands)} sections from combined shell, got {len(sections)}"
+            )
+        return sections
+
     async def _get_device_property(self, serial: str, property_name: str) -> Optional[str]:
         """Get device property via getprop"""
         try:
@@ -238,10 +416,7 @@ class ADBDeviceManager:
         """Get device screen resolution"""
         try:
             stdout, _ = await self._run_adb_command(["shell", "wm", "size"], serial)
-            if stdout and "Physical size:" in stdout:
-                resolution = stdout.split("Physical size:")[1].strip()
-                return resolution
-            return None
+            return self._parse_screen_resolution(stdout)
         except:
             return None
 
@@ -251,11 +426,7 @@ class ADBDeviceManager:
             stdout, _ = await self._run_adb_command(
                 ["shell", "dumpsys", "battery", "|", "grep", "level"], serial
             )
-            if stdout:
-                match = re.search(r"level: (\d+)", stdout)
-                if match:
-                    return int(match.group(1))
-            return None
+            return self._parse_battery_level(stdout)
         except:
             return None
 
@@ -265,19 +436,38 @@ class ADBDeviceManager:
             stdout, _ = await self._run_adb_command(
                 ["shell", "ip", "route", "|", "grep", "wlan0"], serial
             )
-            if stdout:
-                # Extract IP from route output
-                lines = stdout.split("\n")
-                for line in lines:
-                    if "src" in line:
-                        parts = line.split()
-                        for i, part in enumerate(parts):
-                            if part == "src" and i + 1 < len(parts):
-                                return parts[i + 1]
-            return None
+            return self._parse_wifi_ip(stdout)
         except:
             return None
 
+    @staticmethod
+    def _parse_screen_resolution(stdout: str) -> Optional[str]:
+        """Parse `wm size` output"""
+        if stdout and "Physical size:" in stdout:
+            return stdout.split("Physical size:")[1].strip().split()[0]
+        return None
+
+    @staticmethod
+    def _parse_battery_level(stdout: str) -> Optional[int]:
+        """Parse `dumpsys battery` output"""
+        if stdout:
+            match = re.search(r"level: (\d+)", stdout)
+            if match:
+                return int(match.group(1))
+        return None
+
+    @staticmethod
+    def _parse_wifi_ip(stdout: str) -> Optional[str]:
+        """Extract the source IP from `ip route` output"""
+        if stdout:
+            for line in stdout.split("\n"):
+                if "src" in line:
+                    parts = line.split()
+                    for i, part in enumerate(parts):
+                        if part == "src" and i + 1 < len(parts):
+                            return parts[i + 1]
+        return None
+
     async def configure_proxy(self, serial: str, proxy_host: str, proxy_port: int) -> bool:
         """Configure HTTP proxy on Android device"""
         try:
@@ -452,6 +642,49 @@ class ADBDeviceManager:
             logger.error(f"Failed to get packages for device {serial}: {e}")
             return []
 
+    async def capture_screen(self, serial: str, downscale: int = 1) -> Optional[ScreenFrame]:
+        """Capture the screen straight into memory.
+
+        Raw `screencap` output is streamed over `exec-out` and decoded into
+        an RGB array; nothing is written on the device or the host.
+        ``downscale`` keeps every n-th row and column of the frame.
+        """
+        try:
+            data = await self._run_adb_binary(["exec-out", "screencap"], serial)
+            image, source_size = decode_screencap(data, downscale)
+            return ScreenFrame(
+                device_serial=serial,
+                image=image,
+                source_size=source_size,
+                downscale=max(int(downscale), 1),
+            )
+
+        except (ADBError, ScreenCaptureError) as e:
+            logger.error(f"Failed to capture screen for device {serial}: {e}")
+            return None
+
+    async def take_screenshot(self, serial: str, save_path: Optional[str] = None) -> Optional[str]:
+        """Capture the screen as a PNG file and return its path"""
+        try:
+            if not save_path:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+                save_path = f"screenshots/{serial}_{timestamp}.png"
+
+            png = await self._run_adb_binary(["exec-out", "screencap", "-p"], serial)
+            if not png:
+                logger.error(f"Empty screenshot from device {serial}")
+                return None
+
+            Path(save_path).parent.mkdir(parents=True, exist_ok=True)
+            await asyncio.to_thread(Path(save_path).write_bytes, png)
+
+            logger.debug(f"Screenshot saved: {save_path}")
+            return save_path
+
+        except Exception as e:
+            logger.error(f"Screenshot failed for device {serial}: {e}")
+            return None
+
     async def _sync_devices_to_db(self, devices: List[DeviceInfo]):
         """Synchronize devices to database"""
         try:
@@ -510,6 +743,8 @@ class ADBDeviceManager:
                 "detected_devices": len(self._devices),
                 "configured_proxies": len(self._device_proxies),
                 "last_scan": self._last_scan.isoformat() if self._last_scan else None,
+                "scan_metrics": dict(self._scan_metrics),
+                "shell_sessions": self._shell_pool.get_statistics(),
             }
 
         except Exception as e:
@@ -0,0 +1,240 @@
+"""
+Device Farm v5 - Persistent ADB Shell Sessions
+Keeps one long-lived `adb shell` per device and frames commands over it
+"""
+
+import asyncio
+import uuid
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+class ADBShellSessionError(Exception):
+    """Persistent shell session failure"""
+
+    pass
+
+
+class ADBShellOutputError(ADBShellSessionError):
+    """Command output could not be framed (e.g. a line over the read limit)"""
+
+    pass
+
+
+class ADBShellTimeoutError(ADBShellSessionError):
+    """Command did not finish in time; it may or may not have run"""
+
+    pass
+
+
+class ADBShellUnsupportedError(ADBShellSessionError):
+    """Device has no shell_v2, so stdout and stderr cannot be framed separately"""
+
+    pass
+
+
+# asyncio's default 64 KiB line limit is too small for single-line dumps
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+# Upper bound for the one-off `adb features` probe
+FEATURES_TIMEOUT = 10.0
+
+
+class ADBShellSession:
+    """A long-lived `adb -s <serial> shell` process.
+
+    Commands are written to the shell's stdin one at a time. Each command is
+    followed by a unique marker echoed to stdout (with the exit status) and
+    to stderr, so both streams can be read up to the end of that command
+    without closing the process. A command that times out leaves the stream
+    in an unknown state, so the session is closed and the next command
+    reconnects.
+
+    The framing needs separate stdout/stderr streams, which adbd only
+    provides with the ``shell_v2`` feature (Android 7+). Devices without it
+    raise ADBShellUnsupportedError so callers can fall back to one `adb`
+    process per command.
+    """
+
+    def __init__(self, adb_path: str, serial: str):
+        self.adb_path = adb_path
+        self.serial = serial
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        self._connected_before = False
+        self._shell_v2: Optional[bool] = None
+        self.commands_run = 0
+        self.reconnects = 0
+
+    @property
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def run(self, command: str, timeout: float) -> Tuple[str, str, int]:
+        """Run a shell command and return (stdout, stderr, exit_status)"""
+        async with self._lock:
+            for attempt in range(2):
+                if not self.is_alive:
+                    await self._connect()
+                try:
+                    return await asyncio.wait_for(self._execute(command), timeout=timeout)
+                except asyncio.TimeoutError:
+                    await self._close()
+                    raise ADBShellTimeoutError(
+                        f"Shell command timed out after {timeout}s on {self.serial}"
+                    )
+                except ADBShellOutputError:
+                    # Stream position is unknown; rerunning would hit the same output
+                    await self._close()
+                    raise
+                except (BrokenPipeError, ConnectionResetError, ADBShellSessionError) as e:
+                    # Shell died between commands (device replugged, adbd restart)
+                    await self._close()
+                    if attempt:
+                        raise ADBShellSessionError(f"Shell session to {self.serial} lost: {e}")
+                    logger.debug(f"Reconnecting shell session to {self.serial}: {e}")
+
+        raise ADBShellSessionError(f"Shell session to {self.serial} unavailable")
+
+    async def close(self):
+        """Terminate the shell process"""
+        async with self._lock:
+            await self._close()
+
+    async def _connect(self):
+        if self._shell_v2 is None:
+            self._shell_v2 = await self._probe_shell_v2()
+        if not self._shell_v2:
+            raise ADBShellUnsupportedError(f"{self.serial} does not support shell_v2")
+
+        if self._connected_before:
+            self.reconnects += 1
+        self._connected_before = True
+        self._process = await asyncio.create_subprocess_exec(
+            self.adb_path,
+            "-s",
+            self.serial,
+            "shell",
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=STREAM_LINE_LIMIT,
+        )
+
+    async def _probe_shell_v2(self) -> bool:
+        """Check `adb features` for separate stdout/stderr support"""
+        process = await asyncio.create_subprocess_exec(
+            self.adb_path,
+            "-s",
+            self.serial,
+            "features",
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            stdout, _ = await asyncio.wait_for(process.communicate(), timeout=FEATURES_TIMEOUT)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            raise ADBShellSessionError(f"`adb features` timed out on {self.serial}")
+
+        features = stdout.decode("utf-8", errors="ignore").replace(",", "\n").split()
+        return process.returncode == 0 and "shell_v2" in features
+
+    async def _close(self):
+        process = self._process
+        if process is None:
+            return
+        if process.returncode is None:
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+        self._process = None
+
+    async def _execute(self, command: str) -> Tuple[str, str, int]:
+        marker = f"__DF5_END_{uuid.uuid4().hex}__"
+        # Subshell keeps commands isolated; stdin is detached so a command
+        # cannot swallow the ones that follow it
+        framed = f"( {command} ) </dev/null; echo {marker}$?; echo {marker} >&2\n"
+
+        self._process.stdin.write(framed.encode("utf-8"))
+        await self._process.stdin.drain()
+
+        stdout_result, stderr_result = await asyncio.gather(
+            self._read_until(self._process.stdout, marker),
+            self._read_until(self._process.stderr, marker),
+            return_exceptions=True,
+        )
+        for result in (stdout_result, stderr_result):
+            if isinstance(result, BaseException):
+                raise result
+
+        (stdout_lines, status), (stderr_lines, _) = stdout_result, stderr_result
+        self.commands_run += 1
+
+        return "".join(stdout_lines), "".join(stderr_lines), status
+
+    async def _read_until(
+        self, stream: asyncio.StreamReader, marker: str
+    ) -> Tuple[List[str], int]:
+        lines: List[str] = []
+        while True:
+            try:
+                raw = await stream.readline()
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                raise ADBShellOutputError(f"Shell output line exceeds read limit: {e}")
+            if not raw:
+                raise ADBShellSessionError("Shell closed the stream")
+
+            line = raw.decode("utf-8", errors="ignore")
+            index = line.find(marker)
+            if index < 0:
+                lines.append(line)
+                continue
+
+            # Output without a trailing newline ends up before the marker
+            if index:
+                lines.append(line[:index])
+            status_text = line[index + len(marker) :].strip()
+            return lines, int(status_text) if status_text.isdigit() else 0
+
+
+class ADBShellPool:
+    """One persistent shell session per device serial"""
+
+    def __init__(self, adb_path: str):
+        self.adb_path = adb_path
+        self._sessions: Dict[str, ADBShellSession] = {}
+
+    async def run(self, serial: str, command: str, timeout: float) -> Tuple[str, str, int]:
+        """Run a command on the device's persistent shell"""
+        session = self._sessions.get(serial)
+        if session is None:
+            session = ADBShellSession(self.adb_path, serial)
+            self._sessions[serial] = session
+        return await session.run(command, timeout)
+
+    async def close_session(self, serial: str):
+        """Close the session for a device (e.g. when it disconnects)"""
+        session = self._sessions.pop(serial, None)
+        if session:
+            await session.close()
+
+    async def close_all(self):
+        """Close every session"""
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+
+    def get_statistics(self) -> Dict[str, int]:
+        """Get session pool statistics"""
+        sessions = self._sessions.values()
+        return {
+            "sessions": len(self._sessions),
+            "alive_sessions": sum(1 for session in sessions if session.is_alive),
+            "commands_run": sum(session.commands_run for session in sessions),
+            "reconnects": sum(session.reconnects for session in sessions),
+        }
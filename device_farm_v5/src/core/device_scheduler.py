@@ -0,0 +1,407 @@
+"""
+Device Farm v5 - Capability-Indexed Device Scheduler
+Matches queued tasks to idle devices without polling or linear scans
+"""
+
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+def parse_android_version(version: Optional[str]) -> Tuple[int, ...]:
+    """Parse an Android version string ("13", "8.1.0") into a comparable tuple"""
+    if not version:
+        return ()
+
+    parts = []
+    for chunk in str(version).strip().split("."):
+        digits = "".join(ch for ch in chunk if ch.isdigit())
+        if not digits:
+            break
+        parts.append(int(digits))
+    return tuple(parts)
+
+
+@dataclass(frozen=True)
+class DeviceCapabilities:
+    """Hashable capability signature of a device.
+
+    Devices sharing the same signature form one capability class, so the
+    scheduler only evaluates requirements once per class instead of once
+    per device. ``None`` means "not known" (e.g. the ADB scan does not
+    report installed packages or proxy region) and does not constrain
+    matching; only known capabilities can reject a task.
+    """
+
+    android_version: Tuple[int, ...] = ()
+    screen_resolution: Optional[str] = None
+    region: Optional[str] = None
+    packages: Optional[FrozenSet[str]] = None
+
+    @classmethod
+    def from_device_info(
+        cls,
+        device_info: Any,
+        packages: Optional[Iterable[str]] = None,
+        region: Optional[str] = None,
+    ) -> "DeviceCapabilities":
+        """Build capabilities from an ADB ``DeviceInfo`` plus optional extras"""
+        resolution = getattr(device_info, "screen_resolution", None)
+        if resolution == "Unknown":
+            resolution = None
+
+        return cls(
+            android_version=parse_android_version(getattr(device_info, "android_version", None)),
+            screen_resolution=resolution,
+            region=region,
+            packages=frozenset(packages) if packages is not None else None,
+        )
+
+
+@dataclass(frozen=True)
+class TaskRequirements:
+    """Normalized, hashable form of ``TaskDefinition.device_requirements``"""
+
+    min_android_version: Tuple[int, ...] = ()
+    screen_resolution: Optional[str] = None
+    region: Optional[str] = None
+    packages: FrozenSet[str] = field(default_factory=frozenset)
+
+    @classmethod
+    def from_dict(cls, requirements: Optional[Dict[str, Any]]) -> "TaskRequirements":
+        """Normalize a requirements dict.
+
+        Recognized keys: ``min_android_version`` (or ``android_version``),
+        ``screen_resolution``, ``region`` (or ``proxy_region``) and
+        ``packages`` (or ``required_packages``). Unknown keys are ignored.
+        """
+        requirements = requirements or {}
+
+        version = requirements.get("min_android_version", requirements.get("android_version"))
+        packages = requirements.get("packages", requirements.get("required_packages")) or ()
+        if isinstance(packages, str):
+            packages = (packages,)
+
+        return cls(
+            min_android_version=parse_android_version(version),
+            screen_resolution=requirements.get("screen_resolution"),
+            region=requirements.get("region", requirements.get("proxy_region")),
+            packages=frozenset(packages),
+        )
+
+    def is_satisfied_by(self, capabilities: DeviceCapabilities) -> bool:
+        """Check whether a capability class can run tasks with these requirements"""
+        if self.min_android_version and capabilities.android_version < self.min_android_version:
+            return False
+        if self.screen_resolution and capabilities.screen_resolution != self.screen_resolution:
+            return False
+        if self.region and capabilities.region is not None and capabilities.region != self.region:
+            return False
+        if (
+            self.packages
+            and capabilities.packages is not None
+            and not self.packages <= capabilities.packages
+        ):
+            return False
+        return True
+
+
+class DeviceScheduler:
+    """Capability-indexed matcher between pending tasks and idle devices.
+
+    * Idle devices are bucketed by ``DeviceCapabilities``; each bucket is a
+      heap ordered by the time the device became idle (least recently used
+      first), so taking a device is O(log n).
+    * Pending tasks are bucketed by ``TaskRequirements``; each bucket is a
+      heap ordered by priority and then submission order.
+    * Requirement shapes and capability classes are cross-indexed once, and
+      every requirement shape tracks how many compatible devices are idle.
+    * A "ready" heap holds the head task of every requirement shape that has
+      a compatible idle device, so the next dispatch is a heap pop.
+
+    Classes and shapes are interned to integer ids so the hot path never
+    hashes the capability dataclasses.
+
+    Tasks only need ``priority`` (an Enum with an int ``value`` or an int)
+    and ``device_requirements`` attributes; those with a ``task_id`` can
+    also be withdrawn with ``remove_task``.
+    """
+
+    def __init__(self):
+        self._counter = itertools.count()
+
+        # Capability classes (interned)
+        self._class_ids: Dict[DeviceCapabilities, int] = {}
+        self._classes: List[DeviceCapabilities] = []
+        self._idle_by_class: List[List[Tuple[int, str]]] = []
+        self._idle_count_by_class: List[int] = []
+        self._reqs_for_class: List[List[int]] = []
+
+        # Requirement shapes (interned)
+        self._req_ids: Dict[TaskRequirements, int] = {}
+        self._reqs: List[TaskRequirements] = []
+        self._pending_by_req: List[List[Tuple[int, int, Any]]] = []
+        self._classes_for_req: List[List[int]] = []
+        self._idle_compatible: List[int] = []
+
+        # Devices
+        self._device_class: Dict[str, int] = {}
+        self._idle_since: Dict[str, int] = {}
+
+        self._pending_count = 0
+        self._pending_by_priority: Dict[int, int] = {}
+        # task_id -> (req_id, heap entry), for removal before dispatch
+        self._task_entries: Dict[Any, Tuple[int, Tuple[int, int, Any]]] = {}
+
+        # (-priority, seq, req_id) of dispatchable bucket heads; stale
+        # entries are discarded lazily in next_assignment
+        self._ready: List[Tuple[int, int, int]] = []
+
+    # ------------------------------------------------------------------
+    # Devices
+    # ------------------------------------------------------------------
+    def set_device(
+        self,
+        serial: str,
+        capabilities: Optional[DeviceCapabilities] = None,
+        available: bool = True,
+    ):
+        """Register or update a device and its availability"""
+        previous = self._device_class.get(serial)
+        if capabilities is None:
+            class_id = previous if previous is not None else self._intern_class(DeviceCapabilities())
+        else:
+            class_id = self._intern_class(capabilities)
+
+        if previous is not None and previous != class_id:
+            # Capability class changed; drop the stale idle entry
+            self._mark_busy(serial)
+
+        self._device_class[serial] = class_id
+
+        if available:
+            self.mark_idle(serial)
+        else:
+            self._mark_busy(serial)
+
+    def remove_device(self, serial: str):
+        """Forget a device (disconnected from the farm)"""
+        self._mark_busy(serial)
+        self._device_class.pop(serial, None)
+
+    def mark_idle(self, serial: str):
+        """Return a device to the idle index"""
+        class_id = self._device_class.get(serial)
+        if class_id is None:
+            self.set_device(serial, available=True)
+            return
+        if serial in self._idle_since:
+            return
+
+        seq = next(self._counter)
+        self._idle_since[serial] = seq
+        heapq.heappush(self._idle_by_class[class_id], (seq, serial))
+        self._idle_count_by_class[class_id] += 1
+
+        idle_compatible = self._idle_compatible
+        for req_id in self._reqs_for_class[class_id]:
+            idle_compatible[req_id] += 1
+            if idle_compatible[req_id] == 1:
+                self._push_ready(req_id)
+
+    def mark_busy(self, serial: str):
+        """Remove a device from the idle index"""
+        self._mark_busy(serial)
+
+    def is_idle(self, serial: str) -> bool:
+        """Check whether a device is currently idle"""
+        return serial in self._idle_since
+
+    def get_capabilities(self, serial: str) -> Optional[DeviceCapabilities]:
+        """Get registered capabilities of a device"""
+        class_id = self._device_class.get(serial)
+        return None if class_id is None else self._classes[class_id]
+
+    def device_serials(self) -> List[str]:
+        """Serials of all registered devices"""
+        return list(self._device_class)
+
+    def _mark_busy(self, serial: str):
+        # Heap entries are removed lazily; _pop_idle skips stale ones
+        if self._idle_since.pop(serial, None) is None:
+            return
+
+        class_id = self._device_class[serial]
+        self._idle_count_by_class[class_id] -= 1
+        idle_compatible = self._idle_compatible
+        for req_id in self._reqs_for_class[class_id]:
+            idle_compatible[req_id] -= 1
+
+    def _intern_class(self, capabilities: DeviceCapabilities) -> int:
+        class_id = self._class_ids.get(capabilities)
+        if class_id is not None:
+            return class_id
+
+        class_id = len(self._classes)
+        self._class_ids[capabilities] = class_id
+        self._classes.append(capabilities)
+        self._idle_by_class.append([])
+        self._idle_count_by_class.append(0)
+        self._reqs_for_class.append([])
+
+        for req_id, requirements in enumerate(self._reqs):
+            if requirements.is_satisfied_by(capabilities):
+                self._classes_for_req[req_id].append(class_id)
+                self._reqs_for_class[class_id].append(req_id)
+        return class_id
+
+    def _pop_idle(self, class_id: int) -> Optional[str]:
+        heap = self._idle_by_class[class_id]
+        while heap:
+            seq, serial = heapq.heappop(heap)
+            if self._idle_since.get(serial) == seq and self._device_class.get(serial) == class_id:
+                self._mark_busy(serial)
+                return serial
+        return None
+
+    # ------------------------------------------------------------------
+    # Tasks
+    # ------------------------------------------------------------------
+    def submit(self, task: Any):
+        """Queue a task for dispatch"""
+        req_id = self._intern_requirements(
+            TaskRequirements.from_dict(getattr(task, "device_requirements", None))
+        )
+        priority = _priority_value(task)
+
+        bucket = self._pending_by_req[req_id]
+        entry = (-priority, next(self._counter), task)
+        heapq.heappush(bucket, entry)
+
+        self._pending_count += 1
+        self._pending_by_priority[priority] = self._pending_by_priority.get(priority, 0) + 1
+
+        task_id = getattr(task, "task_id", None)
+        if task_id is not None:
+            self._task_entries[task_id] = (req_id, entry)
+
+        if bucket[0] is entry:
+            self._push_ready(req_id)
+
+    def remove_task(self, task_id: Any) -> bool:
+        """Withdraw a pending task (e.g. cancelled); False if it is not queued.
+
+        O(n) in the task's requirement bucket; cancellation is rare.
+        """
+        found = self._task_entries.pop(task_id, None)
+        if found is None:
+            return False
+
+        req_id, entry = found
+        bucket = self._pending_by_req[req_id]
+        was_head = bucket[0] is entry
+        bucket.remove(entry)
+        heapq.heapify(bucket)
+
+        priority = -entry[0]
+        self._pending_count -= 1
+        self._pending_by_priority[priority] -= 1
+
+        # The old head's ready entry goes stale; advertise the new head
+        if was_head:
+            self._push_ready(req_id)
+        return True
+
+    def next_assignment(self) -> Optional[Tuple[Any, str]]:
+        """Pop the best (task, device) pair that can run right now.
+
+        Picks the highest-priority, oldest task among all requirement
+        shapes that have at least one compatible idle device.
+        """
+        ready = self._ready
+        while ready:
+            neg_priority, seq, req_id = heapq.heappop(ready)
+            bucket = self._pending_by_req[req_id]
+
+            if not bucket or bucket[0][1] != seq or not self._idle_compatible[req_id]:
+                continue
+
+            serial = None
+            for class_id in self._classes_for_req[req_id]:
+                if self._idle_count_by_class[class_id]:
+                    serial = self._pop_idle(class_id)
+                    break
+            if serial is None:
+                continue
+
+            _, _, task = heapq.heappop(bucket)
+            self._task_entries.pop(getattr(task, "task_id", None), None)
+            self._pending_count -= 1
+            self._pending_by_priority[-neg_priority] -= 1
+            self._push_ready(req_id)
+
+            return task, serial
+
+        return None
+
+    def _intern_requirements(self, requirements: TaskRequirements) -> int:
+        req_id = self._req_ids.get(requirements)
+        if req_id is not None:
+            return req_id
+
+        req_id = len(self._reqs)
+        self._req_ids[requirements] = req_id
+        self._reqs.append(requirements)
+        self._pending_by_req.append([])
+
+        classes = []
+        idle = 0
+        for class_id, capabilities in enumerate(self._classes):
+            if requirements.is_satisfied_by(capabilities):
+                classes.append(class_id)
+                self._reqs_for_class[class_id].append(req_id)
+                idle += self._idle_count_by_class[class_id]
+
+        self._classes_for_req.append(classes)
+        self._idle_compatible.append(idle)
+        return req_id
+
+    def _push_ready(self, req_id: int):
+        bucket = self._pending_by_req[req_id]
+        if bucket and self._idle_compatible[req_id]:
+            heapq.heappush(self._ready, (bucket[0][0], bucket[0][1], req_id))
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+    @property
+    def pending_count(self) -> int:
+        return self._pending_count
+
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle_since)
+
+    @property
+    def device_count(self) -> int:
+        return len(self._device_class)
+
+    def pending_by_priority(self) -> Dict[int, int]:
+        """Number of pending tasks per priority value"""
+        return dict(self._pending_by_priority)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get scheduler index statistics"""
+        return {
+            "pending_tasks": self._pending_count,
+            "idle_devices": self.idle_count,
+            "total_devices": self.device_count,
+            "capability_classes": len(self._classes),
+            "requirement_shapes": len(self._reqs),
+        }
+
+
+def _priority_value(task: Any) -> int:
+    priority = getattr(task, "priority", 0)
+    return getattr(priority, "value", priority)
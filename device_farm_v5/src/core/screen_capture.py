@@ -0,0 +1,85 @@
+"""
+Device Farm v5 - In-Memory Screen Capture
+Decodes raw `screencap` output into NumPy frames without touching disk
+"""
+
+import struct
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Tuple
+
+import numpy as np
+
+# android::PixelFormat values screencap can emit -> (bytes per pixel, channel order)
+_PIXEL_FORMATS = {
+    1: (4, "RGBA"),  # RGBA_8888
+    2: (4, "RGBX"),  # RGBX_8888
+    3: (3, "RGB"),  # RGB_888
+    5: (4, "BGRA"),  # BGRA_8888
+}
+
+# Header is width, height, format (+ color space since Android 12)
+_HEADER_SIZES = (12, 16)
+
+
+class ScreenCaptureError(Exception):
+    """Raw screencap output could not be decoded"""
+
+    pass
+
+
+@dataclass
+class ScreenFrame:
+    """A decoded device screenshot held in memory"""
+
+    device_serial: str
+    image: np.ndarray  # H x W x 3, RGB, uint8
+    source_size: Tuple[int, int]  # (width, height) on the device
+    downscale: int = 1
+    captured_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+
+def decode_screencap(data: bytes, downscale: int = 1) -> Tuple[np.ndarray, Tuple[int, int]]:
+    """Decode raw `screencap` output into an RGB array.
+
+    ``downscale`` keeps every n-th row and column. The pixel buffer is
+    viewed in place, so only the kept pixels are copied.
+
+    Returns the RGB image and the full-resolution (width, height).
+    """
+    if len(data) < _HEADER_SIZES[0]:
+        raise ScreenCaptureError(f"Screencap output too short ({len(data)} bytes)")
+
+    width, height, pixel_format = struct.unpack_from("<III", data)
+    if pixel_format not in _PIXEL_FORMATS:
+        raise ScreenCaptureError(f"Unsupported screencap pixel format {pixel_format}")
+
+    bytes_per_pixel, order = _PIXEL_FORMATS[pixel_format]
+    pixel_bytes = width * height * bytes_per_pixel
+    header_size = len(data) - pixel_bytes
+    if header_size not in _HEADER_SIZES:
+        raise ScreenCaptureError(
+            f"Screencap size mismatch: {len(data)} bytes for {width}x{height} format {pixel_format}"
+        )
+
+    pixels = np.frombuffer(data, dtype=np.uint8, count=pixel_bytes, offset=header_size)
+    pixels = pixels.reshape(height, width, bytes_per_pixel)
+
+    step = max(int(downscale), 1)
+    if step > 1:
+        pixels = pixels[::step, ::step]
+
+    if order == "BGRA":
+        rgb = pixels[..., 2::-1]
+    else:
+        rgb = pixels[..., :3]
+
+    return np.ascontiguousarray(rgb), (width, height)
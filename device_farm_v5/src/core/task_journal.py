@@ -0,0 +1,403 @@
+"""
+Device Farm v5 - Write-Behind Task Journal
+Coalesces task state transitions and persists them in bulk from a background thread
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from sqlalchemy import Table, bindparam, select
+
+# task_id -> (is_insert, merged fields)
+PendingWrites = Dict[str, Tuple[bool, Dict[str, Any]]]
+
+
+class TaskJournal:
+    """Write-behind persistence for the ``tasks`` table.
+
+    Every transition is appended to a local log segment (one JSON line,
+    written with an unbuffered ``os.write`` so it survives a process crash)
+    and merged into an in-memory map keyed by task id. A background thread
+    swaps that map out when ``batch_size`` tasks are dirty or every
+    ``flush_interval`` seconds, and writes it with one ``executemany``
+    insert plus one ``executemany`` update per distinct column set.
+
+    * Ordering: transitions for a task are merged in arrival order and
+      batches are written by a single thread, so the database never sees an
+      older state after a newer one.
+    * Durability: a segment is deleted only after the batch that covers it
+      has been committed. Segments left behind by a crash are replayed on
+      ``start()``; replayed inserts for rows that already exist become
+      updates, so replay is idempotent.
+    """
+
+    _DATETIME_KEY = "__dt__"
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Any],
+        table: Table,
+        journal_dir: str,
+        flush_interval: float = 0.5,
+        batch_size: int = 500,
+        fsync: bool = True,
+    ):
+        self._session_factory = session_factory
+        self._table = table
+        self._journal_dir = Path(journal_dir)
+        self._flush_interval = flush_interval
+        self._batch_size = batch_size
+        self._fsync = fsync
+
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._pending: PendingWrites = {}
+        self._inflight: PendingWrites = {}
+        self._segment_fd: Optional[int] = None
+        self._segment_path: Optional[Path] = None
+        self._segment_index = 0
+        self._sealed_segments: List[Path] = []
+
+        # Sequence numbers let flush() wait for everything recorded so far
+        self._recorded_seq = 0
+        self._committed_seq = 0
+
+        self._stats = {
+            "records": 0,
+            "batches": 0,
+            "rows_written": 0,
+            "coalesced": 0,
+            "failed_batches": 0,
+            "quarantined_rows": 0,
+            "last_batch_seconds": 0.0,
+        }
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def start(self):
+        """Replay leftover segments and start the background writer"""
+        self._journal_dir.mkdir(parents=True, exist_ok=True)
+        self._replay()
+
+        with self._lock:
+            self._open_segment()
+
+        self._thread = threading.Thread(target=self._run, name="task-journal", daemon=True)
+        self._thread.start()
+        logger.info(f"Task journal started ({self._journal_dir})")
+
+    def stop(self, timeout: float = 30.0):
+        """Flush outstanding writes and stop the background writer"""
+        if not self._thread:
+            return
+
+        self.flush(timeout=timeout)
+        self._stopping = True
+        self._wake.set()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+        with self._lock:
+            if self._segment_fd is not None:
+                os.close(self._segment_fd)
+                self._segment_fd = None
+            # Only an empty segment can remain once everything is committed
+            if not self._pending and self._segment_path and self._segment_path.exists():
+                self._segment_path.unlink()
+
+        logger.info("Task journal stopped")
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    def record_insert(self, task_id: str, fields: Dict[str, Any]):
+        """Record creation of a task row"""
+        self._record("insert", task_id, fields)
+
+    def record_update(self, task_id: str, fields: Dict[str, Any]):
+        """Record a change to an existing task row"""
+        self._record("update", task_id, fields)
+
+    def pending(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """Fields recorded for a task that are not yet in the database"""
+        with self._lock:
+            fields: Dict[str, Any] = {}
+            for writes in (self._inflight, self._pending):
+                entry = writes.get(task_id)
+                if entry:
+                    fields.update(entry[1])
+            return fields or None
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything recorded so far is committed"""
+        with self._lock:
+            target = self._recorded_seq
+            if self._committed_seq >= target:
+                return True
+
+        self._wake.set()
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._flushed:
+            while self._committed_seq < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._flushed.wait(remaining)
+        return True
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get journal statistics"""
+        with self._lock:
+            return {
+                **self._stats,
+                "pending_tasks": len(self._pending),
+                "sealed_segments": len(self._sealed_segments),
+            }
+
+    def _record(self, op: str, task_id: str, fields: Dict[str, Any]):
+        line = (
+            json.dumps(
+                {"op": op, "id": task_id, "fields": self._encode(fields)},
+                separators=(",", ":"),
+            )
+            + "\n"
+        ).encode("utf-8")
+
+        with self._lock:
+            if self._segment_fd is None:
+                raise RuntimeError("Task journal is not started")
+
+            os.write(self._segment_fd, line)
+            self._merge(self._pending, op, task_id, fields)
+            self._recorded_seq += 1
+            self._stats["records"] += 1
+            dirty = len(self._pending)
+
+        if dirty >= self._batch_size:
+            self._wake.set()
+
+    def _merge(self, pending: PendingWrites, op: str, task_id: str, fields: Dict[str, Any]):
+        entry = pending.get(task_id)
+        if entry is None:
+            pending[task_id] = (op == "insert", dict(fields))
+        else:
+            entry[1].update(fields)
+            self._stats["coalesced"] += 1
+
+    # ------------------------------------------------------------------
+    # Background writer
+    # ------------------------------------------------------------------
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self._flush_interval)
+            self._wake.clear()
+            try:
+                self._flush_once()
+            except Exception as e:
+                logger.error(f"Task journal flush failed: {e}")
+
+    def _flush_once(self):
+        with self._lock:
+            if not self._pending:
+                self._committed_seq = self._recorded_seq
+                self._flushed.notify_all()
+                return
+
+            batch = self._pending
+            batch_seq = self._recorded_seq
+            self._pending = {}
+            self._inflight = batch
+            self._seal_segment()
+            self._open_segment()
+
+        start = time.perf_counter()
+        try:
+            written = self._write_batch(batch)
+        except Exception as e:
+            logger.warning(f"Task journal batch of {len(batch)} rows failed, retrying row by row: {e}")
+            written, rejected = self._write_rows(batch)
+            if written == 0 and len(rejected) == len(batch):
+                # Nothing went through: treat it as the database being down
+                self._requeue(batch)
+                raise
+            self._quarantine(batch, rejected)
+
+        with self._lock:
+            for path in self._sealed_segments:
+                path.unlink(missing_ok=True)
+            self._sealed_segments = []
+            self._inflight = {}
+
+            self._committed_seq = batch_seq
+            self._stats["batches"] += 1
+            self._stats["rows_written"] += written
+            self._stats["last_batch_seconds"] = time.perf_counter() - start
+            self._flushed.notify_all()
+
+    def _write_rows(self, batch: PendingWrites) -> Tuple[int, Dict[str, str]]:
+        """Write a failed batch one row at a time, collecting the rows that still fail"""
+        written = 0
+        rejected: Dict[str, str] = {}
+        for task_id, entry in batch.items():
+            try:
+                written += self._write_batch({task_id: entry})
+            except Exception as e:
+                rejected[task_id] = str(e)
+        return written, rejected
+
+    def _requeue(self, batch: PendingWrites):
+        with self._lock:
+            # Put the batch back underneath anything recorded since
+            for task_id, (is_insert, fields) in batch.items():
+                newer = self._pending.get(task_id)
+                if newer is not None:
+                    fields.update(newer[1])
+                    is_insert = is_insert or newer[0]
+                self._pending[task_id] = (is_insert, fields)
+            self._inflight = {}
+            self._stats["failed_batches"] += 1
+
+    def _quarantine(self, batch: PendingWrites, rejected: Dict[str, str]):
+        """Move rows the database refuses out of the journal so they stop blocking flushes"""
+        if not rejected:
+            return
+        with open(self._journal_dir / "quarantine.jsonl", "a", encoding="utf-8") as f:
+            for task_id, error in rejected.items():
+                is_insert, fields = batch[task_id]
+                record = {"id": task_id, "insert": is_insert, "fields": self._encode(fields), "error": error}
+                f.write(json.dumps(record) + "\n")
+                logger.error(f"Task journal quarantined the row for task {task_id}: {error}")
+        with self._lock:
+            self._stats["quarantined_rows"] += len(rejected)
+
+    def _write_batch(self, batch: PendingWrites) -> int:
+        table = self._table
+        ids = list(batch)
+
+        session = self._session_factory()
+        try:
+            existing = set()
+            for i in range(0, len(ids), 500):
+                chunk = ids[i : i + 500]
+                existing.update(
+                    session.execute(select(table.c.id).where(table.c.id.in_(chunk))).scalars()
+                )
+
+            # Group by column set so each group is a single executemany and
+            # omitted columns keep their table defaults
+            inserts: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            updates: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+            for task_id, (is_insert, fields) in batch.items():
+                columns = tuple(sorted(fields))
+                if is_insert and task_id not in existing:
+                    inserts.setdefault(columns, []).append({**fields, "id": task_id})
+                elif fields:
+                    params = {f"v_{column}": fields[column] for column in columns}
+                    params["t_id"] = task_id
+                    updates.setdefault(columns, []).append(params)
+
+            for rows in inserts.values():
+                session.execute(table.insert(), rows)
+
+            for columns, params in updates.items():
+                statement = (
+                    table.update()
+                    .where(table.c.id == bindparam("t_id"))
+                    .values({column: bindparam(f"v_{column}") for column in columns})
+                )
+                session.execute(statement, params)
+
+            session.commit()
+            return sum(len(rows) for rows in inserts.values()) + sum(
+                len(params) for params in updates.values()
+            )
+
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+    def _open_segment(self):
+        self._segment_index += 1
+        self._segment_path = self._journal_dir / (
+            f"journal-{time.time_ns()}-{self._segment_index:06d}.log"
+        )
+        self._segment_fd = os.open(
+            self._segment_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+
+    def _seal_segment(self):
+        if self._segment_fd is None:
+            return
+        if self._fsync:
+            os.fsync(self._segment_fd)
+        os.close(self._segment_fd)
+        self._sealed_segments.append(self._segment_path)
+        self._segment_fd = None
+
+    def _replay(self):
+        segments = sorted(self._journal_dir.glob("journal-*.log"))
+        if not segments:
+            return
+
+        batch: PendingWrites = {}
+        records = 0
+        for path in segments:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Torn final line from a crash mid-write
+                        logger.warning(f"Skipping corrupt journal line in {path.name}")
+                        continue
+                    self._merge(batch, record["op"], record["id"], self._decode(record["fields"]))
+                    records += 1
+
+        if batch:
+            self._write_batch(batch)
+
+        for path in segments:
+            path.unlink()
+
+        logger.info(
+            f"Replayed {records} journal records for {len(batch)} tasks "
+            f"from {len(segments)} segments"
+        )
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+    @classmethod
+    def _encode(cls, fields: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: {cls._DATETIME_KEY: value.isoformat()} if isinstance(value, datetime) else value
+            for key, value in fields.items()
+        }
+
+    @classmethod
+    def _decode(cls, fields: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: (
+                datetime.fromisoformat(value[cls._DATETIME_KEY])
+                if isinstance(value, dict) and cls._DATETIME_KEY in value
+                else value
+            )
+            for key, value in fields.items()
+        }
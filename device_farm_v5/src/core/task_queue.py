@@ -5,6 +5,7 @@ Manages and distributes automation tasks across devices
 
 import asyncio
 import json
+import time
 import uuid
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
@@ -12,11 +13,14 @@ from enum import Enum
 from typing import Any, Callable, Dict, List, Optional
 
 from loguru import logger
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, Text, or_
 from sqlalchemy.ext.declarative import declarative_base
 
 from ..config_manager import get_config
+from ..core.device_scheduler import DeviceCapabilities, DeviceScheduler
 from ..core.models import Base, get_db_session
+from ..core.task_journal import TaskJournal
+from ..core.timer_wheel import TimerWheel
 
 
 class TaskStatus(Enum):
@@ -119,22 +123,47 @@ class TaskQueue:
     def __init__(self):
         self.config = get_config()
 
-        # In-memory queues by priority
-        self._queues: Dict[TaskPriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in TaskPriority
-        }
+        # Pending tasks and idle devices, indexed by requirements/capabilities
+        self._scheduler = DeviceScheduler()
+        self._wakeup = asyncio.Event()
+        # Cancelled tasks still waiting in the timer wheel; dropped when they fire
+        self._cancelled_tasks: set = set()
+
+        # Delayed tasks: only the next preload window is kept in memory,
+        # later ones stay in the database until the window reaches them
+        scheduling = self.config.raw_config.get("task_queue", {}).get("scheduling", {})
+        self._tick_seconds = float(scheduling.get("tick_seconds", 1.0))
+        self._preload_window = float(scheduling.get("preload_window", 3600))
+        self._timer_wheel = TimerWheel(tick_seconds=self._tick_seconds, start_time=time.time())
+        self._timer_wakeup = asyncio.Event()
+        self._wheel_task_ids: set = set()
+        self._scheduled_loaded_until = 0.0
+        # Lower bound of the next database load, and tasks submitted into the
+        # wheel beyond it (they may also come back from that load)
+        self._scheduled_queried_until = 0.0
+        self._window_submits: set = set()
+
+        # Write-behind persistence of task state transitions
+        persistence = self.config.raw_config.get("task_queue", {}).get("persistence", {})
+        self._journal = TaskJournal(
+            session_factory=get_db_session,
+            table=Task.__table__,
+            journal_dir=persistence.get("journal_dir", "data/task_journal"),
+            flush_interval=float(persistence.get("flush_interval", 0.5)),
+            batch_size=int(persistence.get("batch_size", 500)),
+            fsync=bool(persistence.get("fsync", True)),
+        )
+        self._flush_timeout = float(persistence.get("flush_timeout", 5.0))
 
         # Active executions
         self._active_executions: Dict[str, TaskExecution] = {}
 
-        # Device availability tracking
-        self._device_availability: Dict[str, bool] = {}
-
         # Task handlers registry
         self._task_handlers: Dict[str, Callable] = {}
 
         # Background tasks
         self._queue_processor_task: Optional[asyncio.Task] = None
+        self._timer_processor_task: Optional[asyncio.Task] = None
         self._cleanup_task: Optional[asyncio.Task] = None
 
         logger.info("TaskQueue initialized")
@@ -142,11 +171,15 @@ class TaskQueue:
     async def initialize(self) -> bool:
         """Initialize task queue system"""
         try:
+            # Replay transitions left in the journal by a crash
+            self._journal.start()
+
             # Load pending tasks from database
             await self._load_pending_tasks()
 
             # Start background processors
             self._queue_processor_task = asyncio.create_task(self._queue_processor())
+            self._timer_processor_task = asyncio.create_task(self._timer_processor())
             self._cleanup_task = asyncio.create_task(self._cleanup_expired_tasks())
 
             logger.info("TaskQueue initialized successfully")
@@ -163,6 +196,8 @@ class TaskQueue:
         # Cancel background tasks
         if self._queue_processor_task:
             self._queue_processor_task.cancel()
+        if self._timer_processor_task:
+            self._timer_processor_task.cancel()
         if self._cleanup_task:
             self._cleanup_task.cancel()
 
@@ -171,6 +206,9 @@ class TaskQueue:
             if execution.status == TaskStatus.RUNNING:
                 await self._cancel_task_execution(execution.task_id)
 
+        # Persist everything still buffered
+        await asyncio.to_thread(self._journal.stop)
+
         logger.info("TaskQueue shutdown complete")
 
     def register_task_handler(self, task_type: str, handler: Callable):
@@ -184,8 +222,10 @@ class TaskQueue:
             # Save to database
             await self._save_task_to_db(task_def)
 
-            # Add to appropriate priority queue
-            await self._queues[task_def.priority].put(task_def)
+            # Delayed tasks wait in the timer wheel (or the database if they
+            # are beyond the preload window); the rest go straight to dispatch
+            if not self._schedule_if_delayed(task_def):
+                self._enqueue(task_def)
 
             logger.info(f"Submitted task {task_def.task_id} with priority {task_def.priority.name}")
             return task_def.task_id
@@ -212,19 +252,30 @@ class TaskQueue:
                 logger.info(f"Cancelled running task {task_id}")
                 return True
 
-            # Update database status for pending tasks
-            session = get_db_session()
-            task = session.query(Task).filter(Task.id == task_id).first()
-            if task and task.status in ["pending", "assigned"]:
-                task.status = TaskStatus.CANCELLED.value
-                task.completed_at = datetime.now(timezone.utc)
-                session.commit()
+            # Update status for pending tasks; unflushed journal state wins
+            status = (self._journal.pending(task_id) or {}).get("status")
+            if status is None:
+                session = get_db_session()
+                task = session.query(Task).filter(Task.id == task_id).first()
                 session.close()
+                status = task.status if task else None
+
+            if status in ["pending", "assigned"]:
+                self._journal.record_update(
+                    task_id,
+                    {
+                        "status": TaskStatus.CANCELLED.value,
+                        "completed_at": datetime.now(timezone.utc),
+                    },
+                )
+
+                # Withdraw it from dispatch; a delayed task is dropped when it fires
+                if not self._scheduler.remove_task(task_id) and task_id in self._wheel_task_ids:
+                    self._cancelled_tasks.add(task_id)
 
                 logger.info(f"Cancelled pending task {task_id}")
                 return True
 
-            session.close()
             logger.warning(f"Task {task_id} not found or cannot be cancelled")
             return False
 
@@ -238,22 +289,38 @@ class TaskQueue:
         if task_id in self._active_executions:
             return self._active_executions[task_id]
 
-        # Check database
+        # Check database, overlaid with transitions not yet flushed
         try:
             session = get_db_session()
             task = session.query(Task).filter(Task.id == task_id).first()
             session.close()
 
+            fields = {}
             if task:
+                fields = {
+                    column: getattr(task, column)
+                    for column in (
+                        "device_serial",
+                        "status",
+                        "started_at",
+                        "completed_at",
+                        "result",
+                        "error_message",
+                        "retry_count",
+                    )
+                }
+            fields.update(self._journal.pending(task_id) or {})
+
+            if fields.get("status"):
                 execution = TaskExecution(
-                    task_id=task.id,
-                    device_serial=task.device_serial or "",
-                    status=TaskStatus(task.status),
-                    started_at=task.started_at,
-                    completed_at=task.completed_at,
-                    result=json.loads(task.result) if task.result else None,
-                    error_message=task.error_message,
-                    retry_count=task.retry_count,
+                    task_id=task_id,
+                    device_serial=fields.get("device_serial") or "",
+                    status=TaskStatus(fields["status"]),
+                    started_at=fields.get("started_at"),
+                    completed_at=fields.get("completed_at"),
+                    result=json.loads(fields["result"]) if fields.get("result") else None,
+                    error_message=fields.get("error_message"),
+                    retry_count=fields.get("retry_count") or 0,
                 )
                 return execution
 
@@ -263,131 +330,283 @@ class TaskQueue:
             logger.error(f"Failed to get task status for {task_id}: {e}")
             return None
 
-    async def update_device_availability(self, device_serial: str, available: bool):
-        """Update device availability status"""
-        self._device_availability[device_serial] = available
+    async def update_device_availability(
+        self,
+        device_serial: str,
+        available: bool,
+        capabilities: Optional[DeviceCapabilities] = None,
+    ):
+        """Update device availability status and, optionally, its capabilities"""
+        self._scheduler.set_device(device_serial, capabilities, available)
+        if available:
+            self._wakeup.set()
         logger.debug(f"Device {device_serial} availability: {available}")
 
+    async def sync_devices(
+        self,
+        devices: List[Any],
+        packages: Optional[Dict[str, List[str]]] = None,
+        regions: Optional[Dict[str, str]] = None,
+    ):
+        """Synchronize scheduler with an ADB scan result.
+
+        New devices become available, known devices keep their busy/idle
+        state with refreshed capabilities and missing devices are removed.
+        """
+        packages = packages or {}
+        regions = regions or {}
+        busy = {execution.device_serial for execution in self._active_executions.values()}
+        seen = set()
+
+        for device_info in devices:
+            serial = device_info.serial
+            seen.add(serial)
+            previous = self._scheduler.get_capabilities(serial)
+            capabilities = DeviceCapabilities.from_device_info(
+                device_info,
+                packages=packages.get(serial, previous.packages if previous else None),
+                region=regions.get(serial, previous.region if previous else None),
+            )
+            self._scheduler.set_device(serial, capabilities, available=serial not in busy)
+
+        for serial in self._scheduler.device_serials():
+            if serial not in seen and serial not in busy:
+                self._scheduler.remove_device(serial)
+
+        self._wakeup.set()
+
     async def get_queue_statistics(self) -> Dict[str, Any]:
         """Get queue statistics"""
+        pending = self._scheduler.pending_by_priority()
         stats = {
             "queued_tasks": {},
             "active_tasks": len(self._active_executions),
-            "available_devices": sum(
-                1 for available in self._device_availability.values() if available
-            ),
-            "total_devices": len(self._device_availability),
+            "available_devices": self._scheduler.idle_count,
+            "total_devices": self._scheduler.device_count,
             "registered_handlers": list(self._task_handlers.keys()),
+            "scheduler": self._scheduler.get_statistics(),
+            "scheduled_tasks": len(self._timer_wheel),
+            "scheduled_loaded_until": datetime.fromtimestamp(
+                self._scheduled_loaded_until, timezone.utc
+            ).isoformat(),
         }
 
         for priority in TaskPriority:
-            stats["queued_tasks"][priority.name] = self._queues[priority].qsize()
+            stats["queued_tasks"][priority.name] = pending.get(priority.value, 0)
 
         return stats
 
     async def _load_pending_tasks(self):
-        """Load pending tasks from database into queues"""
+        """Load pending tasks from database into queues.
+
+        Tasks scheduled within the preload window go to the timer wheel;
+        later ones are picked up by the timer processor as the window moves.
+        """
         try:
             session = get_db_session()
 
+            loaded_until = time.time() + self._preload_window
+            loaded_until_dt = datetime.fromtimestamp(loaded_until, timezone.utc)
+
             # Get pending and assigned tasks
             pending_tasks = (
                 session.query(Task)
                 .filter(Task.status.in_(["pending", "assigned"]))
+                .filter(or_(Task.scheduled_for.is_(None), Task.scheduled_for <= loaded_until_dt))
                 .order_by(Task.priority.desc(), Task.created_at.asc())
                 .all()
             )
+            session.close()
+
+            self._scheduled_loaded_until = loaded_until
+            self._scheduled_queried_until = loaded_until
 
             for task in pending_tasks:
                 try:
-                    task_def = TaskDefinition(
-                        task_id=task.id,
-                        task_type=task.task_type,
-                        priority=TaskPriority(task.priority),
-                        device_requirements=json.loads(task.device_requirements or "{}"),
-                        parameters=json.loads(task.parameters),
-                        timeout_seconds=task.timeout_seconds,
-                        max_retries=task.max_retries,
-                        created_at=task.created_at,
-                        scheduled_for=task.scheduled_for,
-                        callback_url=task.callback_url,
-                    )
-
-                    # Check if task is scheduled for future
-                    if task_def.scheduled_for and task_def.scheduled_for > datetime.now(
-                        timezone.utc
-                    ):
-                        continue  # Skip future tasks for now
-
-                    await self._queues[task_def.priority].put(task_def)
+                    task_def = self._task_definition_from_row(task)
+                    if not self._schedule_if_delayed(task_def):
+                        self._enqueue(task_def)
 
                 except Exception as e:
                     logger.error(f"Failed to load task {task.id}: {e}")
 
-            session.close()
-            logger.info(f"Loaded {len(pending_tasks)} pending tasks from database")
+            logger.info(
+                f"Loaded {len(pending_tasks)} pending tasks from database "
+                f"({len(self._timer_wheel)} scheduled)"
+            )
 
         except Exception as e:
             logger.error(f"Failed to load pending tasks: {e}")
 
+    async def _load_scheduled_window(self, now: float):
+        """Move the preload window forward and load the newly covered tasks"""
+        loaded_until = now + self._preload_window
+        queried_from = self._scheduled_queried_until
+
+        # Claim the window before yielding so tasks submitted meanwhile go
+        # straight to the wheel instead of falling between the two bounds
+        self._scheduled_loaded_until = max(self._scheduled_loaded_until, loaded_until)
+        try:
+            # Tasks submitted beyond the old window may still be buffered;
+            # if the database is slow, keep the window and retry next tick
+            flushed = await asyncio.to_thread(self._journal.flush, self._flush_timeout)
+            if not flushed:
+                logger.warning("Task journal flush timed out; scheduled task load deferred")
+                return
+
+            session = get_db_session()
+            scheduled_tasks = (
+                session.query(Task)
+                .filter(
+                    Task.status == TaskStatus.PENDING.value,
+                    Task.scheduled_for > datetime.fromtimestamp(queried_from, timezone.utc),
+                    Task.scheduled_for <= datetime.fromtimestamp(loaded_until, timezone.utc),
+                )
+                .all()
+            )
+            session.close()
+
+            # Already in the wheel from submit()
+            already_scheduled = self._window_submits
+            self._window_submits = set()
+            self._scheduled_queried_until = loaded_until
+
+            loaded = 0
+            for task in scheduled_tasks:
+                if task.id in already_scheduled:
+                    continue
+                try:
+                    task_def = self._task_definition_from_row(task)
+                    if not self._schedule_if_delayed(task_def):
+                        self._enqueue(task_def)
+                    loaded += 1
+                except Exception as e:
+                    logger.error(f"Failed to load scheduled task {task.id}: {e}")
+
+            if loaded:
+                logger.info(f"Loaded {loaded} scheduled tasks into timer wheel")
+
+        except Exception as e:
+            logger.error(f"Failed to load scheduled tasks: {e}")
+
+    def _task_definition_from_row(self, task: "Task") -> TaskDefinition:
+        """Build a TaskDefinition from a database row"""
+        return TaskDefinition(
+            task_id=task.id,
+            task_type=task.task_type,
+            priority=TaskPriority(task.priority),
+            device_requirements=json.loads(task.device_requirements or "{}"),
+            parameters=json.loads(task.parameters),
+            timeout_seconds=task.timeout_seconds,
+            max_retries=task.max_retries,
+            created_at=task.created_at,
+            scheduled_for=task.scheduled_for,
+            callback_url=task.callback_url,
+        )
+
+    def _schedule_if_delayed(self, task_def: TaskDefinition) -> bool:
+        """Hold a future task back from dispatch.
+
+        Returns False if the task is due now and should be enqueued. Tasks
+        beyond the preload window are left to the database.
+        """
+        if not task_def.scheduled_for:
+            return False
+
+        due = _to_timestamp(task_def.scheduled_for)
+        if due <= time.time():
+            return False
+
+        if due <= self._scheduled_loaded_until:
+            self._timer_wheel.schedule(task_def, due)
+            self._wheel_task_ids.add(task_def.task_id)
+            self._timer_wakeup.set()
+            if due > self._scheduled_queried_until:
+                self._window_submits.add(task_def.task_id)
+
+        return True
+
+    async def _timer_processor(self):
+        """Promote scheduled tasks into the dispatch queue when they become due.
+
+        One loop ticks the timer wheel for all scheduled tasks; while the
+        wheel is empty it only wakes to move the preload window.
+        """
+        logger.info("Timer processor started")
+
+        while True:
+            try:
+                now = time.time()
+
+                for task_def in self._timer_wheel.advance(now):
+                    self._wheel_task_ids.discard(task_def.task_id)
+                    if task_def.task_id in self._cancelled_tasks:
+                        self._cancelled_tasks.discard(task_def.task_id)
+                        continue
+                    self._enqueue(task_def)
+
+                # Also retries a load that failed after claiming its window
+                window_unloaded = self._scheduled_queried_until < self._scheduled_loaded_until
+                if window_unloaded or now + self._preload_window / 2 >= self._scheduled_loaded_until:
+                    await self._load_scheduled_window(now)
+
+                if len(self._timer_wheel) or self._scheduled_queried_until < self._scheduled_loaded_until:
+                    delay = self._tick_seconds
+                else:
+                    delay = self._preload_window / 2
+
+                self._timer_wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._timer_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in timer processor: {e}")
+                await asyncio.sleep(5)
+
+    def _enqueue(self, task_def: TaskDefinition):
+        """Index a task for dispatch and wake the queue processor"""
+        self._scheduler.submit(task_def)
+        self._wakeup.set()
+
     async def _queue_processor(self):
-        """Background task processor"""
+        """Background task processor.
+
+        Sleeps until a task is submitted or a device becomes available, then
+        dispatches every (task, device) match the scheduler can produce.
+        """
         logger.info("Queue processor started")
 
         while True:
             try:
-                # Process queues by priority (highest first)
-                task_processed = False
-
-                for priority in sorted(TaskPriority, key=lambda p: p.value, reverse=True):
-                    if not self._queues[priority].empty():
-                        # Check if we have available devices
-                        available_devices = [
-                            serial
-                            for serial, available in self._device_availability.items()
-                            if available
-                        ]
-
-                        if available_devices:
-                            try:
-                                task_def = self._queues[priority].get_nowait()
-                                await self._assign_and_execute_task(task_def, available_devices)
-                                task_processed = True
-                            except asyncio.QueueEmpty:
-                                continue
-                        else:
-                            logger.debug("No available devices for task execution")
-                            break
-
-                # Sleep if no tasks processed
-                if not task_processed:
-                    await asyncio.sleep(1)
+                await self._wakeup.wait()
+                self._wakeup.clear()
 
+                while True:
+                    assignment = self._scheduler.next_assignment()
+                    if assignment is None:
+                        break
+
+                    task_def, device_serial = assignment
+                    await self._assign_and_execute_task(task_def, device_serial)
+
+            except asyncio.CancelledError:
+                raise
             except Exception as e:
                 logger.error(f"Error in queue processor: {e}")
                 await asyncio.sleep(5)
+                self._wakeup.set()
 
-    async def _assign_and_execute_task(
-        self, task_def: TaskDefinition, available_devices: List[str]
-    ):
-        """Assign task to suitable device and execute"""
+    async def _assign_and_execute_task(self, task_def: TaskDefinition, device_serial: str):
+        """Assign task to the device picked by the scheduler and execute"""
         try:
-            # Find suitable device
-            suitable_device = await self._find_suitable_device(task_def, available_devices)
-
-            if not suitable_device:
-                logger.warning(f"No suitable device found for task {task_def.task_id}, requeueing")
-                # Requeue task
-                await self._queues[task_def.priority].put(task_def)
-                return
-
-            # Mark device as busy
-            self._device_availability[suitable_device] = False
-
             # Create execution tracking
             execution = TaskExecution(
                 task_id=task_def.task_id,
-                device_serial=suitable_device,
+                device_serial=device_serial,
                 status=TaskStatus.ASSIGNED,
                 started_at=datetime.now(timezone.utc),
             )
@@ -395,48 +614,17 @@ class TaskQueue:
             self._active_executions[task_def.task_id] = execution
 
             # Update database
-            await self._update_task_assignment(task_def.task_id, suitable_device)
+            await self._update_task_assignment(task_def.task_id, device_serial)
 
             # Execute task
             asyncio.create_task(self._execute_task(task_def, execution))
 
-            logger.info(f"Assigned task {task_def.task_id} to device {suitable_device}")
+            logger.info(f"Assigned task {task_def.task_id} to device {device_serial}")
 
         except Exception as e:
             logger.error(f"Failed to assign task {task_def.task_id}: {e}")
-
-    async def _find_suitable_device(
-        self, task_def: TaskDefinition, available_devices: List[str]
-    ) -> Optional[str]:
-        """Find suitable device for task execution"""
-        # For now, simple round-robin selection
-        # In production, this could check device capabilities, requirements, etc.
-
-        if not available_devices:
-            return None
-
-        # Check device requirements
-        requirements = task_def.device_requirements
-
-        for device_serial in available_devices:
-            # Simple check - in production, this would check actual device capabilities
-            if self._device_meets_requirements(device_serial, requirements):
-                return device_serial
-
-        # Fallback to first available device
-        return available_devices[0]
-
-    def _device_meets_requirements(self, device_serial: str, requirements: Dict[str, Any]) -> bool:
-        """Check if device meets task requirements"""
-        # Placeholder implementation
-        # In production, this would check:
-        # - Android version
-        # - Installed apps
-        # - Screen resolution
-        # - Available storage
-        # - etc.
-
-        return True  # For now, assume all devices are suitable
+            self._active_executions.pop(task_def.task_id, None)
+            self._scheduler.mark_idle(device_serial)
 
     async def _execute_task(self, task_def: TaskDefinition, execution: TaskExecution):
         """Execute task on assigned device"""
@@ -496,7 +684,7 @@ class TaskQueue:
                 )
 
                 # Requeue task for retry
-                await self._queues[task_def.priority].put(task_def)
+                self._enqueue(task_def)
                 await self._update_task_status(task_def.task_id, TaskStatus.PENDING)
             else:
                 await self._update_task_completion(
@@ -504,13 +692,15 @@ class TaskQueue:
                 )
 
         finally:
-            # Mark device as available again
-            self._device_availability[execution.device_serial] = True
-
             # Remove from active executions
             if task_def.task_id in self._active_executions:
                 del self._active_executions[task_def.task_id]
 
+            # Return device to the idle index and wake the dispatcher
+            if self._scheduler.get_capabilities(execution.device_serial) is not None:
+                self._scheduler.mark_idle(execution.device_serial)
+                self._wakeup.set()
+
     async def _cancel_task_execution(self, task_id: str):
         """Cancel running task execution"""
         # This would send cancellation signal to the task handler
@@ -518,70 +708,49 @@ class TaskQueue:
         logger.info(f"Cancelling task execution: {task_id}")
 
     async def _save_task_to_db(self, task_def: TaskDefinition):
-        """Save task definition to database"""
+        """Record a new task; written to the database by the journal"""
         try:
-            session = get_db_session()
-
-            task = Task(
-                id=task_def.task_id,
-                task_type=task_def.task_type,
-                priority=task_def.priority.value,
-                status=TaskStatus.PENDING.value,
-                parameters=json.dumps(task_def.parameters),
-                device_requirements=json.dumps(task_def.device_requirements),
-                timeout_seconds=task_def.timeout_seconds,
-                max_retries=task_def.max_retries,
-                callback_url=task_def.callback_url,
-                created_at=task_def.created_at,
-                scheduled_for=task_def.scheduled_for,
+            self._journal.record_insert(
+                task_def.task_id,
+                {
+                    "task_type": task_def.task_type,
+                    "priority": task_def.priority.value,
+                    "status": TaskStatus.PENDING.value,
+                    "parameters": json.dumps(task_def.parameters),
+                    "device_requirements": json.dumps(task_def.device_requirements),
+                    "timeout_seconds": task_def.timeout_seconds,
+                    "max_retries": task_def.max_retries,
+                    "callback_url": task_def.callback_url,
+                    "created_at": task_def.created_at,
+                    "scheduled_for": task_def.scheduled_for,
+                },
             )
 
-            session.add(task)
-            session.commit()
-            session.close()
-
         except Exception as e:
             logger.error(f"Failed to save task to database: {e}")
-            session.rollback()
-            session.close()
             raise
 
     async def _update_task_status(self, task_id: str, status: TaskStatus):
-        """Update task status in database"""
+        """Record a task status change"""
         try:
-            session = get_db_session()
-
-            task = session.query(Task).filter(Task.id == task_id).first()
-            if task:
-                task.status = status.value
-                if status == TaskStatus.RUNNING:
-                    task.started_at = datetime.now(timezone.utc)
-                session.commit()
-
-            session.close()
+            fields: Dict[str, Any] = {"status": status.value}
+            if status == TaskStatus.RUNNING:
+                fields["started_at"] = datetime.now(timezone.utc)
+            self._journal.record_update(task_id, fields)
 
         except Exception as e:
             logger.error(f"Failed to update task status: {e}")
-            session.rollback()
-            session.close()
 
     async def _update_task_assignment(self, task_id: str, device_serial: str):
-        """Update task device assignment"""
+        """Record a task device assignment"""
         try:
-            session = get_db_session()
-
-            task = session.query(Task).filter(Task.id == task_id).first()
-            if task:
-                task.device_serial = device_serial
-                task.status = TaskStatus.ASSIGNED.value
-                session.commit()
-
-            session.close()
+            self._journal.record_update(
+                task_id,
+                {"device_serial": device_serial, "status": TaskStatus.ASSIGNED.value},
+            )
 
         except Exception as e:
             logger.error(f"Failed to update task assignment: {e}")
-            session.rollback()
-            session.close()
 
     async def _update_task_completion(
         self,
@@ -590,26 +759,20 @@ class TaskQueue:
         result: Optional[Dict],
         error_message: Optional[str] = None,
     ):
-        """Update task completion in database"""
+        """Record task completion"""
         try:
-            session = get_db_session()
-
-            task = session.query(Task).filter(Task.id == task_id).first()
-            if task:
-                task.status = status.value
-                task.completed_at = datetime.now(timezone.utc)
-                if result:
-                    task.result = json.dumps(result)
-                if error_message:
-                    task.error_message = error_message
-                session.commit()
-
-            session.close()
+            fields: Dict[str, Any] = {
+                "status": status.value,
+                "completed_at": datetime.now(timezone.utc),
+            }
+            if result:
+                fields["result"] = json.dumps(result)
+            if error_message:
+                fields["error_message"] = error_message
+            self._journal.record_update(task_id, fields)
 
         except Exception as e:
             logger.error(f"Failed to update task completion: {e}")
-            session.rollback()
-            session.close()
 
     async def _cleanup_expired_tasks(self):
         """Cleanup old completed tasks"""
@@ -643,6 +806,13 @@ class TaskQueue:
                 logger.error(f"Error in cleanup task: {e}")
 
 
+def _to_timestamp(value: datetime) -> float:
+    """Epoch seconds for a datetime; naive values (SQLite) are treated as UTC"""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
 # Global task queue instance
 _task_queue: Optional[TaskQueue] = None
 
@@ -0,0 +1,125 @@
+"""
+Device Farm v5 - Hierarchical Timer Wheel
+Holds delayed items in memory and releases them when they become due
+"""
+
+import math
+from typing import Any, List, Tuple
+
+
+class TimerWheel:
+    """Hierarchical hashed timer wheel.
+
+    Items are placed in the lowest level whose window contains their due
+    tick, so insertion is O(1) regardless of how many items are pending.
+    Advancing the wheel by one tick fires one level-0 slot and, on slot
+    boundaries, cascades a higher-level slot down one level. Items beyond
+    the top level's range wait in an overflow list that is re-examined
+    once per full top-level revolution.
+
+    Items never fire early: an item due at ``t`` is released by the first
+    ``advance(now)`` call with ``now >= t`` (rounded up to a whole tick).
+    """
+
+    def __init__(
+        self,
+        tick_seconds: float = 1.0,
+        slot_bits: int = 6,
+        levels: int = 4,
+        start_time: float = 0.0,
+    ):
+        if tick_seconds <= 0:
+            raise ValueError("tick_seconds must be positive")
+
+        self.tick_seconds = tick_seconds
+        self._bits = slot_bits
+        self._mask = (1 << slot_bits) - 1
+        self._levels = levels
+        self._wheels: List[List[List[Tuple[float, int, Any]]]] = [
+            [[] for _ in range(1 << slot_bits)] for _ in range(levels)
+        ]
+        self._overflow: List[Tuple[float, int, Any]] = []
+        self._expired: List[Tuple[float, int, Any]] = []
+        self._current_tick = int(start_time // tick_seconds)
+        self._sequence = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def schedule(self, item: Any, due_time: float):
+        """Schedule ``item`` to be released at ``due_time`` (epoch seconds)"""
+        self._sequence += 1
+        self._place((due_time, self._sequence, item))
+        self._size += 1
+
+    def advance(self, now: float) -> List[Any]:
+        """Advance the wheel to ``now`` and return all items that are due.
+
+        Items are returned ordered by due time, then by scheduling order.
+        """
+        target_tick = int(now // self.tick_seconds)
+        fired: List[Tuple[float, int, Any]] = []
+
+        if self._size == len(self._expired):
+            # Nothing left in the wheel; jump straight to the target tick
+            self._current_tick = max(self._current_tick, target_tick)
+        else:
+            while self._current_tick < target_tick:
+                self._current_tick += 1
+                self._cascade()
+                slot = self._wheels[0][self._current_tick & self._mask]
+                if slot:
+                    fired.extend(slot)
+                    slot.clear()
+
+        # Includes items that cascaded onto the current tick
+        fired.extend(self._expired)
+        self._expired = []
+
+        self._size -= len(fired)
+        fired.sort(key=lambda entry: (entry[0], entry[1]))
+        return [item for _, _, item in fired]
+
+    def _due_tick(self, due_time: float) -> int:
+        return math.ceil(due_time / self.tick_seconds)
+
+    def _place(self, entry: Tuple[float, int, Any]):
+        due_tick = self._due_tick(entry[0])
+        current = self._current_tick
+
+        if due_tick <= current:
+            self._expired.append(entry)
+            return
+
+        # Lowest level whose window (shared high-order prefix) holds due_tick
+        for level in range(self._levels):
+            shift = self._bits * (level + 1)
+            if (due_tick >> shift) == (current >> shift):
+                slot = (due_tick >> (self._bits * level)) & self._mask
+                self._wheels[level][slot].append(entry)
+                return
+
+        self._overflow.append(entry)
+
+    def _cascade(self):
+        tick = self._current_tick
+
+        # Top level wrapped: pull overflow items back into range
+        if tick & ((1 << (self._bits * self._levels)) - 1) == 0 and self._overflow:
+            overflow = self._overflow
+            self._overflow = []
+            for entry in overflow:
+                self._place(entry)
+
+        # Highest levels first so items can drop several levels in one tick
+        for level in range(self._levels - 1, 0, -1):
+            if tick & ((1 << (self._bits * level)) - 1):
+                continue
+            slot_index = (tick >> (self._bits * level)) & self._mask
+            slot = self._wheels[level][slot_index]
+            if slot:
+                entries = list(slot)
+                slot.clear()
+                for entry in entries:
+                    self._place(entry)
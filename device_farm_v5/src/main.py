@@ -305,6 +305,10 @@ class DeviceFarmSystem:
                     f"   • {device.serial} - {device.model} (Android {device.android_version})"
                 )
 
+            task_queue = self.components.get("task_queue")
+            if task_queue:
+                await task_queue.sync_devices(devices)
+
         # Check Gologin connectivity
         gologin_manager = self.components.get("gologin")
         if gologin_manager:
@@ -383,7 +387,12 @@ class DeviceFarmSystem:
             try:
                 adb_manager = self.components.get("adb")
                 if adb_manager:
-                    await adb_manager.scan_devices()
+                    devices = await adb_manager.scan_devices()
+
+                    # Keep the task scheduler's device index in sync
+                    task_queue = self.components.get("task_queue")
+                    if task_queue:
+                        await task_queue.sync_devices(devices)
 
                 # Wait before next scan
                 await asyncio.sleep(30)  # Scan every 30 seconds
@@ -454,6 +463,18 @@ class DeviceFarmSystem:
                 await gologin_manager.close()
                 logger.info("✅ Gologin manager closed")
 
+            # Stop task dispatch and flush buffered task state
+            task_queue = self.components.get("task_queue")
+            if task_queue:
+                await task_queue.shutdown()
+                logger.info("✅ Task queue shut down")
+
+            # Close persistent ADB shell sessions
+            adb_manager = self.components.get("adb")
+            if adb_manager:
+                await adb_manager.cleanup()
+                logger.info("✅ ADB sessions closed")
+
             logger.info("✅ Device Farm v5 System shut down gracefully")
 
         except Exception as e:
@@ -17,7 +17,7 @@ import os
 import threading
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import torch
@@ -27,7 +27,10 @@ from PIL import Image
 # Import Device Farm v5 components
 from ..config_manager import get_config
 from ..core.adb_manager import get_adb_manager
+from ..core.screen_capture import ScreenFrame
 from ..utils.performance import performance_monitor, register_resource
+from .inference_batcher import InferenceBatcher
+from .prediction_cache import PerceptualHashCache, perceptual_hash
 
 # Import existing ML v4 components if available
 try:
@@ -49,6 +52,11 @@ except ImportError:
     logger.warning("Ultralytics not available. Install with: pip install ultralytics")
 
 
+def _resolution_key(size: Tuple[int, int]) -> str:
+    """Cache variant for a (width, height) screen size"""
+    return f"{size[0]}x{size[1]}"
+
+
 class DeviceFarmYoloDetector:
     """
     Enhanced YOLO detector specifically for Device Farm v5 automation
@@ -72,15 +80,45 @@ class DeviceFarmYoloDetector:
         )
         self.confidence_threshold = self.model_config.get("confidence_threshold", 0.7)
 
+        # Inference backend: "torch" (Ultralytics) or "onnx" (ONNX Runtime on CPU)
+        self.backend = self.model_config.get("backend", "torch")
+        self.onnx_config = self.model_config.get("onnx", {})
+
         # Performance optimization settings
         self.batch_size = self.model_config.get("batch_size", 4)
+        self.max_batch_latency_ms = self.model_config.get("max_batch_latency_ms", 20)
         self.cache_size = self.model_config.get("cache_size", 100)
+        cache_config = self.model_config.get("cache", {})
         self.enable_memory_optimization = self.model_config.get("memory_optimization", True)
 
+        # Screen capture: "stream" decodes screencap in memory, "file" goes through a PNG
+        capture_config = self.model_config.get("capture", {})
+        self.capture_mode = capture_config.get("mode", "stream")
+        self.capture_downscale = max(int(capture_config.get("downscale", 1)), 1)
+        self.persist_frames = capture_config.get("persist_frames", False)
+        self.persist_on_anomaly = capture_config.get("persist_on_anomaly", True)
+
         # Lazy initialization
         self._model = None
         self._model_lock = threading.Lock()
-        self._prediction_cache = {}
+        self._prediction_cache = PerceptualHashCache(
+            max_entries=self.cache_size,
+            ttl_seconds=cache_config.get("ttl_seconds", 60),
+            max_memory_bytes=int(cache_config.get("max_memory_mb", 64) * 1024 * 1024),
+            hamming_tolerance=cache_config.get("hamming_tolerance", 4),
+            shared=cache_config.get("shared_across_devices", True),
+        )
+        # Frames are only held while an anomaly check may still persist them
+        self._last_frames: Dict[str, ScreenFrame] = {}
+        self._frame_retention: Dict[str, int] = {}
+
+        # Requests from all devices are micro-batched on one inference thread
+        self._batcher = InferenceBatcher(
+            self._infer_batch,
+            batch_size=self.batch_size,
+            max_latency_seconds=self.max_batch_latency_ms / 1000,
+            name="yolo-inference",
+        )
 
         # Register for resource management
         register_resource("yolo_detector", self, self._cleanup)
@@ -126,6 +164,9 @@ class DeviceFarmYoloDetector:
 
     def _initialize_model(self):
         """Initialize YOLO model with optimizations"""
+        if self.backend == "onnx":
+            return self._initialize_onnx_model()
+
         if not ULTRALYTICS_AVAILABLE:
             logger.error("Ultralytics not available. Please install: pip install ultralytics")
             return None
@@ -155,16 +196,38 @@ class DeviceFarmYoloDetector:
             logger.error(f"Failed to initialize YOLO model: {e}")
             return None
 
+    def _initialize_onnx_model(self):
+        """Initialize the ONNX Runtime backend (exports the weights on first use)"""
+        try:
+            from ml_core.models.yolo_onnx import YoloScreenshotDetector as OnnxYoloDetector
+
+            model = OnnxYoloDetector(
+                self.model_path,
+                device=self.device if self.device == "openvino" else "cpu",
+                int8=self.onnx_config.get("int8", False),
+                intra_op_threads=self.onnx_config.get("intra_op_threads"),
+                imgsz=self.onnx_config.get("imgsz", 640),
+            )
+            logger.info(f"✅ YOLO ONNX model loaded: {model.onnx_path}")
+            return model
+
+        except Exception as e:
+            logger.error(f"Failed to initialize ONNX YOLO model: {e}")
+            return None
+
     def _cleanup(self):
         """Cleanup resources"""
         logger.info("🧹 Cleaning up YOLO detector resources...")
 
+        self._batcher.stop()
+
         if self._model is not None:
             del self._model
             self._model = None
 
         # Clear caches
         self._prediction_cache.clear()
+        self._last_frames.clear()
 
         # Force garbage collection
         if self.enable_memory_optimization:
@@ -174,7 +237,7 @@ class DeviceFarmYoloDetector:
 
     @performance_monitor("yolo_device_screenshot")
     async def analyze_device_screenshot(
-        self, device_serial: str, save_analysis: bool = True
+        self, device_serial: str, save_analysis: bool = True, persist_frame: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Take screenshot from device and analyze with YOLO (optimized version)
@@ -182,26 +245,57 @@ class DeviceFarmYoloDetector:
         Args:
             device_serial: Android device serial number
             save_analysis: Whether to save analysis results
+            persist_frame: Whether to write the captured frame to disk
+                (defaults to the ``capture.persist_frames`` setting)
 
         Returns:
             Analysis results with detections and automation recommendations
         """
         try:
-            # Take screenshot using ADB manager
             adb_manager = await get_adb_manager()
-            screenshot_path = await adb_manager.take_screenshot(device_serial)
 
-            if not screenshot_path or not os.path.exists(screenshot_path):
-                raise Exception(f"Failed to capture screenshot for device {device_serial}")
+            if self.capture_mode == "file":
+                screenshot_path = await adb_manager.take_screenshot(device_serial)
 
-            # Check cache first
-            cache_key = f"{device_serial}_{os.path.getmtime(screenshot_path)}"
-            if cache_key in self._prediction_cache:
-                logger.debug(f"📋 Using cached prediction for {device_serial}")
-                return self._prediction_cache[cache_key]
+                if not screenshot_path or not os.path.exists(screenshot_path):
+                    raise Exception(f"Failed to capture screenshot for device {device_serial}")
 
-            # Analyze screenshot
-            analysis_result = await self.analyze_image(screenshot_path)
+                image = Image.open(screenshot_path)
+                image_format = image.format
+                image = image.convert("RGB")
+
+                frame_hash = perceptual_hash(image)
+                cache_variant = _resolution_key(image.size)
+                cached = self._prediction_cache.get(device_serial, frame_hash, cache_variant)
+                if cached is not None:
+                    logger.debug(f"📋 Using cached prediction for {device_serial}")
+                    return self._cached_analysis(cached, device_serial, screenshot_path)
+
+                analysis_result = await self.analyze_frame(image, image_format=image_format)
+            else:
+                # Stream the frame straight into memory
+                frame = await adb_manager.capture_screen(device_serial, self.capture_downscale)
+                if frame is None:
+                    raise Exception(f"Failed to capture screenshot for device {device_serial}")
+
+                if persist_frame is None:
+                    persist_frame = self.persist_frames
+                screenshot_path = (
+                    await self.persist_frame(device_serial, frame) if persist_frame else None
+                )
+                if screenshot_path is None and device_serial in self._frame_retention:
+                    self._last_frames[device_serial] = frame
+
+                frame_hash = perceptual_hash(frame.image)
+                # Boxes are cached in device coordinates, so key on the device size
+                cache_variant = _resolution_key(frame.source_size)
+                cached = self._prediction_cache.get(device_serial, frame_hash, cache_variant)
+                if cached is not None:
+                    logger.debug(f"📋 Using cached prediction for {device_serial}")
+                    return self._cached_analysis(cached, device_serial, screenshot_path)
+
+                analysis_result = await self.analyze_frame(frame.image)
+                self._rescale_detections(analysis_result["detections"], frame.downscale)
 
             # Add device context
             analysis_result["device_serial"] = device_serial
@@ -215,7 +309,7 @@ class DeviceFarmYoloDetector:
             analysis_result["automation_recommendations"] = recommendations
 
             # Cache result
-            self._cache_prediction(cache_key, analysis_result)
+            self._cache_prediction(device_serial, frame_hash, analysis_result, cache_variant)
 
             # Save analysis if requested
             if save_analysis:
@@ -241,57 +335,38 @@ class DeviceFarmYoloDetector:
         Returns:
             Analysis results with detections and metadata
         """
-        if not self.model:
-            raise Exception("YOLO model not initialized")
+        image = Image.open(image_path)
+        image_format = image.format
+        return await self.analyze_frame(image.convert("RGB"), image_format=image_format)
 
+    async def analyze_frame(
+        self, image: Union[np.ndarray, Image.Image], image_format: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze an in-memory image with YOLO model
+
+        Args:
+            image: RGB array (H x W x 3) or PIL image
+            image_format: Source format reported in the image metadata
+
+        Returns:
+            Analysis results with detections and metadata
+        """
         try:
-            # Load and preprocess image
-            image = Image.open(image_path).convert("RGB")
-
-            # Run inference
-            results = self.model(image, device=self.device, verbose=False)
-
-            # Process detections
-            detections = []
-            for result in results:
-                if result.boxes is not None:
-                    boxes = result.boxes
-
-                    for i, box in enumerate(boxes):
-                        # Extract box data
-                        coords = box.xyxy[0].cpu().numpy()
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
-
-                        # Filter by confidence threshold
-                        if confidence >= self.confidence_threshold:
-                            detection = {
-                                "id": i,
-                                "class_id": class_id,
-                                "class_name": self.tiktok_classes.get(
-                                    class_id, f"unknown_{class_id}"
-                                ),
-                                "confidence": round(confidence, 3),
-                                "bbox": {
-                                    "x1": int(coords[0]),
-                                    "y1": int(coords[1]),
-                                    "x2": int(coords[2]),
-                                    "y2": int(coords[3]),
-                                    "width": int(coords[2] - coords[0]),
-                                    "height": int(coords[3] - coords[1]),
-                                    "center_x": int((coords[0] + coords[2]) / 2),
-                                    "center_y": int((coords[1] + coords[3]) / 2),
-                                },
-                            }
-                            detections.append(detection)
+            if isinstance(image, np.ndarray):
+                # Ultralytics treats arrays as BGR; a PIL view keeps RGB semantics
+                image = Image.fromarray(image)
+                image_format = image_format or "RAW"
+
+            # Run inference as part of the next batch
+            detections = await self._batcher.submit(image)
 
             # Calculate image metadata
-            img_array = np.array(image)
             image_info = {
                 "width": image.width,
                 "height": image.height,
-                "channels": len(img_array.shape),
-                "format": image.format,
+                "channels": len(image.getbands()),
+                "format": image_format,
                 "mode": image.mode,
             }
 
@@ -313,6 +388,104 @@ class DeviceFarmYoloDetector:
             logger.error(f"Image analysis failed: {e}")
             raise
 
+    def _infer_batch(self, images: List[Image.Image]) -> List[List[Dict[str, Any]]]:
+        """Run one batched forward pass (inference thread)"""
+        model = self._get_model()
+        if not model:
+            raise Exception("YOLO model not initialized")
+
+        if self.backend == "onnx":
+            return [
+                self._detections_from_arrays(boxes, scores, class_ids)
+                for boxes, scores, class_ids in model.predict(images)
+            ]
+
+        results = model(images, device=self.device, verbose=False)
+        return [self._extract_detections(result) for result in results]
+
+    def _extract_detections(self, result) -> List[Dict[str, Any]]:
+        """Convert one Ultralytics result into detection dicts"""
+        if result.boxes is None or len(result.boxes) == 0:
+            return []
+
+        boxes = result.boxes
+        return self._detections_from_arrays(
+            boxes.xyxy.cpu().numpy(), boxes.conf.cpu().numpy(), boxes.cls.cpu().numpy()
+        )
+
+    def _detections_from_arrays(
+        self, all_coords: np.ndarray, all_confidences: np.ndarray, all_class_ids: np.ndarray
+    ) -> List[Dict[str, Any]]:
+        """Build detection dicts from xyxy boxes, confidences and class ids"""
+        detections = []
+        for i, (coords, confidence, class_id) in enumerate(
+            zip(all_coords, all_confidences, all_class_ids)
+        ):
+            confidence = float(confidence)
+            class_id = int(class_id)
+
+            # Filter by confidence threshold
+            if confidence >= self.confidence_threshold:
+                detection = {
+                    "id": i,
+                    "class_id": class_id,
+                    "class_name": self.tiktok_classes.get(class_id, f"unknown_{class_id}"),
+                    "confidence": round(confidence, 3),
+                    "bbox": {
+                        "x1": int(coords[0]),
+                        "y1": int(coords[1]),
+                        "x2": int(coords[2]),
+                        "y2": int(coords[3]),
+                        "width": int(coords[2] - coords[0]),
+                        "height": int(coords[3] - coords[1]),
+                        "center_x": int((coords[0] + coords[2]) / 2),
+                        "center_y": int((coords[1] + coords[3]) / 2),
+                    },
+                }
+                detections.append(detection)
+
+        return detections
+
+    @staticmethod
+    def _rescale_detections(detections: List[Dict[str, Any]], scale: int):
+        """Map boxes from a downscaled frame back to device coordinates"""
+        if scale <= 1:
+            return
+        for detection in detections:
+            bbox = detection["bbox"]
+            for key in bbox:
+                bbox[key] *= scale
+
+    async def persist_frame(
+        self, device_serial: str, frame: Optional[ScreenFrame] = None
+    ) -> Optional[str]:
+        """Write a captured frame to disk as PNG.
+
+        Without ``frame``, uses the device frame retained for a running
+        anomaly check, if any.
+        """
+        frame = frame or self._last_frames.get(device_serial)
+        if frame is None:
+            return None
+
+        try:
+            config = get_config()
+            frame_dir = (
+                Path(config.raw_config.get("data_dir", "./data")) / "screenshots" / device_serial
+            )
+            frame_dir.mkdir(parents=True, exist_ok=True)
+
+            timestamp = frame.captured_at.strftime("%Y%m%d_%H%M%S_%f")
+            frame_path = frame_dir / f"frame_{timestamp}.png"
+            await asyncio.to_thread(Image.fromarray(frame.image).save, frame_path)
+
+            logger.debug(f"Frame saved to {frame_path}")
+            return str(frame_path)
+
+        except Exception as e:
+            logger.error(f"Failed to persist frame for device {device_serial}: {e}")
+            return None
+
     def _generate_automation_recommendations(
         self, detections: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
@@ -381,7 +554,11 @@ class DeviceFarmYoloDetector:
         return recommendations
 
     async def batch_analyze_devices(self, device_serials: List[str]) -> Dict[str, Dict[str, Any]]:
-        """Analyze screenshots from multiple devices concurrently"""
+        """Analyze screenshots from multiple devices concurrently.
+
+        Captures run in parallel and the frames are inferred together in
+        batches of ``batch_size`` by the inference worker.
+        """
         tasks = []
 
         for device_serial in device_serials:
@@ -407,6 +584,9 @@ class DeviceFarmYoloDetector:
         self, device_serial: str, historical_data: Optional[List] = None
     ) -> Dict[str, Any]:
         """Detect anomalies in current screenshot compared to historical patterns"""
+        retain = self.persist_on_anomaly
+        if retain:
+            self._frame_retention[device_serial] = self._frame_retention.get(device_serial, 0) + 1
         try:
             # Get current analysis
             current_analysis = await self.analyze_device_screenshot(
@@ -451,6 +631,12 @@ class DeviceFarmYoloDetector:
                 anomalies["anomaly_types"].append("low_confidence_detections")
                 anomalies["recommendations"].append("UI elements unclear or app state changed")
 
+            # Keep the frame that triggered the anomaly for review
+            if anomalies["anomaly_detected"] and self.persist_on_anomaly:
+                anomalies["screenshot_path"] = current_analysis.get(
+                    "screenshot_path"
+                ) or await self.persist_frame(device_serial)
+
             return anomalies
 
         except Exception as e:
@@ -461,6 +647,18 @@ class DeviceFarmYoloDetector:
                 "anomaly_types": ["detection_failed"],
                 "error": str(e),
             }
+        finally:
+            if retain:
+                self._release_frame(device_serial)
+
+    def _release_frame(self, device_serial: str):
+        """Drop the retained frame once no anomaly check needs it"""
+        remaining = self._frame_retention.get(device_serial, 0) - 1
+        if remaining > 0:
+            self._frame_retention[device_serial] = remaining
+        else:
+            self._frame_retention.pop(device_serial, None)
+            self._last_frames.pop(device_serial, None)
 
     async def _save_analysis_results(self, device_serial: str, analysis_result: Dict[str, Any]):
         """Save analysis results for historical tracking"""
@@ -484,14 +682,24 @@ class DeviceFarmYoloDetector:
         except Exception as e:
             logger.error(f"Failed to save analysis results: {e}")
 
-    def _cache_prediction(self, cache_key: str, result: Dict[str, Any]):
-        """Cache prediction result with size management"""
-        if len(self._prediction_cache) >= self.cache_size:
-            # Remove oldest entry
-            oldest_key = next(iter(self._prediction_cache))
-            del self._prediction_cache[oldest_key]
+    def _cache_prediction(
+        self, device_serial: str, frame_hash: int, result: Dict[str, Any], variant: str = ""
+    ):
+        """Cache prediction result under the frame's perceptual hash"""
+        self._prediction_cache.put(device_serial, frame_hash, result, variant)
 
-        self._prediction_cache[cache_key] = result
+    @staticmethod
+    def _cached_analysis(
+        cached: Dict[str, Any], device_serial: str, screenshot_path: Optional[str]
+    ) -> Dict[str, Any]:
+        """Re-target a cached result (possibly from another device) to this capture"""
+        return {
+            **cached,
+            "device_serial": device_serial,
+            "screenshot_path": screenshot_path,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "cached": True,
+        }
 
     def clear_cache(self):
         """Clear prediction cache"""
@@ -500,19 +708,25 @@ class DeviceFarmYoloDetector:
 
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
+        stats = self._prediction_cache.get_statistics()
         return {
-            "cache_size": len(self._prediction_cache),
+            **stats,
+            "cache_size": stats["entries"],
             "max_cache_size": self.cache_size,
-            "cache_hit_ratio": getattr(self, "_cache_hits", 0)
-            / max(getattr(self, "_cache_requests", 1), 1),
+            "cache_hit_ratio": stats["hit_ratio"],
         }
 
+    def get_inference_stats(self) -> Dict[str, Any]:
+        """Get batched inference throughput and latency statistics"""
+        return self._batcher.get_statistics()
+
     async def optimize_memory(self):
         """Perform memory optimization"""
         logger.info("🧠 Optimizing YOLO detector memory...")
 
         # Clear caches
         self.clear_cache()
+        self._last_frames.clear()
 
         # Force garbage collection
         gc.collect()
@@ -526,7 +740,7 @@ class DeviceFarmYoloDetector:
 
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the loaded model"""
-        if not self.model:
+        if not self._get_model():
             return {"error": "Model not initialized"}
 
         return {
@@ -535,6 +749,7 @@ class DeviceFarmYoloDetector:
             "confidence_threshold": self.confidence_threshold,
             "supported_classes": list(self.tiktok_classes.values()),
             "automation_contexts": list(self.automation_contexts.keys()),
+            "backend": self.backend,
             "ultralytics_available": ULTRALYTICS_AVAILABLE,
             "ml_v4_integration": ML_V4_AVAILABLE,
         }
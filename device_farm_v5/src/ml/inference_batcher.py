@@ -0,0 +1,201 @@
+"""
+Device Farm v5 - Micro-Batching Inference Worker
+Collects inference requests from many devices and runs them as batches on one thread
+"""
+
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from loguru import logger
+
+
+@dataclass
+class _BatchRequest:
+    item: Any
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    enqueued_at: float
+
+
+class InferenceBatcher:
+    """Micro-batching front end for a synchronous batch inference function.
+
+    ``submit()`` queues an item and returns when its result is ready. A
+    dedicated worker thread takes the first waiting request, keeps
+    collecting until ``batch_size`` requests are queued or
+    ``max_latency_seconds`` has passed since that first request, calls
+    ``infer_batch(items)`` once, and hands each result back to its caller's
+    event loop. The event loop is never blocked by inference, and requests
+    from different devices share a batch.
+
+    ``infer_batch`` must return one result per item, in order. If it
+    raises, every request in that batch fails with the same exception.
+    """
+
+    def __init__(
+        self,
+        infer_batch: Callable[[List[Any]], List[Any]],
+        batch_size: int = 4,
+        max_latency_seconds: float = 0.02,
+        name: str = "inference-batcher",
+    ):
+        self._infer_batch = infer_batch
+        self.batch_size = max(int(batch_size), 1)
+        self.max_latency_seconds = max(float(max_latency_seconds), 0.0)
+        self._name = name
+
+        self._queue: "queue.Queue[Optional[_BatchRequest]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "failed_batches": 0,
+            "inference_seconds": 0.0,
+        }
+        self._batch_sizes: Deque[int] = deque(maxlen=1000)
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._started_at: Optional[float] = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item for the next batch and wait for its result"""
+        self._ensure_started()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put(_BatchRequest(item, future, loop, time.perf_counter()))
+        return await future
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker after the requests already queued"""
+        with self._start_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(None)
+            self._thread = None
+        thread.join(timeout=timeout)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Throughput and latency metrics"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+            batch_sizes = list(self._batch_sizes)
+            latencies = sorted(self._latencies)
+
+        elapsed = time.perf_counter() - self._started_at if self._started_at else 0.0
+        stats.update(
+            {
+                "batch_size": self.batch_size,
+                "max_latency_ms": round(self.max_latency_seconds * 1000, 1),
+                "queued": self._queue.qsize(),
+                "avg_batch_size": round(sum(batch_sizes) / len(batch_sizes), 2)
+                if batch_sizes
+                else 0.0,
+                "throughput_per_second": round(stats["requests"] / elapsed, 2) if elapsed else 0.0,
+                "latency_ms_avg": round(sum(latencies) / len(latencies) * 1000, 2)
+                if latencies
+                else 0.0,
+                "latency_ms_p95": round(latencies[int(len(latencies) * 0.95)] * 1000, 2)
+                if latencies
+                else 0.0,
+            }
+        )
+        return stats
+
+    # ------------------------------------------------------------------
+    # Worker thread
+    # ------------------------------------------------------------------
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._started_at = self._started_at or time.perf_counter()
+                self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = first.enqueued_at + self.max_latency_seconds
+            stopping = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = (
+                        self._queue.get(timeout=remaining)
+                        if remaining > 0
+                        else self._queue.get_nowait()
+                    )
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+
+            self._process(batch)
+            if stopping:
+                return
+
+    def _process(self, batch: List[_BatchRequest]):
+        # Callers that gave up while queued do not need inference
+        batch = [request for request in batch if not request.future.cancelled()]
+        if not batch:
+            return
+
+        start = time.perf_counter()
+        try:
+            results = self._infer_batch([request.item for request in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"Batch inference returned {len(results)} results for {len(batch)} inputs"
+                )
+        except Exception as e:
+            logger.error(f"Batch inference failed for {len(batch)} requests: {e}")
+            with self._stats_lock:
+                self._stats["failed_batches"] += 1
+            for request in batch:
+                self._deliver(request, self._set_exception, e)
+            return
+
+        finished = time.perf_counter()
+        with self._stats_lock:
+            self._stats["requests"] += len(batch)
+            self._stats["batches"] += 1
+            self._stats["inference_seconds"] += finished - start
+            self._batch_sizes.append(len(batch))
+            self._latencies.extend(finished - request.enqueued_at for request in batch)
+
+        for request, result in zip(batch, results):
+            self._deliver(request, self._set_result, result)
+
+    @staticmethod
+    def _deliver(request: _BatchRequest, setter: Callable[[asyncio.Future, Any], None], value: Any):
+        try:
+            request.loop.call_soon_threadsafe(setter, request.future, value)
+        except RuntimeError:
+            # The caller's event loop has already been closed
+            pass
+
+    @staticmethod
+    def _set_result(future: asyncio.Future, result: Any):
+        if not future.done():
+            future.set_result(result)
+
+    @staticmethod
+    def _set_exception(future: asyncio.Future, error: Exception):
+        if not future.done():
+            future.set_exception(error)
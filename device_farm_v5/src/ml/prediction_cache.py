@@ -0,0 +1,206 @@
+"""
+Device Farm v5 - Perceptual-Hash Prediction Cache
+Content-addressed LRU/TTL cache for screenshot analysis results
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+from PIL import Image
+
+# Scope used for entries shared by every device
+SHARED_SCOPE = "*"
+
+
+def perceptual_hash(image: Union[np.ndarray, Image.Image]) -> int:
+    """64-bit difference hash (dHash) of an image.
+
+    The image is reduced to 9x8 grayscale and each bit records whether a
+    pixel is brighter than its right-hand neighbour, so small rendering
+    differences (compression noise, a blinking cursor) flip few bits.
+    """
+    if isinstance(image, np.ndarray):
+        # Sampling first keeps the grayscale conversion cheap on full frames
+        step = max(min(image.shape[0], image.shape[1]) // 64, 1)
+        image = Image.fromarray(np.ascontiguousarray(image[::step, ::step]))
+
+    small = np.asarray(image.convert("L").resize((9, 8), Image.BOX), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+@dataclass
+class _CacheEntry:
+    scope: str
+    phash: int
+    value: Dict[str, Any]
+    size: int
+    expires_at: float
+
+
+class PerceptualHashCache:
+    """LRU/TTL cache keyed on perceptual hashes.
+
+    A lookup hits when a cached frame in the same scope is within
+    ``hamming_tolerance`` bits of the query. Near matches are found with a
+    multi-index: the 64-bit hash is split into ``hamming_tolerance + 1``
+    bands, and any hash within the tolerance must agree exactly on at least
+    one band, so only entries sharing a band are compared.
+
+    Entries expire after ``ttl_seconds`` and the least recently used ones
+    are evicted once ``max_entries`` or ``max_memory_bytes`` (estimated
+    from the serialized result) is exceeded. With ``shared=True`` all
+    devices use one scope, so identical screens on many phones are inferred
+    once. ``variant`` further splits the scope for frames whose results are
+    not interchangeable even when they look alike, e.g. different screen
+    resolutions (a dHash ignores size, bounding boxes do not).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 100,
+        ttl_seconds: float = 60.0,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        hamming_tolerance: int = 4,
+        shared: bool = True,
+    ):
+        self.max_entries = max(int(max_entries), 1)
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_bytes = max_memory_bytes
+        self.hamming_tolerance = max(min(int(hamming_tolerance), 63), 0)
+        self.shared = shared
+
+        self._band_masks = self._build_bands(self.hamming_tolerance + 1)
+        self._entries: "OrderedDict[Tuple[str, int], _CacheEntry]" = OrderedDict()
+        self._bands: Dict[Tuple[str, int, int], Set[int]] = {}
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        self._stats = {
+            "requests": 0,
+            "hits": 0,
+            "near_hits": 0,
+            "evictions": 0,
+            "expirations": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, device_serial: str, phash: int, variant: str = ""
+    ) -> Optional[Dict[str, Any]]:
+        """Look up a result for a frame hash; counts towards the hit ratio"""
+        scope = self._scope(device_serial, variant)
+        now = time.monotonic()
+
+        with self._lock:
+            self._stats["requests"] += 1
+
+            key = (scope, phash)
+            entry = self._entries.get(key)
+            if entry is None and self.hamming_tolerance:
+                entry = self._nearest(scope, phash)
+                if entry is not None:
+                    key = (scope, entry.phash)
+
+            if entry is None:
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self._stats["expirations"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            if entry.phash != phash:
+                self._stats["near_hits"] += 1
+            return entry.value
+
+    def put(self, device_serial: str, phash: int, value: Dict[str, Any], variant: str = ""):
+        """Store a result for a frame hash"""
+        scope = self._scope(device_serial, variant)
+        key = (scope, phash)
+        size = len(json.dumps(value, default=str))
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _CacheEntry(
+                scope, phash, value, size, time.monotonic() + self.ttl_seconds
+            )
+            self._memory_bytes += size
+            for band, mask in enumerate(self._band_masks):
+                self._bands.setdefault((scope, band, phash & mask), set()).add(phash)
+
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._memory_bytes > self.max_memory_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        """Drop every entry (statistics are kept)"""
+        with self._lock:
+            self._entries.clear()
+            self._bands.clear()
+            self._memory_bytes = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        with self._lock:
+            requests = self._stats["requests"]
+            return {
+                **self._stats,
+                "misses": requests - self._stats["hits"],
+                "hit_ratio": self._stats["hits"] / requests if requests else 0.0,
+                "entries": len(self._entries),
+                "memory_bytes": self._memory_bytes,
+                "max_entries": self.max_entries,
+                "max_memory_bytes": self.max_memory_bytes,
+                "hamming_tolerance": self.hamming_tolerance,
+                "shared": self.shared,
+            }
+
+    def _scope(self, device_serial: str, variant: str = "") -> str:
+        scope = SHARED_SCOPE if self.shared else device_serial
+        return f"{scope}@{variant}" if variant else scope
+
+    def _nearest(self, scope: str, phash: int) -> Optional[_CacheEntry]:
+        best: Optional[_CacheEntry] = None
+        best_distance = self.hamming_tolerance + 1
+        for band, mask in enumerate(self._band_masks):
+            for candidate in self._bands.get((scope, band, phash & mask), ()):
+                distance = bin(candidate ^ phash).count("1")
+                if distance < best_distance:
+                    best = self._entries[(scope, candidate)]
+                    best_distance = distance
+        return best
+
+    def _remove(self, key: Tuple[str, int]):
+        entry = self._entries.pop(key)
+        self._memory_bytes -= entry.size
+        for band, mask in enumerate(self._band_masks):
+            band_key = (entry.scope, band, entry.phash & mask)
+            members = self._bands.get(band_key)
+            if members is not None:
+                members.discard(entry.phash)
+                if not members:
+                    del self._bands[band_key]
+
+    @staticmethod
+    def _build_bands(count: int) -> List[int]:
+        masks = []
+        start = 0
+        for band in range(count):
+            width = (64 - start) // (count - band)
+            masks.append(((1 << width) - 1) << start)
+            start += width
+        return masks
@@ -1,8 +1,12 @@
+import asyncio
+import os
+import threading
 import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Dict
-from fastapi import APIRouter, File, UploadFile
+from typing import Any, Dict, List, Sequence, Tuple
+from fastapi import APIRouter, File, HTTPException, UploadFile
 
 from ml_core.models.factory import get_yolo_screenshot_detector
 
@@ -17,27 +21,100 @@ def _load_model_config():
         return config.get('yolo_screenshot', {})
     return {}
 
-# Load configuration and instantiate detector
+# Load configuration
 _config = _load_model_config()
-_detector = get_yolo_screenshot_detector(
-    model_path=_config.get('model_path'),
-    device=_config.get('device', 'cpu')
+
+# Inference runs off the event loop on a small bounded pool. Each worker owns
+# its detector (Ultralytics models are not thread-safe), so every extra worker
+# holds another copy of the weights; raise api_max_workers only with memory to
+# spare. At most _MAX_PENDING requests may be queued or running before we shed load.
+_DEFAULT_MAX_WORKERS = 2
+_WORKERS = max(int(_config.get('api_max_workers') or min(_DEFAULT_MAX_WORKERS, os.cpu_count() or 1)), 1)
+_MAX_PENDING = int(_config.get('api_max_pending') or _WORKERS * 4)
+_MAX_BATCH = int(_config.get('api_max_batch') or 16)
+_RETRY_AFTER_SECONDS = 1
+
+_worker_state = threading.local()
+_slots = threading.BoundedSemaphore(_MAX_PENDING)
+
+
+def _create_worker_detector() -> None:
+    _worker_state.detector = get_yolo_screenshot_detector(
+        model_path=_config.get('model_path'),
+        device=_config.get('device', 'cpu')
+    )
+
+
+_executor = ThreadPoolExecutor(
+    max_workers=_WORKERS,
+    thread_name_prefix="yolo-screenshot",
+    initializer=_create_worker_detector,
 )
 
 
-@router.post("/analyze_screenshot", response_model=Dict[str, Any])
-async def analyze_screenshot(file: UploadFile = File(...)) -> Dict[str, Any]:
-    # Read file bytes and forward to the detector
-    image_bytes = await file.read()
+def _infer(images: Sequence[bytes]) -> Tuple[List[List[Dict[str, Any]]], float]:
+    """Run one batch on the calling worker; returns detections and seconds spent."""
+    detector = _worker_state.detector
+    started = time.perf_counter()
+    if hasattr(detector, "detect_batch"):
+        detections = detector.detect_batch(images)
+    else:
+        detections = [detector.detect(image_bytes) for image_bytes in images]
+    return detections, time.perf_counter() - started
 
-    # Simulate a short processing delay
-    time.sleep(0.2)
 
-    detections = _detector.detect(image_bytes)
+async def _submit(images: Sequence[bytes]) -> Tuple[List[List[Dict[str, Any]]], float]:
+    """Queue a batch on the pool, or reject it with 429 when the pool is saturated."""
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(
+            status_code=429,
+            detail="Screenshot analysis queue is full, retry later",
+            headers={"Retry-After": str(_RETRY_AFTER_SECONDS)},
+        )
 
+    # The slot is released when the job finishes or is cancelled before it
+    # starts, so client disconnects cannot leak capacity
+    future = _executor.submit(_infer, list(images))
+    future.add_done_callback(lambda _: _slots.release())
+    return await asyncio.wrap_future(future)
+
+
+def _result(detections: List[Dict[str, Any]], processing_time: float) -> Dict[str, Any]:
     return {
         "detected_elements": detections,
-        "processing_time": round(0.2 + len(detections) * 0.05, 2),
+        "processing_time": round(processing_time, 4),
         "screen_state": "normal",
         "recommendation": "safe_to_interact",
     }
+
+
+@router.post("/analyze_screenshot", response_model=Dict[str, Any])
+async def analyze_screenshot(file: UploadFile = File(...)) -> Dict[str, Any]:
+    # Read file bytes and forward to the detector pool
+    image_bytes = await file.read()
+
+    (detections,), processing_time = await _submit([image_bytes])
+
+    return _result(detections, processing_time)
+
+
+@router.post("/analyze_screenshots", response_model=Dict[str, Any])
+async def analyze_screenshots(files: List[UploadFile] = File(...)) -> Dict[str, Any]:
+    """Analyze several screenshots as a single inference batch."""
+    if len(files) > _MAX_BATCH:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {_MAX_BATCH} screenshots per request",
+        )
+
+    images = [await file.read() for file in files]
+    batch_detections, processing_time = await _submit(images)
+
+    return {
+        "results": [
+            {"filename": file.filename, **_result(detections, processing_time)}
+            for file, detections in zip(files, batch_detections)
+        ],
+        "batch_size": len(images),
+        "processing_time": round(processing_time, 4),
+    }
@@ -92,22 +92,24 @@ try:
         meta_ads_optimizer,
         feedback
     )
-    from ml_core.meta_automation.api import endpoints as meta_endpoints
 except ImportError as e:
     # Fallback for dummy mode or partial builds
     print(f"[WARNING] Some endpoints could not be imported: {e}")
-
+else:
     # Include routers
     app.include_router(screenshot_analysis.router, prefix="/api/v1", tags=["Screenshot Analysis"])
     app.include_router(anomaly_detection.router, prefix="/api/v1", tags=["Anomaly Detection"])
     app.include_router(posting_predictor.router, prefix="/api/v1", tags=["Posting Time"])
     app.include_router(affinity_calculator.router, prefix="/api/v1", tags=["Affinity"])
-    app.include_router(meta_endpoints.router, tags=["Meta Marketing Automation"])
     app.include_router(meta_ads_optimizer.router, prefix="/api/v1", tags=["Meta Ads Optimizer"])
     app.include_router(feedback.router, prefix="/api/v1", tags=["Feedback Integration"])
-except ImportError:
-    # Endpoints not implemented yet - running in basic mode
-    pass
+
+try:
+    from ml_core.meta_automation.api import endpoints as meta_endpoints
+except ImportError as e:
+    print(f"[WARNING] Meta automation endpoints could not be imported: {e}")
+else:
+    app.include_router(meta_endpoints.router, tags=["Meta Marketing Automation"])
 
 
 @app.get("/")
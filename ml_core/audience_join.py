@@ -0,0 +1,146 @@
+"""
+Audience Join - cross-platform (country, age) matching for MetaMLSystem
+
+YouTube/Spotify records are bucketed by country and sorted by age into flat
+NumPy arrays, with a prefix sum per metric. Each Meta Ads row is answered
+with two binary searches instead of a scan over every record, and the
+per-group aggregates used as ML features fall out of the same lookup.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Ages are clipped to [0, _AGE_SPAN) so a (country, age) pair packs into one
+# sortable int64 key without an age window spilling into the next country
+_AGE_SPAN = 1000
+AGE_TOLERANCE = 5
+
+
+class PlatformIndex:
+    """Records of one platform ordered by (country, age) with prefix sums.
+
+    ``metrics`` maps a column name to one value per record (booleans are
+    summed as counts). ``records`` are the original objects (optional);
+    when given, ``records_in`` returns the matched ones for callers that
+    still need them.
+    """
+
+    def __init__(
+        self,
+        countries: Sequence[str],
+        ages: Sequence[int],
+        metrics: Dict[str, Sequence[float]],
+        records: Optional[Sequence[Any]] = None,
+    ) -> None:
+        names, codes = np.unique(np.asarray(countries, dtype=str), return_inverse=True)
+        self.country_codes: Dict[str, int] = {str(name): code for code, name in enumerate(names)}
+        codes = codes.astype(np.int64).reshape(-1)
+        keys = codes * _AGE_SPAN + np.clip(np.asarray(ages, dtype=np.int64), 0, _AGE_SPAN - 1)
+
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.prefix_sums: Dict[str, np.ndarray] = {}
+        for name, values in metrics.items():
+            column = np.asarray(values, dtype=np.float64)[order]
+            self.prefix_sums[name] = np.concatenate(([0.0], np.cumsum(column)))
+
+        self.records = None
+        if records is not None:
+            self.records = np.empty(len(records), dtype=object)
+            self.records[:] = list(records)
+            self.records = self.records[order]
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def ranges(self, countries: Sequence[str], ages: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Half-open [lo, hi) match range per query (same country, |age diff| <= tolerance)"""
+        codes = np.fromiter(
+            (self.country_codes.get(str(c), -1) for c in countries), dtype=np.int64, count=len(countries)
+        )
+        ages = np.asarray(ages, dtype=np.int64)
+        low = codes * _AGE_SPAN + np.clip(ages - AGE_TOLERANCE, 0, _AGE_SPAN - 1)
+        high = codes * _AGE_SPAN + np.clip(ages + AGE_TOLERANCE, 0, _AGE_SPAN - 1)
+
+        lo = np.searchsorted(self.keys, low, side="left")
+        hi = np.searchsorted(self.keys, high, side="right")
+        # Unknown countries match nothing
+        hi = np.where(codes < 0, lo, hi)
+        return lo, hi
+
+    def sums(self, lo: np.ndarray, hi: np.ndarray) -> Dict[str, np.ndarray]:
+        """Per-query metric sums over the matched ranges"""
+        return {name: prefix[hi] - prefix[lo] for name, prefix in self.prefix_sums.items()}
+
+    def records_in(self, lo: int, hi: int) -> List[Any]:
+        if self.records is None:
+            return []
+        return self.records[lo:hi].tolist()
+
+
+def youtube_index(youtube_data: Sequence[Any]) -> PlatformIndex:
+    """Index ``YouTubeData`` records"""
+    return PlatformIndex(
+        countries=[yt.country for yt in youtube_data],
+        ages=[yt.age for yt in youtube_data],
+        metrics={
+            "retention_rate": [yt.retention_rate for yt in youtube_data],
+            "watch_time": [yt.watch_time for yt in youtube_data],
+            "engaged": [bool(yt.engagement_actions) for yt in youtube_data],
+        },
+        records=youtube_data,
+    )
+
+
+def spotify_index(spotify_data: Sequence[Any]) -> PlatformIndex:
+    """Index ``SpotifyData`` records"""
+    return PlatformIndex(
+        countries=[sp.country for sp in spotify_data],
+        ages=[sp.age for sp in spotify_data],
+        metrics={
+            "listening_time": [sp.listening_time for sp in spotify_data],
+            "saved": [sp.has_saved_track for sp in spotify_data],
+            "repeat_listens": [sp.repeat_listens for sp in spotify_data],
+        },
+        records=spotify_data,
+    )
+
+
+def audience_aggregates(
+    youtube: PlatformIndex,
+    spotify: PlatformIndex,
+    countries: Sequence[str],
+    ages: Sequence[int],
+) -> Dict[str, np.ndarray]:
+    """Match every (country, age) query against both platforms in one pass.
+
+    Returns one array per column, aligned with the queries: the match
+    ranges (``youtube_lo``/``youtube_hi``/``spotify_lo``/``spotify_hi``),
+    the match counts, and the aggregate features ``_generate_ml_features``
+    uses (0 when a platform has no match).
+    """
+    yt_lo, yt_hi = youtube.ranges(countries, ages)
+    sp_lo, sp_hi = spotify.ranges(countries, ages)
+    yt_count = yt_hi - yt_lo
+    sp_count = sp_hi - sp_lo
+    yt_sums = youtube.sums(yt_lo, yt_hi)
+    sp_sums = spotify.sums(sp_lo, sp_hi)
+
+    yt_div = np.maximum(yt_count, 1)
+    sp_div = np.maximum(sp_count, 1)
+    return {
+        "youtube_lo": yt_lo,
+        "youtube_hi": yt_hi,
+        "spotify_lo": sp_lo,
+        "spotify_hi": sp_hi,
+        "youtube_count": yt_count,
+        "spotify_count": sp_count,
+        "youtube_avg_retention": yt_sums["retention_rate"] / yt_div,
+        "youtube_avg_watch_time": yt_sums["watch_time"] / yt_div,
+        "youtube_engagement_rate": yt_sums["engaged"] / yt_div,
+        "spotify_avg_listening": sp_sums["listening_time"] / sp_div,
+        "spotify_save_rate": sp_sums["saved"] / sp_div,
+        "spotify_repeat_rate": sp_sums["repeat_listens"] / sp_div,
+        "cross_platform_score": yt_count + sp_count,
+    }
@@ -9,13 +9,17 @@ import logging
 import os
 import time
 from abc import ABC, abstractmethod
-from dataclasses import asdict, dataclass
+from collections import deque
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 import numpy as np
 
+from ml_core.engine_stores import PendingActionQueue, SpillingHistoryStore, TimeBucketedStore
+from ml_core.pipeline_stages import PipelineStage
+
 try:
     import aiohttp
 except ImportError:
@@ -68,6 +72,7 @@ class MLInsight:
     recommended_actions: List[Dict[str, Any]]
     expected_impact: Dict[str, float]
     urgency_level: str  # low, medium, high, critical
+    created_at: datetime = field(default_factory=datetime.now)
 
 
 @dataclass
@@ -102,12 +107,22 @@ class BidirectionalMLEngine:
         self.action_generator = None
         self.platform_controllers = {}
 
-        # Data storage
-        self.real_time_data = []
-        self.historical_data = []
-        self.active_insights = []
-        self.pending_actions = []
-        self.executed_actions = []
+        # Data storage (bounded; old real-time data moves to the historical
+        # tier, which spills to disk past its in-memory cap)
+        self.real_time_data = TimeBucketedStore(
+            bucket_seconds=self.config.get("data_bucket_seconds", 60),
+            max_points=self.config.get("max_real_time_points", 100_000),
+        )
+        self.historical_data = SpillingHistoryStore(
+            self.config.get("historical_spill_dir", "data/ml_history"),
+            max_in_memory=self.config.get("max_historical_points", 50_000),
+        )
+        self.active_insights = deque(maxlen=self.config.get("max_active_insights", 1000))
+        self.pending_actions = PendingActionQueue(
+            priority=lambda action: (action.confidence, action.expected_outcome.get("impact", 0))
+        )
+        self.executed_actions = deque(maxlen=self.config.get("max_executed_actions", 10_000))
+        self._processed_watermark = 0
 
         # ML Models (initialized based on mode)
         self.prediction_models = {}
@@ -125,6 +140,7 @@ class BidirectionalMLEngine:
         # Processing state
         self.is_running = False
         self.processing_tasks = []
+        self.stages: Dict[str, PipelineStage] = {}
 
         self.logger.info("🧠 Bidirectional ML Engine initialized")
 
@@ -153,41 +169,101 @@ class BidirectionalMLEngine:
         self.logger.info("✅ Bidirectional ML System ready!")
 
     async def start_bidirectional_loop(self, loop_interval: int = 60):
-        """Start the main bidirectional processing loop"""
-        self.logger.info(f"🔄 Starting bidirectional loop (interval: {loop_interval}s)")
+        """Start the bidirectional pipeline.
+
+        Acquisition runs every ``loop_interval`` seconds and feeds a chain of
+        stages (processing → action generation → execution → feedback), each
+        a worker group behind a bounded queue. Stages run concurrently, so a
+        slow platform controller no longer delays the next acquisition; when
+        execution falls behind, the queues fill up and acquisition waits.
+        """
+        self.logger.info(f"🔄 Starting bidirectional pipeline (interval: {loop_interval}s)")
         self.is_running = True
+        self._build_pipeline()
+
+        # Actions queued before the pipeline started (e.g. force_ml_analysis)
+        for _ in range(len(self.pending_actions)):
+            await self.stages["execution"].put(None)
 
         try:
             while self.is_running:
                 loop_start_time = time.time()
 
-                # Phase 1: Data Acquisition
-                await self._acquisition_phase()
+                # Phase 1: Data Acquisition (feeds the processing stage)
+                data_batch = await self._acquisition_phase()
+                if data_batch:
+                    await self.stages["processing"].put(data_batch)
 
-                # Phase 2: ML Processing
-                await self._processing_phase()
+                # Archive old real-time data
+                self._archive_real_time_data()
 
-                # Phase 3: Action Generation
-                await self._action_generation_phase()
-
-                # Phase 4: Action Execution
-                await self._action_execution_phase()
-
-                # Phase 5: Feedback Collection
-                await self._feedback_collection_phase()
-
-                # Calculate processing time and adjust interval
-                loop_time = time.time() - loop_start_time
-                sleep_time = max(0, loop_interval - loop_time)
+                acquisition_time = time.time() - loop_start_time
+                sleep_time = max(0, loop_interval - acquisition_time)
 
                 self.logger.info(
-                    f"🔄 Loop completed in {loop_time:.2f}s, sleeping {sleep_time:.2f}s"
+                    f"🔄 Acquisition completed in {acquisition_time:.2f}s, sleeping {sleep_time:.2f}s"
                 )
                 await asyncio.sleep(sleep_time)
 
         except Exception as e:
             self.logger.error(f"❌ Error in bidirectional loop: {e}")
             raise
+        finally:
+            await self._stop_pipeline(drain=self.is_running is False)
+
+    def _build_pipeline(self):
+        """Create and start the stage chain"""
+        queue_size = self.config.get("pipeline_queue_size", 100)
+
+        feedback = PipelineStage(
+            "feedback",
+            self._feedback_collection_phase,
+            maxsize=queue_size,
+            batch_size=self.config.get("feedback_batch_size", 20),
+            logger=self.logger,
+        )
+        execution = PipelineStage(
+            "execution",
+            self._action_execution_phase,
+            workers=self.config.get("max_concurrent_actions", 5),
+            maxsize=queue_size,
+            downstream=feedback,
+            logger=self.logger,
+        )
+        generation = PipelineStage(
+            "action_generation",
+            self._action_generation_phase,
+            maxsize=queue_size,
+            downstream=execution,
+            logger=self.logger,
+        )
+        processing = PipelineStage(
+            "processing",
+            self._processing_phase,
+            workers=self.config.get("processing_workers", 1),
+            maxsize=queue_size,
+            batch_size=self.config.get("processing_batch_size", 10),
+            downstream=generation,
+            logger=self.logger,
+        )
+
+        self.stages = {
+            "processing": processing,
+            "action_generation": generation,
+            "execution": execution,
+            "feedback": feedback,
+        }
+        for stage in self.stages.values():
+            stage.start()
+
+    async def _stop_pipeline(self, drain: bool = True):
+        # Upstream first, so each stage has received everything before draining
+        for stage in self.stages.values():
+            await stage.stop(drain=drain)
+
+    def get_pipeline_metrics(self) -> Dict[str, Any]:
+        """Per-stage queue depth, throughput and latency"""
+        return {name: stage.get_metrics() for name, stage in self.stages.items()}
 
     async def activate_platform(self, platform: str, mode: str = "dummy"):
         """Activate specific platform in dummy or production mode"""
@@ -223,9 +299,8 @@ class BidirectionalMLEngine:
         await self.data_acquisition_engine.deactivate_platform(platform)
 
         # Cancel pending actions for this platform
-        self.pending_actions = [
-            action for action in self.pending_actions if action.platform != platform
-        ]
+        for action in self.pending_actions.remove_where(lambda a: a.platform == platform):
+            action.status = "cancelled"
 
         self.logger.info(f"✅ {platform} deactivated successfully")
 
@@ -236,7 +311,9 @@ class BidirectionalMLEngine:
             "active_platforms": [
                 p for p, status in self.platform_status.items() if status["enabled"]
             ],
-            "current_insights": [asdict(insight) for insight in self.active_insights[-10:]],
+            "current_insights": [
+                asdict(insight) for insight in list(self.active_insights)[-10:]
+            ],
             "pending_actions": len(self.pending_actions),
             "executed_actions_today": len(
                 [
@@ -247,6 +324,7 @@ class BidirectionalMLEngine:
             ),
             "data_points_collected": len(self.real_time_data),
             "ml_processing_status": await self.cloud_processor.get_status(),
+            "pipeline": self.get_pipeline_metrics(),
             "platform_health": await self._get_platform_health(),
         }
 
@@ -265,6 +343,9 @@ class BidirectionalMLEngine:
 
         # Add to pending actions
         self.pending_actions.extend(actions)
+        if self.is_running and "execution" in self.stages:
+            for _ in actions:
+                await self.stages["execution"].put(None)
 
         return {
             "analysis_completed": True,
@@ -275,14 +356,14 @@ class BidirectionalMLEngine:
 
     # Private methods for bidirectional loop phases
 
-    async def _acquisition_phase(self):
+    async def _acquisition_phase(self) -> List[SocialDataPoint]:
         """Phase 1: Acquire data from all active platforms"""
         active_platforms = [
             platform for platform, status in self.platform_status.items() if status["enabled"]
         ]
 
         if not active_platforms:
-            return
+            return []
 
         self.logger.debug(f"📥 Data acquisition phase - platforms: {active_platforms}")
 
@@ -295,24 +376,29 @@ class BidirectionalMLEngine:
         data_batches = await asyncio.gather(*acquisition_tasks, return_exceptions=True)
 
         # Process collected data
+        collected = []
         for platform, data_batch in zip(active_platforms, data_batches):
             if isinstance(data_batch, Exception):
                 self.logger.error(f"❌ Data acquisition failed for {platform}: {data_batch}")
                 continue
 
             if data_batch:
-                self.real_time_data.extend(data_batch)
+                collected.extend(data_batch)
                 self.logger.debug(f"📊 Collected {len(data_batch)} data points from {platform}")
 
-    async def _processing_phase(self):
-        """Phase 2: Process collected data with ML models"""
-        if not self.real_time_data:
-            return
+        self.real_time_data.extend(collected)
+        return collected
 
-        self.logger.debug(f"🧠 ML processing phase - {len(self.real_time_data)} data points")
+    async def _processing_phase(self, data_batches: List[List[SocialDataPoint]]) -> List[MLInsight]:
+        """Phase 2: Process data collected since the last run with ML models"""
+        new_data, self._processed_watermark = self.real_time_data.since(self._processed_watermark)
+        if not new_data:
+            return []
 
-        # Process data in cloud ML processor
-        new_insights = await self.cloud_processor.process_data_batch(self.real_time_data)
+        self.logger.debug(f"🧠 ML processing phase - {len(new_data)} new data points")
+
+        # Process only unseen data in cloud ML processor
+        new_insights = await self.cloud_processor.process_data_batch(new_data)
 
         # Filter and prioritize insights
         high_confidence_insights = [insight for insight in new_insights if insight.confidence > 0.7]
@@ -320,107 +406,72 @@ class BidirectionalMLEngine:
         # Add to active insights
         self.active_insights.extend(high_confidence_insights)
 
-        # Keep only recent insights (last 24 hours)
+        # Keep only recent insights (last 24 hours, by their own timestamp)
         cutoff_time = datetime.now() - timedelta(hours=24)
-        self.active_insights = [
-            insight
-            for insight in self.active_insights
-            if any(data_point.timestamp > cutoff_time for data_point in self.real_time_data)
-        ]
+        while self.active_insights and self.active_insights[0].created_at < cutoff_time:
+            self.active_insights.popleft()
 
         self.logger.debug(
             f"💡 Generated {len(new_insights)} insights, {len(high_confidence_insights)} high-confidence"
         )
+        return high_confidence_insights
 
-    async def _action_generation_phase(self):
-        """Phase 3: Generate actions from ML insights"""
-        if not self.active_insights:
-            return
-
-        self.logger.debug(f"⚡ Action generation phase - {len(self.active_insights)} insights")
+    async def _action_generation_phase(self, insight: MLInsight) -> List[AutomatedAction]:
+        """Phase 3: Generate actions from a new ML insight"""
+        if insight.urgency_level not in ["high", "critical"]:
+            return []
 
-        # Generate actions for each insight
-        new_actions = []
-        for insight in self.active_insights:
-            if insight.urgency_level in ["high", "critical"]:
-                actions = await self.action_generator.generate_actions_from_insight(insight)
-                new_actions.extend(actions)
+        new_actions = await self.action_generator.generate_actions_from_insight(insight)
 
-        # Add to pending actions
+        # Queue by priority and confidence
         self.pending_actions.extend(new_actions)
 
-        # Sort by priority and confidence
-        self.pending_actions.sort(
-            key=lambda x: (x.confidence, x.expected_outcome.get("impact", 0)), reverse=True
-        )
-
         self.logger.debug(
             f"🎯 Generated {len(new_actions)} new actions, {len(self.pending_actions)} total pending"
         )
+        return new_actions
 
-    async def _action_execution_phase(self):
-        """Phase 4: Execute high-priority actions"""
-        if not self.pending_actions:
-            return
-
-        # Execute top priority actions (limit concurrent executions)
-        max_concurrent = self.config.get("max_concurrent_actions", 5)
-        actions_to_execute = self.pending_actions[:max_concurrent]
-
-        self.logger.debug(
-            f"🚀 Action execution phase - executing {len(actions_to_execute)} actions"
-        )
-
-        execution_tasks = [self._execute_single_action(action) for action in actions_to_execute]
+    async def _action_execution_phase(self, _ticket: Any) -> List[AutomatedAction]:
+        """Phase 4: Execute the highest-priority pending action (one per ticket)"""
+        action = self.pending_actions.pop()
+        if action is None:
+            # Its action was cancelled (e.g. platform deactivated)
+            return []
 
-        results = await asyncio.gather(*execution_tasks, return_exceptions=True)
+        self.logger.debug(f"🚀 Action execution phase - executing {action.action_id}")
 
-        # Process execution results
-        for action, result in zip(actions_to_execute, results):
-            if isinstance(result, Exception):
-                self.logger.error(f"❌ Action execution failed: {result}")
-                action.status = "failed"
-            else:
-                action.status = "completed"
-                self.executed_actions.append(action)
+        try:
+            await self._execute_single_action(action)
+        except Exception as e:
+            self.logger.error(f"❌ Action execution failed: {e}")
+            action.status = "failed"
+            return []
 
-            # Remove from pending
-            if action in self.pending_actions:
-                self.pending_actions.remove(action)
+        action.status = "completed"
+        self.executed_actions.append(action)
+        return [action]
 
-    async def _feedback_collection_phase(self):
+    async def _feedback_collection_phase(self, executed: List[AutomatedAction]):
         """Phase 5: Collect feedback on executed actions"""
-        recent_actions = [
-            action
-            for action in self.executed_actions
-            if action.scheduled_time > datetime.now() - timedelta(hours=1)
-        ]
-
-        if not recent_actions:
-            return
+        self.logger.debug(f"📈 Feedback collection phase - {len(executed)} recent actions")
 
-        self.logger.debug(f"📈 Feedback collection phase - {len(recent_actions)} recent actions")
-
-        # Collect performance data for recent actions
-        feedback_data = []
-        for action in recent_actions:
-            feedback = await self._collect_action_feedback(action)
-            if feedback:
-                feedback_data.append(feedback)
+        # Collect performance data for executed actions
+        feedback_results = await asyncio.gather(
+            *(self._collect_action_feedback(action) for action in executed)
+        )
+        feedback_data = [feedback for feedback in feedback_results if feedback]
 
         # Send feedback to ML processor for model improvement
         if feedback_data:
             await self.cloud_processor.process_feedback(feedback_data)
 
-        # Archive old real-time data
+    def _archive_real_time_data(self):
+        """Move real-time data older than 6 hours to the historical store"""
         cutoff_time = datetime.now() - timedelta(hours=6)
-        archived_data = [data for data in self.real_time_data if data.timestamp < cutoff_time]
+        archived_data = self.real_time_data.expire_before(cutoff_time)
 
         if archived_data:
             self.historical_data.extend(archived_data)
-            self.real_time_data = [
-                data for data in self.real_time_data if data.timestamp >= cutoff_time
-            ]
 
     async def _execute_single_action(self, action: AutomatedAction):
         """Execute a single automated action on its target platform"""
@@ -548,7 +599,7 @@ class BidirectionalMLEngine:
         """Collect data for immediate analysis"""
         if focus_platforms:
             return [data for data in self.real_time_data if data.platform in focus_platforms]
-        return self.real_time_data.copy()
+        return list(self.real_time_data)
 
     async def _get_platform_health(self) -> Dict[str, Any]:
         """Get health status of all platforms"""
@@ -4,11 +4,13 @@ Advanced ML pipeline for processing social media data and generating actionable
 """
 
 import asyncio
+import copy
 import json
 import logging
 import os
 import pickle
 import time
+from collections import deque
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
@@ -27,10 +29,14 @@ except ImportError:
 import joblib
 from sklearn.cluster import KMeans
 from sklearn.ensemble import IsolationForest, RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
 from sklearn.metrics import mean_absolute_error, r2_score
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 
+from ml_core.drift_monitor import DriftMonitor
+from ml_core.training_store import TrainingDataStore
+
 # Import data structures from acquisition engine
 try:
     from .data_acquisition import CompetitorData, MetricType, SocialMetric, TrendingData
@@ -56,6 +62,30 @@ class MLModelType(Enum):
     BUDGET_OPTIMIZER = "budget_optimizer"
 
 
+# Model inputs, in column order (padded with zeros to 5 columns)
+MODEL_FEATURE_KEYS = {
+    MLModelType.ENGAGEMENT_PREDICTOR: [
+        "avg_engagement",
+        "follower_count",
+        "post_frequency",
+        "hashtag_count",
+        "time_of_day",
+    ],
+    MLModelType.VIRAL_DETECTOR: ["engagement_rate", "share_rate", "growth_velocity", "trend_alignment"],
+}
+DEFAULT_FEATURE_KEYS = [
+    "avg_engagement",
+    "engagement_trend",
+    "engagement_volatility",
+    "total_followers",
+    "follower_growth_rate",
+]
+FEATURE_VECTOR_SIZE = 5
+
+# Models that receive labelled feedback and can be updated with partial_fit
+ONLINE_MODEL_TYPES = (MLModelType.ENGAGEMENT_PREDICTOR, MLModelType.VIRAL_DETECTOR)
+
+
 class InsightType(Enum):
     ENGAGEMENT_OPPORTUNITY = "engagement_opportunity"
     VIRAL_POTENTIAL = "viral_potential"
@@ -78,6 +108,8 @@ class MLPrediction:
     prediction_interval: Tuple[float, float]
     model_version: str
     timestamp: datetime
+    platform: Optional[str] = None
+    entity_id: Optional[str] = None  # account/post the prediction is for
 
 
 @dataclass
@@ -126,15 +158,18 @@ class CloudMLProcessingPipeline:
         self.model_scalers = {}
         self.model_performance = {}
 
-        # Processing components
+        # Processing components (batch and urgent analysis keep separate
+        # aggregates, each reset per call)
         self.feature_extractor = None
+        self.quick_feature_extractor = None
         self.insight_generator = None
         self.model_trainer = None
 
-        # Data processing
-        self.processed_data_cache = {}
-        self.training_data_buffer = []
-        self.feedback_data_buffer = []
+        # Per-model scoring runs in parallel threads (sklearn/numpy release the GIL)
+        self.scoring_executor = ThreadPoolExecutor(
+            max_workers=self.config.get("scoring_workers", min(len(MLModelType), os.cpu_count() or 1)),
+            thread_name_prefix="ml-scoring",
+        )
 
         # Cloud processing settings
         self.use_cloud_ml = self.config.get("use_cloud_ml", False)
@@ -143,10 +178,41 @@ class CloudMLProcessingPipeline:
             "model_storage_path", "/workspaces/master/data/models/"
         )
 
+        # Data processing (training data is kept on disk and sampled for retraining)
+        self.processed_data_cache = {}
+        self.training_data_buffer = TrainingDataStore(
+            self.config.get(
+                "training_data_path", os.path.join(self.model_storage_path, "training_data")
+            ),
+            segment_entries=self.config.get("training_segment_entries", 10_000),
+            max_segments=self.config.get("training_max_segments", 100),
+        )
+        self.retrain_sample_size = self.config.get("retrain_sample_size", 5000)
+        self.retrain_half_life_hours = self.config.get("retrain_half_life_hours", 72)
+        self.feedback_data_buffer = []
+
+        # Online learning: drift on features, predictions or feedback errors
+        # queues a retrain of just that model (partial_fit when supported)
+        self.online_learning = self.config.get("online_learning", True)
+        self.drift_monitor = DriftMonitor(
+            threshold=self.config.get("drift_threshold", 1.0),
+            reference_size=self.config.get("drift_reference_size", 200),
+        )
+        self.retrain_queue: asyncio.Queue = asyncio.Queue()
+        self.retrain_cooldown = self.config.get("retrain_cooldown_seconds", 600)
+        self._retrain_pending = set()
+        self._last_retrained: Dict[MLModelType, float] = {}
+        # Models whose last retrain was not adopted; the monitor leaves them
+        # alone until they go stale again or drift is detected
+        self._retrain_not_adopted: set = set()
+        # (features, actual engagement) pairs from feedback, per model
+        self._labeled_feedback: Dict[MLModelType, deque] = {}
+
         # Processing state
         self.is_processing = False
         self.processing_queue = asyncio.Queue()
         self.batch_processing_interval = self.config.get("batch_interval", 300)  # 5 minutes
+        self.monitoring_interval = self.config.get("monitoring_interval", 300)
 
         # Performance tracking
         self.processing_metrics = {
@@ -166,6 +232,8 @@ class CloudMLProcessingPipeline:
         # Initialize feature extractor
         self.feature_extractor = SocialMediaFeatureExtractor()
         await self.feature_extractor.initialize()
+        self.quick_feature_extractor = SocialMediaFeatureExtractor()
+        await self.quick_feature_extractor.initialize()
 
         # Initialize insight generator
         self.insight_generator = InsightGenerationEngine()
@@ -214,6 +282,7 @@ class CloudMLProcessingPipeline:
 
         # Save current model states
         await self._save_all_models()
+        self.scoring_executor.shutdown(wait=False)
 
         self.logger.info("✅ ML processing pipeline stopped")
 
@@ -226,11 +295,13 @@ class CloudMLProcessingPipeline:
         self.logger.info(f"🧠 Processing batch of {len(social_data)} social metrics")
 
         try:
-            # Extract features from social data
+            # Extract features from this batch (totals + per account/post)
+            self.feature_extractor.reset()
             features = await self.feature_extractor.extract_features(social_data)
+            entity_features = self.feature_extractor.entity_features(social_data)
 
             # Generate predictions using all models
-            predictions = await self._generate_predictions(features, social_data)
+            predictions = await self._generate_predictions(entity_features, social_data)
 
             # Generate insights from predictions
             insights = await self.insight_generator.generate_insights(predictions, social_data)
@@ -259,7 +330,8 @@ class CloudMLProcessingPipeline:
         self.logger.info(f"🔍 Immediate analysis requested for {len(social_data)} metrics")
 
         # Use simplified, faster models for immediate analysis
-        features = await self.feature_extractor.extract_quick_features(social_data)
+        self.quick_feature_extractor.reset()
+        features = await self.quick_feature_extractor.extract_quick_features(social_data)
 
         # Generate urgent insights
         urgent_insights = []
@@ -292,7 +364,12 @@ class CloudMLProcessingPipeline:
         return urgent_insights
 
     async def process_feedback(self, feedback_data: List[Dict[str, Any]]):
-        """Process feedback data to improve model performance"""
+        """Process feedback data to improve model performance.
+
+        Entries carry ``action_type`` plus ``expected_outcome``/``actual_outcome``
+        dicts; an optional ``features`` dict (the model input the action was
+        based on) makes the entry a labelled example for incremental updates.
+        """
         if not feedback_data:
             return
 
@@ -313,18 +390,18 @@ class CloudMLProcessingPipeline:
 
     async def retrain_model(
         self, model_type: MLModelType, training_data: List[Dict[str, Any]] = None
-    ):
-        """Retrain a specific ML model"""
+    ) -> bool:
+        """Retrain a specific ML model; returns whether the new model was adopted"""
         self.logger.info(f"🔄 Retraining {model_type.value} model")
 
         if training_data is None:
-            training_data = self.training_data_buffer
+            training_data = self._sample_training_data()
 
         if len(training_data) < 50:
             self.logger.warning(
                 f"⚠️ Insufficient training data for {model_type.value}: {len(training_data)} samples"
             )
-            return
+            return False
 
         try:
             # Retrain the model
@@ -345,11 +422,14 @@ class CloudMLProcessingPipeline:
                     f"✅ Model {model_type.value} updated - Accuracy: {performance.accuracy:.3f}"
                 )
                 self.processing_metrics["models_updated"] += 1
-            else:
-                self.logger.info(f"📊 Model {model_type.value} performance did not improve")
+                return True
+
+            self.logger.info(f"📊 Model {model_type.value} performance did not improve")
+            return False
 
         except Exception as e:
             self.logger.error(f"❌ Error retraining {model_type.value}: {e}")
+            return False
 
     async def predict_engagement(
         self, platform: str, content_features: Dict[str, Any]
@@ -400,6 +480,8 @@ class CloudMLProcessingPipeline:
             "cache_size": len(self.processed_data_cache),
             "training_buffer_size": len(self.training_data_buffer),
             "feedback_buffer_size": len(self.feedback_data_buffer),
+            "drift_scores": self.drift_monitor.scores(),
+            "retrain_queue": self.retrain_queue.qsize(),
         }
 
     # Private methods for processing pipeline
@@ -435,50 +517,95 @@ class CloudMLProcessingPipeline:
                 await asyncio.sleep(60)
 
     async def _model_retraining_loop(self):
-        """Model retraining loop"""
+        """Retrain models queued by drift detection, one at a time"""
         while self.is_processing:
             try:
-                # Wait for retraining interval (daily)
-                await asyncio.sleep(86400)  # 24 hours
-
-                # Retrain models if we have enough data
-                if len(self.training_data_buffer) >= 1000:
-                    self.logger.info("🔄 Starting scheduled model retraining...")
-
-                    for model_type in MLModelType:
-                        await self.retrain_model(model_type)
-                        await asyncio.sleep(5)  # Brief pause between retraining
-
-                    # Clear old training data
-                    self.training_data_buffer = self.training_data_buffer[
-                        -5000:
-                    ]  # Keep last 5000 samples
-
-                    self.logger.info("✅ Scheduled model retraining completed")
+                try:
+                    model_type, reason = await asyncio.wait_for(self.retrain_queue.get(), timeout=5)
+                except asyncio.TimeoutError:
+                    continue
+                self._retrain_pending.discard(model_type)
+
+                self.logger.info(f"🔄 Retraining drifted model {model_type.value} ({reason})")
+                adopted = await self._retrain_drifted_model(model_type)
+                self.drift_monitor.reset(model_type)
+                # Every attempt counts for cooldown and staleness, adopted or not
+                self._last_retrained[model_type] = time.monotonic()
+                if adopted:
+                    self._retrain_not_adopted.discard(model_type)
+                else:
+                    self._retrain_not_adopted.add(model_type)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 self.logger.error(f"❌ Error in model retraining loop: {e}")
 
+    def _schedule_retrain(self, model_type: MLModelType, reason: str):
+        """Queue a targeted retrain unless one is pending or it ran recently"""
+        if model_type in self._retrain_pending:
+            return
+        last = self._last_retrained.get(model_type)
+        if last is not None and time.monotonic() - last < self.retrain_cooldown:
+            return
+        self.logger.warning(f"⚠️ Drift detected for {model_type.value}: {reason}")
+        self._retrain_pending.add(model_type)
+        self.retrain_queue.put_nowait((model_type, reason))
+
+    async def _retrain_drifted_model(self, model_type: MLModelType) -> bool:
+        """Update one model: partial_fit on labelled feedback when possible,
+        otherwise a full retrain on a sample of the training history.
+
+        Returns whether a new model was adopted.
+        """
+        model = self.ml_models.get(model_type)
+        labelled = self._labeled_feedback.pop(model_type, None)
+
+        if self.online_learning and labelled and hasattr(model, "partial_fit"):
+            X = self._prepare_feature_matrix([features for features, _ in labelled], model_type)
+            y = np.array([target for _, target in labelled], dtype=float)
+            # Update a copy so in-flight scoring never sees a half-updated model
+            updated = await asyncio.get_running_loop().run_in_executor(
+                self.scoring_executor, self._partial_fit, model_type, model, X, y
+            )
+            self.ml_models[model_type] = updated
+            if model_type in self.model_performance:
+                self.model_performance[model_type].last_trained = datetime.now()
+            self.processing_metrics["models_updated"] += 1
+            await self._save_model(model_type, updated)
+            self.logger.info(f"✅ Incrementally updated {model_type.value} on {len(y)} samples")
+            return True
+
+        training_data = await asyncio.get_running_loop().run_in_executor(
+            None, self._sample_training_data
+        )
+        return await self.retrain_model(model_type, training_data)
+
+    def _partial_fit(self, model_type: MLModelType, model, X: np.ndarray, y: np.ndarray):
+        updated = copy.deepcopy(model)
+        if model_type in self.model_scalers:
+            X = self.model_scalers[model_type].transform(X)
+        updated.partial_fit(X, y)
+        return updated
+
     async def _performance_monitoring_loop(self):
         """Performance monitoring loop"""
         while self.is_processing:
             try:
-                await asyncio.sleep(3600)  # Check every hour
+                await asyncio.sleep(self.monitoring_interval)
 
-                # Monitor model drift and performance
+                # Stale or inaccurate models are retrained like drifted ones
                 for model_type, model in self.ml_models.items():
                     if model and model_type in self.model_performance:
                         perf = self.model_performance[model_type]
 
-                        # Check if model needs retraining
-                        days_since_training = (
-                            (datetime.now() - perf.last_trained).days if perf.last_trained else 999
-                        )
+                        days_since_training = self._days_since_retrain(model_type, perf)
 
-                        if days_since_training > 7 or perf.accuracy < 0.7:
-                            self.logger.warning(f"⚠️ Model {model_type.value} may need retraining")
+                        # An unadopted retrain would just repeat on the same data
+                        if perf.accuracy < 0.7 and model_type not in self._retrain_not_adopted:
+                            self._schedule_retrain(model_type, f"accuracy {perf.accuracy:.2f}")
+                        elif days_since_training > 7:
+                            self._schedule_retrain(model_type, f"{days_since_training} days old")
 
                 # Log performance metrics
                 self.logger.info(f"📊 Processing metrics: {self.processing_metrics}")
@@ -488,24 +615,97 @@ class CloudMLProcessingPipeline:
             except Exception as e:
                 self.logger.error(f"❌ Error in performance monitoring: {e}")
 
+    def _days_since_retrain(self, model_type: MLModelType, perf: ModelPerformanceMetrics) -> int:
+        """Whole days since the model was last trained or a retrain was attempted"""
+        days = (datetime.now() - perf.last_trained).days if perf.last_trained else 999
+        last_attempt = self._last_retrained.get(model_type)
+        if last_attempt is not None:
+            days = min(days, int((time.monotonic() - last_attempt) // 86400))
+        return days
+
     async def _generate_predictions(
-        self, features: Dict[str, Any], social_data: List[SocialMetric]
+        self,
+        entity_features: Dict[Tuple[str, Optional[str]], Dict[str, Any]],
+        social_data: List[SocialMetric],
     ) -> List[MLPrediction]:
-        """Generate predictions using all available models"""
-        predictions = []
+        """Score every entity with every available model.
 
-        for model_type, model in self.ml_models.items():
-            if model:
-                try:
-                    prediction = await self._make_model_prediction(
-                        model_type, model, features, social_data
+        Each model gets one feature matrix (a row per entity) and one
+        scaler/predict call; the models run in parallel on the scoring pool.
+        """
+        models = [(model_type, model) for model_type, model in self.ml_models.items() if model]
+        if DUMMY_MODE:
+            return [await self._dummy_prediction(model_type) for model_type, _ in models]
+        if not entity_features:
+            return []
+
+        entities = list(entity_features)
+        rows = [entity_features[entity] for entity in entities]
+        matrices = [self._prepare_feature_matrix(rows, model_type) for model_type, _ in models]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(
+            *(
+                loop.run_in_executor(
+                    self.scoring_executor, self._score_matrix, model_type, model, matrix
+                )
+                for (model_type, model), matrix in zip(models, matrices)
+            ),
+            return_exceptions=True,
+        )
+
+        predictions = []
+        timestamp = datetime.now()
+        for (model_type, model), matrix, result in zip(models, matrices, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"❌ Error making prediction with {model_type.value}: {result}")
+                predictions.append(await self._dummy_prediction(model_type))
+                continue
+
+            values, confidences = result
+            feature_drift = self.drift_monitor.observe(model_type, "features", matrix)
+            prediction_drift = self.drift_monitor.observe(model_type, "predictions", values)
+            if feature_drift or prediction_drift:
+                self._schedule_retrain(
+                    model_type, "feature drift" if feature_drift else "prediction drift"
+                )
+            importance = await self._get_feature_importance(model, None)
+            for (platform, entity), value, confidence in zip(entities, values, confidences):
+                value = float(value)
+                predictions.append(
+                    MLPrediction(
+                        model_type=model_type,
+                        prediction_value=value,
+                        confidence=float(confidence),
+                        feature_importance=importance,
+                        prediction_interval=(value * 0.9, value * 1.1),
+                        model_version="1.0.0",
+                        timestamp=timestamp,
+                        platform=platform,
+                        entity_id=f"{platform}:{entity}" if entity else platform,
                     )
-                    predictions.append(prediction)
-                except Exception as e:
-                    self.logger.error(f"❌ Error making prediction with {model_type.value}: {e}")
+                )
 
         return predictions
 
+    def _score_matrix(
+        self, model_type: MLModelType, model, matrix: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Scale and score a feature matrix; returns (values, confidences)"""
+        if model_type in self.model_scalers:
+            matrix = self.model_scalers[model_type].transform(matrix)
+
+        if hasattr(model, "predict_proba"):
+            values = np.asarray(model.predict_proba(matrix), dtype=float).max(axis=1)
+            return values, values
+
+        values = np.asarray(model.predict(matrix), dtype=float)
+        if hasattr(model, "decision_function"):
+            decision = np.asarray(model.decision_function(matrix), dtype=float)
+            confidences = np.minimum(np.abs(decision) / 2.0, 1.0)
+        else:
+            confidences = np.full(len(values), 0.8)
+        return values, confidences
+
     async def _make_model_prediction(
         self,
         model_type: MLModelType,
@@ -628,6 +828,10 @@ class CloudMLProcessingPipeline:
 
     async def _initialize_new_model(self, model_type: MLModelType):
         """Initialize a new ML model"""
+        if self.online_learning and model_type in ONLINE_MODEL_TYPES:
+            # Supports partial_fit; every other model keeps its batch estimator
+            return SGDRegressor(random_state=42)
+
         if model_type == MLModelType.ENGAGEMENT_PREDICTOR:
             return RandomForestRegressor(n_estimators=100, random_state=42)
         elif model_type == MLModelType.VIRAL_DETECTOR:
@@ -669,40 +873,28 @@ class CloudMLProcessingPipeline:
         self, features: Dict[str, Any], model_type: MLModelType
     ) -> np.ndarray:
         """Prepare feature vector for specific model type"""
-        # Extract relevant features based on model type
-        if model_type == MLModelType.ENGAGEMENT_PREDICTOR:
-            feature_keys = [
-                "avg_engagement",
-                "follower_count",
-                "post_frequency",
-                "hashtag_count",
-                "time_of_day",
-            ]
-        elif model_type == MLModelType.VIRAL_DETECTOR:
-            feature_keys = ["engagement_rate", "share_rate", "growth_velocity", "trend_alignment"]
-        else:
-            feature_keys = list(features.keys())[:5]  # Default to first 5 features
-
-        # Extract values and handle missing features
-        feature_vector = []
-        for key in feature_keys:
-            value = features.get(key, 0.0)
-            if isinstance(value, (int, float)):
-                feature_vector.append(float(value))
-            else:
-                feature_vector.append(0.0)
-
-        # Ensure consistent feature vector size
-        while len(feature_vector) < 5:
-            feature_vector.append(0.0)
-
-        vector = np.array(feature_vector[:5])  # Limit to 5 features
+        vector = self._prepare_feature_matrix([features], model_type)
 
         # Apply scaling if available
         if model_type in self.model_scalers:
-            vector = self.model_scalers[model_type].transform([vector])[0]
+            vector = self.model_scalers[model_type].transform(vector)
+
+        return vector[0]
 
-        return vector
+    def _prepare_feature_matrix(
+        self, rows: List[Dict[str, Any]], model_type: MLModelType
+    ) -> np.ndarray:
+        """Unscaled feature matrix for a model type, one row per feature dict"""
+        feature_keys = MODEL_FEATURE_KEYS.get(model_type, DEFAULT_FEATURE_KEYS)
+        matrix = np.zeros((len(rows), FEATURE_VECTOR_SIZE))
+
+        # Non-numeric and missing features stay 0.0
+        for column, key in enumerate(feature_keys[:FEATURE_VECTOR_SIZE]):
+            matrix[:, column] = [
+                value if isinstance(value, (int, float)) else 0.0
+                for value in (row.get(key, 0.0) for row in rows)
+            ]
+        return matrix
 
     async def _calculate_prediction_confidence(self, model, feature_vector: np.ndarray) -> float:
         """Calculate prediction confidence"""
@@ -819,11 +1011,28 @@ class CloudMLProcessingPipeline:
         # Update model performance metrics based on feedback
         for model_type, feedbacks in model_feedback.items():
             await self._update_model_performance_from_feedback(model_type, feedbacks)
+            self._observe_feedback_drift(model_type, feedbacks)
 
         # Clear processed feedback
         self.feedback_data_buffer.clear()
         self.logger.info("✅ Feedback batch processed")
 
+    def _observe_feedback_drift(self, model_type: MLModelType, feedbacks: List[Dict[str, Any]]):
+        """Track prediction errors for drift; keep labelled rows for partial_fit"""
+        errors = []
+        labelled = self._labeled_feedback.setdefault(model_type, deque(maxlen=5000))
+        for feedback in feedbacks:
+            expected = feedback.get("expected_outcome") or {}
+            actual = feedback.get("actual_outcome") or {}
+            if "engagement_increase" not in actual:
+                continue
+            errors.append(actual["engagement_increase"] - expected.get("engagement_increase", 0))
+            if feedback.get("features"):
+                labelled.append((feedback["features"], actual["engagement_increase"]))
+
+        if errors and self.drift_monitor.observe(model_type, "errors", np.array(errors)):
+            self._schedule_retrain(model_type, "feedback error drift")
+
     async def _update_model_performance_from_feedback(
         self, model_type: MLModelType, feedbacks: List[Dict[str, Any]]
     ):
@@ -872,11 +1081,19 @@ class CloudMLProcessingPipeline:
             "predictions": [asdict(pred) for pred in predictions],
         }
 
-        self.training_data_buffer.append(training_entry)
+        try:
+            # Serialization and fsync stay off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.training_data_buffer.append, training_entry
+            )
+        except OSError as e:
+            self.logger.error(f"❌ Error caching training data: {e}")
 
-        # Keep buffer size manageable
-        if len(self.training_data_buffer) > 10000:
-            self.training_data_buffer = self.training_data_buffer[-8000:]  # Keep last 8000
+    def _sample_training_data(self) -> List[Dict[str, Any]]:
+        """Retrain set drawn from the on-disk training history"""
+        return self.training_data_buffer.sample(
+            self.retrain_sample_size, half_life_hours=self.retrain_half_life_hours
+        )
 
     async def _update_processing_metrics(self, processing_time: float, insights_count: int):
         """Update processing performance metrics"""
@@ -921,98 +1138,163 @@ class CloudMLProcessingPipeline:
 # Supporting classes
 
 
+class RunningStats:
+    """Count, sum, mean and variance of a stream (Welford), O(1) per value"""
+
+    __slots__ = ("count", "total", "mean", "_m2")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def std(self) -> float:
+        """Population standard deviation (same as ``np.std``)"""
+        return (self._m2 / self.count) ** 0.5 if self.count else 0.0
+
+
 class SocialMediaFeatureExtractor:
-    """Extracts ML features from social media data"""
+    """Extracts ML features from social media data.
+
+    Metrics are folded into running aggregates per platform and metric type
+    as they arrive, so a feature snapshot costs the same no matter how much
+    data has been seen. ``reset`` starts a new window.
+    """
+
+    def __init__(self):
+        self.reset()
 
     async def initialize(self):
         pass
 
-    async def extract_features(self, social_data: List[SocialMetric]) -> Dict[str, Any]:
-        """Extract comprehensive features from social media data"""
-        if not social_data:
-            return {}
-
-        # Group data by platform and metric type
-        platform_data = {}
+    def reset(self):
+        """Drop all aggregates"""
+        # metric type -> (value stats, change_percentage stats)
+        self._by_type: Dict[MetricType, Tuple[RunningStats, RunningStats]] = {}
+        # platform -> metric type value -> value stats
+        self._by_platform: Dict[str, Dict[str, RunningStats]] = {}
+        self._latest_time: Optional[datetime] = None
+        self._max_change = 0.0
+        self._data_points = 0
+
+    def update(self, social_data: List[SocialMetric]):
+        """Fold new metrics into the running aggregates"""
         for metric in social_data:
-            platform = metric.platform
-            if platform not in platform_data:
-                platform_data[platform] = {}
+            stats = self._by_type.get(metric.metric_type)
+            if stats is None:
+                stats = self._by_type[metric.metric_type] = (RunningStats(), RunningStats())
+            stats[0].add(metric.value)
+            stats[1].add(metric.change_percentage)
 
+            platform_stats = self._by_platform.setdefault(metric.platform, {})
             metric_type = metric.metric_type.value
-            if metric_type not in platform_data[platform]:
-                platform_data[platform][metric_type] = []
+            if metric_type not in platform_stats:
+                platform_stats[metric_type] = RunningStats()
+            platform_stats[metric_type].add(metric.value)
 
-            platform_data[platform][metric_type].append(metric)
+            if self._latest_time is None or metric.timestamp > self._latest_time:
+                self._latest_time = metric.timestamp
+            self._max_change = max(self._max_change, abs(metric.change_percentage))
+            self._data_points += 1
+
+    async def extract_features(self, social_data: List[SocialMetric]) -> Dict[str, Any]:
+        """Add ``social_data`` and return the comprehensive feature snapshot"""
+        self.update(social_data)
+        return self.snapshot()
+
+    def entity_features(
+        self, social_data: List[SocialMetric]
+    ) -> Dict[Tuple[str, Optional[str]], Dict[str, Any]]:
+        """Feature snapshot per (platform, account/post) in ``social_data``.
+
+        The entity comes from ``context["post_id"]`` or
+        ``context["account_id"]``; metrics without one are grouped per
+        platform. Does not touch the running aggregates.
+        """
+        extractors: Dict[Tuple[str, Optional[str]], SocialMediaFeatureExtractor] = {}
+        for metric in social_data:
+            context = metric.context or {}
+            key = (metric.platform, context.get("post_id") or context.get("account_id"))
+            if key not in extractors:
+                extractors[key] = SocialMediaFeatureExtractor()
+            extractors[key].update([metric])
+        return {key: extractor.snapshot() for key, extractor in extractors.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Features over everything added since the last reset"""
+        if not self._data_points:
+            return {}
 
-        # Extract features
         features = {}
 
         # Engagement features
-        all_engagement = [m for m in social_data if m.metric_type == MetricType.ENGAGEMENT]
-        if all_engagement:
-            features["avg_engagement"] = np.mean([m.value for m in all_engagement])
-            features["engagement_trend"] = np.mean([m.change_percentage for m in all_engagement])
-            features["engagement_volatility"] = np.std([m.value for m in all_engagement])
+        engagement = self._by_type.get(MetricType.ENGAGEMENT)
+        if engagement:
+            values, changes = engagement
+            features["avg_engagement"] = values.mean
+            features["engagement_trend"] = changes.mean
+            features["engagement_volatility"] = values.std
 
         # Follower features
-        all_followers = [m for m in social_data if m.metric_type == MetricType.FOLLOWERS]
-        if all_followers:
-            features["total_followers"] = np.sum([m.value for m in all_followers])
-            features["follower_growth_rate"] = np.mean([m.change_percentage for m in all_followers])
+        followers = self._by_type.get(MetricType.FOLLOWERS)
+        if followers:
+            values, changes = followers
+            features["total_followers"] = values.total
+            features["follower_growth_rate"] = changes.mean
 
         # Platform diversity
-        features["platform_count"] = len(platform_data)
+        features["platform_count"] = len(self._by_platform)
         features["cross_platform_correlation"] = self._calculate_cross_platform_correlation(
-            platform_data
+            self._by_platform
         )
 
         # Temporal features
-        if social_data:
-            latest_time = max(m.timestamp for m in social_data)
-            features["time_of_day"] = latest_time.hour
-            features["day_of_week"] = latest_time.weekday()
-            features["data_freshness"] = (datetime.now() - latest_time).total_seconds() / 3600
+        features["time_of_day"] = self._latest_time.hour
+        features["day_of_week"] = self._latest_time.weekday()
+        features["data_freshness"] = (datetime.now() - self._latest_time).total_seconds() / 3600
 
         # Content velocity features
-        features["posting_frequency"] = len(social_data) / max(1, features.get("data_freshness", 1))
+        features["posting_frequency"] = self._data_points / max(1, features["data_freshness"])
 
         return features
 
     async def extract_quick_features(self, social_data: List[SocialMetric]) -> Dict[str, Any]:
-        """Extract minimal features for quick processing"""
-        if not social_data:
+        """Add ``social_data`` and return the minimal feature snapshot"""
+        self.update(social_data)
+        if not self._data_points:
             return {}
 
+        engagement = self._by_type.get(MetricType.ENGAGEMENT)
         return {
-            "avg_engagement": np.mean(
-                [m.value for m in social_data if m.metric_type == MetricType.ENGAGEMENT] or [0]
-            ),
-            "max_change": max([abs(m.change_percentage) for m in social_data] or [0]),
-            "platform_count": len(set(m.platform for m in social_data)),
-            "data_points": len(social_data),
+            "avg_engagement": engagement[0].mean if engagement else 0.0,
+            "max_change": self._max_change,
+            "platform_count": len(self._by_platform),
+            "data_points": self._data_points,
             "time_of_day": datetime.now().hour,
         }
 
-    def _calculate_cross_platform_correlation(self, platform_data: Dict[str, Dict]) -> float:
-        """Calculate correlation between platform metrics"""
-        # Simplified correlation calculation
-        if len(platform_data) < 2:
-            return 0.0
-
-        # Extract engagement rates for correlation
-        platform_engagements = {}
-        for platform, metrics in platform_data.items():
-            if "engagement" in metrics and metrics["engagement"]:
-                avg_engagement = np.mean([m.value for m in metrics["engagement"]])
-                platform_engagements[platform] = avg_engagement
-
+    def _calculate_cross_platform_correlation(
+        self, platform_stats: Dict[str, Dict[str, RunningStats]]
+    ) -> float:
+        """Calculate agreement between platform engagement levels"""
+        # Simplified measure: ratio of the first two platforms' mean engagement
+        platform_engagements = [
+            stats["engagement"].mean for stats in platform_stats.values() if "engagement" in stats
+        ]
         if len(platform_engagements) < 2:
             return 0.0
 
-        # Calculate simple correlation measure
-        values = list(platform_engagements.values())
-        return abs(np.corrcoef(values[:2])[0, 1]) if len(values) >= 2 else 0.0
+        low, high = sorted(abs(value) for value in platform_engagements[:2])
+        return low / high if high else 0.0
 
 
 class InsightGenerationEngine:
@@ -1039,12 +1321,16 @@ class InsightGenerationEngine:
         self, prediction: MLPrediction, social_data: List[SocialMetric]
     ) -> Optional[MLInsight]:
         """Create specific insight from ML prediction"""
-        platforms = list(set(m.platform for m in social_data))
+        if prediction.platform:
+            platforms = [prediction.platform]
+        else:
+            platforms = list(set(m.platform for m in social_data))
+        suffix = f"_{prediction.entity_id}" if prediction.entity_id else ""
 
         if prediction.model_type == MLModelType.ENGAGEMENT_PREDICTOR:
             if prediction.prediction_value > 6.0:  # High engagement predicted
                 return MLInsight(
-                    insight_id=f"engagement_{int(time.time())}",
+                    insight_id=f"engagement_{int(time.time())}{suffix}",
                     insight_type=InsightType.ENGAGEMENT_OPPORTUNITY,
                     platforms_affected=platforms,
                     confidence=prediction.confidence,
@@ -1065,7 +1351,7 @@ class InsightGenerationEngine:
         elif prediction.model_type == MLModelType.VIRAL_DETECTOR:
             if prediction.prediction_value > 0.8:  # High viral potential
                 return MLInsight(
-                    insight_id=f"viral_{int(time.time())}",
+                    insight_id=f"viral_{int(time.time())}{suffix}",
                     insight_type=InsightType.VIRAL_POTENTIAL,
                     platforms_affected=platforms,
                     confidence=prediction.confidence,
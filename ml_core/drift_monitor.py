@@ -0,0 +1,96 @@
+"""
+Drift Monitor - streaming drift detection for CloudMLProcessingPipeline
+
+Each model type gets one detector per stream (the feature rows it scores,
+the predictions it makes and the errors reported back as feedback). A
+detector learns a reference mean/std from the first rows it sees, then
+tracks an exponentially weighted mean of new batches; the drift score is
+the largest shift of that mean in reference standard deviations.
+"""
+
+from typing import Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+
+class ShiftDetector:
+    """Mean shift of a (rows x columns) stream against a reference window"""
+
+    def __init__(self, reference_size: int = 200, alpha: float = 0.1):
+        self.reference_size = reference_size
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self._count = 0
+        self._sum: Optional[np.ndarray] = None
+        self._sum_sq: Optional[np.ndarray] = None
+        self._mean: Optional[np.ndarray] = None
+        self._std: Optional[np.ndarray] = None
+        self._recent: Optional[np.ndarray] = None
+        self.score = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self._mean is not None
+
+    def update(self, rows: np.ndarray) -> float:
+        """Add a batch; returns the drift score (0.0 until the reference is built)"""
+        rows = np.asarray(rows, dtype=float)
+        if rows.ndim == 1:
+            rows = rows.reshape(-1, 1)
+        if not len(rows):
+            return self.score
+
+        if self._mean is None:
+            if self._sum is None:
+                self._sum = np.zeros(rows.shape[1])
+                self._sum_sq = np.zeros(rows.shape[1])
+            self._count += len(rows)
+            self._sum += rows.sum(axis=0)
+            self._sum_sq += (rows ** 2).sum(axis=0)
+            if self._count >= self.reference_size:
+                self._mean = self._sum / self._count
+                variance = np.maximum(self._sum_sq / self._count - self._mean ** 2, 0.0)
+                # Constant columns: treat a shift of 1% of the level (or 1e-6) as one std
+                self._std = np.where(
+                    variance > 0, np.sqrt(variance), np.maximum(np.abs(self._mean) * 0.01, 1e-6)
+                )
+                self._recent = self._mean.copy()
+            return self.score
+
+        self._recent = (1 - self.alpha) * self._recent + self.alpha * rows.mean(axis=0)
+        self.score = float(np.max(np.abs(self._recent - self._mean) / self._std))
+        return self.score
+
+
+class DriftMonitor:
+    """Shift detectors per (key, stream); ``observe`` reports threshold crossings"""
+
+    def __init__(self, threshold: float = 1.0, reference_size: int = 200, alpha: float = 0.1):
+        self.threshold = threshold
+        self.reference_size = reference_size
+        self.alpha = alpha
+        self._detectors: Dict[Tuple[Hashable, str], ShiftDetector] = {}
+
+    def observe(self, key: Hashable, stream: str, rows: np.ndarray) -> bool:
+        """Feed a batch; True if this stream of ``key`` has drifted"""
+        detector = self._detectors.get((key, stream))
+        if detector is None:
+            detector = ShiftDetector(self.reference_size, self.alpha)
+            self._detectors[(key, stream)] = detector
+        return detector.update(rows) > self.threshold
+
+    def reset(self, key: Hashable):
+        """Forget all references of ``key`` (after it was retrained)"""
+        for (detector_key, _), detector in self._detectors.items():
+            if detector_key == key:
+                detector.reset()
+
+    def scores(self) -> Dict[str, Dict[str, float]]:
+        result: Dict[str, Dict[str, float]] = {}
+        for (key, stream), detector in self._detectors.items():
+            if detector.ready:
+                name = getattr(key, "value", str(key))
+                result.setdefault(name, {})[stream] = detector.score
+        return result
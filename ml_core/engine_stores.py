@@ -0,0 +1,217 @@
+"""
+Engine Stores - bounded, time-indexed storage for BidirectionalMLEngine
+
+- TimeBucketedStore: real-time data points in fixed-width time buckets,
+  with sequence watermarks so consumers read each point exactly once and
+  whole buckets expire in O(1).
+- PendingActionQueue: priority heap for actions awaiting execution, with
+  lazy removal instead of O(n) ``list.remove``.
+- SpillingHistoryStore: historical tier with an in-memory cap; the oldest
+  points are appended to JSON-lines segments on disk.
+"""
+
+import heapq
+import itertools
+import json
+import os
+from collections import deque
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+class TimeBucketedStore:
+    """Data points grouped into ``bucket_seconds`` buckets, oldest first.
+
+    Every appended point gets a monotonically increasing sequence number;
+    ``since(watermark)`` returns the points appended after a watermark
+    together with the new watermark. ``max_points`` caps memory: when it
+    is exceeded the oldest buckets are evicted and returned like expired
+    ones.
+    """
+
+    def __init__(
+        self,
+        bucket_seconds: int = 60,
+        max_points: int = 100_000,
+        timestamp: Callable[[Any], datetime] = lambda point: point.timestamp,
+    ):
+        self.bucket_seconds = bucket_seconds
+        self.max_points = max_points
+        self._timestamp = timestamp
+        # (bucket_start, [(seq, point), ...]) in bucket order
+        self._buckets: Deque[Tuple[int, List[Tuple[int, Any]]]] = deque()
+        self._size = 0
+        self._seq = 0
+        self._overflow: List[Any] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        for _, entries in self._buckets:
+            for _, point in entries:
+                yield point
+
+    @property
+    def watermark(self) -> int:
+        """Sequence number of the latest appended point"""
+        return self._seq
+
+    def extend(self, points: List[Any]):
+        for point in points:
+            self.append(point)
+
+    def append(self, point: Any):
+        self._seq += 1
+        key = int(self._timestamp(point).timestamp()) // self.bucket_seconds
+        entry = (self._seq, point)
+
+        if not self._buckets or key > self._buckets[-1][0]:
+            self._buckets.append((key, [entry]))
+        else:
+            # Late point: walk back to its bucket (usually the last one)
+            for index in range(len(self._buckets) - 1, -1, -1):
+                bucket_key, entries = self._buckets[index]
+                if bucket_key == key:
+                    entries.append(entry)
+                    break
+                if bucket_key < key:
+                    self._buckets.insert(index + 1, (key, [entry]))
+                    break
+            else:
+                self._buckets.appendleft((key, [entry]))
+        self._size += 1
+
+        while self._size > self.max_points and len(self._buckets) > 1:
+            self._overflow.extend(self._pop_oldest())
+
+    def since(self, watermark: int) -> Tuple[List[Any], int]:
+        """Points appended after ``watermark`` and the current watermark.
+
+        Buckets whose newest sequence number is at or below the watermark
+        are skipped without looking at their points.
+        """
+        points = []
+        for _, entries in self._buckets:
+            if entries[-1][0] > watermark:
+                points.extend(point for seq, point in entries if seq > watermark)
+        return points, self._seq
+
+    def expire_before(self, cutoff: datetime) -> List[Any]:
+        """Remove and return points in buckets that end before ``cutoff``,
+        plus any points evicted for exceeding ``max_points``"""
+        cutoff_key = int(cutoff.timestamp()) // self.bucket_seconds
+        expired, self._overflow = self._overflow, []
+        while self._buckets and self._buckets[0][0] < cutoff_key:
+            expired.extend(self._pop_oldest())
+        return expired
+
+    def _pop_oldest(self) -> List[Any]:
+        _, entries = self._buckets.popleft()
+        self._size -= len(entries)
+        return [point for _, point in entries]
+
+
+class PendingActionQueue:
+    """Max-priority heap of pending actions keyed on ``priority(action)``"""
+
+    def __init__(self, priority: Callable[[Any], Tuple]):
+        self._priority = priority
+        self._heap: List[Tuple[Tuple, int, Any]] = []
+        self._removed: set = set()
+        self._counter = itertools.count()
+        self._live = 0
+
+    def __len__(self) -> int:
+        return self._live
+
+    def __iter__(self) -> Iterator[Any]:
+        return (action for _, seq, action in self._heap if seq not in self._removed)
+
+    def push(self, action: Any):
+        priority = tuple(-value for value in self._priority(action))
+        heapq.heappush(self._heap, (priority, next(self._counter), action))
+        self._live += 1
+
+    def extend(self, actions: List[Any]):
+        for action in actions:
+            self.push(action)
+
+    def pop(self) -> Optional[Any]:
+        """Highest-priority action, or None when empty"""
+        while self._heap:
+            _, seq, action = heapq.heappop(self._heap)
+            if seq in self._removed:
+                self._removed.discard(seq)
+                continue
+            self._live -= 1
+            return action
+        return None
+
+    def remove_where(self, predicate: Callable[[Any], bool]) -> List[Any]:
+        """Lazily drop matching actions; returns them"""
+        removed = []
+        for _, seq, action in self._heap:
+            if seq not in self._removed and predicate(action):
+                self._removed.add(seq)
+                removed.append(action)
+        self._live -= len(removed)
+        return removed
+
+
+class SpillingHistoryStore:
+    """Historical data points capped at ``max_in_memory``.
+
+    Overflow is appended, oldest first, to ``history-<n>.jsonl`` segments
+    in ``spill_dir`` (``segment_points`` points each).
+    """
+
+    def __init__(self, spill_dir: str, max_in_memory: int = 50_000, segment_points: int = 10_000):
+        self.spill_dir = spill_dir
+        self.max_in_memory = max_in_memory
+        self.segment_points = segment_points
+        self._memory: Deque[Any] = deque()
+        self.spilled_points = 0
+        self._segment_index = 0
+        self._segment_fill = 0
+
+    def __len__(self) -> int:
+        return len(self._memory) + self.spilled_points
+
+    def extend(self, points: List[Any]):
+        self._memory.extend(points)
+        overflow = len(self._memory) - self.max_in_memory
+        if overflow > 0:
+            self._spill([self._memory.popleft() for _ in range(overflow)])
+
+    def recent(self, limit: int = 1000) -> List[Any]:
+        return list(itertools.islice(reversed(self._memory), limit))[::-1]
+
+    def iter_spilled(self) -> Iterator[Dict[str, Any]]:
+        """Spilled points as dicts, oldest first"""
+        for index in range(self._segment_index + 1):
+            path = self._segment_path(index)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def _spill(self, points: List[Any]):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        while points:
+            room = self.segment_points - self._segment_fill
+            chunk, points = points[:room], points[room:]
+            with open(self._segment_path(self._segment_index), "a", encoding="utf-8") as f:
+                for point in chunk:
+                    record = asdict(point) if is_dataclass(point) else point
+                    f.write(json.dumps(record, default=str) + "\n")
+            self._segment_fill += len(chunk)
+            self.spilled_points += len(chunk)
+            if self._segment_fill >= self.segment_points:
+                self._segment_index += 1
+                self._segment_fill = 0
+
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.spill_dir, f"history-{index:06d}.jsonl")
@@ -0,0 +1,123 @@
+"""
+Feature Columns - columnar ML feature pipeline for MetaMLSystem
+
+Meta Ads performance rows are converted once into NumPy columns and joined
+against the YouTube/Spotify audience indexes with vectorized lookups. The
+builder keeps the accumulated columns, so new performance rows only cost
+their own join instead of rebuilding the feature frame from scratch.
+"""
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from ml_core.audience_join import PlatformIndex, audience_aggregates
+
+# Per-group YouTube/Spotify aggregates produced by the audience join
+AGGREGATE_FEATURES = (
+    "youtube_avg_retention", "youtube_avg_watch_time", "youtube_engagement_rate",
+    "spotify_avg_listening", "spotify_save_rate", "spotify_repeat_rate",
+)
+
+# Column order of the training frame (the models are fitted on this order)
+FEATURE_COLUMNS = (
+    "country", "age_numeric", "gender_encoded", "device_mobile",
+    "meta_ctr", "meta_retention", "meta_conversions", "meta_cost_per_conv",
+    "meta_engagement", "meta_landing_time",
+    *AGGREGATE_FEATURES,
+    "cross_platform_score", "roi",
+)
+
+_META_FIELDS = attrgetter(
+    "country", "age_range", "gender", "device_type", "ctr", "retention_rate",
+    "conversions", "cost_per_conversion", "engagement_rate", "landing_page_time",
+)
+
+
+def meta_columns(meta_data: Sequence[Any], parse_age: Callable[[str], int]) -> Dict[str, np.ndarray]:
+    """Convert ``MetaAdsPerformance`` rows into feature columns (one pass)"""
+    if not meta_data:
+        rows: List[tuple] = [()] * 10
+    else:
+        rows = list(zip(*map(_META_FIELDS, meta_data)))
+    (country, age_range, gender, device, ctr, retention,
+     conversions, cost, engagement, landing_time) = rows
+
+    conversions = np.asarray(conversions, dtype=np.int64)
+    cost = np.asarray(cost, dtype=np.float64)
+    return {
+        "country": np.asarray(country, dtype=object),
+        "age_numeric": np.fromiter(map(parse_age, age_range), dtype=np.int64, count=len(age_range)),
+        "gender_encoded": (np.asarray(gender, dtype=object) == "female").astype(np.int64),
+        "device_mobile": (np.asarray(device, dtype=object) == "mobile").astype(np.int64),
+        "meta_ctr": np.asarray(ctr, dtype=np.float64),
+        "meta_retention": np.asarray(retention, dtype=np.float64),
+        "meta_conversions": conversions,
+        "meta_cost_per_conv": cost,
+        "meta_engagement": np.asarray(engagement, dtype=np.float64),
+        "meta_landing_time": np.asarray(landing_time, dtype=np.int64),
+        "roi": conversions / np.maximum(cost * conversions, 1),
+    }
+
+
+def feature_frame(columns: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Training frame in ``FEATURE_COLUMNS`` order, highest cross-platform score first"""
+    order = np.argsort(-np.asarray(columns["cross_platform_score"]), kind="stable")
+    return pd.DataFrame({name: np.asarray(columns[name])[order] for name in FEATURE_COLUMNS})
+
+
+class ColumnarFeatureBuilder:
+    """Accumulates Meta Ads performance as feature columns.
+
+    ``add_performance`` joins a batch against the audience indexes and
+    appends the matched rows; ``features`` returns the frame over
+    everything added so far. Accumulated chunks are merged lazily, once per
+    ``features`` call after new data.
+    """
+
+    def __init__(
+        self,
+        youtube: PlatformIndex,
+        spotify: PlatformIndex,
+        parse_age: Callable[[str], int],
+    ) -> None:
+        self.youtube = youtube
+        self.spotify = spotify
+        self.parse_age = parse_age
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._frame: Optional[pd.DataFrame] = None
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def add_performance(self, meta_data: Sequence[Any]) -> Dict[str, np.ndarray]:
+        """Join a batch of Meta rows; returns the raw matches (aligned with the batch)"""
+        columns = meta_columns(meta_data, self.parse_age)
+        matches = audience_aggregates(
+            self.youtube, self.spotify, columns["country"], columns["age_numeric"]
+        )
+
+        keep = matches["cross_platform_score"] > 0
+        chunk = {name: values[keep] for name, values in columns.items()}
+        for name in (*AGGREGATE_FEATURES, "cross_platform_score"):
+            chunk[name] = matches[name][keep]
+
+        if keep.any():
+            self._chunks.append(chunk)
+            self._rows += int(keep.sum())
+            self._frame = None
+        return matches
+
+    def features(self) -> pd.DataFrame:
+        if self._frame is None:
+            if not self._chunks:
+                return pd.DataFrame(columns=list(FEATURE_COLUMNS))
+            if len(self._chunks) > 1:
+                self._chunks = [
+                    {name: np.concatenate([c[name] for c in self._chunks]) for name in self._chunks[0]}
+                ]
+            self._frame = feature_frame(self._chunks[0])
+        return self._frame
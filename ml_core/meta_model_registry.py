@@ -0,0 +1,218 @@
+"""
+Meta Model Registry - off-loop training and versioned hot-swap for MetaMLSystem
+
+``fit_meta_models`` is a plain top-level function so it can run in a worker
+process. ``MetaModelRegistry`` writes every trained set as versioned
+artifacts next to the current ``roi_model.pkl``/``segment_model.pkl``/
+``scaler.pkl`` (temp file + ``os.replace``, so readers never see a partial
+pickle), keeps a JSON manifest with per-version metrics, and hands out the
+active model set as one immutable snapshot that can be swapped atomically.
+"""
+
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestClassifier
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+ARTIFACTS = {
+    "roi_predictor": "roi_model",
+    "segment_classifier": "segment_model",
+    "feature_scaler": "scaler",
+}
+MANIFEST = "versions.json"
+
+logger = logging.getLogger(__name__)
+
+# A new version may score at most this much R² below the active one
+MAX_ROI_SCORE_REGRESSION = 0.05
+
+
+def fit_meta_models(features_df: pd.DataFrame, n_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """Fit scaler, ROI regressor and segment classifier on a feature frame.
+
+    Runs in a worker process; returns the fitted objects, hold-out scores,
+    the hold-out split itself (so other versions can be scored on the same
+    rows) and the fit wall time.
+    """
+    started = time.perf_counter()
+
+    feature_columns = [col for col in features_df.columns if col not in ["roi", "country"]]
+    X = features_df[feature_columns]
+    y = features_df["roi"]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+
+    scaler = StandardScaler()
+    X_train_scaled = scaler.fit_transform(X_train)
+    X_test_scaled = scaler.transform(X_test)
+
+    roi_model = GradientBoostingRegressor(n_estimators=100, random_state=42)
+    roi_model.fit(X_train_scaled, y_train)
+
+    # High/low ROI labels around the median
+    roi_threshold = np.median(y)
+    segment_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=n_jobs)
+    segment_model.fit(X_train_scaled, (y_train > roi_threshold).astype(int))
+
+    return {
+        "models": {
+            "roi_predictor": roi_model,
+            "segment_classifier": segment_model,
+            "feature_scaler": scaler,
+        },
+        "roi_score": float(roi_model.score(X_test_scaled, y_test)),
+        "segment_score": float(segment_model.score(X_test_scaled, (y_test > roi_threshold).astype(int))),
+        "features_used": feature_columns,
+        "holdout": {"X": X_test, "y": y_test},
+        "samples_trained": len(X_train),
+        "training_seconds": time.perf_counter() - started,
+    }
+
+
+@dataclass(frozen=True)
+class ModelSet:
+    """One trained version; replaced as a whole, never mutated"""
+
+    version: int
+    models: Dict[str, Any]
+    metrics: Dict[str, Any] = field(default_factory=dict)
+
+
+class MetaModelRegistry:
+    """Versioned model artifacts plus the active ``ModelSet``"""
+
+    def __init__(self, model_path: str) -> None:
+        self.model_path = model_path
+        self.active: Optional[ModelSet] = None
+        self.versions: Dict[int, Dict[str, Any]] = {}
+        self._latency: Dict[int, List[float]] = {}
+        os.makedirs(model_path, exist_ok=True)
+        self._load_manifest()
+
+    def validate(self, result: Dict[str, Any]) -> Optional[str]:
+        """Reason to reject a training result, or None if it may go live"""
+        for metric in ("roi_score", "segment_score"):
+            if not math.isfinite(result[metric]):
+                return f"{metric} is not finite"
+        if self.active is not None:
+            # Stored scores come from each version's own split; compare on this one
+            current = self._active_roi_score(result.get("holdout"))
+            if current is not None and result["roi_score"] < current - MAX_ROI_SCORE_REGRESSION:
+                return f"roi_score {result['roi_score']:.3f} below active {current:.3f}"
+        return None
+
+    def _active_roi_score(self, holdout: Optional[Dict[str, Any]]) -> Optional[float]:
+        """R² of the active ROI model on a candidate's hold-out rows.
+
+        None when there is nothing comparable: no hold-out, or the active
+        version was trained on different feature columns.
+        """
+        if holdout is None:
+            return None
+        scaler = self.active.models["feature_scaler"]
+        X = holdout["X"]
+        if list(getattr(scaler, "feature_names_in_", [])) != list(X.columns):
+            return None
+        try:
+            score = float(self.active.models["roi_predictor"].score(scaler.transform(X), holdout["y"]))
+        except Exception as e:
+            logger.warning(f"Could not score active version {self.active.version}: {e}")
+            return None
+        return score if math.isfinite(score) else None
+
+    def publish(self, result: Dict[str, Any]) -> ModelSet:
+        """Persist a validated result as the next version and make it active"""
+        version = max(self.versions, default=0) + 1
+        for key, stem in ARTIFACTS.items():
+            versioned = os.path.join(self.model_path, f"{stem}.v{version}.pkl")
+            self._atomic_dump(result["models"][key], versioned)
+            # The unversioned file always holds the active version
+            self._atomic_dump(result["models"][key], os.path.join(self.model_path, f"{stem}.pkl"))
+
+        metrics = {
+            name: result[name]
+            for name in ("roi_score", "segment_score", "samples_trained", "training_seconds")
+        }
+        metrics["created_at"] = datetime.now().isoformat()
+        self.versions[version] = metrics
+        self._write_manifest(active=version)
+
+        self.active = ModelSet(version=version, models=dict(result["models"]), metrics=metrics)
+        return self.active
+
+    def record_prediction(self, version: int, seconds: float) -> None:
+        samples = self._latency.setdefault(version, [])
+        samples.append(seconds)
+        if len(samples) > 1000:
+            del samples[:500]
+
+    def get_versions(self) -> List[Dict[str, Any]]:
+        """Per-version metrics with prediction latency observed in this process"""
+        versions = []
+        for version, metrics in sorted(self.versions.items()):
+            samples = sorted(self._latency.get(version, []))
+            latency = {}
+            if samples:
+                latency = {
+                    "predictions": len(samples),
+                    "p50_ms": samples[len(samples) // 2] * 1000,
+                    "p95_ms": samples[max(int(len(samples) * 0.95) - 1, 0)] * 1000,
+                }
+            versions.append({
+                "version": version,
+                "active": self.active is not None and self.active.version == version,
+                **metrics,
+                "prediction_latency": latency,
+            })
+        return versions
+
+    def _atomic_dump(self, obj: Any, path: str) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_path, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                joblib.dump(obj, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+    def _write_manifest(self, active: int) -> None:
+        manifest = {"active": active, "versions": {str(v): m for v, m in self.versions.items()}}
+        fd, tmp_path = tempfile.mkstemp(dir=self.model_path, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(self.model_path, MANIFEST))
+
+    def _load_manifest(self) -> None:
+        path = os.path.join(self.model_path, MANIFEST)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.versions = {int(v): m for v, m in manifest.get("versions", {}).items()}
+
+        active = manifest.get("active")
+        if active is None:
+            return
+        try:
+            models = {
+                key: joblib.load(os.path.join(self.model_path, f"{stem}.v{active}.pkl"))
+                for key, stem in ARTIFACTS.items()
+            }
+        except Exception as e:
+            logger.warning(f"Could not load model version {active}: {e}")
+            return
+        self.active = ModelSet(version=active, models=models, metrics=self.versions.get(active, {}))
@@ -40,10 +40,25 @@ from .yolo_video import YoloVideoDetector as _YoloVideoDummy
 def get_yolo_screenshot_detector(*args, **kwargs) -> Any:
     if is_dummy_mode():
         return _YoloScreenshotDummy(*args, **kwargs)
-    else:
-        # Production mode: use real YOLOv8 implementation
-        from .yolo_prod import YoloScreenshotDetector as _YoloScreenshotProd
-        return _YoloScreenshotProd(*args, **kwargs)
+
+    # Production mode: explicit implementation (YOLO_SCREENSHOT_IMPL) wins,
+    # otherwise pick the inference backend (YOLO_SCREENSHOT_BACKEND)
+    impl = _load_impl("YOLO_SCREENSHOT_IMPL", None)
+    if impl is not None:
+        return impl(*args, **kwargs)
+
+    backend = (get_env("YOLO_SCREENSHOT_BACKEND", "torch") or "torch").lower()
+    if backend in ("onnx", "openvino"):
+        # CPU inference through ONNX Runtime (optionally the OpenVINO provider)
+        from .yolo_onnx import YoloScreenshotDetector as _YoloScreenshotOnnx
+
+        if backend == "openvino":
+            kwargs.setdefault("device", "openvino")
+        return _YoloScreenshotOnnx(*args, **kwargs)
+
+    # Real YOLOv8 implementation on PyTorch
+    from .yolo_prod import YoloScreenshotDetector as _YoloScreenshotProd
+    return _YoloScreenshotProd(*args, **kwargs)
 
 
 def get_yolo_video_detector(*args, **kwargs) -> Any:
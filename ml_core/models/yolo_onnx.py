@@ -0,0 +1,347 @@
+"""ONNX Runtime YOLOv8 implementation for CPU-only hosts.
+
+Drop-in replacement for ``yolo_prod.YoloScreenshotDetector``: same
+constructor arguments and the same detection schema, but inference runs
+through ONNX Runtime instead of PyTorch. The PyTorch weights are exported
+to ONNX once (next to the ``.pt`` file) and optionally INT8-quantized; later
+runs load the exported file directly.
+
+To use this implementation:
+
+1. Install requirements:
+   pip install onnxruntime          # export also needs: pip install ultralytics onnx
+
+2. Set environment variables:
+   export DUMMY_MODE=false
+   export YOLO_SCREENSHOT_BACKEND=onnx
+   # or: export YOLO_SCREENSHOT_IMPL=ml_core.models.yolo_onnx.YoloScreenshotDetector
+
+3. Optional tuning:
+   export YOLO_ONNX_INT8=true       # dynamic INT8 weight quantization
+   export YOLO_ONNX_THREADS=4       # intra-op threads (default: all cores)
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import onnxruntime as ort
+from PIL import Image
+
+from config.app_settings import get_env
+
+# Ultralytics predict() defaults, so both backends keep the same boxes
+DEFAULT_CONF_THRESHOLD = 0.25
+DEFAULT_IOU_THRESHOLD = 0.7
+MAX_DETECTIONS = 300
+_LETTERBOX_FILL = 114
+
+# (boxes Nx4 xyxy in source pixels, scores N, class ids N)
+RawDetections = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def export_onnx(model_path: str, imgsz: int = 640, int8: bool = False) -> Path:
+    """Return an ONNX model for ``model_path``, exporting it if needed.
+
+    ``.onnx`` paths are used as-is. For PyTorch weights the export is
+    written next to them and redone only when the weights are newer.
+    With ``int8`` a dynamically quantized copy (``<name>.int8.onnx``) is
+    produced the same way.
+
+    Detectors built concurrently share one export per path, and every
+    file is written under a unique temporary name and moved into place, so
+    other processes never load a partially written model.
+    """
+    source = Path(model_path)
+    if source.suffix == ".onnx":
+        onnx_path = source
+    else:
+        onnx_path = source.with_suffix(".onnx")
+        with _export_lock(onnx_path):
+            if _is_stale(onnx_path, source):
+                _export_weights(source, onnx_path, imgsz)
+
+    if not int8:
+        return onnx_path
+
+    quantized_path = onnx_path.with_name(f"{onnx_path.stem}.int8.onnx")
+    with _export_lock(quantized_path):
+        if _is_stale(quantized_path, onnx_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            tmp_path = _unique_tmp(quantized_path)
+            try:
+                quantize_dynamic(str(onnx_path), str(tmp_path), weight_type=QuantType.QUInt8)
+                tmp_path.replace(quantized_path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+    return quantized_path
+
+
+_export_locks: Dict[Path, threading.Lock] = {}
+_export_locks_guard = threading.Lock()
+
+
+def _export_lock(path: Path) -> threading.Lock:
+    with _export_locks_guard:
+        return _export_locks.setdefault(path.resolve(), threading.Lock())
+
+
+def _unique_tmp(path: Path) -> Path:
+    return path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _export_weights(source: Path, onnx_path: Path, imgsz: int) -> None:
+    """Export ``source`` to ``onnx_path`` via a private copy of the weights.
+
+    Ultralytics always writes ``<weights>.onnx`` beside the weights it is
+    given, so exporting a copy in a private directory keeps concurrent
+    exports from writing the same file.
+    """
+    from ultralytics import YOLO
+
+    with tempfile.TemporaryDirectory(dir=onnx_path.parent, prefix=".onnx-export-") as workdir:
+        weights = Path(workdir) / source.name
+        shutil.copy2(source, weights)
+        exported = YOLO(str(weights)).export(
+            format="onnx", imgsz=imgsz, dynamic=True, simplify=True
+        )
+        Path(exported).replace(onnx_path)
+
+
+def _is_stale(target: Path, source: Path) -> bool:
+    return not target.exists() or target.stat().st_mtime < source.stat().st_mtime
+
+
+def _env_flag(name: str) -> bool:
+    return (get_env(name, "false") or "").lower() in ("1", "true", "yes", "on")
+
+
+class YoloScreenshotDetector:
+    """ONNX Runtime YOLO detector for TikTok UI elements.
+
+    Provides the same interface and output as the PyTorch production
+    detector. ``predict`` additionally exposes raw arrays for callers that
+    build their own detection records.
+    """
+
+    def __init__(
+        self,
+        model_path: str = None,
+        device: str = "cpu",
+        int8: Optional[bool] = None,
+        intra_op_threads: Optional[int] = None,
+        imgsz: int = 640,
+        conf_threshold: float = DEFAULT_CONF_THRESHOLD,
+        iou_threshold: float = DEFAULT_IOU_THRESHOLD,
+    ) -> None:
+        """Initialize ONNX detector.
+
+        Args:
+            model_path: Path to YOLOv8 ``.pt`` weights or an exported ``.onnx`` file
+            device: 'cpu', or 'openvino' to use the OpenVINO execution provider
+            int8: Use the INT8-quantized model (default: YOLO_ONNX_INT8)
+            intra_op_threads: Threads per operator (default: YOLO_ONNX_THREADS or all cores)
+            imgsz: Square input size the model was exported with
+            conf_threshold: Minimum class confidence
+            iou_threshold: IoU threshold for non-maximum suppression
+        """
+        if not model_path:
+            raise ValueError("model_path is required for production YOLO")
+
+        if int8 is None:
+            int8 = _env_flag("YOLO_ONNX_INT8")
+        if intra_op_threads is None:
+            intra_op_threads = int(get_env("YOLO_ONNX_THREADS", "0") or 0) or os.cpu_count() or 1
+
+        self.model_path = model_path
+        self.device = device or "cpu"
+        self.int8 = int8
+        self.intra_op_threads = intra_op_threads
+        self.imgsz = imgsz
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self._load_session()
+
+        # Element type mapping (same as the PyTorch detector)
+        self.type_map = {
+            0: "like_button",
+            1: "follow_button",
+            2: "comment_button",
+            3: "video_player",
+            4: "profile_icon",
+            5: "share_button",
+            6: "text_overlay",
+            7: "thumbnail",
+            8: "user_avatar",
+        }
+
+    def detect(self, image_bytes: bytes) -> List[Dict[str, Any]]:
+        """Run inference on screenshot.
+
+        Args:
+            image_bytes: Raw bytes of the screenshot image
+
+        Returns:
+            List of detections with type, confidence and coordinates
+        """
+        return self.detect_batch([image_bytes])[0]
+
+    def detect_batch(self, images: Sequence[bytes]) -> List[List[Dict[str, Any]]]:
+        """Run one batched inference over several screenshots"""
+        decoded = [Image.open(io.BytesIO(image_bytes)) for image_bytes in images]
+        return [self._to_records(raw) for raw in self.predict(decoded)]
+
+    def predict(self, images: Sequence[Image.Image]) -> List[RawDetections]:
+        """Raw detections per image, with boxes in source pixel coordinates"""
+        if not images:
+            return []
+
+        tensors, transforms = [], []
+        for image in images:
+            tensor, transform = self._letterbox(image.convert("RGB"))
+            tensors.append(tensor)
+            transforms.append(transform)
+
+        if self._dynamic_batch:
+            outputs = self.session.run(None, {self._input_name: np.stack(tensors)})[0]
+        else:
+            outputs = np.concatenate(
+                [
+                    self.session.run(None, {self._input_name: tensor[None]})[0]
+                    for tensor in tensors
+                ]
+            )
+
+        return [
+            self._postprocess(output, transform) for output, transform in zip(outputs, transforms)
+        ]
+
+    def train(self, data_yaml: str, epochs: int = 100, imgsz: int = 640, batch: int = 16) -> None:
+        """Fine-tune with the PyTorch backend, then re-export and reload.
+
+        Args:
+            data_yaml: Path to data.yaml with dataset configuration
+            epochs: Number of training epochs
+            imgsz: Input image size
+            batch: Batch size
+        """
+        if Path(self.model_path).suffix == ".onnx":
+            raise ValueError("Training needs PyTorch weights (.pt), not an exported .onnx model")
+
+        from .yolo_prod import YoloScreenshotDetector as _YoloScreenshotTorch
+
+        trainer = _YoloScreenshotTorch(model_path=self.model_path)
+        trainer.train(data_yaml, epochs=epochs, imgsz=imgsz, batch=batch)
+
+        # Ultralytics writes the best checkpoint into the run directory
+        self.model_path = str(trainer.model.trainer.best)
+        self._load_session()
+
+    def _load_session(self) -> None:
+        """Export ``model_path`` if needed and open an inference session on it"""
+        self.onnx_path = export_onnx(self.model_path, imgsz=self.imgsz, int8=self.int8)
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        options.intra_op_num_threads = self.intra_op_threads
+        options.inter_op_num_threads = 1
+
+        providers = ["CPUExecutionProvider"]
+        if self.device == "openvino" and "OpenVINOExecutionProvider" in ort.get_available_providers():
+            providers.insert(0, "OpenVINOExecutionProvider")
+
+        self.session = ort.InferenceSession(str(self.onnx_path), options, providers=providers)
+        model_input = self.session.get_inputs()[0]
+        self._input_name = model_input.name
+        self._dynamic_batch = not isinstance(model_input.shape[0], int)
+
+    def _letterbox(self, image: Image.Image) -> Tuple[np.ndarray, Tuple[float, int, int, int, int]]:
+        """Resize keeping aspect ratio and pad to imgsz (Ultralytics letterbox)"""
+        width, height = image.size
+        ratio = min(self.imgsz / width, self.imgsz / height)
+        new_width, new_height = round(width * ratio), round(height * ratio)
+        pad_x = (self.imgsz - new_width) / 2
+        pad_y = (self.imgsz - new_height) / 2
+        left, top = round(pad_x - 0.1), round(pad_y - 0.1)
+
+        canvas = np.full((self.imgsz, self.imgsz, 3), _LETTERBOX_FILL, dtype=np.uint8)
+        resized = image.resize((new_width, new_height), Image.BILINEAR)
+        canvas[top : top + new_height, left : left + new_width] = np.asarray(resized)
+
+        tensor = canvas.transpose(2, 0, 1).astype(np.float32) / 255.0
+        return tensor, (ratio, left, top, width, height)
+
+    def _postprocess(
+        self, output: np.ndarray, transform: Tuple[float, int, int, int, int]
+    ) -> RawDetections:
+        # (4 + classes, anchors) -> (anchors, 4 + classes)
+        predictions = output.T
+        class_scores = predictions[:, 4:]
+        class_ids = class_scores.argmax(axis=1)
+        scores = class_scores[np.arange(len(class_ids)), class_ids]
+
+        keep = scores >= self.conf_threshold
+        if not keep.any():
+            return np.zeros((0, 4), np.float32), np.zeros(0, np.float32), np.zeros(0, np.int64)
+
+        xywh, scores, class_ids = predictions[keep, :4], scores[keep], class_ids[keep]
+        boxes = np.empty_like(xywh)
+        boxes[:, :2] = xywh[:, :2] - xywh[:, 2:] / 2
+        boxes[:, 2:] = xywh[:, :2] + xywh[:, 2:] / 2
+
+        # Class-aware NMS: offset boxes per class so classes never overlap
+        selected = _nms(boxes + class_ids[:, None] * float(self.imgsz * 4), scores, self.iou_threshold)
+        selected = selected[:MAX_DETECTIONS]
+        boxes, scores, class_ids = boxes[selected], scores[selected], class_ids[selected]
+
+        ratio, left, top, width, height = transform
+        boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - left) / ratio).clip(0, width)
+        boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - top) / ratio).clip(0, height)
+        return boxes, scores, class_ids
+
+    def _to_records(self, raw: RawDetections) -> List[Dict[str, Any]]:
+        detections = []
+        for (x1, y1, x2, y2), conf, cls in zip(*raw):
+            detections.append(
+                {
+                    "type": self.type_map.get(int(cls), "unknown"),
+                    "confidence": round(float(conf), 3),
+                    "coordinates": {
+                        "x": int((x1 + x2) / 2),  # Center X
+                        "y": int((y1 + y2) / 2),  # Center Y
+                        "width": int(x2 - x1),
+                        "height": int(y2 - y1),
+                        "bbox": [int(x1), int(y1), int(x2), int(y2)],
+                    },
+                }
+            )
+        return detections
+
+
+def _nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Greedy non-maximum suppression; returns kept indices by descending score"""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1).clip(0) * (y2 - y1).clip(0)
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size:
+        best = order[0]
+        keep.append(best)
+        rest = order[1:]
+
+        inter_w = (np.minimum(x2[best], x2[rest]) - np.maximum(x1[best], x1[rest])).clip(0)
+        inter_h = (np.minimum(y2[best], y2[rest]) - np.maximum(y1[best], y1[rest])).clip(0)
+        intersection = inter_w * inter_h
+        iou = intersection / (areas[best] + areas[rest] - intersection + 1e-9)
+        order = rest[iou <= iou_threshold]
+
+    return np.asarray(keep, dtype=np.int64)
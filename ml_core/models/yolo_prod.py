@@ -14,7 +14,7 @@ production use. To use this implementation:
 """
 
 import io
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Sequence
 
 import torch
 from PIL import Image
@@ -67,37 +67,45 @@ class YoloScreenshotDetector:
         Returns:
             List of detections with type, confidence and coordinates
         """
-        # Convert bytes to PIL Image
-        image = Image.open(io.BytesIO(image_bytes))
+        return self.detect_batch([image_bytes])[0]
 
-        # Run inference
-        results = self.model(image, device=self.device)
+    def detect_batch(self, images: Sequence[bytes]) -> List[List[Dict[str, Any]]]:
+        """Run one batched inference over several screenshots"""
+        if not images:
+            return []
 
+        # Convert bytes to PIL Images
+        decoded = [Image.open(io.BytesIO(image_bytes)) for image_bytes in images]
+
+        # Run inference (one result per image, in order)
+        results = self.model(decoded, device=self.device)
+
+        return [self._to_records(r) for r in results]
+
+    def _to_records(self, result) -> List[Dict[str, Any]]:
         # Process detections
         detections = []
-        for r in results:
-            boxes = r.boxes
-            for box in boxes:
-                # Get coordinates (normalized -> pixel)
-                x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
-
-                # Get class and confidence
-                cls = int(box.cls[0].item())
-                conf = float(box.conf[0].item())
-
-                detections.append(
-                    {
-                        "type": self.type_map.get(cls, "unknown"),
-                        "confidence": round(conf, 3),
-                        "coordinates": {
-                            "x": int((x1 + x2) / 2),  # Center X
-                            "y": int((y1 + y2) / 2),  # Center Y
-                            "width": int(x2 - x1),
-                            "height": int(y2 - y1),
-                            "bbox": [int(x1), int(y1), int(x2), int(y2)],
-                        },
-                    }
-                )
+        for box in result.boxes:
+            # Get coordinates (normalized -> pixel)
+            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+
+            # Get class and confidence
+            cls = int(box.cls[0].item())
+            conf = float(box.conf[0].item())
+
+            detections.append(
+                {
+                    "type": self.type_map.get(cls, "unknown"),
+                    "confidence": round(conf, 3),
+                    "coordinates": {
+                        "x": int((x1 + x2) / 2),  # Center X
+                        "y": int((y1 + y2) / 2),  # Center Y
+                        "width": int(x2 - x1),
+                        "height": int(y2 - y1),
+                        "bbox": [int(x1), int(y1), int(x2), int(y2)],
+                    },
+                }
+            )
 
         return detections
 
@@ -0,0 +1,121 @@
+"""
+Pipeline Stages - bounded asyncio worker groups for the bidirectional ML loop
+
+Each stage owns a bounded queue and a group of workers running one handler.
+A handler returns the items to forward to the next stage; forwarding awaits
+the downstream queue, so a slow stage backs up the ones before it instead of
+letting work pile up in memory.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional
+
+StageHandler = Callable[[Any], Awaitable[Optional[Iterable[Any]]]]
+
+
+class PipelineStage:
+    """One pipeline phase: bounded input queue + ``workers`` concurrent handlers.
+
+    With ``batch_size`` > 1 a worker drains up to that many queued items
+    and passes them to the handler as a list. ``backpressure_seconds`` in
+    the metrics is the time producers spent waiting for room in this stage.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: StageHandler,
+        workers: int = 1,
+        maxsize: int = 100,
+        batch_size: int = 1,
+        downstream: Optional["PipelineStage"] = None,
+        logger: Optional[logging.Logger] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.downstream = downstream
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.logger = logger or logging.getLogger(f"{__name__}.{name}")
+
+        self._tasks: List[asyncio.Task] = []
+        self._started_at: Optional[float] = None
+        self._latencies: Deque[float] = deque(maxlen=1000)
+        self._queue_waits: Deque[float] = deque(maxlen=1000)
+        self.items_in = 0
+        self.items_processed = 0
+        self.errors = 0
+        self.blocked_seconds = 0.0
+
+    async def put(self, item: Any):
+        """Enqueue an item, waiting while the stage is full (backpressure)"""
+        started = time.monotonic()
+        await self.queue.put((item, started))
+        self.blocked_seconds += time.monotonic() - started
+        self.items_in += 1
+
+    def start(self):
+        self._started_at = time.monotonic()
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"{self.name}-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self, drain: bool = True):
+        """Stop the workers, optionally after everything queued was handled"""
+        if drain and self._tasks:
+            await self.queue.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _worker(self):
+        while True:
+            entries = [await self.queue.get()]
+            while len(entries) < self.batch_size:
+                try:
+                    entries.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            started = time.monotonic()
+            items = [item for item, _ in entries]
+            try:
+                outputs = await self.handler(items if self.batch_size > 1 else items[0])
+                self.items_processed += len(entries)
+                self._latencies.append(time.monotonic() - started)
+                self._queue_waits.extend(started - enqueued for _, enqueued in entries)
+
+                if self.downstream is not None and outputs:
+                    for output in outputs:
+                        await self.downstream.put(output)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.errors += len(entries)
+                self.logger.error(f"❌ Stage {self.name} failed: {e}")
+            finally:
+                for _ in entries:
+                    self.queue.task_done()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        latencies = sorted(self._latencies)
+        waits = self._queue_waits
+        return {
+            "workers": self.workers,
+            "queue_depth": self.queue.qsize(),
+            "queue_capacity": self.queue.maxsize,
+            "items_in": self.items_in,
+            "items_processed": self.items_processed,
+            "errors": self.errors,
+            "throughput_per_sec": self.items_processed / uptime if uptime else 0.0,
+            "avg_latency_ms": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+            "p95_latency_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)] * 1000 if latencies else 0.0,
+            "avg_queue_wait_ms": sum(waits) / len(waits) * 1000 if waits else 0.0,
+            "backpressure_seconds": self.blocked_seconds,
+        }
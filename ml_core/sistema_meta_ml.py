@@ -12,10 +12,18 @@ from datetime import datetime, timedelta
 import json
 import os
 import logging
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import StandardScaler
-import joblib
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ml_core.audience_join import spotify_index, youtube_index
+from ml_core.meta_model_registry import MetaModelRegistry, ModelSet, fit_meta_models
+from ml_core.feature_columns import (
+    AGGREGATE_FEATURES, FEATURE_COLUMNS, ColumnarFeatureBuilder, feature_frame, meta_columns
+)
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
@@ -30,6 +38,13 @@ app = FastAPI(
 # URLs de servicios
 DUMMY_MODE = os.getenv("DUMMY_MODE", "true").lower() == "true"
 
+# Caché de predicciones por huella campaña/features (segundos; 0 = desactivada)
+PREDICTION_CACHE_TTL = float(os.getenv("META_ML_PREDICTION_CACHE_TTL", "300"))
+PREDICTION_CACHE_MAX_ENTRIES = 10000
+
+# Núcleos para el entrenamiento (RandomForest n_jobs; -1 = todos)
+TRAINING_N_JOBS = int(os.getenv("META_ML_TRAINING_N_JOBS", "-1"))
+
 # ============================================
 # MODELOS DE DATOS
 # ============================================
@@ -159,6 +174,7 @@ class MetaMLSystem:
         self.models = {}
         self.scalers = {}
         self.performance_history = []
+        self.feature_builder: Optional[ColumnarFeatureBuilder] = None
         self.geographic_distribution = GeographicDistribution(
             spain_current=35.0, 
             latam_countries={}, 
@@ -166,6 +182,16 @@ class MetaMLSystem:
         )
         self.model_path = "models/meta_ml/"
         os.makedirs(self.model_path, exist_ok=True)
+        
+        # Modelos versionados: las predicciones usan el conjunto activo hasta
+        # que una nueva versión se valida y se intercambia de golpe
+        self.registry = MetaModelRegistry(self.model_path)
+        self.active_models: Optional[ModelSet] = None
+        if self.registry.active is not None:
+            self._activate_models(self.registry.active)
+        self._training_pool: Optional[ProcessPoolExecutor] = None
+        self._training_lock = asyncio.Lock()
+        self._prediction_cache: "OrderedDict[str, Tuple[float, MLPrediction]]" = OrderedDict()
     
     async def process_data_sources(
         self, 
@@ -189,13 +215,17 @@ class MetaMLSystem:
             if sp.is_organic_listener and (sp.has_saved_track or sp.repeat_listens > 1)
         ]
         
-        # 3. Cruzar datos para encontrar patrones
-        cross_platform_users = self._cross_reference_users(
-            meta_data, filtered_youtube, filtered_spotify
+        # 3. Cruzar datos para encontrar patrones (índices por país/edad)
+        self.feature_builder = ColumnarFeatureBuilder(
+            youtube_index(filtered_youtube),
+            spotify_index(filtered_spotify),
+            self._parse_age_range
         )
+        matches = self.feature_builder.add_performance(meta_data)
+        cross_platform_users = self._cross_platform_groups(meta_data, matches, self.feature_builder)
         
-        # 4. Generar features para ML
-        features_df = self._generate_ml_features(cross_platform_users)
+        # 4. Generar features para ML (columnar, sin filas dict)
+        features_df = self.feature_builder.features()
         
         logger.info(f"📊 Datos procesados: {len(filtered_youtube)} YouTube + {len(filtered_spotify)} Spotify")
         
@@ -215,31 +245,28 @@ class MetaMLSystem:
     ) -> List[Dict[str, Any]]:
         """Cruzar usuarios entre plataformas para detectar patrones"""
         
-        cross_platform = []
+        builder = ColumnarFeatureBuilder(
+            youtube_index(youtube_data), spotify_index(spotify_data), self._parse_age_range
+        )
+        return self._cross_platform_groups(meta_data, builder.add_performance(meta_data), builder)
+    
+    def _cross_platform_groups(
+        self,
+        meta_data: List[MetaAdsPerformance],
+        matches: Dict[str, np.ndarray],
+        builder: ColumnarFeatureBuilder
+    ) -> List[Dict[str, Any]]:
+        """Agrupar filas Meta con sus usuarios YouTube/Spotify similares"""
         
-        # Agrupar por país y demografía para encontrar similitudes
-        for meta in meta_data:
-            # Buscar usuarios similares en YouTube
-            similar_youtube = [
-                yt for yt in youtube_data
-                if yt.country == meta.country and 
-                abs(self._parse_age_range(meta.age_range) - yt.age) <= 5
-            ]
-            
-            # Buscar usuarios similares en Spotify  
-            similar_spotify = [
-                sp for sp in spotify_data
-                if sp.country == meta.country and
-                abs(self._parse_age_range(meta.age_range) - sp.age) <= 5
-            ]
-            
-            if similar_youtube or similar_spotify:
-                cross_platform.append({
-                    "meta_performance": meta,
-                    "youtube_users": similar_youtube,
-                    "spotify_users": similar_spotify,
-                    "cross_platform_score": len(similar_youtube) + len(similar_spotify)
-                })
+        cross_platform = []
+        for i in np.flatnonzero(matches["cross_platform_score"] > 0):
+            cross_platform.append({
+                "meta_performance": meta_data[i],
+                "youtube_users": builder.youtube.records_in(matches["youtube_lo"][i], matches["youtube_hi"][i]),
+                "spotify_users": builder.spotify.records_in(matches["spotify_lo"][i], matches["spotify_hi"][i]),
+                "cross_platform_score": int(matches["cross_platform_score"][i]),
+                "aggregates": {name: float(matches[name][i]) for name in AGGREGATE_FEATURES}
+            })
         
         # Ordenar por score de cross-platform
         return sorted(cross_platform, key=lambda x: x["cross_platform_score"], reverse=True)
@@ -256,48 +283,37 @@ class MetaMLSystem:
     def _generate_ml_features(self, cross_platform_data: List[Dict[str, Any]]) -> pd.DataFrame:
         """Generar features para el modelo ML"""
         
-        features = []
+        if not cross_platform_data:
+            return pd.DataFrame(columns=list(FEATURE_COLUMNS))
         
-        for user_group in cross_platform_data:
-            meta = user_group["meta_performance"]
-            youtube_users = user_group["youtube_users"]
-            spotify_users = user_group["spotify_users"]
-            
-            # Features base de Meta Ads
-            feature_row = {
-                "country": meta.country,
-                "age_numeric": self._parse_age_range(meta.age_range),
-                "gender_encoded": 1 if meta.gender == "female" else 0,
-                "device_mobile": 1 if meta.device_type == "mobile" else 0,
-                
-                # Métricas Meta Ads
-                "meta_ctr": meta.ctr,
-                "meta_retention": meta.retention_rate,
-                "meta_conversions": meta.conversions,
-                "meta_cost_per_conv": meta.cost_per_conversion,
-                "meta_engagement": meta.engagement_rate,
-                "meta_landing_time": meta.landing_page_time,
-                
-                # Features YouTube agregadas
-                "youtube_avg_retention": np.mean([yt.retention_rate for yt in youtube_users]) if youtube_users else 0,
-                "youtube_avg_watch_time": np.mean([yt.watch_time for yt in youtube_users]) if youtube_users else 0,
-                "youtube_engagement_rate": len([yt for yt in youtube_users if yt.engagement_actions]) / max(len(youtube_users), 1),
-                
-                # Features Spotify agregadas
-                "spotify_avg_listening": np.mean([sp.listening_time for sp in spotify_users]) if spotify_users else 0,
-                "spotify_save_rate": len([sp for sp in spotify_users if sp.has_saved_track]) / max(len(spotify_users), 1),
-                "spotify_repeat_rate": np.mean([sp.repeat_listens for sp in spotify_users]) if spotify_users else 0,
-                
-                # Cross-platform score
-                "cross_platform_score": user_group["cross_platform_score"],
-                
-                # Target (ROI)
-                "roi": meta.conversions / max(meta.cost_per_conversion * meta.conversions, 1)
-            }
-            
-            features.append(feature_row)
+        columns = meta_columns(
+            [group["meta_performance"] for group in cross_platform_data], self._parse_age_range
+        )
+        aggregates = [self._group_aggregates(group) for group in cross_platform_data]
+        for name in AGGREGATE_FEATURES:
+            columns[name] = np.array([agg[name] for agg in aggregates], dtype=np.float64)
+        columns["cross_platform_score"] = np.array(
+            [group["cross_platform_score"] for group in cross_platform_data], dtype=np.int64
+        )
+        
+        return feature_frame(columns)
+    
+    def _group_aggregates(self, user_group: Dict[str, Any]) -> Dict[str, float]:
+        """Agregados YouTube/Spotify de un grupo (precalculados en el cruce si existen)"""
         
-        return pd.DataFrame(features)
+        if "aggregates" in user_group:
+            return user_group["aggregates"]
+        
+        youtube_users = user_group["youtube_users"]
+        spotify_users = user_group["spotify_users"]
+        return {
+            "youtube_avg_retention": np.mean([yt.retention_rate for yt in youtube_users]) if youtube_users else 0,
+            "youtube_avg_watch_time": np.mean([yt.watch_time for yt in youtube_users]) if youtube_users else 0,
+            "youtube_engagement_rate": len([yt for yt in youtube_users if yt.engagement_actions]) / max(len(youtube_users), 1),
+            "spotify_avg_listening": np.mean([sp.listening_time for sp in spotify_users]) if spotify_users else 0,
+            "spotify_save_rate": len([sp for sp in spotify_users if sp.has_saved_track]) / max(len(spotify_users), 1),
+            "spotify_repeat_rate": np.mean([sp.repeat_listens for sp in spotify_users]) if spotify_users else 0,
+        }
     
     async def train_models(self, features_df: pd.DataFrame) -> Dict[str, Any]:
         """Entrenar modelos de ML"""
@@ -308,108 +324,185 @@ class MetaMLSystem:
             logger.warning("⚠️ Pocos datos para entrenar, usando modelo dummy")
             return {"status": "insufficient_data", "model": "dummy"}
         
-        try:
-            # Preparar datos
-            feature_columns = [col for col in features_df.columns if col not in ["roi", "country"]]
-            X = features_df[feature_columns]
-            y = features_df["roi"]
-            
-            # Split train/test
-            X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-            
-            # Scaler
-            scaler = StandardScaler()
-            X_train_scaled = scaler.fit_transform(X_train)
-            X_test_scaled = scaler.transform(X_test)
-            
-            # Modelo de regresión para ROI prediction
-            roi_model = GradientBoostingRegressor(n_estimators=100, random_state=42)
-            roi_model.fit(X_train_scaled, y_train)
-            
-            # Modelo de clasificación para segments
-            # Crear labels binarias basadas en ROI (alto/bajo)
-            roi_threshold = np.median(y)
-            y_class = (y > roi_threshold).astype(int)
-            y_train_class = (y_train > roi_threshold).astype(int)
-            
-            segment_model = RandomForestClassifier(n_estimators=100, random_state=42)
-            segment_model.fit(X_train_scaled, y_train_class)
-            
-            # Evaluación
-            roi_score = roi_model.score(X_test_scaled, y_test)
-            segment_score = segment_model.score(X_test_scaled, (y_test > roi_threshold).astype(int))
-            
-            # Guardar modelos
-            self.models["roi_predictor"] = roi_model
-            self.models["segment_classifier"] = segment_model
-            self.scalers["feature_scaler"] = scaler
-            
-            # Persistir modelos
-            joblib.dump(roi_model, f"{self.model_path}/roi_model.pkl")
-            joblib.dump(segment_model, f"{self.model_path}/segment_model.pkl")
-            joblib.dump(scaler, f"{self.model_path}/scaler.pkl")
-            
-            logger.info(f"✅ Modelos entrenados - ROI Score: {roi_score:.3f}, Segment Score: {segment_score:.3f}")
-            
-            return {
-                "status": "trained",
-                "roi_score": roi_score,
-                "segment_score": segment_score,
-                "features_used": feature_columns,
-                "samples_trained": len(X_train)
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ Error entrenando modelos: {str(e)}")
-            return {"status": "error", "error": str(e)}
+        async with self._training_lock:
+            try:
+                # Entrenar en un proceso aparte: el event loop sigue sirviendo /predict
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(
+                    self._get_training_pool(), fit_meta_models, features_df, TRAINING_N_JOBS
+                )
+                
+                # Validar antes de sustituir la versión activa
+                rejection = self.registry.validate(result)
+                if rejection:
+                    logger.warning(f"⚠️ Nueva versión rechazada: {rejection}")
+                    return {
+                        "status": "rejected",
+                        "reason": rejection,
+                        "active_version": self.active_models.version if self.active_models else None,
+                        "roi_score": result["roi_score"],
+                        "segment_score": result["segment_score"]
+                    }
+                
+                # Persistir artefactos versionados (escritura atómica) e intercambiar
+                model_set = await loop.run_in_executor(None, self.registry.publish, result)
+                self._activate_models(model_set)
+                
+                logger.info(
+                    f"✅ Modelos v{model_set.version} entrenados en {result['training_seconds']:.1f}s - "
+                    f"ROI Score: {result['roi_score']:.3f}, Segment Score: {result['segment_score']:.3f}"
+                )
+                
+                return {
+                    "status": "trained",
+                    "version": model_set.version,
+                    "roi_score": result["roi_score"],
+                    "segment_score": result["segment_score"],
+                    "features_used": result["features_used"],
+                    "samples_trained": result["samples_trained"],
+                    "training_seconds": result["training_seconds"]
+                }
+                
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._training_pool = None
+                logger.error(f"❌ Error entrenando modelos: {str(e)}")
+                return {"status": "error", "error": str(e)}
+    
+    def _get_training_pool(self) -> ProcessPoolExecutor:
+        if self._training_pool is None:
+            self._training_pool = ProcessPoolExecutor(max_workers=1)
+        return self._training_pool
+    
+    def _activate_models(self, model_set: ModelSet):
+        """Hot-swap: una sola asignación por atributo, sin estados intermedios"""
+        
+        self.active_models = model_set
+        self.models = {
+            "roi_predictor": model_set.models["roi_predictor"],
+            "segment_classifier": model_set.models["segment_classifier"]
+        }
+        self.scalers = {"feature_scaler": model_set.models["feature_scaler"]}
     
     async def predict_optimization(self, current_campaign: Dict[str, Any]) -> MLPrediction:
         """Generar predicciones y optimizaciones"""
         
-        logger.info("🎯 Generando predicciones y optimizaciones...")
+        return (await self.predict_optimization_batch([current_campaign]))[0]
+    
+    async def predict_optimization_batch(self, campaigns: List[Dict[str, Any]]) -> List[MLPrediction]:
+        """Generar predicciones para varias campañas con una sola pasada por modelo"""
+        
+        logger.info(f"🎯 Generando predicciones y optimizaciones para {len(campaigns)} campañas...")
+        
+        # Si no hay modelos entrenados, usar lógica dummy
+        model_set = self.active_models
+        if model_set is None or not campaigns:
+            return list(await asyncio.gather(*(self._dummy_prediction(c) for c in campaigns)))
         
         try:
-            # Si no hay modelos entrenados, usar lógica dummy
-            if "roi_predictor" not in self.models:
-                return await self._dummy_prediction(current_campaign)
-            
-            # Generar features para predicción
-            prediction_features = self._prepare_prediction_features(current_campaign)
-            
-            # Hacer predicciones
-            roi_prediction = self.models["roi_predictor"].predict([prediction_features])[0]
-            segment_prediction = self.models["segment_classifier"].predict([prediction_features])[0]
-            
-            # Optimizar distribución geográfica
-            geographic_optimization = await self._optimize_geographic_distribution(current_campaign)
-            
-            # Identificar creatividades virales
-            viral_creatives = await self._identify_viral_creatives(current_campaign)
-            
-            # Generar recomendaciones presupuestarias
-            budget_recommendations = await self._generate_budget_recommendations(
-                current_campaign, roi_prediction, geographic_optimization
-            )
+            # Una matriz de features para todo el lote
+            feature_matrix = self._prepare_prediction_matrix(campaigns, model_set)
+            keys = [
+                self._prediction_cache_key(campaign, row, model_set.version)
+                for campaign, row in zip(campaigns, feature_matrix.to_numpy())
+            ]
+        except Exception as e:
+            logger.error(f"❌ Error en predicción: {str(e)}")
+            return list(await asyncio.gather(*(self._dummy_prediction(c) for c in campaigns)))
+        
+        results: List[Optional[MLPrediction]] = [self._cached_prediction(key) for key in keys]
+        pending = [i for i, prediction in enumerate(results) if prediction is None]
+        if not pending:
+            return results
+        
+        try:
+            # Cada modelo se ejecuta una vez sobre todo el lote (siempre la misma versión)
+            started = time.perf_counter()
+            scaled = model_set.models["feature_scaler"].transform(feature_matrix.iloc[pending])
+            roi_predictions = model_set.models["roi_predictor"].predict(scaled)
+            segment_predictions = model_set.models["segment_classifier"].predict(scaled)
+            self.registry.record_prediction(model_set.version, time.perf_counter() - started)
             
-            # Crear predicción final
-            prediction = MLPrediction(
-                campaign_id=current_campaign.get("campaign_id", "unknown"),
-                target_segments=await self._generate_target_segments(segment_prediction),
-                spain_percentage=max(35.0, geographic_optimization["spain_percentage"]),
-                latam_distribution=geographic_optimization["latam_distribution"],
-                budget_recommendations=budget_recommendations,
-                viral_creatives=viral_creatives,
-                confidence_score=min(roi_prediction / 2.0, 1.0),  # Normalizar
-                expected_roi=roi_prediction
+            built = await asyncio.gather(
+                *(
+                    self._build_prediction(campaigns[i], float(roi), int(segment))
+                    for i, roi, segment in zip(pending, roi_predictions, segment_predictions)
+                ),
+                return_exceptions=True
             )
-            
-            logger.info(f"✅ Predicción generada - ROI esperado: {roi_prediction:.2f}")
-            
-            return prediction
-            
         except Exception as e:
             logger.error(f"❌ Error en predicción: {str(e)}")
-            return await self._dummy_prediction(current_campaign)
+            built = [e] * len(pending)
+        
+        for i, prediction in zip(pending, built):
+            if isinstance(prediction, Exception):
+                logger.error(f"❌ Error en predicción {campaigns[i].get('campaign_id', 'unknown')}: {prediction}")
+                prediction = await self._dummy_prediction(campaigns[i])
+            else:
+                self._store_prediction(keys[i], prediction)
+            results[i] = prediction
+        
+        return results
+    
+    async def _build_prediction(
+        self,
+        campaign: Dict[str, Any],
+        roi_prediction: float,
+        segment_prediction: int
+    ) -> MLPrediction:
+        """Combinar la predicción de los modelos con las optimizaciones auxiliares"""
+        
+        # Distribución geográfica, creatividades virales y segmentos son independientes
+        geographic_optimization, viral_creatives, target_segments = await asyncio.gather(
+            self._optimize_geographic_distribution(campaign),
+            self._identify_viral_creatives(campaign),
+            self._generate_target_segments(segment_prediction)
+        )
+        
+        # Generar recomendaciones presupuestarias
+        budget_recommendations = await self._generate_budget_recommendations(
+            campaign, roi_prediction, geographic_optimization
+        )
+        
+        prediction = MLPrediction(
+            campaign_id=campaign.get("campaign_id", "unknown"),
+            target_segments=target_segments,
+            spain_percentage=max(35.0, geographic_optimization["spain_percentage"]),
+            latam_distribution=geographic_optimization["latam_distribution"],
+            budget_recommendations=budget_recommendations,
+            viral_creatives=viral_creatives,
+            confidence_score=min(roi_prediction / 2.0, 1.0),  # Normalizar
+            expected_roi=roi_prediction
+        )
+        
+        logger.info(f"✅ Predicción generada - ROI esperado: {roi_prediction:.2f}")
+        
+        return prediction
+    
+    def _prediction_cache_key(self, campaign: Dict[str, Any], features: np.ndarray, version: int) -> str:
+        """Huella de campaña + features + versión de modelo"""
+        
+        digest = hashlib.sha1(str(campaign.get("campaign_id", "unknown")).encode("utf-8"))
+        digest.update(np.ascontiguousarray(features, dtype=np.float64).tobytes())
+        return f"v{version}:{digest.hexdigest()}"
+    
+    def _cached_prediction(self, key: str) -> Optional[MLPrediction]:
+        entry = self._prediction_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, prediction = entry
+        if expires_at < time.monotonic():
+            del self._prediction_cache[key]
+            return None
+        return prediction
+    
+    def _store_prediction(self, key: str, prediction: MLPrediction):
+        if PREDICTION_CACHE_TTL <= 0:
+            return
+        self._prediction_cache[key] = (time.monotonic() + PREDICTION_CACHE_TTL, prediction)
+        self._prediction_cache.move_to_end(key)
+        while len(self._prediction_cache) > PREDICTION_CACHE_MAX_ENTRIES:
+            self._prediction_cache.popitem(last=False)
     
     async def _dummy_prediction(self, campaign: Dict[str, Any]) -> MLPrediction:
         """Predicción dummy para desarrollo/testing"""
@@ -457,12 +550,22 @@ class MetaMLSystem:
             expected_roi=2.95
         )
     
-    def _prepare_prediction_features(self, campaign: Dict[str, Any]) -> List[float]:
+    def _prepare_prediction_features(self, campaign: Dict[str, Any], feature_names: List[str]) -> List[float]:
         """Preparar features para predicción"""
         
-        # Extraer features de la campaña actual
+        # Extraer features de la campaña actual (0.5 para las que no vienen)
         # Esto sería más complejo en producción
-        return [0.5] * 15  # Dummy features
+        return [float(campaign.get(name, 0.5)) for name in feature_names]
+    
+    def _prepare_prediction_matrix(self, campaigns: List[Dict[str, Any]], model_set: ModelSet) -> pd.DataFrame:
+        """Matriz de features (una fila por campaña) con las columnas del entrenamiento"""
+        
+        scaler = model_set.models["feature_scaler"]
+        feature_names = list(getattr(scaler, "feature_names_in_", range(scaler.n_features_in_)))
+        return pd.DataFrame(
+            [self._prepare_prediction_features(campaign, feature_names) for campaign in campaigns],
+            columns=feature_names
+        )
     
     async def _optimize_geographic_distribution(self, campaign: Dict[str, Any]) -> Dict[str, Any]:
         """Optimizar distribución geográfica España-LATAM"""
@@ -640,6 +743,11 @@ class MetaMLSystem:
         # Agregar nuevos datos al historial
         self.performance_history.extend(new_performance_data)
         
+        # Extender las features columnares solo con las filas nuevas
+        if self.feature_builder is not None:
+            self.feature_builder.add_performance(new_performance_data)
+            logger.info(f"🧮 Features actualizadas: {len(self.feature_builder)} filas")
+        
         # Si tenemos suficientes datos nuevos, reentrenar
         if len(new_performance_data) >= 5:
             logger.info("🔄 Suficientes datos nuevos - iniciando reentrenamiento...")
@@ -748,6 +856,17 @@ async def predict_campaign_optimization(campaign_data: Dict[str, Any]):
         logger.error(f"Error en predicción: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/ml/predict-batch", response_model=List[MLPrediction])
+async def predict_campaign_optimization_batch(campaigns_data: List[Dict[str, Any]]):
+    """Generar predicciones y optimizaciones para varias campañas en un lote"""
+    
+    try:
+        return await meta_ml_system.predict_optimization_batch(campaigns_data)
+        
+    except Exception as e:
+        logger.error(f"Error en predicción por lotes: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/ml/update-learning")
 async def update_continuous_learning(new_data: List[MetaAdsPerformance]):
     """Actualizar aprendizaje continuo con nuevos datos de performance"""
@@ -766,6 +885,15 @@ async def update_continuous_learning(new_data: List[MetaAdsPerformance]):
         logger.error(f"Error actualizando aprendizaje: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/ml/models")
+async def get_model_versions():
+    """Versiones de modelos con métricas de entrenamiento y latencia de predicción"""
+    
+    return {
+        "active_version": meta_ml_system.active_models.version if meta_ml_system.active_models else None,
+        "versions": meta_ml_system.registry.get_versions()
+    }
+
 @app.get("/ml/geographic-distribution")
 async def get_geographic_distribution():
     """Obtener distribución geográfica actual España-LATAM"""
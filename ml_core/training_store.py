@@ -0,0 +1,176 @@
+"""
+Training Store - append-only, on-disk training data for CloudMLProcessingPipeline
+
+Entries are appended as JSON lines to numbered segment files, so the
+training history survives restarts and never has to fit in memory. Retrain
+sets are drawn with a single streaming pass of weighted reservoir sampling
+(Efraimidis-Spirakis), optionally time-decayed so recent entries are
+preferred; memory stays proportional to the sample, not the history.
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import random
+import threading
+from dataclasses import asdict, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "training-"
+
+
+def _json_default(obj: Any) -> Any:
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if is_dataclass(obj):
+        return asdict(obj)
+    return str(obj)
+
+
+class TrainingDataStore:
+    """Training entries in ``path/training-<n>.jsonl`` segments.
+
+    A segment holds up to ``segment_entries`` entries; once more than
+    ``max_segments`` exist the oldest is deleted. Existing segments are
+    picked up on construction, so a restarted process continues where the
+    last one stopped. A torn last line (crash mid-write) is skipped on read.
+    Appends are serialized with a lock, so they may run on worker threads.
+    """
+
+    def __init__(self, path: str, segment_entries: int = 10_000, max_segments: int = 100):
+        self.path = path
+        self.segment_entries = segment_entries
+        self.max_segments = max_segments
+        self._segments: List[int] = []
+        self._counts: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self) -> int:
+        return sum(self._counts.values())
+
+    def append(self, entry: Dict[str, Any]):
+        self.extend([entry])
+
+    def extend(self, entries: List[Dict[str, Any]]):
+        with self._lock:
+            self._extend(entries)
+
+    def _extend(self, entries: List[Dict[str, Any]]):
+        os.makedirs(self.path, exist_ok=True)
+        while entries:
+            if not self._segments or self._counts[self._segments[-1]] >= self.segment_entries:
+                self._new_segment()
+            segment = self._segments[-1]
+            room = self.segment_entries - self._counts[segment]
+            chunk, entries = entries[:room], entries[room:]
+
+            lines = "".join(json.dumps(entry, default=_json_default) + "\n" for entry in chunk)
+            with open(self._segment_path(segment), "a", encoding="utf-8") as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._counts[segment] += len(chunk)
+
+    def iter_entries(self) -> Iterator[Dict[str, Any]]:
+        """All entries, oldest first"""
+        for segment in list(self._segments):
+            try:
+                with open(self._segment_path(segment), "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            yield json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+            except FileNotFoundError:
+                continue
+
+    def sample(
+        self,
+        size: int,
+        half_life_hours: Optional[float] = None,
+        now: Optional[datetime] = None,
+        seed: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Up to ``size`` entries drawn without replacement in one pass.
+
+        Uniform by default; with ``half_life_hours`` an entry's weight
+        halves for every half-life of age (by its ``timestamp``). Returned
+        oldest first.
+        """
+        rng = random.Random(seed)
+        now = now or datetime.now()
+        # Min-heap of (log key, order, entry): keeps the ``size`` largest keys
+        reservoir: List[Any] = []
+        for order, entry in enumerate(self.iter_entries()):
+            # log(u ** (1 / w)) = log(u) / w; larger wins
+            key = math.log(1.0 - rng.random())
+            if half_life_hours:
+                key *= 2.0 ** min(self._age_hours(entry, now) / half_life_hours, 1000.0)
+            item = (key, order, entry)
+            if len(reservoir) < size:
+                heapq.heappush(reservoir, item)
+            elif key > reservoir[0][0]:
+                heapq.heapreplace(reservoir, item)
+        return [entry for _, _, entry in sorted(reservoir, key=lambda item: item[1])]
+
+    @staticmethod
+    def _age_hours(entry: Dict[str, Any], now: datetime) -> float:
+        try:
+            timestamp = datetime.fromisoformat(entry["timestamp"])
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+        return max((now - timestamp).total_seconds() / 3600, 0.0)
+
+    def _new_segment(self):
+        segment = self._segments[-1] + 1 if self._segments else 0
+        self._segments.append(segment)
+        self._counts[segment] = 0
+        while len(self._segments) > self.max_segments:
+            oldest = self._segments.pop(0)
+            self._counts.pop(oldest)
+            try:
+                os.remove(self._segment_path(oldest))
+            except FileNotFoundError:
+                pass
+
+    def _load(self):
+        if not os.path.isdir(self.path):
+            return
+        for name in os.listdir(self.path):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(".jsonl"):
+                try:
+                    self._segments.append(int(name[len(SEGMENT_PREFIX):-len(".jsonl")]))
+                except ValueError:
+                    continue
+        self._segments.sort()
+        for segment in self._segments:
+            with open(self._segment_path(segment), "rb") as f:
+                self._counts[segment] = sum(1 for _ in f)
+        if self._segments:
+            # Terminate a torn last line so the next append starts clean
+            last = self._segment_path(self._segments[-1])
+            with open(last, "rb+") as f:
+                f.seek(0, os.SEEK_END)
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        f.write(b"\n")
+            logger.info(f"📂 Resumed training store with {len(self)} entries from {self.path}")
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.path, f"{SEGMENT_PREFIX}{segment:06d}.jsonl")
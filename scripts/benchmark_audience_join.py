@@ -0,0 +1,98 @@
+"""
+Benchmark the cross-platform audience join used by MetaMLSystem.
+
+Builds synthetic YouTube/Spotify columns (1M rows each by default), indexes
+them by (country, age) and answers a batch of Meta Ads rows. The original
+nested-loop join is timed on a smaller slice for comparison, since at full
+size it takes minutes.
+
+Usage:
+    python scripts/benchmark_audience_join.py
+    python scripts/benchmark_audience_join.py --rows 2000000 --meta-rows 500
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from ml_core.audience_join import PlatformIndex, audience_aggregates  # noqa: E402
+
+COUNTRIES = np.array(["ES", "MX", "CO", "AR", "CL", "PE", "EC", "US"])
+AGE_RANGES = np.array([21, 29, 39, 49, 59, 70])
+
+
+def _columns(rng: np.random.Generator, rows: int):
+    return rng.choice(COUNTRIES, rows), rng.integers(13, 80, rows)
+
+
+def _nested_loop(meta_countries, meta_ages, countries, ages, values):
+    """Reference implementation: scan every record for every Meta row."""
+    records = list(zip(countries.tolist(), ages.tolist(), values.tolist()))
+    out = []
+    for country, age in zip(meta_countries.tolist(), meta_ages.tolist()):
+        matched = [v for c, a, v in records if c == country and abs(age - a) <= 5]
+        out.append(np.mean(matched) if matched else 0)
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audience join benchmark")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per platform")
+    parser.add_argument("--meta-rows", type=int, default=300)
+    parser.add_argument("--baseline-rows", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    yt_countries, yt_ages = _columns(rng, args.rows)
+    sp_countries, sp_ages = _columns(rng, args.rows)
+    retention = rng.random(args.rows)
+    meta_countries = rng.choice(COUNTRIES, args.meta_rows)
+    meta_ages = rng.choice(AGE_RANGES, args.meta_rows)
+
+    start = time.perf_counter()
+    youtube = PlatformIndex(
+        yt_countries,
+        yt_ages,
+        {
+            "retention_rate": retention,
+            "watch_time": rng.integers(10, 600, args.rows),
+            "engaged": rng.random(args.rows) < 0.4,
+        },
+    )
+    spotify = PlatformIndex(
+        sp_countries,
+        sp_ages,
+        {
+            "listening_time": rng.integers(10, 600, args.rows),
+            "saved": rng.random(args.rows) < 0.3,
+            "repeat_listens": rng.integers(0, 8, args.rows),
+        },
+    )
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    result = audience_aggregates(youtube, spotify, meta_countries, meta_ages)
+    query_seconds = time.perf_counter() - start
+
+    n = args.baseline_rows
+    start = time.perf_counter()
+    _nested_loop(meta_countries, meta_ages, yt_countries[:n], yt_ages[:n], retention[:n])
+    baseline_seconds = (time.perf_counter() - start) * 2  # both platforms
+    projected = baseline_seconds * args.rows / n
+
+    print(f"Rows per platform: {args.rows:,}  Meta rows: {args.meta_rows}")
+    print(f"index build        {build_seconds * 1000:>10.1f} ms")
+    print(f"join + aggregates  {query_seconds * 1000:>10.1f} ms")
+    print(f"matched records    {int(result['cross_platform_score'].sum()):>10,}")
+    print(f"nested loop @ {n:,} rows  {baseline_seconds * 1000:>10.1f} ms "
+          f"(~{projected:.0f} s projected at {args.rows:,})")
+
+
+if __name__ == "__main__":
+    main()
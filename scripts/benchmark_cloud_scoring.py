@@ -0,0 +1,110 @@
+"""
+Benchmark model scoring in CloudMLProcessingPipeline.
+
+Fits small sklearn models for every model type on synthetic features, then
+scores a batch of entities (accounts/posts) two ways: the per-row path
+(``_make_model_prediction`` once per entity and model, one scaler/predict
+call each) and the batched path (``_generate_predictions``: one feature
+matrix per model, models fanned out over the scoring thread pool). The
+per-row path is timed on a slice since it is orders of magnitude slower.
+
+Usage:
+    python scripts/benchmark_cloud_scoring.py
+    python scripts/benchmark_cloud_scoring.py --entities 5000 --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+os.environ["DUMMY_MODE"] = "false"
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sklearn.cluster import KMeans  # noqa: E402
+from sklearn.ensemble import IsolationForest, RandomForestRegressor  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from ml_core.cloud_processing import (  # noqa: E402
+    DEFAULT_FEATURE_KEYS,
+    MODEL_FEATURE_KEYS,
+    CloudMLProcessingPipeline,
+    MLModelType,
+)
+
+
+def _fit_models(rng: np.random.Generator):
+    X = rng.random((2000, 5))
+    y = X @ rng.random(5)
+    models = {}
+    for model_type in MLModelType:
+        if model_type == MLModelType.ANOMALY_DETECTOR:
+            model = IsolationForest(n_estimators=50, random_state=42).fit(X)
+        elif model_type == MLModelType.AUDIENCE_SEGMENTER:
+            model = KMeans(n_clusters=5, n_init=3, random_state=42).fit(X)
+        else:
+            model = RandomForestRegressor(n_estimators=50, random_state=42).fit(X, y)
+        models[model_type] = model
+    return models, StandardScaler().fit(X)
+
+
+def _entity_features(rng: np.random.Generator, entities: int):
+    keys = sorted({key for keys in MODEL_FEATURE_KEYS.values() for key in keys} | set(DEFAULT_FEATURE_KEYS))
+    return {
+        ("instagram", f"post_{i}"): {key: float(value) for key, value in zip(keys, rng.random(len(keys)))}
+        for i in range(entities)
+    }
+
+
+async def _per_row(pipeline: CloudMLProcessingPipeline, entity_features):
+    predictions = []
+    for features in entity_features.values():
+        for model_type, model in pipeline.ml_models.items():
+            predictions.append(
+                await pipeline._make_model_prediction(model_type, model, features, [])
+            )
+    return predictions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cloud ML scoring benchmark")
+    parser.add_argument("--entities", type=int, default=5000)
+    parser.add_argument("--baseline-entities", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=None, help="scoring threads")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = {}
+    if args.workers:
+        config["scoring_workers"] = args.workers
+    pipeline = CloudMLProcessingPipeline(config)
+    rng = np.random.default_rng(args.seed)
+    pipeline.ml_models, scaler = _fit_models(rng)
+    pipeline.model_scalers = {model_type: scaler for model_type in pipeline.ml_models}
+    entity_features = _entity_features(rng, args.entities)
+    rows = args.entities * len(pipeline.ml_models)
+
+    baseline = dict(list(entity_features.items())[: args.baseline_entities])
+    start = time.perf_counter()
+    before = asyncio.run(_per_row(pipeline, baseline))
+    per_row_seconds = time.perf_counter() - start
+    per_row_rate = len(before) / per_row_seconds
+
+    start = time.perf_counter()
+    after = asyncio.run(pipeline._generate_predictions(entity_features, []))
+    batched_seconds = time.perf_counter() - start
+
+    assert len(after) == rows
+    print(f"Entities: {args.entities:,}  Models: {len(pipeline.ml_models)}  "
+          f"Workers: {pipeline.scoring_executor._max_workers}")
+    print(f"per-row   {per_row_rate:>12,.0f} rows/s  ({len(before):,} rows in {per_row_seconds:.1f} s)")
+    print(f"batched   {rows / batched_seconds:>12,.0f} rows/s  ({rows:,} rows in {batched_seconds:.2f} s)")
+    print(f"speedup   {rows / batched_seconds / per_row_rate:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Benchmark UTM visit ingestion (UTMDatabase.save_visit).
+
+Replays landing-page visits from several producer threads into a fresh
+SQLite file with the batched WAL writer, twice: as an unpaced burst (peak
+visits/sec) and paced at ``--rate`` visits/sec (sustained write latency,
+enqueue -> commit). The original connect/insert/commit-per-visit path is
+timed on a smaller slice for comparison.
+
+Usage:
+    python scripts/benchmark_utm_ingestion.py
+    python scripts/benchmark_utm_ingestion.py --visits 200000 --producers 8
+"""
+
+import argparse
+import importlib.util
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+MODULE = ROOT / "social_extensions/meta/advanced_campaign_system/utm_tracking_system.py"
+
+# Loaded by path: the package __init__ pulls in unrelated optional modules
+_spec = importlib.util.spec_from_file_location("utm_tracking_system", MODULE)
+utm = importlib.util.module_from_spec(_spec)
+sys.modules["utm_tracking_system"] = utm
+_spec.loader.exec_module(utm)
+
+
+def _visits(count: int, utm_ids: int):
+    params = [
+        utm.UTMParameters("meta", "paid_social", "burst", "clip", f"term_{i}", f"utm_{i}")
+        for i in range(utm_ids)
+    ]
+    return [
+        utm.UTMVisitData(
+            visit_id=str(uuid.uuid4()),
+            timestamp=datetime.now(),
+            utm_params=params[i % utm_ids],
+            ip_address=f"10.0.{i % 255}.{i % 253}",
+            user_agent="Mozilla/5.0 (Benchmark)",
+        )
+        for i in range(count)
+    ]
+
+
+def _legacy_save_visit(db_path: str, visit):
+    """Reference implementation: one connection and commit per visit."""
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "INSERT INTO utm_visits (visit_id, utm_id, timestamp, ip_address, user_agent) "
+        "VALUES (?, ?, ?, ?, ?)",
+        (visit.visit_id, visit.utm_params.utm_id, visit.timestamp.isoformat(),
+         visit.ip_address, visit.user_agent),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000 if values else 0.0
+
+
+def _run_batched(db_path: str, args, rate=None):
+    """Returns (visits/sec, writer stats, rows stored)"""
+    db = utm.UTMDatabase(db_path, batch_size=args.batch_size, flush_interval=args.flush_interval)
+    visits = _visits(args.visits, args.utm_ids)
+    chunks = [visits[i::args.producers] for i in range(args.producers)]
+    interval = args.producers / rate if rate else 0.0
+
+    def produce(chunk):
+        started = time.perf_counter()
+        for i, visit in enumerate(chunk):
+            if interval:
+                delay = started + i * interval - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            db.save_visit(visit)
+
+    threads = [threading.Thread(target=produce, args=(chunk,)) for chunk in chunks]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    db.flush()
+    seconds = time.perf_counter() - start
+
+    stats = db.writer.get_stats()
+    stored = db.query("SELECT COUNT(*) FROM utm_visits")[0][0]
+    db.writer.close()
+    return args.visits / seconds, stats, stored
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UTM ingestion benchmark")
+    parser.add_argument("--visits", type=int, default=50_000)
+    parser.add_argument("--baseline-visits", type=int, default=2_000)
+    parser.add_argument("--producers", type=int, default=4)
+    parser.add_argument("--rate", type=int, default=5_000, help="paced visits/sec")
+    parser.add_argument("--utm-ids", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--flush-interval", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Legacy path (rollback journal, fsync per commit)
+        legacy_path = os.path.join(tmp, "legacy.db")
+        db = utm.UTMDatabase(legacy_path)
+        db.writer.close()
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("PRAGMA journal_mode=DELETE")
+        legacy_latencies = []
+        start = time.perf_counter()
+        for visit in _visits(args.baseline_visits, args.utm_ids):
+            began = time.perf_counter()
+            _legacy_save_visit(legacy_path, visit)
+            legacy_latencies.append(time.perf_counter() - began)
+        legacy_seconds = time.perf_counter() - start
+
+        burst = _run_batched(os.path.join(tmp, "burst.db"), args, rate=None)
+        paced = _run_batched(os.path.join(tmp, "paced.db"), args, rate=args.rate)
+
+    print(f"Visits: {args.visits:,}  Producers: {args.producers}  Batch: {args.batch_size}")
+    print(f"per-visit commit  {args.baseline_visits / legacy_seconds:>10,.0f} visits/s  "
+          f"p99 {_percentile(legacy_latencies, 0.99):>8.2f} ms")
+    for label, (rate, stats, stored) in (("batched burst", burst), ("batched paced", paced)):
+        print(f"{label:<17} {rate:>10,.0f} visits/s  p99 {stats['p99_latency_ms']:>8.2f} ms  "
+              f"({stats['batches_written']} batches, {stored:,} rows stored)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Benchmark YOLO screenshot inference backends on CPU.
+
+Compares the PyTorch (Ultralytics) detector with the ONNX Runtime detector,
+FP32 and INT8, on the same image. Each backend runs in its own process so
+resident memory is measured in isolation.
+
+Usage:
+    python scripts/benchmark_yolo_backends.py --weights yolov8n.pt --image bus.jpg
+    python scripts/benchmark_yolo_backends.py --backends onnx onnx-int8 --threads 4
+"""
+
+import argparse
+import multiprocessing
+import resource
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+BACKENDS = ("torch", "onnx", "onnx-int8")
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * resource.getpagesize() / (1024 * 1024)
+
+
+def _run_backend(backend: str, args: argparse.Namespace, results: "multiprocessing.Queue"):
+    try:
+        rss_start = _rss_mb()
+        load_start = time.perf_counter()
+
+        if backend == "torch":
+            import torch
+
+            from ml_core.models.yolo_prod import YoloScreenshotDetector
+
+            if args.threads:
+                torch.set_num_threads(args.threads)
+            detector = YoloScreenshotDetector(args.weights, device="cpu")
+        else:
+            from ml_core.models.yolo_onnx import YoloScreenshotDetector
+
+            detector = YoloScreenshotDetector(
+                args.weights,
+                int8=backend == "onnx-int8",
+                intra_op_threads=args.threads or None,
+            )
+
+        load_seconds = time.perf_counter() - load_start
+        image_bytes = Path(args.image).read_bytes()
+
+        for _ in range(args.warmup):
+            detector.detect(image_bytes)
+
+        latencies = []
+        detections = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            detections = detector.detect(image_bytes)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        latencies.sort()
+        results.put(
+            {
+                "backend": backend,
+                "load_seconds": load_seconds,
+                "p50_ms": statistics.median(latencies),
+                "p95_ms": latencies[int(len(latencies) * 0.95) - 1],
+                "mean_ms": statistics.fmean(latencies),
+                "rss_mb": _rss_mb() - rss_start,
+                "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                "detections": len(detections),
+            }
+        )
+    except Exception as e:
+        results.put({"backend": backend, "error": f"{type(e).__name__}: {e}"})
+
+
+def run_isolated(backend: str, args: argparse.Namespace) -> Dict[str, Any]:
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    process = context.Process(target=_run_backend, args=(backend, args, results))
+    process.start()
+    result = results.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO CPU backend benchmark")
+    parser.add_argument("--weights", default="yolov8n.pt")
+    parser.add_argument("--image", default="bus.jpg")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--threads", type=int, default=0, help="0 = library default")
+    parser.add_argument("--backends", nargs="+", choices=BACKENDS, default=list(BACKENDS))
+    args = parser.parse_args()
+
+    print(f"Weights: {args.weights}  Image: {args.image}  Runs: {args.runs}")
+    print(
+        f"{'backend':<10} {'load s':>7} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} "
+        f"{'+RSS MB':>8} {'peak MB':>8} {'dets':>5}"
+    )
+
+    for backend in args.backends:
+        result = run_isolated(backend, args)
+        if "error" in result:
+            print(f"{backend:<10} failed: {result['error']}")
+            continue
+        print(
+            f"{backend:<10} {result['load_seconds']:>7.2f} {result['p50_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {result['mean_ms']:>8.1f} {result['rss_mb']:>8.1f} "
+            f"{result['peak_rss_mb']:>8.1f} {result['detections']:>5}"
+        )
+
+
+if __name__ == "__main__":
+    main()
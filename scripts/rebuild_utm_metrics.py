@@ -0,0 +1,44 @@
+"""
+Rebuild UTM metric rollups from raw visits.
+
+utm_metrics, utm_metrics_hourly and utm_metrics_daily are maintained
+incrementally by triggers on utm_visits. This recomputes all three from
+utm_visits in one transaction, for repairs after manual edits or bulk
+imports done with the triggers dropped.
+
+Usage:
+    python scripts/rebuild_utm_metrics.py
+    python scripts/rebuild_utm_metrics.py --db data/utm_tracking.db
+"""
+
+import argparse
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+MODULE = ROOT / "social_extensions/meta/advanced_campaign_system/utm_tracking_system.py"
+
+# Loaded by path: the package __init__ pulls in unrelated optional modules
+_spec = importlib.util.spec_from_file_location("utm_tracking_system", MODULE)
+utm = importlib.util.module_from_spec(_spec)
+sys.modules["utm_tracking_system"] = utm
+_spec.loader.exec_module(utm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild UTM metric rollups")
+    parser.add_argument("--db", default="data/utm_tracking.db")
+    args = parser.parse_args()
+
+    db = utm.UTMDatabase(args.db)
+    start = time.perf_counter()
+    utm_ids = db.rebuild_metrics()
+    seconds = time.perf_counter() - start
+    db.writer.close()
+    print(f"Rebuilt metrics for {utm_ids:,} UTM IDs in {seconds:.2f} s ({args.db})")
+
+
+if __name__ == "__main__":
+    main()
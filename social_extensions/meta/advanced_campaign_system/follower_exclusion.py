@@ -5,10 +5,22 @@ Exclusión de seguidores actuales para evitar mostrar anuncios a usuarios ya con
 
 import hashlib
 import json
+import math
+import os
 import random
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+# Bits activos por byte; np.bitwise_count necesita NumPy >= 2.0
+_POPCOUNT = np.array([bin(byte).count("1") for byte in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> int:
+    """Bits activos en un array de palabras de 64 bits"""
+    return int(_POPCOUNT[np.ascontiguousarray(words).view(np.uint8)].sum(dtype=np.int64))
 
 
 @dataclass
@@ -36,11 +48,385 @@ class AudienceSegment:
     targeting_criteria: Dict[str, any]
 
 
+class FollowerIdInterner:
+    """Asigna a cada user_id un entero denso (0, 1, 2...) estable entre ejecuciones.
+
+    Los IDs se guardan una sola vez, en un búfer UTF-8 ("id\\n" seguidos)
+    con un array de offsets; la búsqueda usa hashes ordenados
+    (``np.searchsorted``) verificando la cadena, en lugar de un dict y una
+    lista de ``str``. Con IDs de ~30 caracteres son unos 55 bytes por ID
+    frente a ~150 con objetos Python. Los IDs nuevos esperan en un dict
+    pequeño hasta fusionarse con el índice.
+
+    Con ``path`` los IDs se anexan a un fichero de texto (una línea por ID,
+    número de línea = entero), así que los bitmaps guardados siguen siendo
+    válidos al reiniciar.
+    """
+
+    MERGE_THRESHOLD = 65_536
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._buffer = bytearray()
+        self._offsets = np.zeros(1024, dtype=np.uint64)  # inicio de cada ID; [n] = fin
+        self._count = 0
+        self._hashes = np.zeros(0, dtype=np.uint64)  # ordenados
+        self._order = np.zeros(0, dtype=np.uint32)  # entero de cada hash
+        self._recent: Dict[bytes, int] = {}
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                data = f.read()
+            lines = data.split(b"\n")
+            if lines and not lines[-1]:
+                lines.pop()
+            self._intern_encoded(lines)
+            self._merge()
+            if data and not data.endswith(b"\n"):
+                # Línea cortada por un cierre a medias: terminarla antes de anexar
+                with open(path, "ab") as f:
+                    f.write(b"\n")
+
+    def __len__(self) -> int:
+        return self._count
+
+    @staticmethod
+    def _hashes_of(encoded: Iterable[bytes]) -> np.ndarray:
+        # hash() de Python basta: el índice solo vive en memoria y se
+        # reconstruye al cargar, y las colisiones se resuelven con la cadena
+        return np.fromiter(map(hash, encoded), dtype=np.int64).view(np.uint64)
+
+    def _id_bytes(self, index: int) -> bytes:
+        return bytes(self._buffer[int(self._offsets[index]) : int(self._offsets[index + 1]) - 1])
+
+    def _lookup_encoded(self, encoded: List[bytes]) -> np.ndarray:
+        result = np.full(len(encoded), -1, dtype=np.int64)
+        if not encoded:
+            return result
+        hashes = self._hashes_of(encoded)
+        if len(self._hashes):
+            positions = np.minimum(np.searchsorted(self._hashes, hashes), len(self._hashes) - 1)
+            found = np.flatnonzero(self._hashes[positions] == hashes)
+            candidates = self._order[positions[found]].astype(np.int64)
+            starts = self._offsets[candidates].tolist()
+            ends = self._offsets[candidates + 1].tolist()
+            buffer = self._buffer
+            for i, candidate, start, end in zip(found.tolist(), candidates.tolist(), starts, ends):
+                if buffer[start : end - 1] == encoded[i]:
+                    result[i] = candidate
+                else:
+                    # Colisión de hash: revisar el resto de entradas con ese hash
+                    result[i] = self._probe(encoded[i], int(hashes[i]), int(positions[i]) + 1)
+        if self._recent:
+            for i in np.flatnonzero(result < 0).tolist():
+                result[i] = self._recent.get(encoded[i], -1)
+        return result
+
+    def _probe(self, encoded: bytes, h: int, pos: int) -> int:
+        while pos < len(self._hashes) and int(self._hashes[pos]) == h:
+            candidate = int(self._order[pos])
+            if self._id_bytes(candidate) == encoded:
+                return candidate
+            pos += 1
+        return -1
+
+    def _intern_encoded(self, encoded: List[bytes]) -> np.ndarray:
+        ids = self._lookup_encoded(encoded)
+        for i in np.flatnonzero(ids < 0).tolist():
+            e = encoded[i]
+            index = self._recent.get(e)  # repetido dentro del mismo lote
+            if index is None:
+                index = self._append(e)
+            ids[i] = index
+        if len(self._recent) >= self.MERGE_THRESHOLD:
+            self._merge()
+        return ids
+
+    def _append(self, encoded: bytes) -> int:
+        index = self._count
+        if index + 2 > len(self._offsets):
+            self._offsets = np.concatenate([self._offsets, np.zeros_like(self._offsets)])
+        self._buffer += encoded + b"\n"
+        self._count += 1
+        self._offsets[self._count] = len(self._buffer)
+        self._recent[encoded] = index
+        return index
+
+    def _merge(self):
+        """Pasar los IDs recientes al índice ordenado"""
+        if not self._recent:
+            return
+        hashes = self._hashes_of(self._recent)
+        order = np.fromiter(self._recent.values(), dtype=np.uint32)
+        hashes = np.concatenate([self._hashes, hashes])
+        order = np.concatenate([self._order, order])
+        sort = np.argsort(hashes, kind="stable")
+        self._hashes, self._order = hashes[sort], order[sort]
+        self._recent = {}
+
+    def intern(self, user_ids: Iterable[str]) -> np.ndarray:
+        """Enteros de ``user_ids``, registrando los nuevos"""
+        start = self._count
+        ids = self._intern_encoded([user_id.encode("utf-8") for user_id in user_ids])
+        if self.path and self._count > start:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "ab") as f:
+                f.write(self._buffer[int(self._offsets[start]) :])
+        return ids.astype(np.uint32)
+
+    def lookup(self, user_ids: Iterable[str]) -> np.ndarray:
+        """Enteros de ``user_ids`` sin registrar; -1 para IDs desconocidos"""
+        return self._lookup_encoded([user_id.encode("utf-8") for user_id in user_ids])
+
+    def user_ids(self, ids: np.ndarray) -> List[str]:
+        return [self._id_bytes(i).decode("utf-8") for i in ids.tolist()]
+
+
+class FollowerBitmap:
+    """Conjunto de enteros como bitmap de palabras de 64 bits.
+
+    Solo se guarda el rango de palabras entre el primer y el último bit
+    activo (``base`` + ``words``): los seguidores de una cuenta se internan
+    seguidos, así que ocupan un rango compacto del espacio de IDs.
+    """
+
+    def __init__(self, words: Optional[np.ndarray] = None, base: int = 0):
+        self.words = np.zeros(0, dtype="<u8") if words is None else words
+        self.base = base
+
+    @classmethod
+    def from_ids(cls, ids: np.ndarray) -> "FollowerBitmap":
+        bitmap = cls()
+        bitmap.add(ids)
+        return bitmap
+
+    @property
+    def end(self) -> int:
+        return self.base + len(self.words)
+
+    def __len__(self) -> int:
+        return _popcount(self.words)
+
+    def add(self, ids: np.ndarray):
+        ids = np.asarray(ids, dtype=np.uint64)
+        if not len(ids):
+            return
+        first, last = int(ids.min()) >> 6, (int(ids.max()) >> 6) + 1
+        if not len(self.words):
+            self.base = first
+        if first < self.base or last > self.end:
+            base, end = min(first, self.base), max(last, self.end)
+            words = np.zeros(end - base, dtype="<u8")
+            words[self.base - base : self.end - base] = self.words
+            self.words, self.base = words, base
+        elif not self.words.flags.writeable:
+            self.words = np.array(self.words)  # copia de un bitmap mapeado en solo lectura
+        np.bitwise_or.at(
+            self.words, (ids >> 6) - self.base, np.left_shift(np.uint64(1), ids & np.uint64(63))
+        )
+
+    def contains_many(self, ids: np.ndarray) -> np.ndarray:
+        ids = np.asarray(ids, dtype=np.int64)
+        words = ids >> 6
+        inside = (ids >= 0) & (words >= self.base) & (words < self.end)
+        result = np.zeros(len(ids), dtype=bool)
+        hits = ids[inside]
+        result[inside] = (self.words[(hits >> 6) - self.base] >> (hits & 63).astype(np.uint64)) & 1 == 1
+        return result
+
+    def to_ids(self) -> np.ndarray:
+        bits = np.unpackbits(self.words.view(np.uint8), bitorder="little")
+        return np.flatnonzero(bits).astype(np.uint32) + np.uint32(self.base * 64)
+
+    def _trimmed(self) -> "FollowerBitmap":
+        nonzero = np.flatnonzero(self.words)
+        if not len(nonzero):
+            return FollowerBitmap()
+        return FollowerBitmap(self.words[nonzero[0] : nonzero[-1] + 1], self.base + int(nonzero[0]))
+
+    def _widened(self, base: int, end: int) -> np.ndarray:
+        words = np.zeros(max(end - base, 0), dtype="<u8")
+        lo, hi = max(self.base, base), min(self.end, end)
+        if lo < hi:
+            words[lo - base : hi - base] = self.words[lo - self.base : hi - self.base]
+        return words
+
+    def __or__(self, other: "FollowerBitmap") -> "FollowerBitmap":
+        if not len(other.words):
+            return FollowerBitmap(self.words.copy(), self.base)
+        if not len(self.words):
+            return FollowerBitmap(other.words.copy(), other.base)
+        base, end = min(self.base, other.base), max(self.end, other.end)
+        return FollowerBitmap(self._widened(base, end) | other._widened(base, end), base)
+
+    def __and__(self, other: "FollowerBitmap") -> "FollowerBitmap":
+        base, end = max(self.base, other.base), min(self.end, other.end)
+        return FollowerBitmap(self._widened(base, end) & other._widened(base, end), base)._trimmed()
+
+    def __sub__(self, other: "FollowerBitmap") -> "FollowerBitmap":
+        return FollowerBitmap(self.words & ~other._widened(self.base, self.end), self.base)._trimmed()
+
+    def save(self, path: str):
+        """Fichero .npy: [base, palabras...], cargable con mmap"""
+        np.save(path, np.concatenate([np.array([self.base], dtype="<u8"), self.words]))
+
+    @classmethod
+    def load(cls, path: str) -> "FollowerBitmap":
+        data = np.load(path, mmap_mode="r")
+        return cls(data[1:], int(data[0]))
+
+
+class FollowerBloomFilter:
+    """Filtro de Bloom sobre user_ids con tasa de falsos positivos configurable.
+
+    No necesita el interner: sirve para comprobar audiencias externas con
+    memoria fija. Unión/intersección requieren la misma capacidad y FPR.
+    """
+
+    def __init__(self, capacity: int, fpr: float = 0.001, words: Optional[np.ndarray] = None):
+        self.capacity = max(int(capacity), 1)
+        self.fpr = fpr
+        bits = math.ceil(-self.capacity * math.log(fpr) / math.log(2) ** 2)
+        self.size = max(64, (bits + 63) // 64 * 64)
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.words = np.zeros(self.size // 64, dtype="<u8") if words is None else words
+
+    def _positions(self, user_ids: Iterable[str]) -> np.ndarray:
+        digests = b"".join(
+            hashlib.blake2b(user_id.encode(), digest_size=16).digest() for user_id in user_ids
+        )
+        h1, h2 = np.frombuffer(digests, dtype="<u8").reshape(-1, 2).T
+        rounds = np.arange(self.hashes, dtype=np.uint64)
+        # Doble hashing: h1 + i * h2 (mod 2^64, luego mod tamaño)
+        return (h1[:, None] + rounds[None, :] * (h2[:, None] | np.uint64(1))) % np.uint64(self.size)
+
+    def add(self, user_ids: Iterable[str]):
+        positions = self._positions(user_ids).ravel()
+        if not self.words.flags.writeable:
+            self.words = np.array(self.words)
+        np.bitwise_or.at(
+            self.words, positions >> np.uint64(6), np.left_shift(np.uint64(1), positions & np.uint64(63))
+        )
+
+    def contains_many(self, user_ids: Iterable[str]) -> np.ndarray:
+        positions = self._positions(user_ids)
+        bits = (self.words[positions >> np.uint64(6)] >> (positions & np.uint64(63))) & np.uint64(1)
+        return bits.all(axis=1)
+
+    def __contains__(self, user_id: str) -> bool:
+        return bool(self.contains_many([user_id])[0])
+
+    def __len__(self) -> int:
+        """Número estimado de elementos"""
+        set_bits = _popcount(self.words)
+        if set_bits >= self.size:
+            return self.capacity
+        return round(-self.size / self.hashes * math.log(1 - set_bits / self.size))
+
+    def _combine(self, other: "FollowerBloomFilter", words: np.ndarray) -> "FollowerBloomFilter":
+        if (self.size, self.hashes) != (other.size, other.hashes):
+            raise ValueError("Filtros de Bloom con parámetros distintos")
+        return FollowerBloomFilter(self.capacity, self.fpr, words)
+
+    def __or__(self, other: "FollowerBloomFilter") -> "FollowerBloomFilter":
+        return self._combine(other, self.words | other.words)
+
+    def __and__(self, other: "FollowerBloomFilter") -> "FollowerBloomFilter":
+        return self._combine(other, self.words & other.words)
+
+    def save(self, path: str):
+        """Fichero .npy: [capacidad, FPR en millonésimas, palabras...], cargable con mmap"""
+        header = np.array([self.capacity, round(self.fpr * 1e6)], dtype="<u8")
+        np.save(path, np.concatenate([header, self.words]))
+
+    @classmethod
+    def load(cls, path: str) -> "FollowerBloomFilter":
+        data = np.load(path, mmap_mode="r")
+        return cls(int(data[0]), int(data[1]) / 1e6, data[2:])
+
+
+class FollowerExclusionSet:
+    """Lista de exclusión sobre un bitmap de IDs internados.
+
+    Se usa como el ``set`` de user_ids anterior (``len``, ``in``) y admite
+    ``|``, ``&`` y ``-`` entre cuentas y criterios.
+    """
+
+    def __init__(self, bitmap: FollowerBitmap, interner: FollowerIdInterner):
+        self.bitmap = bitmap
+        self.interner = interner
+
+    def __len__(self) -> int:
+        return len(self.bitmap)
+
+    def __contains__(self, user_id: str) -> bool:
+        return bool(self.contains_many([user_id])[0])
+
+    def contains_many(self, user_ids: Iterable[str]) -> np.ndarray:
+        return self.bitmap.contains_many(self.interner.lookup(user_ids))
+
+    def user_ids(self) -> List[str]:
+        return self.interner.user_ids(self.bitmap.to_ids())
+
+    def __or__(self, other: "FollowerExclusionSet") -> "FollowerExclusionSet":
+        return FollowerExclusionSet(self.bitmap | other.bitmap, self.interner)
+
+    def __and__(self, other: "FollowerExclusionSet") -> "FollowerExclusionSet":
+        return FollowerExclusionSet(self.bitmap & other.bitmap, self.interner)
+
+    def __sub__(self, other: "FollowerExclusionSet") -> "FollowerExclusionSet":
+        return FollowerExclusionSet(self.bitmap - other.bitmap, self.interner)
+
+    def to_bloom(self, fpr: float = 0.001) -> FollowerBloomFilter:
+        bloom = FollowerBloomFilter(len(self), fpr)
+        bloom.add(self.user_ids())
+        return bloom
+
+
+ExclusionList = Union[FollowerExclusionSet, FollowerBloomFilter]
+
+
+@dataclass
+class FollowerColumns:
+    """Seguidores de una cuenta en columnas (en lugar de objetos FollowerData)"""
+
+    ids: np.ndarray  # uint32, internados
+    follow_dates: np.ndarray  # datetime64[s]
+    engagement: np.ndarray  # float32
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @classmethod
+    def from_followers(
+        cls, followers: List[FollowerData], interner: FollowerIdInterner
+    ) -> "FollowerColumns":
+        return cls(
+            ids=interner.intern(f.user_id for f in followers),
+            follow_dates=np.array([f.follow_date for f in followers], dtype="datetime64[s]"),
+            engagement=np.array([f.engagement_level for f in followers], dtype=np.float32),
+        )
+
+    def select(self, mask: np.ndarray) -> "FollowerColumns":
+        return FollowerColumns(self.ids[mask], self.follow_dates[mask], self.engagement[mask])
+
+    def extend(self, other: "FollowerColumns") -> "FollowerColumns":
+        return FollowerColumns(
+            np.concatenate([self.ids, other.ids]),
+            np.concatenate([self.follow_dates, other.follow_dates]),
+            np.concatenate([self.engagement, other.engagement]),
+        )
+
+
 class FollowerExclusionManager:
     """Manager para exclusión de seguidores actuales de campañas"""
 
-    def __init__(self):
-        self.followers_cache = {}
+    def __init__(self, storage_dir: Optional[str] = None):
+        self.storage_dir = storage_dir
+        self.id_interner = FollowerIdInterner(
+            os.path.join(storage_dir, "follower_ids.txt") if storage_dir else None
+        )
+        self.followers_cache: Dict[str, FollowerColumns] = {}
+        self.account_followers: Dict[str, FollowerBitmap] = {}
         self.exclusion_history = []
 
         # Configuración de exclusión
@@ -51,8 +437,73 @@ class FollowerExclusionManager:
             "engagement_threshold": 0.7,  # Threshold para "alta engagement"
             "preserve_segment_size": True,  # Mantener tamaño mínimo de audiencia
             "minimum_audience_size": 1000,  # Tamaño mínimo de audiencia
+            "exclusion_backend": "bitmap",  # bitmap (exacto) o bloom (memoria fija)
+            "bloom_fpr": 0.001,  # Falsos positivos admitidos con bloom
         }
 
+        if storage_dir and os.path.isdir(storage_dir):
+            for name in os.listdir(storage_dir):
+                if name.startswith("account_") and name.endswith(".npy"):
+                    self.account_followers[name[len("account_") : -len(".npy")]] = (
+                        FollowerBitmap.load(os.path.join(storage_dir, name))
+                    )
+
+    def ingest_followers(self, account_id: str, followers: List[FollowerData]) -> int:
+        """
+        Añade seguidores nuevos de una cuenta (incremental); devuelve cuántos eran nuevos
+        """
+        columns = FollowerColumns.from_followers(followers, self.id_interner)
+        known = self.account_followers.get(account_id, FollowerBitmap())
+        _, first = np.unique(columns.ids, return_index=True)
+        columns = columns.select(np.sort(first))
+        columns = columns.select(~known.contains_many(columns.ids))
+        if not len(columns):
+            return 0
+
+        cached = self.followers_cache.get(account_id)
+        self.followers_cache[account_id] = cached.extend(columns) if cached else columns
+        known.add(columns.ids)
+        self.account_followers[account_id] = known
+        if self.storage_dir:
+            known.save(os.path.join(self.storage_dir, f"account_{account_id}.npy"))
+        return len(columns)
+
+    def _exclusion_bitmap(self, columns: FollowerColumns, exclusion_criteria: Dict) -> FollowerBitmap:
+        """Bitmap con la unión de los criterios activos, evaluados por columnas"""
+        exclusion = FollowerBitmap()
+
+        # 1. Excluir seguidores recientes si está activado
+        if exclusion_criteria.get("exclude_recent_followers", True):
+            threshold_days = exclusion_criteria.get("recent_threshold_days", 30)
+            age_days = (np.datetime64(datetime.now(), "s") - columns.follow_dates) // np.timedelta64(1, "D")
+            recent = FollowerBitmap.from_ids(columns.ids[age_days <= threshold_days])
+            exclusion = exclusion | recent
+            print(f"   📅 Recientes (<{threshold_days} días): {len(recent):,} excluidos")
+
+        # 2. Excluir seguidores con alta engagement si está activado
+        if exclusion_criteria.get("exclude_high_engagement", True):
+            engagement_threshold = exclusion_criteria.get("engagement_threshold", 0.7)
+            high_engagement = FollowerBitmap.from_ids(
+                columns.ids[columns.engagement > engagement_threshold]
+            )
+            exclusion = exclusion | high_engagement
+            print(
+                f"   🔥 Alta engagement (>{engagement_threshold}): {len(high_engagement):,} excluidos"
+            )
+
+        # 3. Excluir todos los seguidores (opción más agresiva)
+        if exclusion_criteria.get("exclude_all_followers", False):
+            exclusion = exclusion | FollowerBitmap.from_ids(columns.ids)
+            print(f"   🚫 Todos los seguidores: {len(columns):,} excluidos")
+
+        return exclusion
+
+    def _as_exclusion_list(self, bitmap: FollowerBitmap, exclusion_criteria: Dict) -> ExclusionList:
+        exclusion_set = FollowerExclusionSet(bitmap, self.id_interner)
+        if exclusion_criteria.get("exclusion_backend", "bitmap") == "bloom":
+            return exclusion_set.to_bloom(exclusion_criteria.get("bloom_fpr", 0.001))
+        return exclusion_set
+
     def collect_followers(self, account_id: str) -> List[FollowerData]:
         """
         Simula recolección de lista de seguidores actuales
@@ -100,8 +551,8 @@ class FollowerExclusionManager:
             )
             followers.append(follower)
 
-        # Cache para reutilización
-        self.followers_cache[account_id] = followers
+        # Cache en columnas para reutilización
+        self.ingest_followers(account_id, followers)
 
         print(f"✅ Seguidores recolectados: {len(followers):,}")
         print(
@@ -119,50 +570,55 @@ class FollowerExclusionManager:
 
     def create_exclusion_list(
         self, followers: List[FollowerData], exclusion_criteria: Dict = None
-    ) -> Set[str]:
+    ) -> ExclusionList:
         """
         Crea lista de exclusión basada en criterios específicos
         """
         if exclusion_criteria is None:
             exclusion_criteria = self.exclusion_settings
 
-        exclusion_set = set()
-
         print("🚫 CREANDO LISTA DE EXCLUSIÓN")
         print("-" * 30)
 
-        # 1. Excluir seguidores recientes si está activado
-        if exclusion_criteria.get("exclude_recent_followers", True):
-            threshold_days = exclusion_criteria.get("recent_threshold_days", 30)
-            recent_followers = [
-                f for f in followers if (datetime.now() - f.follow_date).days <= threshold_days
-            ]
-            exclusion_set.update(f.user_id for f in recent_followers)
-            print(f"   📅 Recientes (<{threshold_days} días): {len(recent_followers):,} excluidos")
+        columns = FollowerColumns.from_followers(followers, self.id_interner)
+        exclusion_list = self._as_exclusion_list(
+            self._exclusion_bitmap(columns, exclusion_criteria), exclusion_criteria
+        )
 
-        # 2. Excluir seguidores con alta engagement si está activado
-        if exclusion_criteria.get("exclude_high_engagement", True):
-            engagement_threshold = exclusion_criteria.get("engagement_threshold", 0.7)
-            high_engagement_followers = [
-                f for f in followers if f.engagement_level > engagement_threshold
-            ]
-            exclusion_set.update(f.user_id for f in high_engagement_followers)
-            print(
-                f"   🔥 Alta engagement (>{engagement_threshold}): {len(high_engagement_followers):,} excluidos"
-            )
+        print(f"✅ Total únicos en lista de exclusión: {len(exclusion_list):,}")
+        print()
 
-        # 3. Excluir todos los seguidores (opción más agresiva)
-        if exclusion_criteria.get("exclude_all_followers", False):
-            exclusion_set.update(f.user_id for f in followers)
-            print(f"   🚫 Todos los seguidores: {len(followers):,} excluidos")
+        return exclusion_list
+
+    def create_account_exclusion_list(
+        self, account_ids: List[str], exclusion_criteria: Dict = None
+    ) -> ExclusionList:
+        """
+        Lista de exclusión unida de varias cuentas, desde la cache en columnas
+        """
+        if exclusion_criteria is None:
+            exclusion_criteria = self.exclusion_settings
 
-        print(f"✅ Total únicos en lista de exclusión: {len(exclusion_set):,}")
+        print(f"🚫 CREANDO LISTA DE EXCLUSIÓN - {len(account_ids)} cuentas")
+        print("-" * 30)
+
+        exclusion = FollowerBitmap()
+        for account_id in account_ids:
+            columns = self.followers_cache.get(account_id)
+            if columns is not None:
+                exclusion = exclusion | self._exclusion_bitmap(columns, exclusion_criteria)
+            elif exclusion_criteria.get("exclude_all_followers", False):
+                # Sin columnas en memoria (p.ej. tras reiniciar): bitmap persistido
+                exclusion = exclusion | self.account_followers.get(account_id, FollowerBitmap())
+
+        exclusion_list = self._as_exclusion_list(exclusion, exclusion_criteria)
+        print(f"✅ Total únicos en lista de exclusión: {len(exclusion_list):,}")
         print()
 
-        return exclusion_set
+        return exclusion_list
 
     def filter_audience(
-        self, audience_segment: Dict, exclusion_list: Set[str], account_id: str
+        self, audience_segment: Dict, exclusion_list: ExclusionList, account_id: str
     ) -> AudienceSegment:
         """
         Filtra audiencia eliminando seguidores de la lista de exclusión
@@ -170,25 +626,31 @@ class FollowerExclusionManager:
         print(f"🎯 FILTRANDO AUDIENCIA - {audience_segment.get('name', 'Unnamed')}")
         print("-" * 40)
 
-        # Simular audiencia original
-        original_size = audience_segment.get("estimated_size", random.randint(50000, 500000))
+        if "user_ids" in audience_segment:
+            # Audiencia real: overlap exacto (o con FPR del bloom) en una pasada
+            user_ids = audience_segment["user_ids"]
+            original_size = len(user_ids)
+            overlap_count = int(exclusion_list.contains_many(user_ids).sum())
+        else:
+            # Simular audiencia original
+            original_size = audience_segment.get("estimated_size", random.randint(50000, 500000))
 
-        # Simular overlap con seguidores (típicamente 5-20%)
-        overlap_percentage = random.uniform(0.05, 0.20)
-        overlap_count = int(original_size * overlap_percentage)
+            # Simular overlap con seguidores (típicamente 5-20%)
+            overlap_percentage = random.uniform(0.05, 0.20)
+            overlap_count = int(original_size * overlap_percentage)
 
         # Calcular audiencia filtrada
         filtered_size = original_size - overlap_count
-        exclusion_percentage = (overlap_count / original_size) * 100
+        exclusion_percentage = (overlap_count / original_size) * 100 if original_size else 0.0
 
-        # Validar tamaño mínimo de audiencia
-        minimum_size = self.exclusion_settings.get("minimum_audience_size", 1000)
+        # Validar tamaño mínimo de audiencia (nunca mayor que la audiencia original)
+        minimum_size = min(self.exclusion_settings.get("minimum_audience_size", 1000), original_size)
         if filtered_size < minimum_size:
             print(f"⚠️ Audiencia filtrada muy pequeña ({filtered_size:,})")
             print(f"   Ajustando a tamaño mínimo: {minimum_size:,}")
             filtered_size = minimum_size
             overlap_count = original_size - filtered_size
-            exclusion_percentage = (overlap_count / original_size) * 100
+            exclusion_percentage = (overlap_count / original_size) * 100 if original_size else 0.0
 
         segment_id = hashlib.md5(
             f"{account_id}_{audience_segment.get('name', 'default')}_{datetime.now()}".encode()
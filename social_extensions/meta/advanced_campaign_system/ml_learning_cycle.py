@@ -11,7 +11,7 @@ from collections import defaultdict
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
@@ -61,6 +61,94 @@ class ModelAdjustments:
     confidence_score: float
 
 
+@dataclass
+class CycleHistory:
+    """Historial en columnas: arrays por ciclo, y ROI medio por país y por colaborador"""
+
+    cycle_ids: np.ndarray
+    genres: np.ndarray
+    weekdays: np.ndarray  # 0=Monday, 6=Sunday
+    total_investment: np.ndarray
+    total_roi: np.ndarray
+    clip_counts: np.ndarray
+    avg_engagement: np.ndarray
+    has_collaborators: np.ndarray
+    geo_countries: np.ndarray
+    geo_roi: np.ndarray
+    geo_counts: np.ndarray
+    collaborators: np.ndarray
+    collaborator_roi: np.ndarray
+    collaborator_counts: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.cycle_ids)
+
+    @classmethod
+    def from_cycles(cls, cycles: List[CycleMetrics]) -> "CycleHistory":
+        """Construye las columnas a partir de ciclos ya cargados en memoria"""
+        engagement = []
+        for cycle in cycles:
+            rates = [
+                metrics["engagement_rate"]
+                for metrics in cycle.clip_performance.values()
+                if "engagement_rate" in metrics
+            ]
+            engagement.append(sum(rates) / len(rates) if rates else 0.0)
+
+        geo_countries, geo_roi, geo_counts = _grouped_mean(
+            _text_array([country for cycle in cycles for country in cycle.geo_performance]),
+            np.array(
+                [
+                    metrics.get("roi_projection", 0)
+                    for cycle in cycles
+                    for metrics in cycle.geo_performance.values()
+                ],
+                dtype=float,
+            ),
+        )
+        collaborators, collaborator_roi, collaborator_counts = _grouped_mean(
+            _text_array([name for cycle in cycles for name in cycle.collaborators]),
+            np.array(
+                [cycle.total_roi for cycle in cycles for _ in cycle.collaborators], dtype=float
+            ),
+        )
+        return cls(
+            cycle_ids=_text_array([cycle.cycle_id for cycle in cycles]),
+            genres=_text_array([cycle.genre for cycle in cycles]),
+            weekdays=np.array([cycle.timestamp.weekday() for cycle in cycles], dtype=int),
+            total_investment=np.array([cycle.total_investment for cycle in cycles], dtype=float),
+            total_roi=np.array([cycle.total_roi for cycle in cycles], dtype=float),
+            clip_counts=np.array([len(cycle.clip_performance) for cycle in cycles], dtype=int),
+            avg_engagement=np.array(engagement, dtype=float),
+            has_collaborators=np.array([bool(cycle.collaborators) for cycle in cycles], dtype=bool),
+            geo_countries=geo_countries,
+            geo_roi=geo_roi,
+            geo_counts=geo_counts,
+            collaborators=collaborators,
+            collaborator_roi=collaborator_roi,
+            collaborator_counts=collaborator_counts,
+        )
+
+
+def _text_array(values: List[str]) -> np.ndarray:
+    return np.array(values, dtype=str) if values else np.array([], dtype=str)
+
+
+def _weekdays(timestamps) -> np.ndarray:
+    """Día de la semana (0=Monday) de timestamps ISO, vectorizado"""
+    days = np.array(timestamps, dtype="datetime64[D]").astype(np.int64)
+    return (days + 3) % 7  # 1970-01-01 fue jueves
+
+
+def _grouped_mean(keys: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Media de ``values`` por clave: (claves únicas, medias, conteos)"""
+    if not len(keys):
+        return keys[:0], np.zeros(0), np.zeros(0, dtype=int)
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.bincount(inverse)
+    return unique, np.bincount(inverse, weights=values) / counts, counts
+
+
 class HistoricalDataManager:
     """Gestor de datos históricos con base de datos SQLite simulada"""
 
@@ -87,10 +175,25 @@ class HistoricalDataManager:
                 total_investment REAL,
                 total_views INTEGER,
                 total_roi REAL,
-                campaign_data TEXT
+                campaign_data TEXT,
+                clip_count INTEGER DEFAULT 0,
+                avg_engagement_rate REAL DEFAULT 0,
+                collaborator_count INTEGER DEFAULT 0
             )
         """
         )
+        # Resumen por ciclo para analizar sin unir clip_performance
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(campaign_cycles)")}
+        summary_columns = {
+            "clip_count": "INTEGER DEFAULT 0",
+            "avg_engagement_rate": "REAL DEFAULT 0",
+            "collaborator_count": "INTEGER DEFAULT 0",
+        }
+        missing_summary = [column for column in summary_columns if column not in existing]
+        for column in missing_summary:
+            cursor.execute(
+                f"ALTER TABLE campaign_cycles ADD COLUMN {column} {summary_columns[column]}"
+            )
 
         cursor.execute(
             """
@@ -126,11 +229,69 @@ class HistoricalDataManager:
         """
         )
 
+        # Colaboradores normalizados (antes solo como JSON en campaign_cycles)
+        has_collaborators_table = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'cycle_collaborators'"
+        ).fetchone()
+        cursor.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cycle_collaborators (
+                cycle_id TEXT,
+                collaborator TEXT,
+                FOREIGN KEY(cycle_id) REFERENCES campaign_cycles(cycle_id)
+            )
+        """
+        )
+        if not has_collaborators_table:
+            cursor.execute(
+                """
+                INSERT INTO cycle_collaborators (cycle_id, collaborator)
+                SELECT c.cycle_id, j.value
+                FROM campaign_cycles c, json_each(c.collaborators) j
+                WHERE json_valid(c.collaborators)
+            """
+            )
+        if missing_summary:
+            cursor.execute(
+                """
+                UPDATE campaign_cycles SET
+                    clip_count = (SELECT COUNT(*) FROM clip_performance cp
+                                  WHERE cp.cycle_id = campaign_cycles.cycle_id),
+                    avg_engagement_rate = (SELECT COALESCE(AVG(engagement_rate), 0)
+                                           FROM clip_performance cp
+                                           WHERE cp.cycle_id = campaign_cycles.cycle_id),
+                    collaborator_count = (SELECT COUNT(*) FROM cycle_collaborators cc
+                                          WHERE cc.cycle_id = campaign_cycles.cycle_id)
+            """
+            )
+
+        # Índices para las consultas de análisis; los de ventana y uniones son
+        # de cobertura para no leer las filas con el JSON de campaign_data
+        cycle_columns = "cycle_id, genre, total_investment, total_roi, clip_count, avg_engagement_rate, collaborator_count"
+        for index, table, columns in (
+            ("idx_campaign_cycles_timestamp", "campaign_cycles", f"timestamp, {cycle_columns}"),
+            ("idx_campaign_cycles_genre", "campaign_cycles", f"genre, timestamp, {cycle_columns}"),
+            ("idx_clip_performance_cycle", "clip_performance", "cycle_id"),
+            ("idx_geo_performance_cycle", "geo_performance", "cycle_id, country, estimated_roi"),
+            ("idx_geo_performance_country", "geo_performance", "country"),
+            ("idx_cycle_collaborators_cycle", "cycle_collaborators", "cycle_id, collaborator"),
+            ("idx_cycle_collaborators_name", "cycle_collaborators", "collaborator"),
+        ):
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({columns})")
+
         conn.commit()
         conn.close()
 
     def store_cycle(self, cycle_data: CycleMetrics) -> str:
         """Almacena datos completos de un ciclo"""
+        campaign_data = asdict(cycle_data)
+        campaign_data["timestamp"] = cycle_data.timestamp.isoformat()
+        engagement_rates = [
+            metrics["engagement_rate"]
+            for metrics in cycle_data.clip_performance.values()
+            if "engagement_rate" in metrics
+        ]
+
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
 
@@ -139,8 +300,9 @@ class HistoricalDataManager:
             """
             INSERT OR REPLACE INTO campaign_cycles 
             (cycle_id, timestamp, genre, subgenre, collaborators, regional_focus,
-             total_investment, total_views, total_roi, campaign_data)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+             total_investment, total_views, total_roi, campaign_data,
+             clip_count, avg_engagement_rate, collaborator_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             (
                 cycle_data.cycle_id,
@@ -152,19 +314,26 @@ class HistoricalDataManager:
                 cycle_data.total_investment,
                 cycle_data.total_views,
                 cycle_data.total_roi,
-                json.dumps(asdict(cycle_data)),
+                json.dumps(campaign_data),
+                len(cycle_data.clip_performance),
+                sum(engagement_rates) / len(engagement_rates) if engagement_rates else 0.0,
+                len(cycle_data.collaborators),
             ),
         )
 
+        # Las tablas hijas no tienen clave primaria: reemplazar las filas del ciclo
+        for table in ("clip_performance", "geo_performance", "cycle_collaborators"):
+            cursor.execute(f"DELETE FROM {table} WHERE cycle_id = ?", (cycle_data.cycle_id,))
+
         # Insertar rendimiento de clips
-        for clip_id, metrics in cycle_data.clip_performance.items():
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO clip_performance
-                (cycle_id, clip_id, ctr, cpc, cpv, views, engagement_rate, 
-                 conversion_rate, total_spend, roi, is_winner)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
+        cursor.executemany(
+            """
+            INSERT INTO clip_performance
+            (cycle_id, clip_id, ctr, cpc, cpv, views, engagement_rate, 
+             conversion_rate, total_spend, roi, is_winner)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
                 (
                     cycle_data.cycle_id,
                     clip_id,
@@ -172,23 +341,25 @@ class HistoricalDataManager:
                     metrics.get("cpc", 0),
                     metrics.get("cpv", 0),
                     metrics.get("views", 0),
-                    metrics.get("engagement_rate", 0),
+                    metrics.get("engagement_rate"),  # NULL: no cuenta en el promedio
                     metrics.get("conversion_rate", 0),
                     metrics.get("total_spend", 0),
                     metrics.get("roi", 0),
                     clip_id in cycle_data.winner_clips,
-                ),
-            )
+                )
+                for clip_id, metrics in cycle_data.clip_performance.items()
+            ],
+        )
 
         # Insertar rendimiento geográfico
-        for country, metrics in cycle_data.geo_performance.items():
-            cursor.execute(
-                """
-                INSERT OR REPLACE INTO geo_performance
-                (cycle_id, country, budget_allocated, estimated_views,
-                 estimated_roi, estimated_ctr, market_share)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            """,
+        cursor.executemany(
+            """
+            INSERT INTO geo_performance
+            (cycle_id, country, budget_allocated, estimated_views,
+             estimated_roi, estimated_ctr, market_share)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            [
                 (
                     cycle_data.cycle_id,
                     country,
@@ -197,8 +368,16 @@ class HistoricalDataManager:
                     metrics.get("roi_projection", 0),
                     metrics.get("estimated_ctr", 0),
                     metrics.get("market_share", 0),
-                ),
-            )
+                )
+                for country, metrics in cycle_data.geo_performance.items()
+            ],
+        )
+
+        # Insertar colaboradores
+        cursor.executemany(
+            "INSERT INTO cycle_collaborators (cycle_id, collaborator) VALUES (?, ?)",
+            [(cycle_data.cycle_id, collaborator) for collaborator in cycle_data.collaborators],
+        )
 
         conn.commit()
         conn.close()
@@ -235,12 +414,80 @@ class HistoricalDataManager:
         conn.close()
         return cycles
 
+    def get_cycle_history(self, genre: Optional[str] = None, limit: int = 50) -> CycleHistory:
+        """Historial en columnas de los ``limit`` ciclos más recientes, sin deserializar JSON"""
+        recent = """
+            WITH recent AS (
+                SELECT cycle_id, genre, timestamp, total_investment, total_roi,
+                       clip_count, avg_engagement_rate, collaborator_count
+                FROM campaign_cycles
+                {where}
+                ORDER BY timestamp DESC
+                LIMIT ?
+            )
+        """.format(where="WHERE genre = ?" if genre else "")
+        params = [genre, limit] if genre else [limit]
+
+        conn = sqlite3.connect(self.db_path)
+        cycles = conn.execute(
+            recent
+            + """
+            SELECT cycle_id, genre, timestamp,
+                   COALESCE(total_investment, 0), COALESCE(total_roi, 0),
+                   COALESCE(clip_count, 0), COALESCE(avg_engagement_rate, 0),
+                   COALESCE(collaborator_count, 0) > 0
+            FROM recent
+        """,
+            params,
+        ).fetchall()
+        geo = conn.execute(
+            recent
+            + """
+            SELECT g.country, AVG(COALESCE(g.estimated_roi, 0)), COUNT(*)
+            FROM recent r JOIN geo_performance g ON g.cycle_id = r.cycle_id
+            GROUP BY g.country
+            ORDER BY g.country
+        """,
+            params,
+        ).fetchall()
+        collabs = conn.execute(
+            recent
+            + """
+            SELECT cc.collaborator, AVG(COALESCE(r.total_roi, 0)), COUNT(*)
+            FROM recent r JOIN cycle_collaborators cc ON cc.cycle_id = r.cycle_id
+            GROUP BY cc.collaborator
+            ORDER BY cc.collaborator
+        """,
+            params,
+        ).fetchall()
+        conn.close()
+
+        columns = list(zip(*cycles)) or [()] * 8
+        geo_columns = list(zip(*geo)) or [()] * 3
+        collab_columns = list(zip(*collabs)) or [()] * 3
+        return CycleHistory(
+            cycle_ids=_text_array(list(columns[0])),
+            genres=_text_array([genre or "unknown" for genre in columns[1]]),
+            weekdays=_weekdays(columns[2]),
+            total_investment=np.array(columns[3], dtype=float),
+            total_roi=np.array(columns[4], dtype=float),
+            clip_counts=np.array(columns[5], dtype=int),
+            avg_engagement=np.array(columns[6], dtype=float),
+            has_collaborators=np.array(columns[7], dtype=bool),
+            geo_countries=_text_array(list(geo_columns[0])),
+            geo_roi=np.array(geo_columns[1], dtype=float),
+            geo_counts=np.array(geo_columns[2], dtype=int),
+            collaborators=_text_array(list(collab_columns[0])),
+            collaborator_roi=np.array(collab_columns[1], dtype=float),
+            collaborator_counts=np.array(collab_columns[2], dtype=int),
+        )
+
 
 class MLLearningCycle:
     """Motor de aprendizaje progresivo con reentrenamiento simulado"""
 
-    def __init__(self):
-        self.historical_manager = HistoricalDataManager()
+    def __init__(self, historical_manager: Optional[HistoricalDataManager] = None):
+        self.historical_manager = historical_manager or HistoricalDataManager()
         self.learning_rate = 0.1
         self.confidence_threshold = 0.7
 
@@ -303,8 +550,16 @@ class MLLearningCycle:
 
         return stored_id
 
+    def retrain_from_history(
+        self, genre: Optional[str] = None, limit: int = 50
+    ) -> Tuple[ModelAdjustments, ModelInsights]:
+        """Reentrena directamente sobre el historial en columnas de la base de datos"""
+        return self.simulate_model_retraining(
+            self.historical_manager.get_cycle_history(genre=genre, limit=limit)
+        )
+
     def simulate_model_retraining(
-        self, historical_cycles: List[CycleMetrics]
+        self, historical_cycles: Union[CycleHistory, List[CycleMetrics]]
     ) -> Tuple[ModelAdjustments, ModelInsights]:
         """
         Simula reentrenamiento del modelo con datos históricos
@@ -312,7 +567,10 @@ class MLLearningCycle:
         print("🧠 SIMULANDO REENTRENAMIENTO DEL MODELO ML")
         print("-" * 50)
 
-        if not historical_cycles:
+        if not isinstance(historical_cycles, CycleHistory):
+            historical_cycles = CycleHistory.from_cycles(historical_cycles)
+
+        if not len(historical_cycles):
             print("⚠️ No hay datos históricos suficientes para reentrenamiento")
             return self.get_default_adjustments()
 
@@ -358,128 +616,69 @@ class MLLearningCycle:
 
         return adjustments, insights
 
-    def analyze_genre_trends(self, cycles: List[CycleMetrics]) -> Dict[str, float]:
+    def analyze_genre_trends(self, history: CycleHistory) -> Dict[str, float]:
         """Analiza tendencias de rendimiento por género"""
-        genre_performance = defaultdict(list)
-
-        for cycle in cycles:
-            genre_performance[cycle.genre].append(cycle.total_roi)
-
-        trends = {}
-        for genre, rois in genre_performance.items():
-            avg_roi = sum(rois) / len(rois)
-            trend_score = min(avg_roi / 150, 2.0)  # Normalizar y limitar
-            trends[genre] = trend_score
-
-        return trends
+        genres, avg_roi, _ = _grouped_mean(history.genres, history.total_roi)
+        trend_scores = np.minimum(avg_roi / 150, 2.0)  # Normalizar y limitar
+        return dict(zip(genres.tolist(), trend_scores.tolist()))
 
-    def analyze_geo_patterns(self, cycles: List[CycleMetrics]) -> Dict[str, float]:
+    def analyze_geo_patterns(self, history: CycleHistory) -> Dict[str, float]:
         """Analiza patrones de optimización geográfica"""
-        geo_performance = defaultdict(list)
+        pattern_scores = np.minimum(history.geo_roi / 100, 1.5)
+        return dict(zip(history.geo_countries.tolist(), pattern_scores.tolist()))
 
-        for cycle in cycles:
-            for country, metrics in cycle.geo_performance.items():
-                roi = metrics.get("roi_projection", 0)
-                geo_performance[country].append(roi)
-
-        patterns = {}
-        for country, rois in geo_performance.items():
-            if rois:
-                avg_roi = sum(rois) / len(rois)
-                pattern_score = min(avg_roi / 100, 1.5)
-                patterns[country] = pattern_score
-
-        return patterns
-
-    def analyze_budget_efficiency(self, cycles: List[CycleMetrics]) -> Dict[str, float]:
+    def analyze_budget_efficiency(self, history: CycleHistory) -> Dict[str, float]:
         """Analiza eficiencia de diferentes estrategias de presupuesto"""
         efficiency_patterns = {}
 
         # Analizar distribución entre clips
-        clip_counts = [len(cycle.clip_performance) for cycle in cycles]
-        avg_clips = sum(clip_counts) / len(clip_counts) if clip_counts else 5
-        efficiency_patterns["optimal_clip_count"] = avg_clips
+        efficiency_patterns["optimal_clip_count"] = (
+            float(history.clip_counts.mean()) if len(history) else 5
+        )
 
         # Analizar ROI por inversión
-        high_investment_rois = []
-        low_investment_rois = []
-
-        for cycle in cycles:
-            if cycle.total_investment > 400:
-                high_investment_rois.append(cycle.total_roi)
-            else:
-                low_investment_rois.append(cycle.total_roi)
-
-        if high_investment_rois and low_investment_rois:
-            high_avg = sum(high_investment_rois) / len(high_investment_rois)
-            low_avg = sum(low_investment_rois) / len(low_investment_rois)
+        high_investment = history.total_investment > 400
+        if high_investment.any() and not high_investment.all():
+            high_avg = history.total_roi[high_investment].mean()
+            low_avg = history.total_roi[~high_investment].mean()
             efficiency_patterns["investment_efficiency"] = (
-                high_avg / low_avg if low_avg > 0 else 1.0
+                float(high_avg / low_avg) if low_avg > 0 else 1.0
             )
         else:
             efficiency_patterns["investment_efficiency"] = 1.0
 
         return efficiency_patterns
 
-    def analyze_audience_behavior(self, cycles: List[CycleMetrics]) -> Dict[str, float]:
+    def analyze_audience_behavior(self, history: CycleHistory) -> Dict[str, float]:
         """Analiza patrones de comportamiento de audiencia"""
         behavior_patterns = {}
 
         # Analizar engagement por colaboraciones
-        solo_engagements = []
-        collab_engagements = []
-
-        for cycle in cycles:
-            has_collaborators = len(cycle.collaborators) > 0
-
-            # Calcular engagement promedio del ciclo
-            total_engagement = 0
-            clip_count = 0
-
-            for clip_metrics in cycle.clip_performance.values():
-                if "engagement_rate" in clip_metrics:
-                    total_engagement += clip_metrics["engagement_rate"]
-                    clip_count += 1
-
-            avg_engagement = total_engagement / clip_count if clip_count > 0 else 0
-
-            if has_collaborators:
-                collab_engagements.append(avg_engagement)
-            else:
-                solo_engagements.append(avg_engagement)
-
-        if solo_engagements and collab_engagements:
-            solo_avg = sum(solo_engagements) / len(solo_engagements)
-            collab_avg = sum(collab_engagements) / len(collab_engagements)
+        collab = history.has_collaborators
+        if collab.any() and not collab.all():
+            solo_avg = history.avg_engagement[~collab].mean()
+            collab_avg = history.avg_engagement[collab].mean()
             behavior_patterns["collaboration_engagement_boost"] = (
-                collab_avg / solo_avg if solo_avg > 0 else 1.0
+                float(collab_avg / solo_avg) if solo_avg > 0 else 1.0
             )
         else:
             behavior_patterns["collaboration_engagement_boost"] = 1.2  # Default boost
 
         return behavior_patterns
 
-    def detect_seasonal_patterns(self, cycles: List[CycleMetrics]) -> Dict[str, float]:
+    def detect_seasonal_patterns(self, history: CycleHistory) -> Dict[str, float]:
         """Detecta patrones estacionales en el rendimiento"""
         seasonal_patterns = {}
 
         # Analizar por día de la semana
-        weekday_performance = defaultdict(list)
-
-        for cycle in cycles:
-            weekday = cycle.timestamp.weekday()  # 0=Monday, 6=Sunday
-            weekday_performance[weekday].append(cycle.total_roi)
+        weekdays, avg_roi, _ = _grouped_mean(history.weekdays, history.total_roi)
 
         # Calcular mejores días
         best_weekday = 0
         best_avg_roi = 0
-
-        for weekday, rois in weekday_performance.items():
-            if rois:
-                avg_roi = sum(rois) / len(rois)
-                if avg_roi > best_avg_roi:
-                    best_avg_roi = avg_roi
-                    best_weekday = weekday
+        if len(avg_roi) and avg_roi.max() > 0:
+            best = int(np.argmax(avg_roi))
+            best_weekday, best_avg_roi = int(weekdays[best]), float(avg_roi[best])
 
         seasonal_patterns["optimal_weekday"] = best_weekday
         seasonal_patterns["weekday_boost"] = (
@@ -488,31 +687,21 @@ class MLLearningCycle:
 
         return seasonal_patterns
 
-    def analyze_collaboration_effects(self, cycles: List[CycleMetrics]) -> Dict[str, float]:
+    def analyze_collaboration_effects(self, history: CycleHistory) -> Dict[str, float]:
         """Analiza efectos específicos de colaboraciones"""
         collaboration_effects = {}
 
-        # Contar colaboradores exitosos
-        collaborator_success = defaultdict(list)
-
-        for cycle in cycles:
-            for collaborator in cycle.collaborators:
-                collaborator_success[collaborator].append(cycle.total_roi)
-
-        # Identificar colaboradores top
-        top_collaborators = {}
-        for collaborator, rois in collaborator_success.items():
-            if len(rois) >= 2:  # Mínimo 2 colaboraciones
-                avg_roi = sum(rois) / len(rois)
-                top_collaborators[collaborator] = avg_roi
-
-        collaboration_effects["top_collaborators"] = top_collaborators
-        collaboration_effects["collaboration_sample_size"] = len(collaborator_success)
+        # Identificar colaboradores top (mínimo 2 colaboraciones)
+        top = history.collaborator_counts >= 2
+        collaboration_effects["top_collaborators"] = dict(
+            zip(history.collaborators[top].tolist(), history.collaborator_roi[top].tolist())
+        )
+        collaboration_effects["collaboration_sample_size"] = len(history.collaborators)
 
         return collaboration_effects
 
     def calculate_model_adjustments(
-        self, insights: ModelInsights, cycles: List[CycleMetrics]
+        self, insights: ModelInsights, cycles: CycleHistory
     ) -> ModelAdjustments:
         """Calcula ajustes específicos del modelo basados en insights"""
 
@@ -769,11 +958,8 @@ if __name__ == "__main__":
     # Guardar ciclo
     cycle_id = ml_cycle.save_campaign_cycle_data(campaign_results_example)
 
-    # Obtener historial
-    historical_cycles = ml_cycle.historical_manager.get_historical_cycles(genre="trap")
-
-    # Simular reentrenamiento
-    adjustments, insights = ml_cycle.simulate_model_retraining(historical_cycles)
+    # Reentrenar sobre el historial en columnas
+    adjustments, insights = ml_cycle.retrain_from_history(genre="trap")
 
     # Predecir próxima campaña
     next_campaign_proposal = {"genre": "trap", "budget_total": 500, "collaborators": ["anuel_aa"]}
@@ -3,16 +3,18 @@ Advanced Campaign System - Ultralytics Integration
 Flujo completo: 5 clips → selección → reasignación presupuesto → escalado automático → reinversión YouTube
 """
 
+import hashlib
 import json
 import os
 import random
 import shutil
 import subprocess
 import tempfile
-from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
@@ -50,6 +52,7 @@ class ClipAnalysis:
     genre_classification: Dict[str, float]  # Género musical detectado
     mood_analysis: Dict[str, float]  # Análisis de mood/ambiente
     target_audience: List[str]  # Audiencia objetivo inferida
+    frames_analyzed: int = 0  # Frames muestreados (según frame_stride)
 
 
 @dataclass
@@ -124,14 +127,15 @@ class DummyYOLOAnalyzer:
             "mansion_interior",
         ]
 
-    def analyze_video_clip(self, video_path: str) -> ClipAnalysis:
-        """Simula análisis completo de un clip de video"""
+    def analyze_video_clip(self, video_path: str, frame_stride: int = 1) -> ClipAnalysis:
+        """Simula análisis completo de un clip de video (1 de cada ``frame_stride`` frames)"""
         print(f"🎬 Analizando clip: {Path(video_path).name}")
 
         # Simular propiedades básicas del video
         duration = random.uniform(15, 45)  # Entre 15-45 segundos
         resolution = random.choice([(1920, 1080), (1080, 1920), (1280, 720)])
         frame_count = int(duration * 30)  # 30 fps
+        sampled_frames = range(1, frame_count + 1, max(frame_stride, 1))
 
         # Simular detecciones de objetos
         num_detections = random.randint(3, 12)
@@ -148,7 +152,7 @@ class DummyYOLOAnalyzer:
                     random.randint(100, 300),
                     random.randint(100, 300),
                 ],
-                "frame_number": random.randint(1, frame_count),
+                "frame_number": random.choice(sampled_frames),
             }
             object_detections.append(detection)
 
@@ -235,9 +239,149 @@ class DummyYOLOAnalyzer:
             genre_classification=genre_classification,
             mood_analysis=mood_analysis,
             target_audience=target_audience,
+            frames_analyzed=len(sampled_frames),
         )
 
 
+# Analizador del proceso worker: se carga una vez por proceso, no por clip
+_worker_analyzer: Optional[DummyYOLOAnalyzer] = None
+
+
+def _init_analysis_worker():
+    global _worker_analyzer
+    random.seed()  # Los procesos creados con fork heredan el mismo estado aleatorio
+    _worker_analyzer = DummyYOLOAnalyzer()
+
+
+def _analyze_in_worker(clip_path: str, frame_stride: int) -> ClipAnalysis:
+    return _worker_analyzer.analyze_video_clip(clip_path, frame_stride=frame_stride)
+
+
+class ClipAnalysisPool:
+    """Análisis de clips en paralelo con un pool de procesos y cache por contenido.
+
+    Cada worker precarga su propio analizador. Los resultados se entregan a
+    medida que terminan (``analyze_iter``) y se cachean por hash SHA-256 del
+    fichero, así que volver a lanzar una campaña solo analiza clips nuevos.
+    Con ``workers=1`` se analiza en el propio proceso.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        frame_stride: int = 5,
+        cache_dir: Optional[str] = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.frame_stride = frame_stride
+        self.cache_dir = cache_dir
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._local_analyzer: Optional[DummyYOLOAnalyzer] = None
+        self.model_name = DummyYOLOAnalyzer().model_name
+        self._memory_cache: Dict[str, ClipAnalysis] = {}
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self.stats = {"analyzed": 0, "cache_hits": 0}
+
+    def __enter__(self) -> "ClipAnalysisPool":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def cache_key(self, clip_path: str) -> Optional[str]:
+        """Hash del contenido (+ stride y modelo); None si el fichero no existe"""
+        try:
+            stat = os.stat(clip_path)
+        except OSError:
+            return None
+        memo = (os.path.abspath(clip_path), stat.st_size, stat.st_mtime_ns)
+        if memo not in self._hashes:
+            digest = hashlib.sha256()
+            with open(clip_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+            self._hashes[memo] = digest.hexdigest()
+        return f"{self._hashes[memo]}_s{self.frame_stride}_{self.model_name}"
+
+    def _cached(self, key: Optional[str], clip_path: str) -> Optional[ClipAnalysis]:
+        if key is None:
+            return None
+        analysis = self._memory_cache.get(key)
+        if analysis is None and self.cache_dir:
+            try:
+                with open(os.path.join(self.cache_dir, f"{key}.json"), "r") as f:
+                    data = json.load(f)
+                data["resolution"] = tuple(data["resolution"])
+                analysis = ClipAnalysis(**data)
+                self._memory_cache[key] = analysis
+            except (OSError, ValueError, TypeError):
+                return None
+        if analysis is None:
+            return None
+        # El mismo contenido puede estar en otra ruta
+        return replace(analysis, clip_id=Path(clip_path).stem, file_path=clip_path)
+
+    def _store(self, key: Optional[str], analysis: ClipAnalysis):
+        if key is None:
+            return
+        self._memory_cache[key] = analysis
+        if self.cache_dir:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = os.path.join(self.cache_dir, f"{key}.json.tmp")
+            with open(tmp_path, "w") as f:
+                json.dump(asdict(analysis), f)
+            os.replace(tmp_path, os.path.join(self.cache_dir, f"{key}.json"))
+
+    def analyze_iter(self, clip_paths: List[str]) -> Iterator[Tuple[int, ClipAnalysis]]:
+        """(índice, análisis) en orden de finalización: primero los cacheados"""
+        pending = []
+        for index, clip_path in enumerate(clip_paths):
+            key = self.cache_key(clip_path)
+            cached = self._cached(key, clip_path)
+            if cached is not None:
+                self.stats["cache_hits"] += 1
+                yield index, cached
+            else:
+                pending.append((index, clip_path, key))
+
+        if self.workers <= 1 or len(pending) <= 1:
+            if self._local_analyzer is None:
+                self._local_analyzer = DummyYOLOAnalyzer()
+            for index, clip_path, key in pending:
+                analysis = self._local_analyzer.analyze_video_clip(clip_path, self.frame_stride)
+                self._store(key, analysis)
+                self.stats["analyzed"] += 1
+                yield index, analysis
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_analysis_worker
+            )
+        futures = {
+            self._executor.submit(_analyze_in_worker, clip_path, self.frame_stride): (index, key)
+            for index, clip_path, key in pending
+        }
+        for future in as_completed(futures):
+            index, key = futures[future]
+            analysis = future.result()
+            self._store(key, analysis)
+            self.stats["analyzed"] += 1
+            yield index, analysis
+
+    def analyze(self, clip_paths: List[str]) -> List[ClipAnalysis]:
+        """Análisis de todos los clips, en el orden de entrada"""
+        results: List[Optional[ClipAnalysis]] = [None] * len(clip_paths)
+        for index, analysis in self.analyze_iter(clip_paths):
+            results[index] = analysis
+        return results
+
+
 class PerformancePredictor:
     """Predictor de rendimiento de clips basado en análisis visual y datos históricos"""
 
@@ -372,8 +516,15 @@ class PerformancePredictor:
 class UltralyticsClipSelector:
     """Selector de clips usando análisis Ultralytics y ML"""
 
-    def __init__(self):
-        self.yolo_analyzer = DummyYOLOAnalyzer()
+    def __init__(
+        self,
+        analysis_workers: Optional[int] = None,
+        frame_stride: int = 5,
+        analysis_cache_dir: Optional[str] = None,
+    ):
+        self.analysis_pool = ClipAnalysisPool(
+            workers=analysis_workers, frame_stride=frame_stride, cache_dir=analysis_cache_dir
+        )
         self.performance_predictor = PerformancePredictor()
         self.performance_predictor.load_historical_data()
 
@@ -385,22 +536,33 @@ class UltralyticsClipSelector:
             "genre_confidence": 0.20,
         }
 
+    def __enter__(self) -> "UltralyticsClipSelector":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Cierra el pool de análisis"""
+        self.analysis_pool.close()
+
     def analyze_clip_batch(self, clip_paths: List[str]) -> List[ClipAnalysis]:
         """Analiza un batch de clips con Ultralytics"""
         print("🎬 ANÁLISIS DE CLIPS CON ULTRALYTICS")
         print("-" * 45)
 
-        analyses = []
-        for i, clip_path in enumerate(clip_paths, 1):
-            print(f"📹 Clip {i}/{len(clip_paths)}: {Path(clip_path).name}")
+        analyses: List[Optional[ClipAnalysis]] = [None] * len(clip_paths)
+        before = dict(self.analysis_pool.stats)
+
+        # Análisis con YOLO en paralelo; se muestra cada clip al terminar
+        for done, (index, analysis) in enumerate(self.analysis_pool.analyze_iter(clip_paths), 1):
+            clip_path = clip_paths[index]
+            print(f"📹 Clip {done}/{len(clip_paths)}: {Path(clip_path).name}")
 
             # Verificar que el archivo existe (simulado)
             if not Path(clip_path).exists():
                 print(f"   ⚠️ Archivo no encontrado, usando análisis simulado")
 
-            # Análisis con YOLO
-            analysis = self.yolo_analyzer.analyze_video_clip(clip_path)
-
             # Mostrar resumen del análisis
             print(f"   🎯 Calidad visual: {analysis.visual_quality_score:.2f}")
             print(f"   🚀 Potencial viral: {analysis.virality_potential:.2f}")
@@ -410,8 +572,10 @@ class UltralyticsClipSelector:
             print(f"   📊 Objetos detectados: {len(analysis.object_detections)}")
             print()
 
-            analyses.append(analysis)
+            analyses[index] = analysis
 
+        stats = {key: value - before[key] for key, value in self.analysis_pool.stats.items()}
+        print(f"⚡ Analizados: {stats['analyzed']} | Desde cache: {stats['cache_hits']}")
         return analyses
 
     def select_best_clips(
@@ -679,6 +843,16 @@ class UltralyticsIntegration:
         self.max_clips_to_select = 3
         self.total_scaling_budget = 500
 
+    def __enter__(self) -> "UltralyticsIntegration":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Libera los recursos del selector de clips"""
+        self.clip_selector.close()
+
     def execute_complete_flow(
         self, clip_directory: str = "/workspaces/master/data/video_clips/"
     ) -> Dict:
@@ -773,11 +947,9 @@ if __name__ == "__main__":
     print("🎬 TEST ULTRALYTICS INTEGRATION")
     print("=" * 40)
 
-    # Crear instancia de integración
-    ultralytics_integration = UltralyticsIntegration()
-
-    # Ejecutar flujo completo
-    results = ultralytics_integration.execute_complete_flow()
+    # Crear instancia de integración y ejecutar flujo completo
+    with UltralyticsIntegration() as ultralytics_integration:
+        results = ultralytics_integration.execute_complete_flow()
 
     # Mostrar resumen final
     print("📊 RESUMEN FINAL:")
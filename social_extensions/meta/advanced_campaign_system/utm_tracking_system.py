@@ -6,10 +6,17 @@ Integración completa con ML Learning Cycle para optimización automática
 basada en datos de conversión y engagement por UTM parameters
 """
 
+import atexit
 import hashlib
+import itertools
 import json
+import os
+import queue
 import sqlite3
+import threading
+import time
 import uuid
+from collections import deque
 from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta
 from typing import Any, Dict, List, Optional, Tuple
@@ -58,18 +65,347 @@ class UTMVisitData:
     conversion: bool = False
     conversion_type: Optional[str] = None
     conversion_value: Optional[float] = None
+    geo_country: Optional[str] = None
+    device_type: Optional[str] = None
+
+
+# Columnas aditivas de utm_metrics y de los rollups
+ROLLUP_COLUMNS = (
+    "total_visits",
+    "total_conversions",
+    "total_value",
+    "total_session_duration",
+    "sessions_with_duration",
+)
+# Rollups por (utm_id, periodo, país, dispositivo): tabla -> prefijo ISO del timestamp
+ROLLUP_TABLES = {"utm_metrics_hourly": 13, "utm_metrics_daily": 10}
+
+
+def _visit_contribution(row: str) -> Dict[str, str]:
+    """Aporte de una fila de utm_visits (``NEW``/``OLD``) a cada columna aditiva"""
+    return {
+        "total_visits": "1",
+        "total_conversions": f"(CASE WHEN {row}.conversion = 1 THEN 1 ELSE 0 END)",
+        "total_value": f"COALESCE({row}.conversion_value, 0)",
+        "total_session_duration": f"COALESCE({row}.session_duration, 0)",
+        "sessions_with_duration": f"({row}.session_duration IS NOT NULL)",
+    }
+
+
+def _rollup_keys(table: str, row: str) -> Dict[str, str]:
+    if table == "utm_metrics":
+        return {"utm_id": f"{row}.utm_id"}
+    return {
+        "utm_id": f"{row}.utm_id",
+        "period": f"substr({row}.timestamp, 1, {ROLLUP_TABLES[table]})",
+        "geo_country": f"COALESCE({row}.geo_country, 'unknown')",
+        "device_type": f"COALESCE({row}.device_type, 'unknown')",
+    }
+
+
+def _rollup_upsert(table: str, row: str, sign: str = "") -> str:
+    """Sumar (o restar con ``sign="-"``) el aporte de una visita a una tabla"""
+    keys = _rollup_keys(table, row)
+    contribution = _visit_contribution(row)
+    columns = ", ".join([*keys, *ROLLUP_COLUMNS])
+    values = ", ".join([*keys.values(), *(f"{sign}{contribution[c]}" for c in ROLLUP_COLUMNS)])
+    updates = ", ".join(f"{c} = {c} + excluded.{c}" for c in ROLLUP_COLUMNS)
+    return (
+        f"INSERT INTO {table} ({columns}) VALUES ({values}) "
+        f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {updates};"
+    )
+
+
+_DERIVED_METRICS = """
+    UPDATE utm_metrics SET
+        conversion_rate = CASE WHEN total_visits > 0
+            THEN total_conversions * 100.0 / total_visits ELSE 0 END,
+        avg_session_duration = CASE WHEN sessions_with_duration > 0
+            THEN total_session_duration * 1.0 / sessions_with_duration ELSE 0 END,
+        last_updated = CURRENT_TIMESTAMP
+    WHERE utm_id IN ({utm_ids});
+"""
+
+
+def _rollup_triggers() -> List[str]:
+    """Triggers que mantienen utm_metrics y los rollups al escribir visitas"""
+    tables = ["utm_metrics", *ROLLUP_TABLES]
+    insert = "".join(_rollup_upsert(table, "NEW") for table in tables)
+    delete = "".join(_rollup_upsert(table, "OLD", "-") for table in tables)
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_utm_visits_insert AFTER INSERT ON utm_visits
+        BEGIN {insert} {_DERIVED_METRICS.format(utm_ids="NEW.utm_id")} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_utm_visits_update AFTER UPDATE ON utm_visits
+        BEGIN {delete} {insert}
+        {_DERIVED_METRICS.format(utm_ids="OLD.utm_id, NEW.utm_id")} END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_utm_visits_delete AFTER DELETE ON utm_visits
+        BEGIN {delete} {_DERIVED_METRICS.format(utm_ids="OLD.utm_id")} END""",
+    ]
+
+
+def _rebuild_statements() -> List[str]:
+    """Recalcular utm_metrics y los rollups desde utm_visits"""
+    aggregates = """COUNT(*),
+        SUM(CASE WHEN conversion = 1 THEN 1 ELSE 0 END),
+        COALESCE(SUM(conversion_value), 0),
+        COALESCE(SUM(session_duration), 0),
+        COUNT(session_duration)"""
+    columns = ", ".join(ROLLUP_COLUMNS)
+    statements = [f"DELETE FROM {table}" for table in ("utm_metrics", *ROLLUP_TABLES)]
+    statements.append(
+        f"""INSERT INTO utm_metrics (utm_id, {columns}, conversion_rate, avg_session_duration)
+        SELECT utm_id, {aggregates},
+               SUM(CASE WHEN conversion = 1 THEN 1 ELSE 0 END) * 100.0 / COUNT(*),
+               COALESCE(AVG(session_duration), 0)
+        FROM utm_visits GROUP BY utm_id"""
+    )
+    for table, prefix in ROLLUP_TABLES.items():
+        statements.append(
+            f"""INSERT INTO {table} (utm_id, period, geo_country, device_type, {columns})
+            SELECT utm_id, substr(timestamp, 1, {prefix}), COALESCE(geo_country, 'unknown'),
+                   COALESCE(device_type, 'unknown'), {aggregates}
+            FROM utm_visits GROUP BY 1, 2, 3, 4"""
+        )
+    return statements
+
+
+class _WriterCall:
+    """Función a ejecutar en el hilo escritor con su conexión"""
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+    def run(self, conn: sqlite3.Connection):
+        try:
+            with conn:
+                self.result = self.fn(conn)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+
+class UTMWriter:
+    """Hilo escritor único con una conexión SQLite persistente (WAL).
+
+    Las escrituras se encolan sin bloquear y se confirman en lotes con
+    ``executemany`` en una sola transacción, cuando el lote llega a
+    ``batch_size`` o cuando la escritura más antigua lleva
+    ``flush_interval`` segundos esperando. El orden de las escrituras se
+    conserva (una conversión nunca se aplica antes que su visita). Con
+    ``max_pending`` escrituras en cola, ``submit`` espera (backpressure).
+
+    Un error inesperado en un lote se registra y el hilo sigue; si el hilo
+    muere (p. ej. no puede abrir la base de datos), ``submit`` falla y
+    ``flush`` devuelve False en lugar de perder escrituras en silencio.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        max_pending: int = 100_000,
+    ):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.latencies: deque = deque(maxlen=10000)  # encolado -> commit (s)
+        self.rows_written = 0
+        self.batches_written = 0
+        self.errors = 0
+        self.failure: Optional[BaseException] = None
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="utm-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, sql: str, params: Tuple):
+        if self.closed:
+            raise RuntimeError(f"UTMWriter cerrado: {self.failure}")
+        self._queue.put((sql, params, time.perf_counter()))
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que todo lo encolado hasta ahora esté confirmado"""
+        if not self._thread.is_alive():
+            # Solo está todo confirmado si no quedó nada en la cola
+            return self.failure is None and self._queue.empty()
+        done = threading.Event()
+        self._queue.put(done)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        # Esperar por tramos para no quedarse colgado si el hilo muere
+        while not done.wait(0.1):
+            if not self._thread.is_alive():
+                return False
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+        return True
+
+    def call(self, fn, timeout: Optional[float] = None):
+        """Ejecutar ``fn(conn)`` en su propia transacción, tras lo ya encolado"""
+        if self.closed:
+            raise RuntimeError("UTMWriter cerrado")
+        request = _WriterCall(fn)
+        self._queue.put(request)
+        if not request.done.wait(timeout):
+            raise TimeoutError("UTMWriter.call no terminó a tiempo")
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    @property
+    def closed(self) -> bool:
+        return not self._thread.is_alive()
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def get_stats(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(q: float) -> float:
+            if not latencies:
+                return 0.0
+            return latencies[min(int(len(latencies) * q), len(latencies) - 1)] * 1000
+
+        return {
+            "rows_written": self.rows_written,
+            "batches_written": self.batches_written,
+            "errors": self.errors,
+            "pending": self._queue.qsize(),
+            "p50_latency_ms": percentile(0.50),
+            "p99_latency_ms": percentile(0.99),
+        }
+
+    def _run(self):
+        try:
+            self._serve()
+        except BaseException as e:
+            self.failure = e
+            print(f"❌ Hilo escritor UTM detenido ({self.db_path}): {e}")
+            raise
+
+    def _serve(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+
+        pending = []
+        waiters = []
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(pending[0][2] + self.flush_interval - time.perf_counter(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = False  # venció el intervalo
+
+            if isinstance(item, tuple):
+                pending.append(item)
+                if len(pending) < self.batch_size:
+                    continue
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+
+            try:
+                self._commit(conn, pending)
+            except Exception as e:
+                # No tirar el hilo: el lote se pierde, pero se cuenta y se avisa
+                self.errors += len(pending)
+                print(f"❌ Error inesperado confirmando lote UTM: {e}")
+            pending = []
+            if isinstance(item, _WriterCall):
+                item.run(conn)
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+            if item is None:
+                break
+
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, pending: List[Tuple]):
+        if not pending:
+            return
+        try:
+            with conn:
+                for sql, group in itertools.groupby(pending, key=lambda item: item[0]):
+                    conn.executemany(sql, [params for _, params, _ in group])
+        except sqlite3.Error:
+            # Reintentar una a una para no perder el lote por una fila inválida
+            for sql, params, _ in pending:
+                try:
+                    with conn:
+                        conn.execute(sql, params)
+                except sqlite3.Error as e:
+                    self.errors += 1
+                    print(f"❌ Error guardando en UTM DB: {e}")
+
+        committed = time.perf_counter()
+        self.latencies.extend(committed - enqueued for _, _, enqueued in pending)
+        self.rows_written += len(pending)
+        self.batches_written += 1
+
+
+# Un escritor por fichero de base de datos, compartido entre instancias
+_writers: Dict[str, UTMWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def _get_writer(db_path: str, batch_size: int, flush_interval: float) -> UTMWriter:
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer.closed:
+            writer = _writers[key] = UTMWriter(db_path, batch_size, flush_interval)
+        return writer
+
+
+@atexit.register
+def _close_writers():
+    with _writers_lock:
+        for writer in _writers.values():
+            writer.close()
+        _writers.clear()
 
 
 class UTMDatabase:
     """Manejo de base de datos SQLite para UTMs"""
 
-    def __init__(self, db_path: str = "data/utm_tracking.db"):
+    def __init__(
+        self,
+        db_path: str = "data/utm_tracking.db",
+        batch_size: int = 500,
+        flush_interval: float = 0.05,
+        query_flush_timeout: float = 5.0,
+    ):
         self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
         self._init_database()
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self.query_flush_timeout = query_flush_timeout
+        self._writer = _get_writer(db_path, batch_size, flush_interval)
+        self._local = threading.local()
+
+    @property
+    def writer(self) -> UTMWriter:
+        """Escritor compartido; se reemplaza si su hilo murió"""
+        if self._writer.closed:
+            self._writer = _get_writer(self.db_path, self._batch_size, self._flush_interval)
+        return self._writer
 
     def _init_database(self):
         """Inicializar tablas de base de datos"""
-        conn = sqlite3.connect(self.db_path)
+        conn = sqlite3.connect(self.db_path, timeout=30)
         cursor = conn.cursor()
 
         # Tabla de UTMs generados
@@ -124,20 +460,80 @@ class UTMDatabase:
                 total_value REAL DEFAULT 0.0,
                 avg_session_duration REAL DEFAULT 0.0,
                 last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                total_session_duration REAL DEFAULT 0.0,
+                sessions_with_duration INTEGER DEFAULT 0,
                 FOREIGN KEY (utm_id) REFERENCES utm_campaigns (utm_id)
             )
         """
         )
+        # Bases creadas antes de mantener utm_metrics incrementalmente
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(utm_metrics)")}
+        for column, ddl in (
+            ("total_session_duration", "REAL DEFAULT 0.0"),
+            ("sessions_with_duration", "INTEGER DEFAULT 0"),
+        ):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE utm_metrics ADD COLUMN {column} {ddl}")
+
+        # Rollups horarios/diarios por UTM, país y dispositivo
+        for table in ROLLUP_TABLES:
+            cursor.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    utm_id TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    geo_country TEXT NOT NULL,
+                    device_type TEXT NOT NULL,
+                    total_visits INTEGER DEFAULT 0,
+                    total_conversions INTEGER DEFAULT 0,
+                    total_value REAL DEFAULT 0.0,
+                    total_session_duration REAL DEFAULT 0.0,
+                    sessions_with_duration INTEGER DEFAULT 0,
+                    PRIMARY KEY (utm_id, period, geo_country, device_type)
+                )
+            """
+            )
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_period ON {table} (period)")
+
+        # Triggers: las métricas se actualizan en la misma transacción que la visita
+        has_triggers = cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'trg_utm_visits_insert'"
+        ).fetchone()
+        for trigger in _rollup_triggers():
+            cursor.execute(trigger)
+        if not has_triggers:
+            for statement in _rebuild_statements():
+                cursor.execute(statement)
+
+        # Índices para las consultas por UTM y por rango de fechas
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_utm_visits_utm_id ON utm_visits (utm_id)")
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_utm_visits_timestamp ON utm_visits (timestamp)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_utm_campaigns_status ON utm_campaigns (status)"
+        )
 
         conn.commit()
+        conn.execute("PRAGMA journal_mode=WAL").fetchone()
         conn.close()
 
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Confirmar en disco todas las escrituras pendientes"""
+        return self.writer.flush(timeout)
+
+    def query(self, sql: str, params: Tuple = ()) -> List[Tuple]:
+        """Consulta de lectura (ve todas las escrituras hechas antes de la llamada)"""
+        if not self.flush(self.query_flush_timeout):
+            print("⚠️ Escrituras UTM sin confirmar; la consulta puede no verlas")
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.db_path, timeout=30)
+        return conn.execute(sql, params).fetchall()
+
     def save_utm_campaign(self, utm_params: UTMParameters, campaign_context: Dict[str, Any]):
         """Guardar campaña UTM en base de datos"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        self.writer.submit(
             """
             INSERT OR REPLACE INTO utm_campaigns 
             (utm_id, campaign_name, clip_name, subgenre, collaboration,
@@ -158,20 +554,15 @@ class UTMDatabase:
             ),
         )
 
-        conn.commit()
-        conn.close()
-
     def save_visit(self, visit_data: UTMVisitData):
-        """Guardar visita con datos UTM"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        """Guardar visita con datos UTM (encolada; se escribe en el próximo lote)"""
+        self.writer.submit(
             """
             INSERT INTO utm_visits 
             (visit_id, utm_id, timestamp, ip_address, user_agent, 
-             session_duration, conversion, conversion_type, conversion_value)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+             session_duration, conversion, conversion_type, conversion_value,
+             geo_country, device_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """,
             (
                 visit_data.visit_id,
@@ -183,45 +574,84 @@ class UTMDatabase:
                 visit_data.conversion,
                 visit_data.conversion_type,
                 visit_data.conversion_value,
+                visit_data.geo_country,
+                visit_data.device_type,
             ),
         )
 
-        conn.commit()
-        conn.close()
+    def update_visit_conversion(
+        self, visit_id: str, conversion_type: str, conversion_value: float = 0.0
+    ):
+        """Marcar una visita como convertida (ordenado tras su inserción)"""
+        self.writer.submit(
+            """
+            UPDATE utm_visits 
+            SET conversion = TRUE, conversion_type = ?, conversion_value = ?
+            WHERE visit_id = ?
+        """,
+            (conversion_type, conversion_value, visit_id),
+        )
 
     def get_utm_metrics(self, utm_id: str) -> Dict[str, Any]:
-        """Obtener métricas por UTM ID"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        """Obtener métricas por UTM ID (desde utm_metrics, sin recorrer visitas)"""
+        rows = self.query(
             """
-            SELECT COUNT(*) as total_visits,
-                   SUM(CASE WHEN conversion = 1 THEN 1 ELSE 0 END) as conversions,
-                   AVG(session_duration) as avg_duration,
-                   SUM(conversion_value) as total_value
-            FROM utm_visits 
+            SELECT total_visits, total_conversions, conversion_rate,
+                   avg_session_duration, total_value
+            FROM utm_metrics
             WHERE utm_id = ?
         """,
             (utm_id,),
         )
 
-        result = cursor.fetchone()
-        conn.close()
+        total_visits, conversions, conversion_rate, avg_duration, total_value = (
+            rows[0] if rows else (0, 0, 0.0, 0.0, 0.0)
+        )
+        return {
+            "utm_id": utm_id,
+            "total_visits": total_visits or 0,
+            "total_conversions": conversions or 0,
+            "conversion_rate": conversion_rate or 0,
+            "avg_session_duration": avg_duration or 0,
+            "total_value": total_value or 0,
+        }
 
-        if result:
-            total_visits, conversions, avg_duration, total_value = result
-            conversion_rate = (conversions / total_visits * 100) if total_visits > 0 else 0
-
-            return {
-                "utm_id": utm_id,
-                "total_visits": total_visits or 0,
-                "total_conversions": conversions or 0,
-                "conversion_rate": conversion_rate,
-                "avg_session_duration": avg_duration or 0,
-                "total_value": total_value or 0,
-            }
-        return {}
+    def get_utm_rollups(
+        self,
+        granularity: str = "hourly",
+        utm_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """Métricas por periodo (``hourly``/``daily``), país y dispositivo"""
+        table = f"utm_metrics_{granularity}"
+        if table not in ROLLUP_TABLES:
+            raise ValueError(f"Granularidad no soportada: {granularity}")
+
+        conditions, params = [], []
+        if utm_id is not None:
+            conditions.append("utm_id = ?")
+            params.append(utm_id)
+        if since is not None:
+            conditions.append("period >= ?")
+            params.append(since.isoformat()[: ROLLUP_TABLES[table]])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        columns = ["utm_id", "period", "geo_country", "device_type", *ROLLUP_COLUMNS]
+        rows = self.query(
+            f"SELECT {', '.join(columns)} FROM {table} {where} ORDER BY period, utm_id",
+            tuple(params),
+        )
+        return [dict(zip(columns, row)) for row in rows]
+
+    def rebuild_metrics(self) -> int:
+        """Reconstruir utm_metrics y los rollups desde utm_visits; devuelve nº de UTMs"""
+
+        def rebuild(conn: sqlite3.Connection) -> int:
+            for statement in _rebuild_statements():
+                conn.execute(statement)
+            return conn.execute("SELECT COUNT(*) FROM utm_metrics").fetchone()[0]
+
+        return self.writer.call(rebuild)
 
 
 class UTMGenerator:
@@ -398,6 +828,8 @@ class UTMLandingPageCapture:
             utm_params=utm_params,
             ip_address=visitor_data.get("ip_address", "127.0.0.1"),
             user_agent=visitor_data.get("user_agent", "unknown"),
+            geo_country=visitor_data.get("geo_country"),
+            device_type=visitor_data.get("device_type"),
         )
 
         # 4. Guardar en base de datos
@@ -417,20 +849,7 @@ class UTMLandingPageCapture:
     ):
         """Actualizar visita con datos de conversión"""
 
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
-            """
-            UPDATE utm_visits 
-            SET conversion = TRUE, conversion_type = ?, conversion_value = ?
-            WHERE visit_id = ?
-        """,
-            (conversion_type, conversion_value, visit_id),
-        )
-
-        conn.commit()
-        conn.close()
+        self.db.update_visit_conversion(visit_id, conversion_type, conversion_value)
 
         print(f"🎯 CONVERSIÓN REGISTRADA: {visit_id} → {conversion_type} (${conversion_value:.2f})")
 
@@ -444,10 +863,7 @@ class UTMMLIntegration:
     def get_utm_performance_data(self) -> List[Dict[str, Any]]:
         """Obtener datos de performance UTM para alimentar ML"""
 
-        conn = sqlite3.connect(self.db.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute(
+        results = self.db.query(
             """
             SELECT 
                 c.utm_id,
@@ -455,20 +871,16 @@ class UTMMLIntegration:
                 c.clip_name,
                 c.subgenre,
                 c.collaboration,
-                COUNT(v.visit_id) as total_visits,
-                SUM(CASE WHEN v.conversion = 1 THEN 1 ELSE 0 END) as conversions,
-                AVG(v.session_duration) as avg_session_duration,
-                SUM(v.conversion_value) as total_revenue
+                COALESCE(m.total_visits, 0) as total_visits,
+                COALESCE(m.total_conversions, 0) as conversions,
+                m.avg_session_duration,
+                m.total_value as total_revenue
             FROM utm_campaigns c
-            LEFT JOIN utm_visits v ON c.utm_id = v.utm_id
+            LEFT JOIN utm_metrics m ON c.utm_id = m.utm_id
             WHERE c.status = 'active'
-            GROUP BY c.utm_id
         """
         )
 
-        results = cursor.fetchall()
-        conn.close()
-
         performance_data = []
         for row in results:
             (
@@ -0,0 +1,162 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("psutil")
+
+from device_farm_v5.src.core import adb_manager
+from device_farm_v5.src.core.adb_manager import _SECTION_MARKER, ADBDeviceManager, ADBError
+from device_farm_v5.src.core.adb_shell_pool import ADBShellTimeoutError, ADBShellUnsupportedError
+
+_OUTPUTS = {
+    "getprop ro.product.model": "Pixel 7",
+    "getprop ro.build.version.release": "14",
+    "wm size": "Physical size: 1080x2400",
+    "dumpsys battery | grep level": "  level: 87",
+    "ip route | grep wlan0": "192.168.1.0/24 dev wlan0 proto kernel scope link src 192.168.1.42",
+}
+
+
+class FakeADB:
+    """Stands in for `adb`, answering combined shell scripts section by section"""
+
+    def __init__(self, serials, outputs=None):
+        self.serials = serials
+        self.outputs = dict(outputs or _OUTPUTS)
+        self.scripts = []
+
+    async def __call__(self, args, device_serial=None):
+        if args[0] == "devices":
+            lines = ["List of devices attached"]
+            lines += [f"{serial}          device usb:1-1 model:Pixel_7" for serial in self.serials]
+            return "\n".join(lines), ""
+
+        script = args[1]
+        self.scripts.append((device_serial, script))
+        commands = script.split(f"; echo {_SECTION_MARKER}; ")
+        stdout = f"\n{_SECTION_MARKER}\n".join(self.outputs[command] for command in commands)
+        return stdout.strip(), ""
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    config = SimpleNamespace(
+        adb=SimpleNamespace(
+            adb_path="adb", connection_timeout=5, command_timeout=5, max_retries=1
+        ),
+        raw_config={"adb": {"detection": {"scan_concurrency": 2}}},
+    )
+    monkeypatch.setattr(adb_manager, "get_config", lambda: config)
+    manager = ADBDeviceManager()
+
+    async def no_sync(devices):
+        return None
+
+    monkeypatch.setattr(manager, "_sync_devices_to_db", no_sync)
+    return manager
+
+
+def test_combined_shell_splits_sections(manager, monkeypatch):
+    fake = FakeADB(["dev1"])
+    monkeypatch.setattr(manager, "_run_adb_command", fake)
+
+    info = asyncio.run(manager._get_device_info("dev1"))
+
+    assert len(fake.scripts) == 1
+    assert info.model == "Pixel 7"
+    assert info.android_version == "14"
+    assert info.screen_resolution == "1080x2400"
+    assert info.battery_level == 87
+    assert info.wifi_ip == "192.168.1.42"
+
+
+def test_empty_section_falls_back_to_unknown(manager, monkeypatch):
+    fake = FakeADB(["dev1"], {**_OUTPUTS, "getprop ro.product.model": "", "ip route | grep wlan0": ""})
+    monkeypatch.setattr(manager, "_run_adb_command", fake)
+
+    info = asyncio.run(manager._get_device_info("dev1"))
+
+    assert info.model == "Unknown"
+    assert info.wifi_ip is None
+    assert info.battery_level == 87
+
+
+def test_missing_section_is_an_error(manager, monkeypatch):
+    async def truncated(args, device_serial=None):
+        return f"Pixel 7\n{_SECTION_MARKER}\n14", ""
+
+    monkeypatch.setattr(manager, "_run_adb_command", truncated)
+
+    with pytest.raises(ADBError):
+        asyncio.run(manager._run_combined_shell("dev1", adb_manager._STATIC_PROPERTY_COMMANDS))
+    assert asyncio.run(manager._get_device_info("dev1")) is None
+
+
+def test_rescan_only_refreshes_dynamic_properties(manager, monkeypatch):
+    fake = FakeADB(["dev1", "dev2"])
+    monkeypatch.setattr(manager, "_run_adb_command", fake)
+
+    first = asyncio.run(manager.scan_devices())
+    fake.outputs["dumpsys battery | grep level"] = "  level: 40"
+    fake.outputs["getprop ro.product.model"] = "changed"
+    second = asyncio.run(manager.scan_devices())
+
+    assert [d.serial for d in first] == ["dev1", "dev2"]
+    assert {d.battery_level for d in second} == {40}
+    assert {d.model for d in second} == {"Pixel 7"}
+    rescan_scripts = [script for _, script in fake.scripts[2:]]
+    assert all("getprop" not in script for script in rescan_scripts)
+
+    metrics = manager._scan_metrics
+    assert metrics["scans"] == 2
+    assert metrics["full_queries"] == 2
+    assert metrics["incremental_queries"] == 2
+    assert metrics["last_scan_devices"] == 2
+
+
+def test_reconnected_device_gets_full_query(manager, monkeypatch):
+    fake = FakeADB(["dev1"])
+    monkeypatch.setattr(manager, "_run_adb_command", fake)
+
+    asyncio.run(manager.scan_devices())
+    fake.serials = []
+    assert asyncio.run(manager.scan_devices()) == []
+    fake.serials = ["dev1"]
+    asyncio.run(manager.scan_devices())
+
+    assert manager._scan_metrics["full_queries"] == 2
+    assert manager._scan_metrics["incremental_queries"] == 0
+
+
+def test_shell_falls_back_to_one_process_without_shell_v2(manager, monkeypatch):
+    calls = []
+
+    async def unsupported(serial, command, timeout):
+        raise ADBShellUnsupportedError(f"{serial} does not support shell_v2")
+
+    async def spawn(args, device_serial=None):
+        calls.append((args, device_serial))
+        return "hi", ""
+
+    monkeypatch.setattr(manager._shell_pool, "run", unsupported)
+    monkeypatch.setattr(manager, "_spawn_adb_command", spawn)
+
+    assert asyncio.run(manager._run_adb_command(["shell", "echo", "hi"], "dev1")) == ("hi", "")
+    assert asyncio.run(manager._run_adb_command(["shell", "echo", "hi"], "dev1")) == ("hi", "")
+    assert calls == [(["shell", "echo", "hi"], "dev1")] * 2
+    assert manager._legacy_shell_serials == {"dev1"}
+
+
+def test_shell_timeout_is_not_retried(manager, monkeypatch):
+    async def hung(serial, command, timeout):
+        raise ADBShellTimeoutError("timed out")
+
+    async def spawn(args, device_serial=None):
+        raise AssertionError("command must not be re-run")
+
+    monkeypatch.setattr(manager._shell_pool, "run", hung)
+    monkeypatch.setattr(manager, "_spawn_adb_command", spawn)
+
+    with pytest.raises(ADBError):
+        asyncio.run(manager._run_adb_command(["shell", "input", "tap", "1", "2"], "dev1"))
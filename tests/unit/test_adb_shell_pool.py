@@ -0,0 +1,137 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+from device_farm_v5.src.core import adb_shell_pool
+from device_farm_v5.src.core.adb_shell_pool import (
+    ADBShellOutputError,
+    ADBShellPool,
+    ADBShellSession,
+    ADBShellTimeoutError,
+    ADBShellUnsupportedError,
+)
+
+_FAKE_ADB = f"""#!{sys.executable}
+import os
+import sys
+
+args = sys.argv[1:]
+if args[:1] == ["-s"]:
+    args = args[2:]
+if args == ["features"]:
+    print(os.environ.get("FAKE_ADB_FEATURES", "shell_v2,cmd"))
+elif args == ["shell"]:
+    os.execvp("sh", ["sh"])
+elif args[:1] == ["shell"]:
+    os.execvp("sh", ["sh", "-c", " ".join(args[1:])])
+else:
+    sys.exit(1)
+"""
+
+
+@pytest.fixture
+def fake_adb(tmp_path):
+    path = tmp_path / "adb"
+    path.write_text(_FAKE_ADB)
+    path.chmod(0o755)
+    return str(path)
+
+
+def _run(session, *commands, timeout=5.0):
+    async def run():
+        try:
+            return [await session.run(command, timeout) for command in commands]
+        finally:
+            await session.close()
+
+    return asyncio.run(run())
+
+
+def test_commands_are_framed_on_one_session(fake_adb):
+    session = ADBShellSession(fake_adb, "dev1")
+
+    results = _run(
+        session,
+        "echo out; echo err >&2",
+        "printf no-newline",
+        "printf partial >&2; exit 3",
+        "echo after",
+    )
+
+    assert results == [
+        ("out\n", "err\n", 0),
+        ("no-newline", "", 0),
+        ("", "partial", 3),
+        ("after\n", "", 0),
+    ]
+    assert session.commands_run == 4
+    assert session.reconnects == 0
+
+
+def test_commands_cannot_read_the_session_stdin(fake_adb):
+    session = ADBShellSession(fake_adb, "dev1")
+
+    results = _run(session, "cat", "echo still-here")
+
+    assert results[1] == ("still-here\n", "", 0)
+
+
+def test_line_over_read_limit_closes_session(fake_adb, monkeypatch):
+    monkeypatch.setattr(adb_shell_pool, "STREAM_LINE_LIMIT", 1024)
+    session = ADBShellSession(fake_adb, "dev1")
+
+    async def run():
+        with pytest.raises(ADBShellOutputError):
+            await session.run("head -c 4096 /dev/zero | tr '\\\\0' x", 5.0)
+        assert not session.is_alive
+        result = await session.run("echo ok", 5.0)
+        await session.close()
+        return result
+
+    assert asyncio.run(run()) == ("ok\n", "", 0)
+    assert session.reconnects == 1
+
+
+def test_reconnects_after_the_shell_dies(fake_adb):
+    session = ADBShellSession(fake_adb, "dev1")
+
+    async def run():
+        first = await session.run("echo one", 5.0)
+        os.kill(session._process.pid, 9)
+        second = await session.run("echo two", 5.0)
+        await session.close()
+        return first, second
+
+    assert asyncio.run(run()) == (("one\n", "", 0), ("two\n", "", 0))
+    assert session.reconnects == 1
+
+
+def test_timeout_kills_and_reconnects(fake_adb):
+    session = ADBShellSession(fake_adb, "dev1")
+
+    async def run():
+        with pytest.raises(ADBShellTimeoutError):
+            await session.run("sleep 1", 0.2)
+        assert not session.is_alive
+        result = await session.run("echo back", 5.0)
+        await session.close()
+        return result
+
+    assert asyncio.run(run()) == ("back\n", "", 0)
+    assert session.reconnects == 1
+
+
+def test_device_without_shell_v2_is_rejected(fake_adb, monkeypatch):
+    monkeypatch.setenv("FAKE_ADB_FEATURES", "cmd,stat_v2")
+    pool = ADBShellPool(fake_adb)
+
+    async def run():
+        with pytest.raises(ADBShellUnsupportedError):
+            await pool.run("dev1", "echo hi", 5.0)
+        statistics = pool.get_statistics()
+        await pool.close_all()
+        return statistics
+
+    assert asyncio.run(run())["alive_sessions"] == 0
@@ -0,0 +1,63 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from ml_core.audience_join import audience_aggregates, spotify_index, youtube_index
+
+COUNTRIES = ["ES", "MX", "CO", "AR"]
+
+
+def _youtube(rng: random.Random, n: int):
+    return [
+        SimpleNamespace(
+            country=rng.choice(COUNTRIES),
+            age=rng.randint(14, 75),
+            retention_rate=rng.random(),
+            watch_time=rng.randint(10, 600),
+            engagement_actions=rng.choice([[], ["like"]]),
+        )
+        for _ in range(n)
+    ]
+
+
+def _spotify(rng: random.Random, n: int):
+    return [
+        SimpleNamespace(
+            country=rng.choice(COUNTRIES),
+            age=rng.randint(14, 75),
+            listening_time=rng.randint(10, 600),
+            has_saved_track=rng.random() < 0.3,
+            repeat_listens=rng.randint(0, 8),
+        )
+        for _ in range(n)
+    ]
+
+
+def test_matches_and_aggregates_equal_brute_force():
+    rng = random.Random(7)
+    youtube, spotify = _youtube(rng, 500), _spotify(rng, 400)
+    queries = [(c, a) for c in COUNTRIES + ["PE"] for a in (21, 29, 49, 70)]
+
+    yt_idx, sp_idx = youtube_index(youtube), spotify_index(spotify)
+    result = audience_aggregates(yt_idx, sp_idx, [q[0] for q in queries], [q[1] for q in queries])
+
+    for i, (country, age) in enumerate(queries):
+        expected_yt = [r for r in youtube if r.country == country and abs(age - r.age) <= 5]
+        expected_sp = [r for r in spotify if r.country == country and abs(age - r.age) <= 5]
+
+        matched_yt = yt_idx.records_in(result["youtube_lo"][i], result["youtube_hi"][i])
+        assert sorted(map(id, matched_yt)) == sorted(map(id, expected_yt))
+        assert result["cross_platform_score"][i] == len(expected_yt) + len(expected_sp)
+
+        avg_retention = np.mean([r.retention_rate for r in expected_yt]) if expected_yt else 0
+        save_rate = sum(r.has_saved_track for r in expected_sp) / max(len(expected_sp), 1)
+        assert np.isclose(result["youtube_avg_retention"][i], avg_retention)
+        assert np.isclose(result["spotify_save_rate"][i], save_rate)
+
+
+def test_empty_platforms_match_nothing():
+    result = audience_aggregates(youtube_index([]), spotify_index([]), ["ES"], [29])
+
+    assert result["cross_platform_score"].tolist() == [0]
+    assert result["youtube_avg_watch_time"].tolist() == [0.0]
@@ -0,0 +1,115 @@
+import importlib.util
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+MODULE = (
+    Path(__file__).parents[2]
+    / "social_extensions/meta/advanced_campaign_system/ml_learning_cycle.py"
+)
+_spec = importlib.util.spec_from_file_location("ml_learning_cycle", MODULE)
+mlc = importlib.util.module_from_spec(_spec)
+sys.modules.setdefault("ml_learning_cycle", mlc)
+_spec.loader.exec_module(mlc)
+
+GENRES = ["trap", "reggaeton", "rap"]
+COUNTRIES = ["ES", "MX", "CO", "AR"]
+COLLABORATORS = ["anuel_aa", "bad_bunny", "feid"]
+
+
+def _cycle(i, rng):
+    clips = {
+        f"clip_{c}": {"ctr": rng.uniform(1, 5), "roi": rng.uniform(50, 250), "engagement_rate": rng.uniform(0, 10)}
+        for c in range(rng.randint(0, 4))
+    }
+    return mlc.CycleMetrics(
+        cycle_id=f"cycle_{i:04d}",
+        timestamp=datetime(2025, 1, 1) + timedelta(hours=13 * i),
+        campaign_tags={},
+        clip_performance=clips,
+        geo_performance={
+            country: {"roi_projection": rng.uniform(50, 200)}
+            for country in rng.sample(COUNTRIES, rng.randint(0, 3))
+        },
+        budget_allocation={},
+        total_investment=rng.uniform(200, 600),
+        total_views=1000,
+        total_roi=rng.uniform(50, 250),
+        winner_clips=list(clips)[:1],
+        optimization_decisions={},
+        genre=GENRES[i % 3],
+        subgenre="sub",
+        collaborators=rng.sample(COLLABORATORS, rng.randint(0, 2)),
+        regional_focus=[],
+    )
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = mlc.HistoricalDataManager(str(tmp_path / "history.db"))
+    rng = random.Random(7)
+    for i in range(60):
+        manager.store_cycle(_cycle(i, rng))
+    return manager
+
+
+def test_sql_history_matches_in_memory_cycles(manager):
+    for genre in (None, "trap"):
+        cycles = manager.get_historical_cycles(genre=genre, limit=40)
+        from_sql = manager.get_cycle_history(genre=genre, limit=40)
+        in_memory = mlc.CycleHistory.from_cycles(cycles)
+        assert len(from_sql) == len(cycles)
+
+        learning = mlc.MLLearningCycle(historical_manager=manager)
+        _, sql_insights = learning.simulate_model_retraining(from_sql)
+        _, legacy_insights = learning.simulate_model_retraining(cycles)
+        for field in ("genre_performance_trends", "geo_optimization_learnings",
+                      "budget_allocation_insights", "audience_response_patterns",
+                      "seasonal_adjustments"):
+            sql_values, legacy_values = getattr(sql_insights, field), getattr(legacy_insights, field)
+            assert sql_values.keys() == legacy_values.keys()
+            for key in sql_values:
+                assert sql_values[key] == pytest.approx(legacy_values[key])
+        assert sql_insights.collaboration_effects["top_collaborators"] == pytest.approx(
+            legacy_insights.collaboration_effects["top_collaborators"]
+        )
+        assert np.array_equal(from_sql.geo_countries, in_memory.geo_countries)
+        assert np.array_equal(from_sql.collaborator_counts, in_memory.collaborator_counts)
+
+
+def test_aggregates_match_reference(manager):
+    cycles = manager.get_historical_cycles(limit=1000)
+    history = manager.get_cycle_history(limit=1000)
+    learning = mlc.MLLearningCycle(historical_manager=manager)
+
+    for genre, trend in learning.analyze_genre_trends(history).items():
+        rois = [c.total_roi for c in cycles if c.genre == genre]
+        assert trend == pytest.approx(min(sum(rois) / len(rois) / 150, 2.0))
+    for country, pattern in learning.analyze_geo_patterns(history).items():
+        rois = [c.geo_performance[country]["roi_projection"] for c in cycles if country in c.geo_performance]
+        assert pattern == pytest.approx(min(sum(rois) / len(rois) / 100, 1.5))
+    effects = learning.analyze_collaboration_effects(history)
+    assert effects["collaboration_sample_size"] == len({n for c in cycles for n in c.collaborators})
+
+
+def test_restore_replaces_rows_and_indexes_exist(manager):
+    cycle = _cycle(0, random.Random(1))
+    manager.store_cycle(cycle)
+    manager.store_cycle(cycle)
+    with sqlite3.connect(manager.db_path) as conn:
+        clips = conn.execute(
+            "SELECT COUNT(*) FROM clip_performance WHERE cycle_id = ?", (cycle.cycle_id,)
+        ).fetchone()[0]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert clips == len(cycle.clip_performance)
+    assert {"idx_geo_performance_country", "idx_clip_performance_cycle",
+            "idx_campaign_cycles_genre", "idx_campaign_cycles_timestamp"} <= indexes
+
+    empty = mlc.HistoricalDataManager(str(Path(manager.db_path).with_name("empty.db")))
+    adjustments, _ = mlc.MLLearningCycle(historical_manager=empty).retrain_from_history()
+    assert adjustments.confidence_score == 0.5
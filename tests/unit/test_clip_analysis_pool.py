@@ -0,0 +1,72 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+MODULE = (
+    Path(__file__).parents[2]
+    / "social_extensions/meta/advanced_campaign_system/ultralytics_integration.py"
+)
+_spec = importlib.util.spec_from_file_location("ultralytics_integration", MODULE)
+ui = importlib.util.module_from_spec(_spec)
+sys.modules.setdefault("ultralytics_integration", ui)
+_spec.loader.exec_module(ui)
+
+
+def _clips(directory, count, prefix="clip"):
+    paths = []
+    for i in range(count):
+        path = directory / f"{prefix}_{i:02d}.mp4"
+        path.write_bytes(f"{prefix}-video-{i}".encode() * 100)
+        paths.append(str(path))
+    return paths
+
+
+def test_pool_streams_results_in_parallel_and_keeps_input_order(tmp_path):
+    clips = _clips(tmp_path, 6)
+    with ui.ClipAnalysisPool(workers=3, frame_stride=10) as pool:
+        streamed = list(pool.analyze_iter(clips))
+        assert sorted(index for index, _ in streamed) == list(range(6))
+        assert all(a.clip_id == Path(clips[i]).stem for i, a in streamed)
+
+        analyses = pool.analyze(clips)  # todo desde cache
+        assert [a.file_path for a in analyses] == clips
+        assert pool.stats == {"analyzed": 6, "cache_hits": 6}
+
+    # Workers resembrados: no todos los clips devuelven el mismo análisis
+    assert len({a.visual_quality_score for _, a in streamed}) > 1
+    for _, analysis in streamed:
+        assert analysis.frames_analyzed == len(range(1, analysis.frame_count + 1, 10))
+        assert all((d["frame_number"] - 1) % 10 == 0 for d in analysis.object_detections)
+
+
+def test_disk_cache_by_content_only_analyzes_new_clips(tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    clips = _clips(tmp_path, 3)
+    with ui.ClipAnalysisPool(workers=1, cache_dir=cache_dir) as pool:
+        first = pool.analyze(clips)
+
+    # Nueva campaña: mismos clips (uno copiado con otro nombre) + uno nuevo
+    copy = tmp_path / "renamed.mp4"
+    copy.write_bytes(Path(clips[0]).read_bytes())
+    new = _clips(tmp_path, 1, prefix="new")
+    missing = str(tmp_path / "missing.mp4")
+    with ui.ClipAnalysisPool(workers=1, cache_dir=cache_dir) as pool:
+        second = pool.analyze(clips + [str(copy)] + new + [missing])
+        assert pool.stats == {"analyzed": 2, "cache_hits": 4}
+
+    assert [a.visual_quality_score for a in second[:3]] == [a.visual_quality_score for a in first]
+    assert second[3].clip_id == "renamed"
+    assert second[3].resolution == first[0].resolution
+    assert second[5].file_path == missing
+
+
+def test_selector_batch_uses_pool(tmp_path):
+    clips = _clips(tmp_path, 4)
+    with ui.UltralyticsClipSelector(
+        analysis_workers=2, analysis_cache_dir=str(tmp_path / "cache")
+    ) as selector:
+        analyses = selector.analyze_clip_batch(clips)
+        again = selector.analyze_clip_batch(clips)
+    assert selector.analysis_pool._executor is None
+    assert [a.clip_id for a in analyses] == [Path(c).stem for c in clips]
+    assert [a.virality_potential for a in again] == [a.virality_potential for a in analyses]
@@ -0,0 +1,74 @@
+import asyncio
+
+import numpy as np
+from sklearn.ensemble import IsolationForest, RandomForestRegressor
+from sklearn.preprocessing import StandardScaler
+
+import ml_core.cloud_processing as cloud_processing
+from ml_core.cloud_processing import CloudMLProcessingPipeline, MLModelType
+
+
+def _pipeline():
+    rng = np.random.default_rng(0)
+    X = rng.random((200, 5))
+    pipeline = CloudMLProcessingPipeline({"scoring_workers": 2})
+    pipeline.ml_models = {
+        MLModelType.ENGAGEMENT_PREDICTOR: RandomForestRegressor(n_estimators=10, random_state=0).fit(
+            X, X.sum(axis=1)
+        ),
+        MLModelType.ANOMALY_DETECTOR: IsolationForest(n_estimators=10, random_state=0).fit(X),
+    }
+    pipeline.model_scalers = {MLModelType.ENGAGEMENT_PREDICTOR: StandardScaler().fit(X)}
+    return pipeline
+
+
+def test_batched_scoring_matches_per_row(monkeypatch):
+    monkeypatch.setattr(cloud_processing, "DUMMY_MODE", False)
+    pipeline = _pipeline()
+    entity_features = {
+        ("instagram", f"post_{i}"): {"avg_engagement": i * 0.1, "time_of_day": i % 24, "total_followers": i}
+        for i in range(20)
+    }
+
+    async def run():
+        batched = await pipeline._generate_predictions(entity_features, [])
+        per_row = [
+            await pipeline._make_model_prediction(model_type, model, features, [])
+            for model_type, model in pipeline.ml_models.items()
+            for features in entity_features.values()
+        ]
+        return batched, per_row
+
+    batched, per_row = asyncio.run(run())
+
+    assert len(batched) == len(per_row) == 40
+    for got, expected in zip(batched, per_row):
+        assert got.model_type == expected.model_type
+        assert np.isclose(got.prediction_value, expected.prediction_value)
+        assert np.isclose(got.confidence, expected.confidence)
+    assert batched[0].platform == "instagram"
+    assert batched[0].entity_id == "instagram:post_0"
+
+
+def test_failing_model_falls_back_to_dummy(monkeypatch):
+    monkeypatch.setattr(cloud_processing, "DUMMY_MODE", False)
+    pipeline = _pipeline()
+    # Fitted on 3 features, so scoring the 5-column matrix raises
+    pipeline.ml_models[MLModelType.VIRAL_DETECTOR] = RandomForestRegressor(n_estimators=2).fit(
+        np.zeros((4, 3)), np.zeros(4)
+    )
+
+    predictions = asyncio.run(pipeline._generate_predictions({("x", None): {}}, []))
+
+    viral = [p for p in predictions if p.model_type == MLModelType.VIRAL_DETECTOR]
+    assert len(predictions) == 3
+    assert viral[0].model_version == "dummy_1.0.0"
+
+
+def test_stop_shuts_down_scoring_executor(tmp_path):
+    pipeline = CloudMLProcessingPipeline({"model_storage_path": str(tmp_path)})
+    pipeline.scoring_executor.submit(int).result()
+
+    asyncio.run(pipeline.stop_processing_pipeline())
+
+    assert pipeline.scoring_executor._shutdown
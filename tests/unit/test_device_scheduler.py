@@ -0,0 +1,103 @@
+from dataclasses import dataclass, field
+
+from device_farm_v5.src.core.device_scheduler import (
+    DeviceCapabilities,
+    DeviceScheduler,
+    TaskRequirements,
+)
+
+
+@dataclass
+class FakeTask:
+    task_id: str
+    priority: int = 2
+    device_requirements: dict = field(default_factory=dict)
+
+
+def test_requirements_match_capabilities():
+    caps = DeviceCapabilities(
+        android_version=(12,),
+        screen_resolution="1080x2400",
+        region="es",
+        packages=frozenset({"com.zhiliaoapp.musically"}),
+    )
+    assert TaskRequirements.from_dict({"min_android_version": "11"}).is_satisfied_by(caps)
+    assert not TaskRequirements.from_dict({"min_android_version": "13"}).is_satisfied_by(caps)
+    assert not TaskRequirements.from_dict({"region": "mx"}).is_satisfied_by(caps)
+    assert TaskRequirements.from_dict(
+        {"packages": ["com.zhiliaoapp.musically"]}
+    ).is_satisfied_by(caps)
+    assert not TaskRequirements.from_dict({"packages": ["com.other"]}).is_satisfied_by(caps)
+
+
+def test_unknown_capabilities_do_not_block_tasks():
+    """An ADB scan reports neither packages nor proxy region"""
+
+    class DeviceInfo:
+        android_version = "12"
+        screen_resolution = "1080x2400"
+
+    scheduler = DeviceScheduler()
+    scheduler.set_device("scanned", DeviceCapabilities.from_device_info(DeviceInfo()))
+    scheduler.submit(
+        FakeTask("tiktok-es", device_requirements={"region": "es", "packages": ["com.zhiliaoapp.musically"]})
+    )
+    task, serial = scheduler.next_assignment()
+    assert (task.task_id, serial) == ("tiktok-es", "scanned")
+
+
+def test_scheduler_respects_requirements_and_priority():
+    scheduler = DeviceScheduler()
+    scheduler.set_device("old", DeviceCapabilities(android_version=(9,)))
+    scheduler.set_device("new", DeviceCapabilities(android_version=(13,)))
+
+    scheduler.submit(FakeTask("low", priority=1))
+    scheduler.submit(FakeTask("needs-13", priority=2, device_requirements={"android_version": "13"}))
+    scheduler.submit(FakeTask("urgent", priority=4))
+
+    task, serial = scheduler.next_assignment()
+    assert task.task_id == "urgent"
+
+    task, serial = scheduler.next_assignment()
+    if task.task_id == "needs-13":
+        assert serial == "new"
+    else:
+        # "urgent" took the Android 13 device, so only "low" fits the other one
+        assert (task.task_id, serial) == ("low", "old")
+
+    assert scheduler.next_assignment() is None
+
+
+def test_task_waits_for_compatible_device():
+    scheduler = DeviceScheduler()
+    scheduler.set_device("a", DeviceCapabilities(region="es"))
+    scheduler.submit(FakeTask("mx-only", device_requirements={"region": "mx"}))
+
+    assert scheduler.next_assignment() is None
+
+    scheduler.set_device("b", DeviceCapabilities(region="mx"))
+    task, serial = scheduler.next_assignment()
+    assert (task.task_id, serial) == ("mx-only", "b")
+    assert not scheduler.is_idle("b")
+
+    scheduler.mark_idle("b")
+    assert scheduler.is_idle("b")
+    assert scheduler.pending_count == 0
+
+
+def test_removed_task_leaves_the_index():
+    scheduler = DeviceScheduler()
+    scheduler.submit(FakeTask("unmatched", device_requirements={"min_android_version": "99"}))
+    scheduler.submit(FakeTask("high", priority=5))
+    scheduler.submit(FakeTask("low", priority=1))
+
+    assert scheduler.remove_task("unmatched")
+    assert scheduler.remove_task("high")
+    assert not scheduler.remove_task("high")
+    assert scheduler.pending_count == 1
+    assert scheduler.pending_by_priority() == {5: 0, 1: 1, 2: 0}
+
+    scheduler.set_device("d1", DeviceCapabilities(android_version=(12,)))
+    task, serial = scheduler.next_assignment()
+    assert (task.task_id, serial) == ("low", "d1")
+    assert not scheduler.remove_task("low")
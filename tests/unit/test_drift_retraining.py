@@ -0,0 +1,87 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sklearn.cluster import KMeans
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import SGDRegressor
+
+import ml_core.cloud_processing as cloud_processing
+from ml_core.cloud_processing import CloudMLProcessingPipeline, MLModelType
+from ml_core.drift_monitor import DriftMonitor
+
+
+def test_drift_monitor_flags_mean_shift_only():
+    rng = np.random.default_rng(0)
+    monitor = DriftMonitor(threshold=1.0, reference_size=100)
+
+    assert not any(monitor.observe("m", "features", rng.normal(0, 1, (50, 3))) for _ in range(10))
+    shifted = [monitor.observe("m", "features", rng.normal(0, 1, (50, 3)) + [0, 0, 3]) for _ in range(20)]
+    assert shifted[-1]
+    assert monitor.scores()["m"]["features"] > 1.0
+
+    monitor.reset("m")
+    assert monitor.scores() == {}
+
+
+def test_feedback_drift_triggers_incremental_update(monkeypatch, tmp_path):
+    monkeypatch.setattr(cloud_processing, "DUMMY_MODE", False)
+    pipeline = CloudMLProcessingPipeline(
+        {"model_storage_path": str(tmp_path), "drift_reference_size": 20}
+    )
+    model = SGDRegressor(random_state=0).fit(np.zeros((4, 5)), np.zeros(4))
+    pipeline.ml_models = {MLModelType.ENGAGEMENT_PREDICTOR: model}
+
+    def feedback(actual):
+        return {
+            "action_type": "engagement_boost",
+            "expected_outcome": {"engagement_increase": 10.0},
+            "actual_outcome": {"engagement_increase": actual},
+            "features": {"avg_engagement": actual / 10, "time_of_day": 12},
+        }
+
+    async def run():
+        await pipeline.process_feedback([feedback(10.0 + i % 3) for i in range(100)])
+        assert pipeline.retrain_queue.empty()
+        await pipeline.process_feedback([feedback(40.0) for _ in range(100)])
+        model_type, reason = pipeline.retrain_queue.get_nowait()
+        await pipeline._retrain_drifted_model(model_type)
+        return model_type, reason
+
+    model_type, reason = asyncio.run(run())
+
+    assert model_type == MLModelType.ENGAGEMENT_PREDICTOR
+    assert reason == "feedback error drift"
+    updated = pipeline.ml_models[MLModelType.ENGAGEMENT_PREDICTOR]
+    assert updated is not model
+    assert not np.allclose(updated.coef_, model.coef_)
+    assert pipeline.processing_metrics["models_updated"] == 1
+
+
+def test_unadopted_retrain_resets_staleness(tmp_path):
+    pipeline = CloudMLProcessingPipeline({"model_storage_path": str(tmp_path)})
+    model_type = MLModelType.ENGAGEMENT_PREDICTOR
+    perf = cloud_processing.ModelPerformanceMetrics(
+        model_type=model_type, accuracy=0.8, precision=0.8, recall=0.8, f1_score=0.8,
+        mae=0.2, r2_score=0.6, last_trained=datetime.now() - timedelta(days=10),
+        training_samples=0, validation_samples=0,
+    )
+    assert pipeline._days_since_retrain(model_type, perf) == 10
+
+    # Too little data: the attempt is not adopted, but it still counts
+    assert asyncio.run(pipeline.retrain_model(model_type, [])) is False
+    pipeline._last_retrained[model_type] = time.monotonic()
+    assert pipeline._days_since_retrain(model_type, perf) == 0
+
+
+def test_online_estimators_only_for_models_with_feedback(tmp_path):
+    pipeline = CloudMLProcessingPipeline({"model_storage_path": str(tmp_path)})
+
+    async def build(model_type):
+        return await pipeline._initialize_new_model(model_type)
+
+    assert isinstance(asyncio.run(build(MLModelType.ENGAGEMENT_PREDICTOR)), SGDRegressor)
+    assert isinstance(asyncio.run(build(MLModelType.VIRAL_DETECTOR)), SGDRegressor)
+    assert isinstance(asyncio.run(build(MLModelType.CONTENT_OPTIMIZER)), RandomForestRegressor)
+    assert isinstance(asyncio.run(build(MLModelType.AUDIENCE_SEGMENTER)), KMeans)
@@ -0,0 +1,58 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from ml_core.engine_stores import PendingActionQueue, SpillingHistoryStore, TimeBucketedStore
+
+
+def _point(ts, value=0):
+    return SimpleNamespace(timestamp=ts, value=value)
+
+
+def test_since_returns_each_point_once():
+    store = TimeBucketedStore(bucket_seconds=60)
+    now = datetime(2024, 1, 1, 12, 0)
+    store.extend([_point(now + timedelta(seconds=i * 30), i) for i in range(6)])
+
+    points, mark = store.since(0)
+    assert [p.value for p in points] == list(range(6))
+
+    # Late point lands in an old bucket but is still returned after the mark
+    store.append(_point(now, 99))
+    points, mark = store.since(mark)
+    assert [p.value for p in points] == [99]
+    assert store.since(mark)[0] == []
+
+
+def test_expire_and_max_points_eviction():
+    store = TimeBucketedStore(bucket_seconds=60, max_points=4)
+    now = datetime(2024, 1, 1, 12, 0)
+    store.extend([_point(now + timedelta(minutes=i), i) for i in range(6)])
+
+    assert len(store) == 4
+    expired = store.expire_before(now + timedelta(minutes=5))
+    assert [p.value for p in expired] == [0, 1, 2, 3, 4]
+    assert [p.value for p in store] == [5]
+
+
+def test_pending_queue_orders_by_priority_and_removes_lazily():
+    queue = PendingActionQueue(priority=lambda a: (a.confidence,))
+    actions = [SimpleNamespace(name=n, confidence=c) for n, c in [("a", 0.5), ("b", 0.9), ("c", 0.7)]]
+    queue.extend(actions)
+
+    assert [a.name for a in queue.remove_where(lambda a: a.name == "c")] == ["c"]
+    assert len(queue) == 2
+    assert queue.pop().name == "b"
+    assert queue.pop().name == "a"
+    assert queue.pop() is None
+    assert len(queue) == 0
+
+
+def test_history_spills_oldest_to_disk(tmp_path):
+    store = SpillingHistoryStore(str(tmp_path), max_in_memory=3, segment_points=2)
+    store.extend([{"value": i} for i in range(8)])
+
+    assert len(store) == 8
+    assert store.spilled_points == 5
+    assert [r["value"] for r in store.iter_spilled()] == [0, 1, 2, 3, 4]
+    assert [r["value"] for r in store.recent(2)] == [6, 7]
+    assert len(list(tmp_path.glob("history-*.jsonl"))) == 3
@@ -0,0 +1,74 @@
+import random
+from types import SimpleNamespace
+
+import numpy as np
+
+from ml_core.audience_join import spotify_index, youtube_index
+from ml_core.feature_columns import FEATURE_COLUMNS, ColumnarFeatureBuilder
+
+AGES = {"18-24": 21, "25-34": 29, "35-44": 39}
+
+
+def _meta(rng: random.Random, n: int):
+    return [
+        SimpleNamespace(
+            country=rng.choice(["ES", "MX", "PE"]),
+            age_range=rng.choice(list(AGES)),
+            gender=rng.choice(["female", "male"]),
+            device_type=rng.choice(["mobile", "desktop"]),
+            ctr=rng.random(),
+            retention_rate=rng.random(),
+            conversions=rng.randint(0, 20),
+            cost_per_conversion=rng.uniform(0.1, 5),
+            engagement_rate=rng.random(),
+            landing_page_time=rng.randint(5, 120),
+        )
+        for _ in range(n)
+    ]
+
+
+def _builder(rng: random.Random) -> ColumnarFeatureBuilder:
+    youtube = [
+        SimpleNamespace(country=rng.choice(["ES", "MX"]), age=rng.randint(18, 45),
+                        retention_rate=rng.random(), watch_time=rng.randint(10, 300),
+                        engagement_actions=["like"])
+        for _ in range(300)
+    ]
+    spotify = [
+        SimpleNamespace(country="ES", age=rng.randint(18, 45), listening_time=rng.randint(10, 300),
+                        has_saved_track=True, repeat_listens=rng.randint(0, 5))
+        for _ in range(200)
+    ]
+    return ColumnarFeatureBuilder(youtube_index(youtube), spotify_index(spotify), lambda r: AGES.get(r, 30))
+
+
+def test_frame_has_row_features_and_drops_unmatched_rows():
+    rng = random.Random(3)
+    meta = _meta(rng, 50)
+    builder = _builder(rng)
+    builder.add_performance(meta)
+    frame = builder.features()
+
+    matched = [m for m in meta if m.country != "PE"]
+    assert tuple(frame.columns) == FEATURE_COLUMNS
+    assert len(frame) == len(builder) == len(matched)
+    assert set(frame["country"]) <= {"ES", "MX"}
+    assert list(frame["cross_platform_score"]) == sorted(frame["cross_platform_score"], reverse=True)
+
+    expected_roi = sorted(m.conversions / max(m.cost_per_conversion * m.conversions, 1) for m in matched)
+    assert np.allclose(sorted(frame["roi"]), expected_roi)
+
+
+def test_incremental_batches_match_single_batch():
+    rng = random.Random(5)
+    meta = _meta(rng, 60)
+    incremental, full = _builder(random.Random(9)), _builder(random.Random(9))
+
+    incremental.add_performance(meta[:20])
+    incremental.features()
+    incremental.add_performance(meta[20:])
+    full.add_performance(meta)
+
+    a = incremental.features().sort_values(list(FEATURE_COLUMNS)).reset_index(drop=True)
+    b = full.features().sort_values(list(FEATURE_COLUMNS)).reset_index(drop=True)
+    assert a.equals(b)
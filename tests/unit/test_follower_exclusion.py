@@ -0,0 +1,139 @@
+import importlib.util
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+MODULE = (
+    Path(__file__).parents[2]
+    / "social_extensions/meta/advanced_campaign_system/follower_exclusion.py"
+)
+_spec = importlib.util.spec_from_file_location("follower_exclusion", MODULE)
+fe = importlib.util.module_from_spec(_spec)
+sys.modules.setdefault("follower_exclusion", fe)
+_spec.loader.exec_module(fe)
+
+
+def _followers(account, count, rng, start=0):
+    now = datetime.now()
+    return [
+        fe.FollowerData(
+            user_id=f"user_{account}_{i:05d}",
+            follow_date=now - timedelta(days=rng.randint(1, 365), hours=1),
+            engagement_level=rng.random(),
+            account_type="personal",
+        )
+        for i in range(start, start + count)
+    ]
+
+
+def _reference(followers, settings):
+    now = datetime.now()
+    return {
+        f.user_id
+        for f in followers
+        if (settings["exclude_recent_followers"] and (now - f.follow_date).days <= settings["recent_threshold_days"])
+        or (settings["exclude_high_engagement"] and f.engagement_level > settings["engagement_threshold"])
+    }
+
+
+def test_bitmap_set_operations_match_python_sets():
+    rng = np.random.default_rng(3)
+    a_ids = rng.choice(200_000, 5_000, replace=False) + 70_000
+    b_ids = rng.choice(150_000, 8_000, replace=False)
+    a, b = fe.FollowerBitmap.from_ids(a_ids), fe.FollowerBitmap.from_ids(b_ids)
+    sa, sb = set(a_ids.tolist()), set(b_ids.tolist())
+
+    assert len(a) == len(sa)
+    assert set((a | b).to_ids().tolist()) == sa | sb
+    assert set((a & b).to_ids().tolist()) == sa & sb
+    assert set((a - b).to_ids().tolist()) == sa - sb
+    probe = np.arange(-5, 300_000, 7)
+    assert np.array_equal(a.contains_many(probe), np.isin(probe, a_ids))
+    assert len(fe.FollowerBitmap() | a) == len(a)
+    assert len(fe.FollowerBitmap() & a) == 0
+
+
+def test_exclusion_list_matches_set_semantics():
+    rng = random.Random(5)
+    manager = fe.FollowerExclusionManager()
+    followers = _followers("acc", 3000, rng)
+    exclusion = manager.create_exclusion_list(followers)
+    expected = _reference(followers, manager.exclusion_settings)
+
+    assert len(exclusion) == len(expected)
+    assert set(exclusion.user_ids()) == expected
+    assert all((f.user_id in exclusion) == (f.user_id in expected) for f in followers[:200])
+    assert "user_unknown" not in exclusion
+
+    audience = {"name": "Real", "user_ids": [f.user_id for f in followers] + [f"x_{i}" for i in range(5000)]}
+    segment = manager.filter_audience(audience, exclusion, "acc")
+    assert segment.original_size == 8000
+    assert segment.exclusion_count == len(expected)
+
+
+def test_incremental_accounts_persist_and_union(tmp_path):
+    rng = random.Random(9)
+    manager = fe.FollowerExclusionManager(storage_dir=str(tmp_path))
+    first = _followers("a", 1000, rng)
+    assert manager.ingest_followers("a", first) == 1000
+    assert manager.ingest_followers("a", first[:500] + _followers("a", 200, rng, start=1000)) == 200
+    manager.ingest_followers("b", _followers("b", 700, rng) + first[:100])
+
+    settings = dict(manager.exclusion_settings, exclude_all_followers=True)
+    union = manager.create_account_exclusion_list(["a", "b"], settings)
+    assert len(union) == 1200 + 700
+    shared = fe.FollowerExclusionSet(manager.account_followers["a"] & manager.account_followers["b"], manager.id_interner)
+    assert sorted(shared.user_ids()) == sorted(f.user_id for f in first[:100])
+
+    # Reabierto: interner y bitmaps desde disco (mmap), y sigue aceptando altas
+    reopened = fe.FollowerExclusionManager(storage_dir=str(tmp_path))
+    restored = reopened.create_account_exclusion_list(["a", "b"], settings)
+    assert set(restored.user_ids()) == set(union.user_ids())
+    assert reopened.ingest_followers("b", _followers("b", 50, rng, start=700)) == 50
+    assert len(reopened.account_followers["b"]) == 850
+
+
+def test_bloom_filter_fpr_and_persistence(tmp_path):
+    members = [f"user_{i}" for i in range(20_000)]
+    bloom = fe.FollowerBloomFilter(len(members), fpr=0.01)
+    bloom.add(members)
+    assert bloom.contains_many(members).all()
+    false_positives = bloom.contains_many([f"other_{i}" for i in range(20_000)]).mean()
+    assert false_positives < 0.02
+    assert len(bloom) == pytest.approx(20_000, rel=0.05)
+
+    bloom.save(str(tmp_path / "bloom.npy"))
+    loaded = fe.FollowerBloomFilter.load(str(tmp_path / "bloom.npy"))
+    assert loaded.contains_many(members[:100]).all()
+    loaded.add(["late_follower"])
+    assert "late_follower" in loaded
+
+    manager = fe.FollowerExclusionManager()
+    settings = dict(manager.exclusion_settings, exclusion_backend="bloom")
+    followers = _followers("acc", 2000, random.Random(2))
+    exclusion = manager.create_exclusion_list(followers, settings)
+    assert isinstance(exclusion, fe.FollowerBloomFilter)
+    expected = _reference(followers, settings)
+    assert all(user_id in exclusion for user_id in expected)
+
+
+def test_interner_merges_index_and_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(fe.FollowerIdInterner, "MERGE_THRESHOLD", 7)
+    path = str(tmp_path / "ids.txt")
+    interner = fe.FollowerIdInterner(path)
+    batches = [[f"user_{i}" for i in range(start, start + 10)] * 2 for start in range(0, 50, 5)]
+    interned = [interner.intern(batch) for batch in batches]
+
+    assert len(interner) == 55
+    assert interner.user_ids(interned[3]) == batches[3]
+    assert interner.lookup(["user_54", "user_55"]).tolist() == [interner.intern(["user_54"])[0], -1]
+
+    reloaded = fe.FollowerIdInterner(path)
+    assert len(reloaded) == 55
+    assert np.array_equal(reloaded.lookup(batches[7]), interned[7])
+    # Popcount sin np.bitwise_count (NumPy < 2)
+    assert len(fe.FollowerBitmap.from_ids(interned[7])) == 10
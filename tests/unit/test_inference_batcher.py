@@ -0,0 +1,57 @@
+import asyncio
+
+import pytest
+
+from device_farm_v5.src.ml.inference_batcher import InferenceBatcher
+
+
+def test_requests_are_batched_and_scattered_back():
+    batches = []
+
+    def infer(items):
+        batches.append(list(items))
+        return [item * 10 for item in items]
+
+    batcher = InferenceBatcher(infer, batch_size=4, max_latency_seconds=0.05)
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(i) for i in range(10)))
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        batcher.stop()
+
+    assert results == [i * 10 for i in range(10)]
+    assert sorted(len(batch) for batch in batches) == [2, 4, 4]
+
+    stats = batcher.get_statistics()
+    assert stats["requests"] == 10
+    assert stats["batches"] == 3
+
+
+def test_batch_failure_propagates_to_every_caller():
+    def infer(items):
+        raise ValueError("model exploded")
+
+    batcher = InferenceBatcher(infer, batch_size=2, max_latency_seconds=0.05)
+
+    async def run():
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        batcher.stop()
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert batcher.get_statistics()["failed_batches"] == 1
+
+
+def test_wrong_result_count_is_an_error():
+    batcher = InferenceBatcher(lambda items: [], batch_size=1)
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.submit("x"))
+    finally:
+        batcher.stop()
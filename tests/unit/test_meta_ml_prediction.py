@@ -0,0 +1,41 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from ml_core.meta_model_registry import fit_meta_models
+from ml_core.sistema_meta_ml import MetaMLSystem
+
+
+def _trained_system(tmp_path, monkeypatch) -> MetaMLSystem:
+    monkeypatch.chdir(tmp_path)
+    rng = np.random.default_rng(0)
+    features = pd.DataFrame(rng.random((40, 3)), columns=["meta_ctr", "meta_retention", "age_numeric"])
+    features["country"] = "ES"
+    features["roi"] = features["meta_ctr"] * 3
+
+    system = MetaMLSystem()
+    system._activate_models(system.registry.publish(fit_meta_models(features, n_jobs=1)))
+    return system
+
+
+def test_batch_matches_single_predictions_and_is_cached(tmp_path, monkeypatch):
+    system = _trained_system(tmp_path, monkeypatch)
+    campaigns = [{"campaign_id": f"c{i}", "meta_ctr": i / 10} for i in range(5)]
+
+    batch = asyncio.run(system.predict_optimization_batch(campaigns))
+    single = [asyncio.run(system.predict_optimization(c)) for c in campaigns]
+
+    assert [p.campaign_id for p in batch] == ["c0", "c1", "c2", "c3", "c4"]
+    assert [p.expected_roi for p in batch] == [p.expected_roi for p in single]
+    assert all(a is b for a, b in zip(batch, single))
+    assert system.registry.get_versions()[0]["prediction_latency"]["predictions"] == 1
+
+
+def test_batch_falls_back_to_dummy_for_invalid_features(tmp_path, monkeypatch):
+    system = _trained_system(tmp_path, monkeypatch)
+
+    [prediction] = asyncio.run(system.predict_optimization_batch([{"campaign_id": "x", "meta_ctr": "n/a"}]))
+
+    assert prediction.campaign_id == "x"
+    assert prediction.expected_roi == 2.95
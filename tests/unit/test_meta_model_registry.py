@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from ml_core.meta_model_registry import MetaModelRegistry, fit_meta_models
+
+
+def _features(rows: int = 40, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame(rng.random((rows, 4)), columns=["a", "b", "c", "d"])
+    frame["country"] = "ES"
+    frame["roi"] = frame["a"] * 2 + frame["b"]
+    return frame
+
+
+def test_publish_versions_atomically_and_reloads_active(tmp_path):
+    registry = MetaModelRegistry(str(tmp_path))
+    result = fit_meta_models(_features(), n_jobs=1)
+
+    assert registry.validate(result) is None
+    first = registry.publish(result)
+    second = registry.publish(fit_meta_models(_features(seed=1), n_jobs=1))
+
+    assert (first.version, second.version) == (1, 2)
+    assert (tmp_path / "roi_model.v1.pkl").exists() and (tmp_path / "roi_model.pkl").exists()
+    assert not list(tmp_path.glob("*.tmp"))
+
+    reloaded = MetaModelRegistry(str(tmp_path))
+    assert reloaded.active.version == 2
+    assert [v["active"] for v in reloaded.get_versions()] == [False, True]
+
+
+def test_validation_rejects_regressed_scores(tmp_path):
+    registry = MetaModelRegistry(str(tmp_path))
+    result = fit_meta_models(_features(), n_jobs=1)
+    registry.publish(result)
+
+    worse = dict(result, roi_score=result["roi_score"] - 0.5)
+    assert "below active" in registry.validate(worse)
+    assert "not finite" in registry.validate(dict(result, segment_score=float("nan")))
+
+
+def test_validation_scores_active_version_on_candidate_holdout(tmp_path):
+    registry = MetaModelRegistry(str(tmp_path))
+    result = fit_meta_models(_features(), n_jobs=1)
+    registry.publish(result)
+
+    # A stored score from another split is not a fair bar; the active models
+    # are re-scored on the candidate's own hold-out rows instead
+    registry.active.metrics["roi_score"] = 1.0
+    assert registry.validate(result) is None
+
+
+def test_prediction_latency_is_tracked_per_version(tmp_path):
+    registry = MetaModelRegistry(str(tmp_path))
+    registry.publish(fit_meta_models(_features(), n_jobs=1))
+    registry.record_prediction(1, 0.002)
+    registry.record_prediction(1, 0.004)
+
+    latency = registry.get_versions()[0]["prediction_latency"]
+    assert latency["predictions"] == 2
+    assert latency["p95_ms"] > 0
@@ -43,3 +43,32 @@ def test_calculate_affinity_endpoint():
     assert resp.status_code == 200
     data = resp.json()
     assert "affinity_scores" in data
+
+
+def test_analyze_screenshots_batch_endpoint():
+    files = [
+        ("files", (f"img{i}.png", io.BytesIO(b"\x89PNG\r\n\x1a\n"), "image/png"))
+        for i in range(3)
+    ]
+    headers = {"X-API-Key": "dummy_development_key"}
+    resp = client.post("/api/v1/analyze_screenshots", files=files, headers=headers)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["batch_size"] == 3
+    assert [r["filename"] for r in data["results"]] == ["img0.png", "img1.png", "img2.png"]
+
+
+def test_analyze_screenshot_rejects_when_queue_full(monkeypatch):
+    import threading
+
+    from ml_core.api.endpoints import screenshot_analysis
+
+    full = threading.BoundedSemaphore(1)
+    full.acquire()
+    monkeypatch.setattr(screenshot_analysis, "_slots", full)
+
+    files = {"file": ("img.png", io.BytesIO(b"\x89PNG\r\n\x1a\n"), "image/png")}
+    headers = {"X-API-Key": "dummy_development_key"}
+    resp = client.post("/api/v1/analyze_screenshot", files=files, headers=headers)
+    assert resp.status_code == 429
+    assert "Retry-After" in resp.headers
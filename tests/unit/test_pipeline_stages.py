@@ -0,0 +1,81 @@
+import asyncio
+
+from ml_core.pipeline_stages import PipelineStage
+
+
+def test_items_flow_through_stages_in_batches():
+    received = []
+
+    async def double(item):
+        return [item * 2]
+
+    async def sink(items):
+        received.extend(items)
+
+    async def run():
+        last = PipelineStage("sink", sink, batch_size=5)
+        first = PipelineStage("double", double, workers=3, downstream=last)
+        for stage in (first, last):
+            stage.start()
+        for i in range(20):
+            await first.put(i)
+        await first.stop()
+        await last.stop()
+        return first.get_metrics(), last.get_metrics()
+
+    first_metrics, last_metrics = asyncio.run(run())
+
+    assert sorted(received) == [i * 2 for i in range(20)]
+    assert first_metrics["items_processed"] == last_metrics["items_processed"] == 20
+
+
+def test_slow_downstream_applies_backpressure():
+    async def run():
+        gate = asyncio.Event()
+
+        async def blocked(item):
+            await gate.wait()
+
+        async def forward(item):
+            return [item]
+
+        slow = PipelineStage("slow", blocked, maxsize=2)
+        fast = PipelineStage("fast", forward, maxsize=2, downstream=slow)
+        for stage in (fast, slow):
+            stage.start()
+
+        producer = asyncio.gather(*(fast.put(i) for i in range(10)))
+        await asyncio.sleep(0.05)
+        depths = (fast.queue.qsize(), slow.queue.qsize())
+        accepted = fast.items_in
+
+        gate.set()
+        await producer
+        await fast.stop()
+        await slow.stop()
+        return depths, accepted, slow.get_metrics()
+
+    depths, accepted, slow_metrics = asyncio.run(run())
+
+    # One item in the blocked handler, one waiting on put, two queues full
+    assert depths == (2, 2)
+    assert accepted < 10
+    assert slow_metrics["items_processed"] == 10
+    assert slow_metrics["backpressure_seconds"] > 0
+
+
+def test_handler_errors_are_counted_and_do_not_stop_the_stage():
+    async def flaky(item):
+        if item % 2:
+            raise ValueError(item)
+
+    async def run():
+        stage = PipelineStage("flaky", flaky)
+        stage.start()
+        for i in range(6):
+            await stage.put(i)
+        await stage.stop()
+        return stage.get_metrics()
+
+    metrics = asyncio.run(run())
+    assert (metrics["items_processed"], metrics["errors"]) == (3, 3)
@@ -0,0 +1,63 @@
+import numpy as np
+
+from device_farm_v5.src.ml.prediction_cache import PerceptualHashCache, perceptual_hash
+
+
+def _frame(seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 256, (240, 108, 3), dtype=np.uint8)
+
+
+def test_similar_frames_share_a_hash_neighbourhood():
+    frame = _frame(0)
+    noisy = np.clip(frame.astype(np.int16) + 2, 0, 255).astype(np.uint8)
+
+    assert bin(perceptual_hash(frame) ^ perceptual_hash(noisy)).count("1") <= 4
+    assert bin(perceptual_hash(frame) ^ perceptual_hash(_frame(1))).count("1") > 4
+
+
+def test_near_hit_across_devices_and_hit_ratio():
+    cache = PerceptualHashCache(hamming_tolerance=3, shared=True)
+    cache.put("device-a", 0b1011 << 40, {"detections": []})
+
+    assert cache.get("device-b", (0b1011 << 40) ^ 0b101) == {"detections": []}
+    assert cache.get("device-b", (0b1011 << 40) ^ 0b1111) is None
+
+    stats = cache.get_statistics()
+    assert (stats["requests"], stats["hits"], stats["near_hits"]) == (2, 1, 1)
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_variants_do_not_share_results():
+    cache = PerceptualHashCache(hamming_tolerance=0, shared=True)
+    cache.put("device-a", 42, {"bbox": [0, 0, 1080, 1920]}, variant="1080x1920")
+
+    assert cache.get("device-b", 42, variant="720x1280") is None
+    assert cache.get("device-b", 42, variant="1080x1920") == {"bbox": [0, 0, 1080, 1920]}
+
+
+def test_per_device_scope_lru_and_ttl():
+    cache = PerceptualHashCache(max_entries=2, hamming_tolerance=0, shared=False)
+    cache.put("a", 1, {"v": 1})
+    cache.put("a", 2, {"v": 2})
+    assert cache.get("b", 1) is None
+
+    cache.get("a", 1)  # 1 becomes most recently used
+    cache.put("a", 3, {"v": 3})
+    assert cache.get("a", 2) is None
+    assert cache.get("a", 1) == {"v": 1}
+
+    expired = PerceptualHashCache(ttl_seconds=0)
+    expired.put("a", 7, {"v": 7})
+    assert expired.get("a", 7) is None
+    assert expired.get_statistics()["expirations"] == 1
+
+
+def test_memory_bound_evicts_oldest():
+    cache = PerceptualHashCache(max_memory_bytes=100, hamming_tolerance=0)
+    cache.put("a", 1, {"payload": "x" * 60})
+    cache.put("a", 2, {"payload": "y" * 60})
+
+    assert len(cache) == 1
+    assert cache.get("a", 2) is not None
+    assert cache.get_statistics()["evictions"] == 1
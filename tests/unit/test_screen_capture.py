@@ -0,0 +1,42 @@
+import struct
+
+import numpy as np
+import pytest
+
+from device_farm_v5.src.core.screen_capture import ScreenCaptureError, decode_screencap
+
+
+def _raw(pixels: np.ndarray, pixel_format: int, header_words: int = 3) -> bytes:
+    height, width = pixels.shape[:2]
+    header = struct.pack("<III", width, height, pixel_format)
+    if header_words == 4:
+        header += struct.pack("<I", 0)  # color space (Android 12+)
+    return header + pixels.tobytes()
+
+
+@pytest.mark.parametrize("header_words", [3, 4])
+def test_decode_rgba_with_both_header_layouts(header_words):
+    rgba = np.random.default_rng(0).integers(0, 256, (6, 4, 4), dtype=np.uint8)
+
+    image, size = decode_screencap(_raw(rgba, 1, header_words))
+
+    assert size == (4, 6)
+    assert image.shape == (6, 4, 3)
+    assert np.array_equal(image, rgba[..., :3])
+
+
+def test_decode_bgra_and_downscale():
+    bgra = np.random.default_rng(1).integers(0, 256, (8, 6, 4), dtype=np.uint8)
+
+    image, size = decode_screencap(_raw(bgra, 5), downscale=2)
+
+    assert size == (6, 8)
+    assert image.shape == (4, 3, 3)
+    assert np.array_equal(image, bgra[::2, ::2, 2::-1])
+    assert image.flags["C_CONTIGUOUS"]
+
+
+def test_decode_rejects_truncated_output():
+    rgba = np.zeros((4, 4, 4), dtype=np.uint8)
+    with pytest.raises(ScreenCaptureError):
+        decode_screencap(_raw(rgba, 1)[:-10])
@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from ml_core.cloud_processing import SocialMediaFeatureExtractor
+from ml_core.data_acquisition import MetricType, SocialMetric
+
+
+def _metrics(n, start):
+    rng = np.random.default_rng(0)
+    types = [MetricType.ENGAGEMENT, MetricType.FOLLOWERS, MetricType.REACH]
+    return [
+        SocialMetric(
+            platform=["instagram", "tiktok"][i % 2],
+            metric_type=types[i % 3],
+            timestamp=start + timedelta(minutes=i),
+            value=float(rng.uniform(0, 100)),
+            change_percentage=float(rng.uniform(-1.5, 1.5)),
+        )
+        for i in range(n)
+    ]
+
+
+def test_streaming_features_match_batch_statistics():
+    data = _metrics(300, datetime.now() - timedelta(hours=6))
+    extractor = SocialMediaFeatureExtractor()
+
+    async def run():
+        for i in range(0, len(data), 50):
+            features = await extractor.extract_features(data[i:i + 50])
+        return features
+
+    features = asyncio.run(run())
+
+    engagement = [m for m in data if m.metric_type == MetricType.ENGAGEMENT]
+    followers = [m for m in data if m.metric_type == MetricType.FOLLOWERS]
+    assert np.isclose(features["avg_engagement"], np.mean([m.value for m in engagement]))
+    assert np.isclose(features["engagement_volatility"], np.std([m.value for m in engagement]))
+    assert np.isclose(features["engagement_trend"], np.mean([m.change_percentage for m in engagement]))
+    assert np.isclose(features["total_followers"], np.sum([m.value for m in followers]))
+    assert features["platform_count"] == 2
+    assert features["time_of_day"] == data[-1].timestamp.hour
+    assert 0.0 <= features["cross_platform_correlation"] <= 1.0
+
+
+def test_quick_features_and_reset():
+    data = _metrics(30, datetime.now())
+    extractor = SocialMediaFeatureExtractor()
+
+    quick = asyncio.run(extractor.extract_quick_features(data))
+    assert quick["data_points"] == 30
+    assert np.isclose(quick["max_change"], max(abs(m.change_percentage) for m in data))
+
+    extractor.reset()
+    assert asyncio.run(extractor.extract_features([])) == {}
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine
+from sqlalchemy.orm import sessionmaker
+
+from device_farm_v5.src.core.task_journal import TaskJournal
+
+
+def _make_table(tmp_path):
+    metadata = MetaData()
+    table = Table(
+        "tasks",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("status", String, nullable=False),
+        Column("device_serial", String, nullable=True),
+        Column("retry_count", Integer, default=0),
+        Column("completed_at", DateTime, nullable=True),
+    )
+    engine = create_engine(f"sqlite:///{tmp_path / 'tasks.db'}")
+    metadata.create_all(engine)
+    return table, engine, sessionmaker(bind=engine)
+
+
+def test_transitions_are_coalesced_and_flushed(tmp_path):
+    table, engine, Session = _make_table(tmp_path)
+    journal = TaskJournal(Session, table, str(tmp_path / "journal"), flush_interval=60)
+    journal.start()
+
+    for i in range(10):
+        journal.record_insert(f"t{i}", {"status": "pending"})
+        journal.record_update(f"t{i}", {"status": "assigned", "device_serial": "dev1"})
+    journal.record_update("t0", {"status": "completed", "completed_at": datetime.now(timezone.utc)})
+
+    assert journal.pending("t0")["status"] == "completed"
+    assert journal.flush(timeout=10)
+    journal.stop()
+
+    with engine.connect() as conn:
+        rows = {row.id: row for row in conn.execute(table.select())}
+    assert len(rows) == 10
+    assert rows["t0"].status == "completed"
+    assert rows["t5"].status == "assigned"
+    assert rows["t5"].retry_count == 0
+    assert list((tmp_path / "journal").glob("*.log")) == []
+
+
+def test_unflushed_segments_are_replayed(tmp_path):
+    table, engine, Session = _make_table(tmp_path)
+    journal_dir = str(tmp_path / "journal")
+
+    # Simulate a crash: records hit the log but the writer never flushes
+    crashed = TaskJournal(Session, table, journal_dir, flush_interval=3600)
+    crashed.start()
+    crashed.record_insert("t1", {"status": "pending"})
+    crashed.record_update("t1", {"status": "running"})
+    crashed._stopping = True
+
+    recovered = TaskJournal(Session, table, journal_dir)
+    recovered.start()
+    recovered.stop()
+
+    with engine.connect() as conn:
+        rows = list(conn.execute(table.select()))
+    assert [(row.id, row.status) for row in rows] == [("t1", "running")]
+
+
+def test_rejected_rows_are_quarantined(tmp_path):
+    table, engine, Session = _make_table(tmp_path)
+    journal_dir = tmp_path / "journal"
+    journal = TaskJournal(Session, table, str(journal_dir), flush_interval=60)
+    journal.start()
+
+    journal.record_insert("good", {"status": "pending"})
+    journal.record_insert("bad", {"status": None})
+    assert journal.flush(timeout=10)
+    journal.record_insert("later", {"status": "pending"})
+    assert journal.flush(timeout=10)
+    journal.stop()
+
+    with engine.connect() as conn:
+        rows = {row.id for row in conn.execute(table.select())}
+    assert rows == {"good", "later"}
+    quarantined = (journal_dir / "quarantine.jsonl").read_text().splitlines()
+    assert len(quarantined) == 1
+    assert '"id": "bad"' in quarantined[0]
+    assert list(journal_dir.glob("journal-*.log")) == []
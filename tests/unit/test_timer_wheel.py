@@ -0,0 +1,28 @@
+import math
+import random
+
+from device_farm_v5.src.core.timer_wheel import TimerWheel
+
+
+def test_items_fire_on_their_tick():
+    wheel = TimerWheel(tick_seconds=1.0, slot_bits=3, levels=2, start_time=0)
+    rng = random.Random(7)
+    due = {i: rng.uniform(0, 500) for i in range(1000)}
+    for item, due_time in due.items():
+        wheel.schedule(item, due_time)
+
+    for now in range(1, 520):
+        for item in wheel.advance(now):
+            assert now == math.ceil(due[item])
+
+    assert len(wheel) == 0
+
+
+def test_past_due_items_are_released_immediately():
+    wheel = TimerWheel(start_time=100)
+    wheel.schedule("late", 50)
+    wheel.schedule("later", 130)
+
+    assert wheel.advance(100) == ["late"]
+    assert wheel.advance(129) == []
+    assert wheel.advance(1000) == ["later"]
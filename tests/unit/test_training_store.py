@@ -0,0 +1,42 @@
+from datetime import datetime, timedelta
+
+from ml_core.training_store import TrainingDataStore
+
+
+def _entries(n, now):
+    return [{"timestamp": now - timedelta(hours=n - i), "value": i} for i in range(n)]
+
+
+def test_segments_rotate_and_resume_after_restart(tmp_path):
+    now = datetime(2024, 1, 1)
+    store = TrainingDataStore(str(tmp_path), segment_entries=10, max_segments=3)
+    store.extend(_entries(45, now))
+
+    # 5 segments written, the 2 oldest dropped
+    assert len(store) == 25
+    assert [e["value"] for e in store.iter_entries()] == list(range(20, 45))
+
+    # Simulate a crash mid-write, then reopen
+    last = sorted(tmp_path.iterdir())[-1]
+    with open(last, "a", encoding="utf-8") as f:
+        f.write('{"value": ')
+    reopened = TrainingDataStore(str(tmp_path), segment_entries=10, max_segments=3)
+    reopened.append({"value": 99})
+    assert [e["value"] for e in reopened.iter_entries()][-2:] == [44, 99]
+
+
+def test_sample_is_bounded_and_prefers_recent_entries(tmp_path):
+    now = datetime(2024, 1, 1)
+    store = TrainingDataStore(str(tmp_path), segment_entries=100)
+    store.extend(_entries(1000, now))
+
+    uniform = store.sample(100, seed=1)
+    assert len(uniform) == 100
+    assert len({e["value"] for e in uniform}) == 100
+    assert [e["value"] for e in uniform] == sorted(e["value"] for e in uniform)
+
+    decayed = store.sample(100, half_life_hours=24, now=now, seed=1)
+    assert sum(e["value"] for e in decayed) > sum(e["value"] for e in uniform)
+    assert min(e["value"] for e in decayed) > 500
+
+    assert len(store.sample(5000)) == 1000
@@ -0,0 +1,76 @@
+import importlib.util
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+MODULE = (
+    Path(__file__).parents[2]
+    / "social_extensions/meta/advanced_campaign_system/utm_tracking_system.py"
+)
+_spec = importlib.util.spec_from_file_location("utm_tracking_system", MODULE)
+utm = importlib.util.module_from_spec(_spec)
+sys.modules.setdefault("utm_tracking_system", utm)
+_spec.loader.exec_module(utm)
+
+
+def _visit(i, utm_id="utm_a"):
+    params = utm.UTMParameters("meta", "paid", "camp", "clip", "term", utm_id)
+    return utm.UTMVisitData(f"visit_{i}", datetime.now(), params, "10.0.0.1", "ua")
+
+
+def test_batched_writes_are_visible_to_reads_and_ordered(tmp_path):
+    db = utm.UTMDatabase(str(tmp_path / "utm.db"), batch_size=50, flush_interval=10)
+
+    threads = [
+        threading.Thread(target=lambda k=k: [db.save_visit(_visit(k * 100 + i)) for i in range(100)])
+        for k in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # Conversion queued right after its visit (still unflushed) must apply
+    db.save_visit(_visit(999))
+    db.update_visit_conversion("visit_999", "purchase", 9.5)
+
+    metrics = db.get_utm_metrics("utm_a")
+    assert metrics["total_visits"] == 401
+    assert metrics["total_conversions"] == 1
+    assert metrics["total_value"] == 9.5
+
+    stats = db.writer.get_stats()
+    assert stats["rows_written"] == 402
+    assert stats["batches_written"] < 402
+    db.writer.close()
+
+
+def test_schema_has_indexes_and_wal(tmp_path):
+    path = str(tmp_path / "utm.db")
+    db = utm.UTMDatabase(path)
+    db.save_visit(_visit(1))
+    db.save_visit(_visit(1))  # duplicate visit_id: dropped, rest of the batch kept
+    db.save_visit(_visit(2))
+    db.flush()
+
+    with sqlite3.connect(path) as conn:
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list('utm_visits')")}
+        assert {"idx_utm_visits_utm_id", "idx_utm_visits_timestamp"} <= indexes
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("SELECT COUNT(*) FROM utm_visits").fetchone()[0] == 2
+    assert db.writer.errors == 1
+    db.writer.close()
+
+
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+def test_dead_writer_reports_failure(tmp_path):
+    writer = utm.UTMWriter(str(tmp_path))  # un directorio: sqlite no puede abrirlo
+    writer._thread.join(5)
+
+    assert writer.closed and writer.failure is not None
+    assert writer.flush(timeout=1) is False
+    with pytest.raises(RuntimeError):
+        writer.submit("INSERT INTO t VALUES (?)", (1,))
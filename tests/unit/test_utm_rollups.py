@@ -0,0 +1,125 @@
+import importlib.util
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+MODULE = (
+    Path(__file__).parents[2]
+    / "social_extensions/meta/advanced_campaign_system/utm_tracking_system.py"
+)
+_spec = importlib.util.spec_from_file_location("utm_tracking_system", MODULE)
+utm = importlib.util.module_from_spec(_spec)
+sys.modules.setdefault("utm_tracking_system", utm)
+_spec.loader.exec_module(utm)
+
+START = datetime(2025, 3, 1, 22, 0)
+
+
+def _visit(i):
+    params = utm.UTMParameters("meta", "paid", "camp", "clip", "term", f"utm_{i % 3}")
+    return utm.UTMVisitData(
+        visit_id=f"visit_{i}",
+        timestamp=START + timedelta(minutes=17 * i),
+        utm_params=params,
+        ip_address="10.0.0.1",
+        user_agent="ua",
+        session_duration=(i * 7) % 300 if i % 4 else None,
+        geo_country=["ES", "MX", None][i % 3 - 1] if i % 5 else "AR",
+        device_type=["mobile", "desktop"][i % 2],
+    )
+
+
+def _populate(db, visits=120):
+    for i in range(visits):
+        db.save_visit(_visit(i))
+    for i in range(0, visits, 7):
+        db.update_visit_conversion(f"visit_{i}", "purchase", i * 1.5)
+    db.flush()
+
+
+def _raw_rollups(path, prefix):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            f"""
+            SELECT utm_id, substr(timestamp, 1, {prefix}), COALESCE(geo_country, 'unknown'),
+                   COALESCE(device_type, 'unknown'), COUNT(*),
+                   SUM(CASE WHEN conversion = 1 THEN 1 ELSE 0 END),
+                   COALESCE(SUM(conversion_value), 0), COALESCE(SUM(session_duration), 0),
+                   COUNT(session_duration)
+            FROM utm_visits GROUP BY 1, 2, 3, 4 ORDER BY 1, 2, 3, 4
+        """
+        ).fetchall()
+
+
+def _stored_rollups(db, granularity):
+    rows = db.get_utm_rollups(granularity)
+    return sorted(
+        (r["utm_id"], r["period"], r["geo_country"], r["device_type"], r["total_visits"],
+         r["total_conversions"], r["total_value"], r["total_session_duration"],
+         r["sessions_with_duration"])
+        for r in rows
+    )
+
+
+def _raw_metrics(path, utm_id):
+    with sqlite3.connect(path) as conn:
+        visits, conversions, value, duration = conn.execute(
+            """
+            SELECT COUNT(*), SUM(CASE WHEN conversion = 1 THEN 1 ELSE 0 END),
+                   SUM(conversion_value), AVG(session_duration)
+            FROM utm_visits WHERE utm_id = ?
+        """,
+            (utm_id,),
+        ).fetchone()
+    return visits, conversions, value, duration
+
+
+def test_incremental_rollups_match_group_by(tmp_path):
+    path = str(tmp_path / "utm.db")
+    db = utm.UTMDatabase(path, batch_size=16)
+    _populate(db)
+
+    assert _stored_rollups(db, "hourly") == _raw_rollups(path, 13)
+    assert _stored_rollups(db, "daily") == _raw_rollups(path, 10)
+    for utm_id in ("utm_0", "utm_1", "utm_2"):
+        visits, conversions, value, duration = _raw_metrics(path, utm_id)
+        metrics = db.get_utm_metrics(utm_id)
+        assert metrics["total_visits"] == visits
+        assert metrics["total_conversions"] == conversions
+        assert metrics["total_value"] == pytest.approx(value)
+        assert metrics["conversion_rate"] == pytest.approx(conversions * 100 / visits)
+        assert metrics["avg_session_duration"] == pytest.approx(duration)
+
+    since = db.get_utm_rollups("daily", utm_id="utm_1", since=START + timedelta(days=1))
+    assert since and all(r["utm_id"] == "utm_1" and r["period"] >= "2025-03-02" for r in since)
+    assert db.get_utm_metrics("missing")["total_visits"] == 0
+    with pytest.raises(ValueError):
+        db.get_utm_rollups("weekly")
+    db.writer.close()
+
+
+def test_rebuild_and_backfill(tmp_path):
+    path = str(tmp_path / "utm.db")
+    db = utm.UTMDatabase(path)
+    _populate(db, visits=60)
+    expected = _stored_rollups(db, "hourly"), db.get_utm_metrics("utm_0")
+
+    with sqlite3.connect(path) as conn:
+        conn.execute("UPDATE utm_metrics SET total_visits = 0")
+        conn.execute("DELETE FROM utm_metrics_hourly")
+    assert db.rebuild_metrics() == 3
+    assert (_stored_rollups(db, "hourly"), db.get_utm_metrics("utm_0")) == expected
+
+    # Database from before the triggers existed: backfilled on open
+    db.writer.close()
+    with sqlite3.connect(path) as conn:
+        for name in ("insert", "update", "delete"):
+            conn.execute(f"DROP TRIGGER trg_utm_visits_{name}")
+        for table in ("utm_metrics", "utm_metrics_hourly", "utm_metrics_daily"):
+            conn.execute(f"DELETE FROM {table}")
+    reopened = utm.UTMDatabase(path)
+    assert (_stored_rollups(reopened, "hourly"), reopened.get_utm_metrics("utm_0")) == expected
+    reopened.writer.close()
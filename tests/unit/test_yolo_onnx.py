@@ -0,0 +1,69 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("onnxruntime")
+
+from ml_core.models.yolo_onnx import YoloScreenshotDetector, _nms  # noqa: E402
+
+
+def test_nms_keeps_best_of_overlapping_boxes():
+    boxes = np.array([[0, 0, 10, 10], [1, 1, 10, 10], [20, 20, 30, 30]], dtype=np.float32)
+    scores = np.array([0.8, 0.9, 0.5], dtype=np.float32)
+
+    assert _nms(boxes, scores, 0.5).tolist() == [1, 2]
+
+
+def test_postprocess_undoes_letterbox_and_keeps_classes_apart():
+    detector = YoloScreenshotDetector.__new__(YoloScreenshotDetector)
+    detector.imgsz, detector.conf_threshold, detector.iou_threshold = 640, 0.25, 0.7
+
+    # Two identical boxes of different classes plus one below the threshold
+    output = np.zeros((4 + 3, 3), dtype=np.float32)
+    output[:4, 0] = output[:4, 1] = [320, 320, 100, 50]
+    output[4, 0], output[6, 1], output[5, 2] = 0.9, 0.8, 0.1
+
+    # 1280x640 source -> ratio 0.5, 160px vertical padding
+    boxes, scores, class_ids = detector._postprocess(output, (0.5, 0, 160, 1280, 640))
+
+    assert class_ids.tolist() == [0, 2]
+    assert np.allclose(boxes[0], [540, 270, 740, 370])
+
+
+def test_concurrent_exports_share_one_export(tmp_path, monkeypatch):
+    import sys
+    import threading
+    import types
+    from pathlib import Path
+
+    from ml_core.models.yolo_onnx import export_onnx
+
+    calls = []
+
+    class FakeYOLO:
+        def __init__(self, weights):
+            self.weights = Path(weights)
+
+        def export(self, **kwargs):
+            calls.append(self.weights)
+            target = self.weights.with_suffix(".onnx")
+            target.write_bytes(b"onnx")
+            return str(target)
+
+    monkeypatch.setitem(sys.modules, "ultralytics", types.SimpleNamespace(YOLO=FakeYOLO))
+    weights = tmp_path / "best.pt"
+    weights.write_bytes(b"weights")
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(export_onnx(str(weights))))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [tmp_path / "best.onnx"] * 8
+    assert len(calls) == 1
+    assert calls[0].parent != tmp_path
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["best.onnx", "best.pt"]